@@ -8,9 +8,10 @@ multi-agent collaboration with context preservation and conversation management.
 
 import autogen
 from typing import Dict, Any, List, Optional, Callable
-import asyncio
+import inspect
 import logging
 import json
+import os
 from datetime import datetime
 from dataclasses import dataclass, field
 from collections import defaultdict
@@ -21,6 +22,7 @@ from .agent_templates import (
     RiskAgent, ComplianceAgent, MetaAgent, BacktestAgent, OptimizeAgent
 )
 from .mcp_tools import MCPToolRegistry, create_mcp_tool_registry
+from common.workflow_dag import DAGExecutor, StepError, resolve_input, step_id
 
 logger = logging.getLogger(__name__)
 
@@ -72,6 +74,12 @@ class EnhancedAgentCoordinator:
         self.performance_metrics: Dict[str, Any] = defaultdict(dict)
         self.tool_workflows: Dict[str, ToolWorkflow] = {}
         self.agent_memory: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        # Workflow steps run as a dependency graph; sync tools go to a bounded thread pool
+        self.workflow_executor = DAGExecutor(
+            max_concurrency=int(os.getenv("WORKFLOW_MAX_CONCURRENCY", "8")),
+            max_workers=int(os.getenv("WORKFLOW_TOOL_THREADS", "4"))
+        )
+        self.workflow_timings: Dict[str, Dict[str, Any]] = {}  # Last run's timing report per workflow
         
         # Initialize all agents
         self._initialize_agents()
@@ -140,10 +148,14 @@ class EnhancedAgentCoordinator:
             name="Market Analysis Workflow",
             description="Complete market analysis including research, sentiment, and technical analysis",
             steps=[
-                {"step": 1, "agent": "research", "action": "conduct_market_research", "tool": "scrape_crypto_news"},
-                {"step": 2, "agent": "research", "action": "analyze_sentiment", "tool": "analyze_sentiment"},
-                {"step": 3, "agent": "signal", "action": "technical_analysis", "tool": "calculate_rsi"},
-                {"step": 4, "agent": "signal", "action": "generate_signals", "tool": "predict_signal"}
+                {"step": 1, "id": "news", "agent": "research", "action": "conduct_market_research",
+                 "tool": "scrape_crypto_news", "timeout": 30, "retries": 2},
+                {"step": 2, "id": "sentiment", "agent": "research", "action": "analyze_sentiment",
+                 "tool": "analyze_sentiment", "depends_on": ["news"]},
+                {"step": 3, "id": "technical", "agent": "signal", "action": "technical_analysis",
+                 "tool": "calculate_rsi", "depends_on": []},
+                {"step": 4, "id": "signals", "agent": "signal", "action": "generate_signals", "tool": "predict_signal",
+                 "depends_on": ["sentiment"], "inputs": {"features": "technical"}}
             ],
             required_agents=["research", "signal"],
             expected_output="Comprehensive market analysis with sentiment and technical signals"
@@ -156,9 +168,12 @@ class EnhancedAgentCoordinator:
             name="Risk Assessment Workflow",
             description="Complete risk assessment including position sizing and portfolio risk",
             steps=[
-                {"step": 1, "agent": "risk", "action": "calculate_position_size", "tool": "calculate_position_size"},
-                {"step": 2, "agent": "risk", "action": "assess_portfolio_risk", "tool": "assess_portfolio_risk"},
-                {"step": 3, "agent": "risk", "action": "check_risk_limits", "tool": "check_risk_limits"}
+                {"step": 1, "id": "position_size", "agent": "risk", "action": "calculate_position_size",
+                 "tool": "calculate_position_size", "depends_on": []},
+                {"step": 2, "id": "portfolio_risk", "agent": "risk", "action": "assess_portfolio_risk",
+                 "tool": "assess_portfolio_risk", "depends_on": []},
+                {"step": 3, "id": "risk_limits", "agent": "risk", "action": "check_risk_limits",
+                 "tool": "check_risk_limits", "depends_on": ["portfolio_risk"], "inputs": {"trade": "position_size"}}
             ],
             required_agents=["risk"],
             expected_output="Risk assessment with position sizing and portfolio risk analysis"
@@ -171,9 +186,13 @@ class EnhancedAgentCoordinator:
             name="Trading Execution Workflow",
             description="Complete trading execution including order placement and compliance",
             steps=[
-                {"step": 1, "agent": "execution", "action": "place_order", "tool": "place_market_order"},
-                {"step": 2, "agent": "compliance", "action": "log_trade", "tool": "audit_trade"},
-                {"step": 3, "agent": "compliance", "action": "compliance_check", "tool": "detect_suspicious_activity"}
+                # No timeout or retries: a timed-out order call keeps running in its
+                # thread and may still fill, and a retried audit logs the trade twice
+                {"step": 1, "id": "order", "agent": "execution", "action": "place_order", "tool": "place_market_order"},
+                {"step": 2, "id": "audit", "agent": "compliance", "action": "log_trade", "tool": "audit_trade",
+                 "inputs": {"trade": "order"}},
+                {"step": 3, "id": "compliance", "agent": "compliance", "action": "compliance_check",
+                 "tool": "detect_suspicious_activity", "depends_on": ["audit"]}
             ],
             required_agents=["execution", "compliance"],
             expected_output="Trade execution with compliance logging and checks"
@@ -316,7 +335,14 @@ class EnhancedAgentCoordinator:
     async def execute_tool_workflow(self, workflow_id: str, 
                                   parameters: Dict[str, Any],
                                   conversation_id: Optional[str] = None) -> Dict[str, Any]:
-        """Execute a predefined tool workflow with coordination"""
+        """
+        Execute a predefined tool workflow with coordination.
+
+        Steps run as a dependency graph (see common.workflow_dag): each step
+        starts once the steps it depends on have succeeded, with the
+        workflow parameters, its own ``parameters`` and any ``inputs`` taken
+        from its dependencies' results.
+        """
         
         if workflow_id not in self.tool_workflows:
             return {"success": False, "error": f"Workflow {workflow_id} not found"}
@@ -328,46 +354,54 @@ class EnhancedAgentCoordinator:
             self.create_group_chat(workflow.required_agents, conversation_id)
         
         # Set up conversation context for workflow
-        self.conversation_contexts[conversation_id] = ConversationContext(
+        context = ConversationContext(
             conversation_id=conversation_id,
             topic=f"Workflow: {workflow.name}",
             participants=workflow.required_agents,
             context_data={"workflow_id": workflow_id, "parameters": parameters}
         )
+        self.conversation_contexts[conversation_id] = context
+        
+        async def run_step(step: Dict[str, Any], upstream: Dict[str, Any]) -> Any:
+            if step["agent"] not in self.agents:
+                raise StepError(f"Agent {step['agent']} not found")
+            step_parameters = dict(parameters, **step.get("parameters", {}))
+            for name, ref in step.get("inputs", {}).items():
+                step_parameters[name] = resolve_input(ref, upstream)
+            result = await self._execute_workflow_step(
+                step["agent"], step["action"], step.get("tool"), step_parameters, conversation_id
+            )
+            # Update conversation context with step result
+            context.context_data[f"step_{step.get('step', step_id(step))}_result"] = {
+                "success": True, "agent": step["agent"], "action": step["action"],
+                "tool": step.get("tool"), "result": result
+            }
+            return result
         
         workflow_results = []
         
         try:
-            # Execute each step in the workflow
+            run = await self.workflow_executor.run(workflow.steps, run_step)
+            
             for step in workflow.steps:
-                agent_name = step["agent"]
-                action = step["action"]
-                tool_name = step.get("tool")
-                
-                if agent_name not in self.agents:
-                    workflow_results.append({
-                        "step": step["step"],
-                        "status": "error",
-                        "error": f"Agent {agent_name} not found"
-                    })
-                    continue
-                
-                # Execute the step
-                step_result = await self._execute_workflow_step(
-                    agent_name, action, tool_name, parameters, conversation_id
-                )
-                
+                step_run = run.steps[step_id(step)]
+                if step_run.status == "success":
+                    step_result = {"success": True, "agent": step["agent"], "action": step["action"],
+                                   "tool": step.get("tool"), "result": step_run.output}
+                else:
+                    step_result = {"success": False, "agent": step["agent"], "action": step["action"],
+                                   "error": step_run.error}
                 workflow_results.append({
-                    "step": step["step"],
-                    "agent": agent_name,
-                    "action": action,
-                    "tool": tool_name,
-                    "status": "success" if step_result["success"] else "error",
+                    "step": step.get("step", step_id(step)),
+                    "agent": step["agent"],
+                    "action": step["action"],
+                    "tool": step.get("tool"),
+                    "status": step_run.status,
+                    "attempts": step_run.attempts,
+                    "duration_ms": round(step_run.duration * 1e3, 2),
                     "result": step_result
                 })
-                
-                # Update conversation context with step result
-                self.conversation_contexts[conversation_id].context_data[f"step_{step['step']}_result"] = step_result
+            self.workflow_timings[workflow_id] = run.timing
                 
             return {
                 "success": True,
@@ -375,6 +409,7 @@ class EnhancedAgentCoordinator:
                 "conversation_id": conversation_id,
                 "steps": workflow_results,
                 "expected_output": workflow.expected_output,
+                "timing": run.timing,
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -390,59 +425,58 @@ class EnhancedAgentCoordinator:
 
     async def _execute_workflow_step(self, agent_name: str, action: str, 
                                    tool_name: Optional[str], parameters: Dict[str, Any],
-                                   conversation_id: str) -> Dict[str, Any]:
-        """Execute a single workflow step"""
+                                   conversation_id: str) -> Any:
+        """
+        Execute a single workflow step and return its result. Synchronous
+        actions and tools run on the workflow thread pool; failures raise
+        so the executor can retry them.
+        """
         
         agent = self.agents[agent_name]
         
+        # Execute the action on the agent
+        if hasattr(agent, action):
+            method = getattr(agent, action)
+        elif tool_name:
+            # Try to find and execute the tool
+            tool = self.mcp_registry.get_tool(tool_name)
+            if not tool:
+                raise StepError(f"Tool {tool_name} not found")
+            method = tool.function
+        else:
+            raise StepError(f"Action {action} not found on agent {agent_name}")
+        
         try:
-            # Execute the action on the agent
-            if hasattr(agent, action):
-                method = getattr(agent, action)
-                if asyncio.iscoroutinefunction(method):
-                    result = await method(**parameters)
-                else:
-                    result = method(**parameters)
-            else:
-                # Try to find and execute the tool
-                if tool_name:
-                    tool = self.mcp_registry.get_tool(tool_name)
-                    if tool:
-                        result = tool.function(**parameters)
-                    else:
-                        result = {"error": f"Tool {tool_name} not found"}
-                else:
-                    result = {"error": f"Action {action} not found on agent {agent_name}"}
-            
-            # Record the interaction
-            interaction = AgentInteraction(
-                interaction_id=str(uuid.uuid4()),
-                timestamp=datetime.now(),
-                from_agent="coordinator",
-                to_agent=agent_name,
-                message=f"Executing {action}",
-                tool_used=tool_name,
-                result=result,
-                conversation_id=conversation_id
-            )
-            self.interaction_history.append(interaction)
-            
-            return {
-                "success": True,
-                "agent": agent_name,
-                "action": action,
-                "tool": tool_name,
-                "result": result
-            }
-            
+            result = await self.workflow_executor.call(method, **self._accepted_parameters(method, parameters))
         except Exception as e:
             logger.error(f"Error executing step {action} on agent {agent_name}: {e}")
-            return {
-                "success": False,
-                "agent": agent_name,
-                "action": action,
-                "error": str(e)
-            }
+            raise
+        
+        # Record the interaction
+        interaction = AgentInteraction(
+            interaction_id=str(uuid.uuid4()),
+            timestamp=datetime.now(),
+            from_agent="coordinator",
+            to_agent=agent_name,
+            message=f"Executing {action}",
+            tool_used=tool_name,
+            result=result,
+            conversation_id=conversation_id
+        )
+        self.interaction_history.append(interaction)
+        
+        return result
+
+    @staticmethod
+    def _accepted_parameters(function: Callable, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """The workflow parameters ``function`` takes (all of them if it accepts **kwargs)."""
+        try:
+            signature = inspect.signature(function)
+        except (TypeError, ValueError):
+            return parameters
+        if any(p.kind == inspect.Parameter.VAR_KEYWORD for p in signature.parameters.values()):
+            return parameters
+        return {name: value for name, value in parameters.items() if name in signature.parameters}
 
     async def coordinate_task(self, task_description: str, 
                             required_agents: Optional[List[str]] = None,
@@ -578,7 +612,8 @@ class EnhancedAgentCoordinator:
             "average_rounds": sum(m.get("rounds", 0) for m in self.performance_metrics.values()) / max(len(self.performance_metrics), 1),
             "conversation_metrics": conversation_metrics,
             "recent_tasks": list(self.performance_metrics.values())[-5:] if self.performance_metrics else [],
-            "workflows_available": len(self.tool_workflows)
+            "workflows_available": len(self.tool_workflows),
+            "workflow_executor": self.workflow_executor.get_stats()
         }
 
     def get_mcp_tool_status(self) -> Dict[str, Any]:
@@ -595,7 +630,8 @@ class EnhancedAgentCoordinator:
                     "name": workflow.name,
                     "description": workflow.description,
                     "required_agents": workflow.required_agents,
-                    "steps_count": len(workflow.steps)
+                    "steps_count": len(workflow.steps),
+                    "last_run": self.workflow_timings.get(workflow_id)
                 }
                 for workflow_id, workflow in self.tool_workflows.items()
             }
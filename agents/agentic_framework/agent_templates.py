@@ -422,6 +422,14 @@ class BacktestAgent(BaseAgent):
         """Get backtest history using the agentic backtest agent."""
         return await self._agentic_agent.get_backtest_history(limit)
         
+    async def list_stored_backtests(self, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """List stored backtest summaries using the agentic backtest agent."""
+        return await self._agentic_agent.list_stored_backtests(limit, offset)
+        
+    async def get_backtest_trades(self, backtest_id: int, limit: int = 500, after_seq: int = -1) -> Dict[str, Any]:
+        """Page through a stored backtest's trades using the agentic backtest agent."""
+        return await self._agentic_agent.get_backtest_trades(backtest_id, limit, after_seq)
+        
     def get_agent_status(self) -> Dict[str, Any]:
         """Get agent status using the agentic backtest agent."""
         return self._agentic_agent.get_agent_status()
@@ -14,6 +14,9 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 import json
+import time
+
+import pandas as pd
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
@@ -21,10 +24,13 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from agents.agentic_framework.agent_templates import BaseAgent, AgentConfig
 from agents.agentic_framework.mcp_tools import AnalysisTools, MCPToolRegistry
 from common.vault import get_vault_client, get_agent_config
-from common.db import get_db_client
+from common.db import get_db_client, get_session
 from common.logging import get_logger
-from common.models import Strategy, Trade
+from common.models import Strategy, Trade, PriceData
 from common.openai_client import get_openai_client
+from agents.backtest.engine import BacktestEngine, BacktestJob
+from common.backtest_cache import get_backtest_cache
+from common.backtest_store import list_backtests, get_trades, get_equity_curve
 
 logger = get_logger("agentic_backtest")
 
@@ -97,10 +103,15 @@ Learn from backtest results to enhance strategy validation over time."""
         self.analysis_tools = AnalysisTools()
         
         # Initialize agent memory and cache attributes
-        self.backtest_cache = {}
+        self.backtest_cache = get_backtest_cache()
         self.backtest_results = []
         self.strategy_performance = {}
         
+        # Batch engine; candles come from the price_data table unless supplied
+        self.engine = BacktestEngine(data_loader=self._query_price_data, cache=self.backtest_cache)
+        self.default_timeframe = "1h"
+        self.default_lookback_days = 30
+        
         # Initialize infrastructure attributes for test compatibility
         self.vault_client = None
         self.db_client = None
@@ -189,53 +200,139 @@ Learn from backtest results to enhance strategy validation over time."""
 
     async def _run_backtest_simulation(self, strategy_definition: Dict[str, Any], 
                                      historical_data: Dict[str, Any]) -> BacktestResult:
-        """Run backtest simulation."""
-        
-        strategy_name = strategy_definition.get("name", "Unknown Strategy")
-        start_date = datetime.now() - timedelta(days=30)
-        end_date = datetime.now()
-        
-        # Mock backtest simulation
-        total_return = 0.15  # 15% return
-        sharpe_ratio = 1.2
-        max_drawdown = -0.08
-        win_rate = 0.65
-        total_trades = 45
-        
-        # Mock trades
-        trades = [
-            {
-                "symbol": "BTCUSDT",
-                "side": "buy",
-                "amount": 0.1,
-                "price": 50000.0,
-                "timestamp": (start_date + timedelta(days=i)).isoformat(),
-                "pnl": 0.02 if i % 3 == 0 else -0.01
-            }
-            for i in range(total_trades)
-        ]
-        
-        performance_metrics = {
-            "calmar_ratio": 1.8,
-            "sortino_ratio": 1.5,
-            "var_95": -0.03,
-            "volatility": 0.12
+        """Run one strategy through the batch engine."""
+        job = self._build_job(strategy_definition, historical_data or {})
+        results = await self.engine.run_batch([job])
+        if not results or "error" in results[0]:
+            raise Exception(results[0]["error"] if results else "Backtest produced no result")
+        return self._to_backtest_result(results[0])
+
+    async def run_batch_backtests(self, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run many (strategy, symbol, timeframe, date range) backtests in parallel.
+
+        Each job dict holds ``strategy_definition`` plus the same keys accepted
+        as ``historical_data`` by run_autonomous_backtest. Results are streamed
+        to the Meta Agent as they finish.
+        """
+        started = time.perf_counter()
+        batch = [self._build_job(job["strategy_definition"], job) for job in jobs]
+        completed, failed = [], []
+
+        async for result in self.engine.stream(batch):
+            if "error" in result:
+                failed.append(result)
+            else:
+                backtest_result = self._to_backtest_result(result)
+                self.backtest_results.append(backtest_result)
+                completed.append({
+                    "job_id": result["job_id"],
+                    "strategy_name": result["strategy_name"],
+                    "symbol": result["symbol"],
+                    "timeframe": result["timeframe"],
+                    "metrics": result["metrics"],
+                    "performance_rating": self._rate_performance(backtest_result)
+                })
+            await self._stream_job_result(result, len(completed) + len(failed), len(batch))
+
+        return {
+            "completed": completed,
+            "failed": failed,
+            "total_jobs": len(batch),
+            "duration_seconds": time.perf_counter() - started,
+            "timestamp": datetime.now().isoformat()
         }
-        
+
+    async def _stream_job_result(self, result: Dict[str, Any], done: int, total: int):
+        """Send one finished job to the Meta Agent."""
+        ws_client = getattr(self, "ws_client", None)
+        if not ws_client or not ws_client.is_connected:
+            return
+        try:
+            await ws_client.send_task_progress({
+                "task": "run_batch_backtests",
+                "completed": done,
+                "total": total,
+                "job_id": result["job_id"],
+                "strategy_name": result["strategy_name"],
+                "symbol": result["symbol"],
+                "error": result.get("error"),
+                "metrics": result.get("metrics")
+            })
+        except Exception as e:
+            logger.warning(f"Failed to stream backtest result: {e}")
+
+    def _build_job(self, strategy_definition: Dict[str, Any], spec: Dict[str, Any]) -> BacktestJob:
+        """Turn a strategy definition plus data/range settings into an engine job."""
+        end_date = spec.get("end_date") or datetime.now()
+        start_date = spec.get("start_date") or (pd.Timestamp(end_date) - timedelta(days=self.default_lookback_days))
+        candles = spec.get("candles", spec.get("data"))
+        if candles is not None and not isinstance(candles, pd.DataFrame):
+            candles = pd.DataFrame(candles)
+        symbol = spec.get("symbol") or strategy_definition.get("symbol", "BTCUSDT")
+        job = BacktestJob(
+            strategy_definition=strategy_definition,
+            symbol=symbol,
+            timeframe=spec.get("timeframe") or strategy_definition.get("timeframe", self.default_timeframe),
+            start_date=pd.Timestamp(start_date).to_pydatetime(),
+            end_date=pd.Timestamp(end_date).to_pydatetime(),
+            initial_capital=spec.get("initial_capital", 10000.0),
+            fee_rate=spec.get("fee_rate", 0.001),
+            slippage_bps=spec.get("slippage_bps", 5.0),
+            candles=candles
+        )
+        if spec.get("job_id"):
+            job.job_id = spec["job_id"]
+        return job
+
+    def _to_backtest_result(self, result: Dict[str, Any]) -> BacktestResult:
+        metrics = result["metrics"]
+        trades = result["trades"]
+        avg_bars = sum(t["bars_held"] for t in trades) / len(trades) if trades else 0.0
+        try:
+            avg_duration = pd.Timedelta(result["timeframe"]) * avg_bars
+            avg_trade_duration = f"{avg_duration.total_seconds() / 3600:.1f}h"
+        except ValueError:
+            avg_trade_duration = f"{avg_bars:.1f} bars"
         return BacktestResult(
-            strategy_name=strategy_name,
-            start_date=start_date,
-            end_date=end_date,
-            total_return=total_return,
-            sharpe_ratio=sharpe_ratio,
-            max_drawdown=max_drawdown,
-            win_rate=win_rate,
-            total_trades=total_trades,
-            avg_trade_duration="2.5h",
-            performance_metrics=performance_metrics,
+            strategy_name=result["strategy_name"],
+            start_date=datetime.fromisoformat(result["start_date"]),
+            end_date=datetime.fromisoformat(result["end_date"]),
+            total_return=metrics["total_return"],
+            sharpe_ratio=metrics["sharpe_ratio"],
+            max_drawdown=metrics["max_drawdown"],
+            win_rate=metrics["win_rate"],
+            total_trades=metrics["total_trades"],
+            avg_trade_duration=avg_trade_duration,
+            performance_metrics=dict(metrics, symbol=result["symbol"], timeframe=result["timeframe"],
+                                     bars=result["bars"], equity_curve=result["equity_curve"]),
             trades=trades
         )
 
+    def _query_price_data(self, symbol: str, timeframe: str, start_date: Optional[datetime],
+                          end_date: Optional[datetime]) -> Optional[pd.DataFrame]:
+        """Load candles from the price_data table (blocking, runs in an executor)."""
+        with get_session() as session:
+            query = session.query(PriceData).filter(
+                PriceData.symbol == symbol,
+                PriceData.timeframe == timeframe
+            )
+            if start_date:
+                query = query.filter(PriceData.time >= start_date)
+            if end_date:
+                query = query.filter(PriceData.time <= end_date)
+            rows = query.order_by(PriceData.time).all()
+            if not rows:
+                return None
+            return pd.DataFrame([{
+                "time": p.time,
+                "open": p.open,
+                "high": p.high,
+                "low": p.low,
+                "close": p.close,
+                "volume": p.volume
+            } for p in rows])
+
     async def _analyze_performance(self, backtest_result: BacktestResult) -> Dict[str, Any]:
         """Analyze backtest performance."""
         
@@ -371,6 +468,35 @@ Learn from backtest results to enhance strategy validation over time."""
             for result in recent_results
         ]
 
+    async def list_stored_backtests(self, limit: int = 50, offset: int = 0,
+                                    strategy_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """List stored backtest summaries, newest first, without loading their trades."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, lambda: list_backtests(limit=limit, offset=offset, strategy_id=strategy_id))
+
+    async def get_backtest_trades(self, backtest_id: int, limit: int = 500,
+                                  after_seq: int = -1) -> Dict[str, Any]:
+        """
+        Get one page of a stored backtest's trades.
+
+        Pass the returned ``next_after_seq`` back as ``after_seq`` for the next
+        page; it is None after the last page.
+        """
+        loop = asyncio.get_running_loop()
+        trades = await loop.run_in_executor(
+            None, lambda: get_trades(backtest_id, limit=limit, after_seq=after_seq))
+        return {
+            "backtest_id": backtest_id,
+            "trades": trades,
+            "next_after_seq": trades[-1]["seq"] if len(trades) == limit else None
+        }
+
+    async def get_backtest_equity_curve(self, backtest_id: int) -> List[List[Any]]:
+        """Get the stored equity curve of a backtest as [timestamp, equity] pairs."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, get_equity_curve, backtest_id)
+
     def get_agent_status(self) -> Dict[str, Any]:
         """Get agent status for testing compatibility."""
         return {
@@ -378,10 +504,10 @@ Learn from backtest results to enhance strategy validation over time."""
             "status": "active",
             "capabilities": ["backtesting", "performance_analysis", "strategy_validation"],
             "backtest_results": len(self.backtest_results),
+            "engine": self.engine.get_stats(),
             "timestamp": datetime.now().isoformat()
         }
     
     async def shutdown(self):
         """Shutdown the agent"""
-        # Cleanup any resources if needed
-        pass 
\ No newline at end of file
+        self.engine.shutdown() 
\ No newline at end of file
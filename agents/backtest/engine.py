@@ -0,0 +1,526 @@
+"""
+Batch backtest engine for the Backtest Agent.
+Signals are generated vectorized for the whole series; fills, stops and
+trade accounting are then processed event by event over the (few) entry and
+exit events, with array slices for everything between events. Batches of
+(strategy, symbol, timeframe, date range) jobs are sharded across a process
+pool and results are streamed back as each shard finishes.
+"""
+
+import asyncio
+import inspect
+import logging
+import math
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, AsyncIterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+from agents.backtest.vectorized import STRATEGY_SIGNALS, PERIODS_PER_YEAR, generate_positions
+from common.backtest_cache import BacktestResultCache, backtest_cache_key, data_version
+
+logger = logging.getLogger(__name__)
+
+CANDLE_COLUMNS = ("open", "high", "low", "close", "volume")
+_ATR_EXPR = re.compile(r"^\s*([0-9]*\.?[0-9]+)\s*\*\s*atr\s*$", re.IGNORECASE)
+
+
+@dataclass
+class BacktestJob:
+    """One strategy run on one symbol/timeframe/date range."""
+    strategy_definition: Dict[str, Any]
+    symbol: str
+    timeframe: str = "1h"
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    initial_capital: float = 10000.0
+    fee_rate: float = 0.001
+    slippage_bps: float = 5.0
+    candles: Optional[pd.DataFrame] = None
+    equity_points: int = 500
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+
+    @property
+    def strategy_type(self) -> str:
+        definition = self.strategy_definition
+        return definition.get("strategy_type") or definition.get("type") or "trend_following"
+
+    @property
+    def strategy_name(self) -> str:
+        return self.strategy_definition.get("name") or f"{self.symbol}_{self.strategy_type}"
+
+
+def signal_parameters(strategy_type: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the numeric parameters the strategy's signal function accepts."""
+    signal_fn = STRATEGY_SIGNALS.get(strategy_type)
+    if signal_fn is None:
+        raise ValueError(f"Unknown strategy type: {strategy_type}")
+    accepted = set(inspect.signature(signal_fn).parameters) - {"close"}
+    return {
+        name: value for name, value in (parameters or {}).items()
+        if name in accepted and isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+
+
+def _exit_rule(value: Any) -> Tuple[str, float]:
+    """
+    Parse a stop-loss/take-profit setting: a number is a fraction of the
+    entry price, "k * atr" is k times the ATR at the entry signal.
+    """
+    if value is None:
+        return "none", 0.0
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return ("fraction", float(value)) if value > 0 else ("none", 0.0)
+    match = _ATR_EXPR.match(str(value))
+    if match:
+        return "atr", float(match.group(1))
+    return "none", 0.0
+
+
+def _atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    prev_close = np.concatenate(([close[0]], close[:-1]))
+    true_range = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return pd.Series(true_range).rolling(period, min_periods=1).mean().values
+
+
+def simulate(times: np.ndarray, candles: Dict[str, np.ndarray], positions: np.ndarray,
+             initial_capital: float = 10000.0, fee_rate: float = 0.001, slippage_bps: float = 5.0,
+             stop_loss: Any = None, take_profit: Any = None) -> Tuple[np.ndarray, List[Dict[str, Any]], Dict[str, float]]:
+    """
+    Long-only fill simulation.
+
+    A signal on bar t fills at the open of bar t+1, shifted by slippage
+    against the trade and charged ``fee_rate`` on notional. Stops and
+    targets are checked on bar highs/lows between entry and the exit signal;
+    if both are touched in one bar the stop is assumed to fill first.
+
+    Returns:
+        (equity curve per bar, trades, cost totals)
+    """
+    open_, high, low, close = candles["open"], candles["high"], candles["low"], candles["close"]
+    n = len(close)
+    slip = slippage_bps / 10000.0
+    long = positions > 0
+    prev = np.concatenate(([False], long[:-1]))
+    entries = np.flatnonzero(long & ~prev)
+    exits = np.flatnonzero(~long & prev)
+
+    stop_kind, stop_value = _exit_rule(stop_loss)
+    target_kind, target_value = _exit_rule(take_profit)
+    atr = _atr(high, low, close) if "atr" in (stop_kind, target_kind) else None
+
+    equity = np.full(n, np.nan)
+    equity[0] = initial_capital
+    cash = initial_capital
+    trades: List[Dict[str, Any]] = []
+    costs = {"fees": 0.0, "slippage": 0.0}
+
+    next_entry = 0
+    while next_entry < len(entries):
+        signal_bar = entries[next_entry]
+        fill_bar = signal_bar + 1
+        if fill_bar >= n:
+            break
+
+        raw_entry = open_[fill_bar]
+        entry_price = raw_entry * (1 + slip)
+        entry_fee = cash * fee_rate
+        units = (cash - entry_fee) / entry_price
+        costs["fees"] += entry_fee
+        costs["slippage"] += units * (entry_price - raw_entry)
+
+        # Exit signal after this entry fills at the following open
+        k = np.searchsorted(exits, signal_bar, side="right")
+        exit_bar = exits[k] + 1 if k < len(exits) and exits[k] + 1 < n else n
+        reason = "signal" if exit_bar < n else "end_of_data"
+
+        # First stop/target touch between the fill bar and the exit bar
+        stop_price = target_price = None
+        if stop_kind != "none":
+            distance = stop_value * (atr[signal_bar] if stop_kind == "atr" else raw_entry)
+            stop_price = raw_entry - distance
+        if target_kind != "none":
+            distance = target_value * (atr[signal_bar] if target_kind == "atr" else raw_entry)
+            target_price = raw_entry + distance
+        hit_bar, hit_price = None, None
+        if stop_price is not None:
+            touched = low[fill_bar:exit_bar] <= stop_price
+            if touched.any():
+                hit_bar = fill_bar + int(np.argmax(touched))
+                hit_price, reason = min(open_[hit_bar], stop_price), "stop_loss"
+        if target_price is not None:
+            # Only bars before a stop; on a shared bar the stop wins
+            touched = high[fill_bar:exit_bar if hit_bar is None else hit_bar] >= target_price
+            if touched.any():
+                hit_bar = fill_bar + int(np.argmax(touched))
+                hit_price, reason = max(open_[hit_bar], target_price), "take_profit"
+
+        if hit_price is not None:
+            raw_exit, exit_index = hit_price, hit_bar
+        elif exit_bar < n:
+            raw_exit, exit_index = open_[exit_bar], exit_bar
+        else:
+            raw_exit, exit_index = close[-1], n - 1
+
+        exit_price = raw_exit * (1 - slip)
+        proceeds = units * exit_price
+        exit_fee = proceeds * fee_rate
+        costs["fees"] += exit_fee
+        costs["slippage"] += units * (raw_exit - exit_price)
+        entry_cash = cash
+        cash = proceeds - exit_fee
+
+        equity[fill_bar:exit_index] = units * close[fill_bar:exit_index]
+        equity[exit_index] = cash
+        trades.append({
+            "entry_time": times[fill_bar],
+            "exit_time": times[exit_index],
+            "entry_price": float(entry_price),
+            "exit_price": float(exit_price),
+            "units": float(units),
+            "pnl": float(cash - entry_cash),
+            "return_pct": float((cash / entry_cash - 1.0) * 100),
+            "bars_held": int(exit_index - fill_bar + 1),
+            "exit_reason": reason,
+        })
+
+        # The next trade needs a fresh entry signal at or after the exit bar
+        next_entry = int(np.searchsorted(entries, exit_index, side="left"))
+
+    equity = pd.Series(equity).ffill().values
+    return equity, trades, costs
+
+
+def equity_metrics(equity: np.ndarray, trades: List[Dict[str, Any]],
+                   periods_per_year: float = 365) -> Dict[str, float]:
+    """Return, risk and trade statistics computed from the equity curve."""
+    if len(equity) < 2 or equity[0] <= 0:
+        return {"total_return": 0.0, "annualized_return": 0.0, "volatility": 0.0,
+                "sharpe_ratio": 0.0, "sortino_ratio": 0.0, "calmar_ratio": 0.0,
+                "max_drawdown": 0.0, "var_95": 0.0, "cvar_95": 0.0, "win_rate": 0.0,
+                "profit_factor": 0.0, "total_trades": len(trades), "exposure": 0.0}
+
+    returns = equity[1:] / equity[:-1] - 1.0
+    total_return = equity[-1] / equity[0] - 1.0
+    years = len(returns) / periods_per_year
+    annualized = (equity[-1] / equity[0]) ** (1.0 / years) - 1.0 if years > 0 and equity[-1] > 0 else -1.0
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+    max_drawdown = float(drawdown.min())
+
+    scale = math.sqrt(periods_per_year)
+    std = returns.std()
+    downside = math.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    var_95 = float(np.percentile(returns, 5))
+    tail = returns[returns <= var_95]
+
+    pnls = np.array([t["pnl"] for t in trades]) if trades else np.zeros(0)
+    gross_profit = pnls[pnls > 0].sum()
+    gross_loss = -pnls[pnls < 0].sum()
+    bars_in_market = sum(t["bars_held"] for t in trades)
+
+    return {
+        "total_return": float(total_return),
+        "annualized_return": float(annualized),
+        "volatility": float(std * scale),
+        "sharpe_ratio": float(returns.mean() / std * scale) if std > 0 else 0.0,
+        "sortino_ratio": float(returns.mean() / downside * scale) if downside > 0 else 0.0,
+        "calmar_ratio": float(annualized / abs(max_drawdown)) if max_drawdown < 0 else 0.0,
+        "max_drawdown": max_drawdown,
+        "var_95": var_95,
+        "cvar_95": float(tail.mean()) if len(tail) else var_95,
+        "win_rate": float((pnls > 0).mean()) if len(pnls) else 0.0,
+        "profit_factor": float(gross_profit / gross_loss) if gross_loss > 0 else (float("inf") if gross_profit > 0 else 0.0),
+        "total_trades": len(trades),
+        "exposure": float(min(1.0, bars_in_market / len(equity))),
+    }
+
+
+def _job_window(times: np.ndarray, start: Optional[np.datetime64], end: Optional[np.datetime64]) -> Tuple[int, int]:
+    """Row bounds of the candles inside [start, end]."""
+    lo = np.searchsorted(times, start, side="left") if start is not None else 0
+    hi = np.searchsorted(times, end, side="right") if end is not None else len(times)
+    return int(lo), int(hi)
+
+
+def _run_job(times: np.ndarray, candles: Dict[str, np.ndarray], job: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one job on its slice of the shard's candles."""
+    started = time.perf_counter()
+    lo, hi = _job_window(times, job["start_date"], job["end_date"])
+    if hi - lo < 2:
+        raise ValueError(f"No candles for {job['symbol']} {job['timeframe']} in the requested range")
+    window_times = times[lo:hi]
+    window = {name: values[lo:hi] for name, values in candles.items()}
+
+    definition = job["strategy_definition"]
+    strategy_type = job["strategy_type"]
+    parameters = definition.get("parameters", {}) or {}
+    positions = generate_positions(strategy_type, window["close"], signal_parameters(strategy_type, parameters))
+    equity, trades, costs = simulate(
+        window_times, window, positions,
+        initial_capital=job["initial_capital"], fee_rate=job["fee_rate"], slippage_bps=job["slippage_bps"],
+        stop_loss=parameters.get("stop_loss", definition.get("stop_loss")),
+        take_profit=parameters.get("take_profit", definition.get("take_profit")),
+    )
+    metrics = equity_metrics(equity, trades, PERIODS_PER_YEAR.get(job["timeframe"], 365))
+    metrics.update({"fees_paid": costs["fees"], "slippage_cost": costs["slippage"],
+                    "final_equity": float(equity[-1])})
+
+    step = max(1, int(math.ceil(len(equity) / job["equity_points"]))) if job["equity_points"] else 0
+    curve_index = np.unique(np.append(np.arange(0, len(equity), step), len(equity) - 1)) if step else []
+    for trade in trades:
+        trade["entry_time"] = pd.Timestamp(trade["entry_time"]).isoformat()
+        trade["exit_time"] = pd.Timestamp(trade["exit_time"]).isoformat()
+        trade["symbol"] = job["symbol"]
+
+    return {
+        "job_id": job["job_id"],
+        "strategy_name": job["strategy_name"],
+        "strategy_type": strategy_type,
+        "symbol": job["symbol"],
+        "timeframe": job["timeframe"],
+        "start_date": pd.Timestamp(window_times[0]).isoformat(),
+        "end_date": pd.Timestamp(window_times[-1]).isoformat(),
+        "bars": int(hi - lo),
+        "metrics": metrics,
+        "trades": trades,
+        "equity_curve": [[pd.Timestamp(window_times[i]).isoformat(), float(equity[i])] for i in curve_index],
+        "duration": time.perf_counter() - started,
+        "cache_key": job.get("cache_key"),
+    }
+
+
+def _run_shard(times: np.ndarray, candles: Dict[str, np.ndarray], jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Worker entry point: run every job of one (symbol, timeframe) shard."""
+    results = []
+    for job in jobs:
+        try:
+            results.append(_run_job(times, candles, job))
+        except Exception as e:
+            results.append({"job_id": job["job_id"], "strategy_name": job["strategy_name"],
+                            "symbol": job["symbol"], "timeframe": job["timeframe"], "error": str(e)})
+    return results
+
+
+def _candle_arrays(df: pd.DataFrame) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    frame = df.sort_values("time") if "time" in df.columns else df.sort_index()
+    stamps = pd.DatetimeIndex(pd.to_datetime(frame["time"] if "time" in frame.columns else frame.index, utc=True))
+    times = stamps.tz_convert(None).to_numpy(dtype="datetime64[ns]")
+    arrays = {name: frame[name].to_numpy(dtype=np.float64, copy=True) for name in CANDLE_COLUMNS if name in frame}
+    for name in ("open", "high", "low"):
+        arrays.setdefault(name, arrays["close"])
+    return times, arrays
+
+
+class BacktestEngine:
+    """
+    Runs batches of backtest jobs in a process pool.
+
+    Jobs are grouped by (symbol, timeframe) so candles are loaded once per
+    group, then split into shards of a few jobs each; every shard is one
+    pool task, so a batch spreads across all workers while small shards
+    keep results streaming back steadily. With a result cache, jobs whose
+    strategy, parameters, settings and candle slice were seen before are
+    answered from the cache without reaching the pool.
+    """
+
+    def __init__(self, data_loader: Optional[Callable[[str, str, Optional[datetime], Optional[datetime]],
+                                                       Optional[pd.DataFrame]]] = None,
+                 max_workers: Optional[int] = None, max_concurrent_loads: int = 4,
+                 cache: Optional[BacktestResultCache] = None):
+        """
+        Initialize the engine.
+
+        Args:
+            data_loader: Blocking callable (symbol, timeframe, start, end) -> candles
+                DataFrame with time/open/high/low/close/volume, used for jobs
+                without their own candles
+            max_workers: Worker processes (defaults to the CPU count)
+            max_concurrent_loads: Concurrent data loads
+            cache: Optional result cache shared with other agents
+        """
+        self.data_loader = data_loader
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_concurrent_loads = max_concurrent_loads
+        self.cache = cache
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {"batches": 0, "jobs": 0, "failed_jobs": 0, "cached_jobs": 0, "busy_seconds": 0.0}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    async def run_batch(self, jobs: List[BacktestJob],
+                        on_result: Optional[Callable[[Dict[str, Any]], Any]] = None) -> List[Dict[str, Any]]:
+        """Run every job and return the results in completion order."""
+        results = []
+        async for result in self.stream(jobs):
+            results.append(result)
+            if on_result:
+                outcome = on_result(result)
+                if asyncio.iscoroutine(outcome):
+                    await outcome
+        return results
+
+    async def stream(self, jobs: List[BacktestJob]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield each job's result as soon as its shard finishes."""
+        started = time.perf_counter()
+        self.stats["batches"] += 1
+        groups: Dict[Tuple[str, str, int], List[BacktestJob]] = {}
+        for job in jobs:
+            # Jobs that bring their own candles form their own group
+            key = (job.symbol, job.timeframe, id(job.candles) if job.candles is not None else 0)
+            groups.setdefault(key, []).append(job)
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_loads)
+        loaded = await asyncio.gather(*(self._load_group(group, semaphore) for group in groups.values()))
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        shard_size = max(1, math.ceil(len(jobs) / (self.max_workers * 4)))
+        futures = []
+        for group, candles in zip(groups.values(), loaded):
+            if isinstance(candles, Exception) or candles is None:
+                error = str(candles) if candles is not None else "No candles available"
+                for job in group:
+                    self.stats["failed_jobs"] += 1
+                    yield {"job_id": job.job_id, "strategy_name": job.strategy_name,
+                           "symbol": job.symbol, "timeframe": job.timeframe, "error": error}
+                continue
+            times, arrays = candles
+            payloads = [self._job_payload(job) for job in group]
+            if self.cache is not None:
+                keys = [self._cache_key(times, arrays, payload) for payload in payloads]
+                cached = await self.cache.aget_many([k for k in keys if k])
+                remaining = []
+                for payload, key in zip(payloads, keys):
+                    if key in cached:
+                        self.stats["jobs"] += 1
+                        self.stats["cached_jobs"] += 1
+                        yield dict(cached[key], job_id=payload["job_id"],
+                                   strategy_name=payload["strategy_name"], cached=True)
+                    else:
+                        payload["cache_key"] = key
+                        remaining.append(payload)
+                payloads = remaining
+            for i in range(0, len(payloads), shard_size):
+                futures.append(self._run_shard(loop, pool, times, arrays, payloads[i:i + shard_size]))
+
+        for future in asyncio.as_completed(futures):
+            shard, shard_results, error = await future
+            if error is not None:
+                # Report every job of the shard instead of losing them
+                logger.error(f"Backtest shard of {len(shard)} jobs failed: {error}")
+                if isinstance(error, BrokenProcessPool) and self._pool is pool:
+                    # The next batch starts a fresh pool
+                    pool.shutdown(wait=False)
+                    self._pool = None
+                shard_results = [{"job_id": job["job_id"], "strategy_name": job["strategy_name"],
+                                  "symbol": job["symbol"], "timeframe": job["timeframe"],
+                                  "error": f"Backtest worker failed: {error}"} for job in shard]
+            for result in shard_results:
+                self.stats["jobs"] += 1
+                key = result.pop("cache_key", None)
+                if "error" in result:
+                    self.stats["failed_jobs"] += 1
+                elif self.cache is not None and key:
+                    await self.cache.aput(key, result, {
+                        "strategy_name": result["strategy_name"],
+                        "strategy_type": result["strategy_type"],
+                        "symbol": result["symbol"],
+                        "start": result["start_date"],
+                        "end": result["end_date"],
+                    }, result["duration"])
+                yield result
+        self.stats["busy_seconds"] += time.perf_counter() - started
+
+    @staticmethod
+    async def _run_shard(loop: asyncio.AbstractEventLoop, pool: ProcessPoolExecutor, times: np.ndarray,
+                         arrays: Dict[str, np.ndarray], shard: List[Dict[str, Any]]):
+        """Run one shard in the pool; returns (shard, results, error) so a failure stays tied to its jobs."""
+        try:
+            return shard, await loop.run_in_executor(pool, _run_shard, times, arrays, shard), None
+        except Exception as e:
+            return shard, None, e
+
+    @staticmethod
+    def _cache_key(times: np.ndarray, arrays: Dict[str, np.ndarray], payload: Dict[str, Any]) -> Optional[str]:
+        """Content key over the job's own candle slice, so overlapping loads still share entries."""
+        lo, hi = _job_window(times, payload["start_date"], payload["end_date"])
+        if hi - lo < 2:
+            return None
+        definition = payload["strategy_definition"]
+        window = np.concatenate([arrays[name][lo:hi] for name in ("open", "high", "low", "close")])
+        return backtest_cache_key(
+            payload["strategy_type"],
+            {"parameters": definition.get("parameters", {}),
+             "stop_loss": definition.get("stop_loss"), "take_profit": definition.get("take_profit")},
+            payload["symbol"], payload["timeframe"], times[lo], times[hi - 1],
+            data_version(window, times[lo:hi]),
+            {"initial_capital": payload["initial_capital"], "fee_rate": payload["fee_rate"],
+             "slippage_bps": payload["slippage_bps"], "equity_points": payload["equity_points"]},
+        )
+
+    async def _load_group(self, group: List[BacktestJob], semaphore: asyncio.Semaphore):
+        """Load the candles covering every job in a (symbol, timeframe) group once."""
+        first = group[0]
+        if first.candles is not None:
+            return _candle_arrays(first.candles)
+        if self.data_loader is None:
+            return ValueError(f"No candles supplied for {first.symbol} and no data loader configured")
+        starts = [job.start_date for job in group]
+        ends = [job.end_date for job in group]
+        start = None if any(s is None for s in starts) else min(starts)
+        end = None if any(e is None for e in ends) else max(ends)
+        async with semaphore:
+            try:
+                loop = asyncio.get_running_loop()
+                df = await loop.run_in_executor(None, self.data_loader, first.symbol, first.timeframe, start, end)
+            except Exception as e:
+                logger.error(f"Failed to load candles for {first.symbol} {first.timeframe}: {e}")
+                return e
+        if df is None or len(df) < 2:
+            return None
+        return _candle_arrays(df)
+
+    @staticmethod
+    def _job_payload(job: BacktestJob) -> Dict[str, Any]:
+        def naive(value: Optional[datetime]):
+            if value is None:
+                return None
+            stamp = pd.Timestamp(value)
+            return (stamp.tz_convert(None) if stamp.tzinfo else stamp).to_datetime64()
+
+        return {
+            "job_id": job.job_id,
+            "strategy_definition": job.strategy_definition,
+            "strategy_type": job.strategy_type,
+            "strategy_name": job.strategy_name,
+            "symbol": job.symbol,
+            "timeframe": job.timeframe,
+            "start_date": naive(job.start_date),
+            "end_date": naive(job.end_date),
+            "initial_capital": job.initial_capital,
+            "fee_rate": job.fee_rate,
+            "slippage_bps": job.slippage_bps,
+            "equity_points": job.equity_points,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats, workers=self.max_workers)
+        if self.cache is not None:
+            stats["cache"] = self.cache.get_stats()
+        return stats
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,130 @@
+"""
+Vectorized strategy signals and return simulation for VolexSwarm backtests.
+Turns a close-price array and a parameter set into a position series, and the
+position series into per-bar strategy returns and summary metrics.
+"""
+
+from typing import Dict, Any, Callable
+
+import numpy as np
+import pandas as pd
+
+# Periods per year for annualising per-bar statistics
+PERIODS_PER_YEAR = {
+    "1m": 525600, "5m": 105120, "15m": 35040, "30m": 17520,
+    "1h": 8760, "4h": 2190, "1d": 365, "1w": 52,
+}
+
+
+def _latch(enter: np.ndarray, exit_: np.ndarray) -> np.ndarray:
+    """Hold a long position from each entry bar until the next exit bar."""
+    events = np.full(enter.shape, np.nan)
+    events[exit_] = 0.0
+    events[enter] = 1.0
+    return pd.Series(events).ffill().fillna(0.0).values
+
+
+def sma_crossover(close: np.ndarray, fast_period: int = 10, slow_period: int = 30) -> np.ndarray:
+    """Long while the fast SMA is above the slow SMA."""
+    series = pd.Series(close)
+    fast = series.rolling(int(fast_period)).mean().values
+    slow = series.rolling(int(slow_period)).mean().values
+    with np.errstate(invalid="ignore"):
+        return (fast > slow).astype(np.float64)
+
+
+def rsi_mean_reversion(close: np.ndarray, rsi_period: int = 14,
+                       oversold: float = 30, overbought: float = 70) -> np.ndarray:
+    """Enter when RSI drops below ``oversold``, exit when it rises above ``overbought``."""
+    delta = pd.Series(close).diff()
+    span = int(rsi_period)
+    gain = delta.clip(lower=0).ewm(alpha=1.0 / span, min_periods=span).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1.0 / span, min_periods=span).mean()
+    rsi = (100 - 100 / (1 + gain / loss.replace(0, np.nan))).fillna(100).to_numpy(copy=True)
+    rsi[:span] = 50.0
+    return _latch(rsi < oversold, rsi > overbought)
+
+
+def bollinger_breakout(close: np.ndarray, period: int = 20, num_std: float = 2.0) -> np.ndarray:
+    """Enter on a close above the upper band, exit on a close below the middle band."""
+    series = pd.Series(close)
+    mid = series.rolling(int(period)).mean().values
+    std = series.rolling(int(period)).std().values
+    with np.errstate(invalid="ignore"):
+        return _latch(close > mid + num_std * std, close < mid)
+
+
+def momentum(close: np.ndarray, lookback: int = 20, threshold: float = 0.0) -> np.ndarray:
+    """Long while the trailing ``lookback``-bar return exceeds ``threshold``."""
+    past = pd.Series(close).shift(int(lookback)).values
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (close / past - 1.0 > threshold).astype(np.float64)
+
+
+STRATEGY_SIGNALS: Dict[str, Callable[..., np.ndarray]] = {
+    "sma_crossover": sma_crossover,
+    "rsi_mean_reversion": rsi_mean_reversion,
+    "bollinger_breakout": bollinger_breakout,
+    "momentum": momentum,
+    # Names used by strategy discovery
+    "trend_following": sma_crossover,
+    "mean_reversion": rsi_mean_reversion,
+    "breakout": bollinger_breakout,
+}
+
+
+def generate_positions(strategy_type: str, close: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """Build the target position (0..1) for every bar."""
+    signal_fn = STRATEGY_SIGNALS.get(strategy_type)
+    if signal_fn is None:
+        raise ValueError(f"Unknown strategy type: {strategy_type}")
+    return signal_fn(np.asarray(close, dtype=np.float64), **params)
+
+
+def strategy_returns(close: np.ndarray, positions: np.ndarray, fee_rate: float = 0.001) -> np.ndarray:
+    """
+    Per-bar strategy returns. A position decided on bar t is held over bar t+1,
+    and every change in position pays ``fee_rate`` on the traded fraction.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    bar_returns = np.zeros_like(close)
+    bar_returns[1:] = close[1:] / close[:-1] - 1.0
+    held = np.zeros_like(positions)
+    held[1:] = positions[:-1]
+    turnover = np.abs(np.diff(held, prepend=0.0))
+    return held * bar_returns - turnover * fee_rate
+
+
+def compute_metrics(returns: np.ndarray, positions: np.ndarray,
+                    periods_per_year: float = 365) -> Dict[str, float]:
+    """Summary metrics from per-bar strategy returns."""
+    if len(returns) == 0:
+        return {"total_return": 0.0, "sharpe_ratio": 0.0, "sortino_ratio": 0.0,
+                "max_drawdown": 0.0, "num_trades": 0, "exposure": 0.0}
+
+    equity = np.cumprod(1.0 + returns)
+    peak = np.maximum.accumulate(equity)
+    drawdown = equity / peak - 1.0
+
+    mean = returns.mean()
+    std = returns.std()
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    scale = np.sqrt(periods_per_year)
+
+    entries = np.count_nonzero(np.diff(positions, prepend=0.0) > 0)
+    return {
+        "total_return": float(equity[-1] - 1.0),
+        "sharpe_ratio": float(mean / std * scale) if std > 0 else 0.0,
+        "sortino_ratio": float(mean / downside * scale) if downside > 0 else 0.0,
+        "max_drawdown": float(drawdown.min()),
+        "num_trades": int(entries),
+        "exposure": float(positions.mean()),
+    }
+
+
+def evaluate_strategy(strategy_type: str, close: np.ndarray, params: Dict[str, Any],
+                      fee_rate: float = 0.001, periods_per_year: float = 365) -> Dict[str, float]:
+    """Generate positions for ``params`` and score them in one call."""
+    positions = generate_positions(strategy_type, close, params)
+    returns = strategy_returns(close, positions, fee_rate)
+    return compute_metrics(returns, positions, periods_per_year)
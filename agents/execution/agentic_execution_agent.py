@@ -9,7 +9,6 @@ import sys
 import os
 import logging
 import asyncio
-import ccxt
 import ccxt.async_support as ccxt_async
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Tuple
@@ -22,6 +21,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from common.vault import get_vault_client, get_exchange_credentials, get_agent_config
 from common.db import get_db_client, health_check as db_health_check
+from common.exchange_pool import get_exchange_pool
 from common.logging import get_logger
 from common.models import Trade, Order
 from common.websocket_client import AgentWebSocketClient, MessageType
@@ -987,6 +987,7 @@ Prioritize safety and risk management in all execution decisions."""
         try:
             await self.real_time_engine.stop()
             await self.exchange_manager.close_exchanges()
+            await get_exchange_pool().close_all()
             if self.ws_client:
                 await self.ws_client.disconnect()
             logger.info("Agentic Execution Agent shutdown successfully")
@@ -1313,8 +1314,7 @@ Prioritize safety and risk management in all execution decisions."""
     async def _get_current_btc_price(self) -> float:
         """Get current BTC price from Binance."""
         try:
-            exchange = ccxt.binanceus()
-            ticker = exchange.fetch_ticker('BTC/USDT')
+            ticker = await get_exchange_pool().fetch_ticker('binanceus', 'BTC/USDT')
             return ticker['last']
         except Exception as e:
             logger.error(f"Error getting BTC price: {e}")
@@ -1473,6 +1473,7 @@ Prioritize safety and risk management in all execution decisions."""
                 "exchange_connections": len(self.exchange_manager.exchanges),
                 "performance_metrics": self.performance_metrics,
                 "engine_status": self.real_time_engine.get_engine_status(),
+                "exchange_pool": get_exchange_pool().get_stats(),
                 "last_updated": datetime.now()
             }
         except Exception as e:
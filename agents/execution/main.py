@@ -21,6 +21,7 @@ sys.path.insert(0, '/app')
 sys.path.insert(0, '/app/agents/execution')
 
 from agentic_execution_agent import AgenticExecutionAgent
+from common.exchange_pool import get_exchange_pool
 from common.logging import get_logger
 
 logger = get_logger("agentic_execution_main")
@@ -57,6 +58,9 @@ async def lifespan(app: FastAPI):
     start_time = datetime.now()
     execution_service = AgenticExecutionService()
     await execution_service.start()
+    # Let the Meta Agent call these endpoints over the agent's WebSocket
+    if getattr(execution_service.agent, 'ws_client', None):
+        await execution_service.agent.ws_client.serve_rpc(app)
     
     # Start portfolio collection scheduler
     portfolio_task = asyncio.create_task(scheduled_portfolio_collection())
@@ -251,6 +255,14 @@ async def get_performance():
         else:
             return {"error": "Service not running"}
 
+@app.get("/api/execution/exchange-pool")
+async def get_exchange_pool_stats():
+    """Get request counts and latencies for the shared exchange clients."""
+    try:
+        return get_exchange_pool().get_stats()
+    except Exception as e:
+        return {"error": str(e)}
+
 @app.get("/api/execution/portfolio-performance")
 async def get_portfolio_performance():
     """Get comprehensive portfolio performance including total return."""
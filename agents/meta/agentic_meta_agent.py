@@ -54,9 +54,30 @@ from common.db import get_db_client
 from common.logging import get_logger
 from common.models import Strategy, Trade, Signal, AgentLog
 from common.openai_client import get_openai_client
+from common.ws_broadcast import WebSocketBroadcaster
+from common.status_stream import StatusStream, RESYNC
+from common.health_registry import HealthRegistry, HealthTarget, http_probe, vault_probe, database_probe
+from common.decision_memory import get_decision_memory
+from common.retention import RetainedList, get_retention_manager
 
 logger = get_logger("agentic_meta")
 
+DAY = 24 * 3600
+# In-memory retention per history: (max records, time window in seconds).
+# Older records spill to the history archive and stay readable through query().
+HISTORY_LIMITS = {
+    "decision_history": (5000, 7 * DAY),
+    "optimization_history": (2000, 7 * DAY),
+    "innovation_history": (1000, 30 * DAY),
+    "automation_history": (2000, 7 * DAY),
+    "workflow_history": (2000, 7 * DAY),
+    "self_healing_history": (2000, 7 * DAY),
+    "security_history": (5000, 7 * DAY),
+    "conflict_resolution_history": (2000, 7 * DAY),
+}
+# Histories kept per automation, workflow or self-healing system
+ENTITY_HISTORY_LIMIT = (200, DAY)
+
 class TaskPriority(Enum):
     """Task priority levels for intelligent scheduling."""
     CRITICAL = 1
@@ -152,13 +173,18 @@ class AgenticMetaAgent(MetaAgent):
             tool_registry = create_mcp_tool_registry()
         self.tool_registry = tool_registry
         
+        # Histories are capped ring buffers that spill to the history archive
+        self.retention = get_retention_manager()
+        
         # Initialize intelligent coordination systems
         self.tasks: Dict[str, Task] = {}
         self.agent_consensus: Dict[str, AgentConsensus] = {}
         
         # Initialize autonomous decision making systems
         self.autonomous_decisions: Dict[str, AutonomousDecision] = {}
-        self.decision_history: List[AutonomousDecision] = []
+        self.decision_history: RetainedList = self._retained(
+            "decision_history", decode=lambda record: AutonomousDecision(**record), on_evict=self._forget_decision,
+            key=lambda decision: decision.id)
         self.decision_validation: Dict[str, DecisionValidation] = {}
         self.decision_learning: Dict[str, Dict[str, Any]] = {}
         
@@ -166,12 +192,12 @@ class AgenticMetaAgent(MetaAgent):
         self.agent_goals: Dict[str, Dict[str, Any]] = {}
         self.self_monitoring_data: Dict[str, Any] = {}
         self.performance_metrics: Dict[str, Dict[str, Any]] = {}
-        self.optimization_history: List[Dict[str, Any]] = []
+        self.optimization_history: RetainedList = self._retained("optimization_history")
         self.learning_progress: Dict[str, Dict[str, Any]] = {}
         
         # Initialize creative problem solving systems
         self.creative_solutions: Dict[str, Dict[str, Any]] = {}
-        self.innovation_history: List[Dict[str, Any]] = []
+        self.innovation_history: RetainedList = self._retained("innovation_history")
         self.adaptive_strategies: Dict[str, Dict[str, Any]] = {}
         self.novel_approaches: List[Dict[str, Any]] = []
         self.creative_learning: Dict[str, Dict[str, Any]] = {}
@@ -181,14 +207,14 @@ class AgenticMetaAgent(MetaAgent):
         self.task_scheduler: Dict[str, Dict[str, Any]] = {}
         self.resource_optimizer: Dict[str, Dict[str, Any]] = {}
         self.system_orchestrator: Dict[str, Dict[str, Any]] = {}
-        self.automation_history: List[Dict[str, Any]] = []
+        self.automation_history: RetainedList = self._retained("automation_history")
         
         # Initialize Phase 6.2 Intelligent Workflows systems
         self.intelligent_workflows: Dict[str, Dict[str, Any]] = {}
         self.workflow_optimizer: Dict[str, Dict[str, Any]] = {}
         self.workflow_monitor: Dict[str, Dict[str, Any]] = {}
         self.workflow_learning: Dict[str, Dict[str, Any]] = {}
-        self.workflow_history: List[Dict[str, Any]] = []
+        self.workflow_history: RetainedList = self._retained("workflow_history")
         
         # Initialize Phase 6.3 System Self-Healing systems
         self.fault_detector: Dict[str, Dict[str, Any]] = {}
@@ -196,7 +222,7 @@ class AgenticMetaAgent(MetaAgent):
         self.health_monitor: Dict[str, Dict[str, Any]] = {}
         self.preventive_maintenance: Dict[str, Dict[str, Any]] = {}
         self.system_resilience: Dict[str, Dict[str, Any]] = {}
-        self.self_healing_history: List[Dict[str, Any]] = []
+        self.self_healing_history: RetainedList = self._retained("self_healing_history")
         
         # Initialize Phase 7.1 Security Enhancement systems
         self.security_manager: Dict[str, Dict[str, Any]] = {}
@@ -204,12 +230,11 @@ class AgenticMetaAgent(MetaAgent):
         self.authorization_system: Dict[str, Dict[str, Any]] = {}
         self.audit_system: Dict[str, Dict[str, Any]] = {}
         self.encryption_system: Dict[str, Dict[str, Any]] = {}
-        self.security_history: List[Dict[str, Any]] = []
+        self.security_history: RetainedList = self._retained("security_history")
         
         # Initialize missing attributes that are referenced in methods
-        self.conflict_resolution_history: List[Dict[str, Any]] = []
+        self.conflict_resolution_history: RetainedList = self._retained("conflict_resolution_history")
         self.autonomous_decisions: Dict[str, AutonomousDecision] = {}
-        self.decision_history: List[AutonomousDecision] = []
         self.decision_validation: Dict[str, DecisionValidation] = {}
         self.agent_loads: Dict[str, int] = {}
         self.performance_metrics: Dict[str, Dict[str, Any]] = {}
@@ -217,6 +242,16 @@ class AgenticMetaAgent(MetaAgent):
         self.task_queue: List[str] = []
         self.agent_consensus: Dict[str, AgentConsensus] = {}
         self.websocket_clients: set = set()
+        # Per-client outbound queues so one slow browser can't hold up the others
+        self.broadcaster = WebSocketBroadcaster(on_evict=self._on_websocket_evicted)
+        # Versioned status: snapshot on connect, deltas every status tick
+        self.status_stream = StatusStream()
+        self.status_broadcast_interval = 5  # seconds
+        # Agent and service health, probed in the background for /api/agents/health
+        self.health_registry = HealthRegistry(self._health_targets())
+        # Past decisions indexed by context similarity, with their validation outcomes
+        self.decision_memory = get_decision_memory()
+        self.similar_decisions_k = 20
         self.agent_coordinator = None
         
         # Initialize missing attributes that are referenced in methods
@@ -284,13 +319,25 @@ class AgenticMetaAgent(MetaAgent):
             # Start servers (WebSocket and FastAPI)
             self._start_servers()
             
-            # Start periodic websocket cleanup task
+            # Start periodic websocket cleanup and status broadcast tasks
             asyncio.create_task(self._periodic_websocket_cleanup())
+            asyncio.create_task(self._periodic_status_broadcast())
+            self.health_registry.start()
+            self.retention.start()
             
             logger.info("Infrastructure initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize infrastructure: {e}")
 
+    async def shutdown(self):
+        """Stop background services, writing retained records still waiting for the archive."""
+        try:
+            await self.health_registry.stop()
+            await self.retention.stop()
+            logger.info("Meta agent shut down")
+        except Exception as e:
+            logger.error(f"Error shutting down meta agent: {e}")
+
     async def _periodic_websocket_cleanup(self):
         """Periodically clean up stale websocket connections."""
         while True:
@@ -306,6 +353,58 @@ class AgenticMetaAgent(MetaAgent):
                 logger.error(f"Error in periodic websocket cleanup: {e}")
                 await asyncio.sleep(60)  # Wait longer on error
 
+    def _retained(self, name: str, limits: Optional[Tuple[int, int]] = None, **kwargs) -> RetainedList:
+        """The retained history ``name``, capped per HISTORY_LIMITS unless ``limits`` is given."""
+        max_items, max_age = limits or HISTORY_LIMITS[name]
+        return self.retention.collection(name, max_items, max_age, **kwargs)
+
+    def _entity_history(self, name: str) -> RetainedList:
+        """Per-entity history; the retention manager forgets it once it has been idle for its window."""
+        return self._retained(name, ENTITY_HISTORY_LIMIT, transient=True)
+
+    def _forget_decision(self, decision: AutonomousDecision) -> None:
+        """Drop the lookup entries of a decision leaving the in-memory history."""
+        self.autonomous_decisions.pop(decision.id, None)
+        self.decision_validation.pop(decision.id, None)
+
+    def _health_targets(self) -> List[HealthTarget]:
+        """Vault, the database and every agent's /health endpoint."""
+        # Agent id -> (display name, internal port); addressed by container name
+        agents = {
+            'research': ('Research Agent', 8000),
+            'execution': ('Execution Agent', 8002),
+            'signal': ('Signal Agent', 8003),
+            'meta': ('Meta Agent', 8004),
+            'strategy': ('Strategy Agent', 8011),
+            'risk': ('Risk Agent', 8009),
+            'compliance': ('Compliance Agent', 8010),
+            'backtest': ('Backtest Agent', 8006),
+            'optimize': ('Optimize Agent', 8007),
+            'monitor': ('Monitor Agent', 8008),
+            'news_sentiment': ('News Sentiment Agent', 8024),
+        }
+        targets = [
+            HealthTarget('vault', 'Vault', vault_probe(),
+                         info={'port': 8200, 'endpoints': ['/v1/sys/health'], 'dependencies': []}),
+            HealthTarget('db', 'TimescaleDB', database_probe(get_db_client),
+                         info={'port': 5432, 'endpoints': ['SELECT 1'], 'dependencies': []}),
+        ]
+        for agent_id, (name, port) in agents.items():
+            url = f"http://volexswarm-{agent_id}-1:{port}/health"
+            targets.append(HealthTarget(agent_id, name, http_probe(url),
+                                        info={'port': port, 'endpoints': ['/health'], 'dependencies': []}))
+        return targets
+
+    async def _periodic_status_broadcast(self):
+        """Send the changes in agent status to connected clients every tick."""
+        while True:
+            await asyncio.sleep(self.status_broadcast_interval)
+            if self.broadcaster:
+                try:
+                    await self.broadcast_agent_status()
+                except Exception as e:
+                    logger.error(f"Error broadcasting agent status: {e}")
+
     async def create_intelligent_task(self, name: str, description: str, 
                                     priority: TaskPriority = TaskPriority.MEDIUM,
                                     required_agents: List[str] = None,
@@ -768,7 +867,7 @@ class AgenticMetaAgent(MetaAgent):
                 "consensus_decisions": len(self.agent_consensus)
             },
             "conflict_resolution": {
-                "total_conflicts": len(self.conflict_resolution_history),
+                "total_conflicts": self.conflict_resolution_history.total,
                 "resolution_success_rate": self._calculate_resolution_success_rate(),
                 "average_resolution_time": self._calculate_average_resolution_time()
             },
@@ -893,7 +992,8 @@ class AgenticMetaAgent(MetaAgent):
                 "agent_type": "agentic_meta",
                 "status": "healthy",
                 "autonomous_decisions_count": len(self.autonomous_decisions),
-                "decision_history_count": len(self.decision_history),
+                "decision_history_count": self.decision_history.total,
+                "decision_memory_size": len(self.decision_memory),
                 "validation_success_rate": self._calculate_validation_success_rate(),
                 "average_decision_confidence": self._calculate_average_decision_confidence(),
                 "recent_decisions": self._get_recent_decisions(5),
@@ -933,6 +1033,9 @@ class AgenticMetaAgent(MetaAgent):
             # Validate decision
             await self._validate_decision(autonomous_decision)
             
+            # Remember the outcome for similar-decision lookups
+            await self._remember_decision(autonomous_decision)
+            
             # Learn from decision
             await self._learn_from_decision(autonomous_decision)
             
@@ -1049,16 +1152,19 @@ class AgenticMetaAgent(MetaAgent):
     async def _validate_against_history(self, decision: AutonomousDecision) -> Tuple[float, str]:
         """Validate decision against historical patterns."""
         try:
-            # Find similar historical decisions
-            similar_decisions = self._find_similar_decisions(decision)
+            # Outcomes of the most similar historical decisions, weighted by similarity
+            outcomes = self.decision_memory.similar_outcomes(
+                decision.decision_type, decision.context, decision.confidence,
+                k=self.similar_decisions_k, exclude_id=decision.id
+            )
             
-            if not similar_decisions:
+            if not outcomes["count"]:
                 return 0.5, "No historical data for comparison"
             
-            # Calculate success rate of similar decisions
-            success_rate = sum(1 for d in similar_decisions if d.validation_score > 0.7) / len(similar_decisions)
+            success_rate = outcomes["weighted_success_rate"]
             
-            feedback = f"Historical success rate: {success_rate:.2f}"
+            feedback = (f"Historical success rate: {success_rate:.2f} over {outcomes['count']} similar decisions "
+                        f"(mean similarity {outcomes['mean_similarity']:.2f})")
             return success_rate, feedback
             
         except Exception as e:
@@ -1133,15 +1239,28 @@ class AgenticMetaAgent(MetaAgent):
         })
 
     def _find_similar_decisions(self, decision: AutonomousDecision) -> List[AutonomousDecision]:
-        """Find similar historical decisions for validation."""
-        similar_decisions = []
-        
-        for hist_decision in self.decision_history[-100:]:  # Last 100 decisions
-            if hist_decision.decision_type == decision.decision_type:
-                # Simple similarity check - could be enhanced with ML
-                similar_decisions.append(hist_decision)
-        
-        return similar_decisions
+        """
+        Find similar historical decisions: the nearest neighbors of the
+        decision's context in the decision memory, most similar first.
+        Only decisions still held in memory are returned.
+        """
+        neighbors = self.decision_memory.search(
+            decision.decision_type, decision.context, decision.confidence,
+            k=self.similar_decisions_k, exclude_id=decision.id
+        )
+        return [self.autonomous_decisions[n.decision_id] for n in neighbors
+                if n.decision_id in self.autonomous_decisions]
+
+    async def _remember_decision(self, decision: AutonomousDecision) -> None:
+        """Add a validated decision to the decision memory and persist it when due."""
+        try:
+            self.decision_memory.add(decision.id, decision.decision_type, decision.context,
+                                     decision.confidence, decision.validation_score)
+            if self.decision_memory.path:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self.decision_memory.persist_if_due)
+        except Exception as e:
+            logger.error(f"Error remembering decision: {e}")
 
     def _generate_validation_recommendations(self, score: float, feedback: List[str]) -> List[str]:
         """Generate recommendations based on validation results."""
@@ -1246,10 +1365,12 @@ class AgenticMetaAgent(MetaAgent):
     async def explain_decision(self, decision_id: str) -> Dict[str, Any]:
         """Provide detailed explanation of an autonomous decision."""
         try:
-            if decision_id not in self.autonomous_decisions:
-                return {"error": "Decision not found"}
-            
-            decision = self.autonomous_decisions[decision_id]
+            decision = self.autonomous_decisions.get(decision_id)
+            if decision is None:
+                # No longer in memory; look it up by id in the spilled history
+                decision = await self.decision_history.aget(decision_id)
+                if decision is None:
+                    return {"error": "Decision not found"}
             validation = self.decision_validation.get(decision_id)
             
             explanation = {
@@ -2325,7 +2446,7 @@ class AgenticMetaAgent(MetaAgent):
         """Get a comprehensive report on creative problem solving capabilities."""
         try:
             total_solutions = len(self.creative_solutions)
-            total_innovations = len(self.innovation_history)
+            total_innovations = self.innovation_history.total
             
             # Calculate average creativity scores
             creativity_scores = [sol.get("creativity_score", 0.0) for sol in self.creative_solutions.values()]
@@ -2442,7 +2563,7 @@ class AgenticMetaAgent(MetaAgent):
                 "orchestration_rules": automation.get("orchestration_rules", []),
                 "agent_coordination": {},
                 "workflow_management": {},
-                "coordination_history": []
+                "coordination_history": self._entity_history(f"automation_coordination/{automation_id}")
             }
             
             logger.debug(f"Automation components initialized for {automation_id}")
@@ -2978,7 +3099,7 @@ class AgenticMetaAgent(MetaAgent):
                 "execution_count": 0,
                 "success_rate": 0.0,
                 "performance_metrics": {},
-                "adaptation_history": [],
+                "adaptation_history": self._entity_history(f"workflow_adaptation/{workflow_id}"),
                 "learning_insights": []
             }
             
@@ -3013,7 +3134,7 @@ class AgenticMetaAgent(MetaAgent):
                 "workflow_id": workflow_id,
                 "optimization_rules": workflow.get("adaptation_rules", []),
                 "performance_targets": {},
-                "optimization_history": [],
+                "optimization_history": self._entity_history(f"workflow_optimization/{workflow_id}"),
                 "efficiency_metrics": {}
             }
             
@@ -3023,7 +3144,7 @@ class AgenticMetaAgent(MetaAgent):
                 "monitoring_rules": [],
                 "performance_metrics": {},
                 "alert_thresholds": {},
-                "monitoring_history": []
+                "monitoring_history": self._entity_history(f"workflow_monitoring/{workflow_id}")
             }
             
             # Initialize workflow learning
@@ -3641,7 +3762,7 @@ class AgenticMetaAgent(MetaAgent):
                 "fault_patterns": healing_config.get("fault_patterns", []),
                 "detection_rules": healing_config.get("detection_rules", []),
                 "alert_thresholds": healing_config.get("alert_thresholds", {}),
-                "detection_history": []
+                "detection_history": self._entity_history(f"fault_detection/{healing_id}")
             }
             
             # Initialize recovery manager
@@ -3649,7 +3770,7 @@ class AgenticMetaAgent(MetaAgent):
                 "healing_id": healing_id,
                 "recovery_strategies": healing_config.get("recovery_strategies", []),
                 "recovery_procedures": healing_config.get("recovery_procedures", {}),
-                "recovery_history": [],
+                "recovery_history": self._entity_history(f"fault_recovery/{healing_id}"),
                 "success_rate": 0.0
             }
             
@@ -3790,8 +3911,8 @@ class AgenticMetaAgent(MetaAgent):
             recent_activities = self.self_healing_history[-10:] if self.self_healing_history else []
             
             # Calculate total faults detected and recovered
-            total_faults_detected = sum(len(d.get("detection_history", [])) for d in self.fault_detector.values())
-            total_recoveries_attempted = sum(len(r.get("recovery_history", [])) for r in self.recovery_manager.values())
+            total_faults_detected = sum(d["detection_history"].total for d in self.fault_detector.values())
+            total_recoveries_attempted = sum(r["recovery_history"].total for r in self.recovery_manager.values())
             
             self_healing_report = {
                 "total_healing_systems": total_healing_systems,
@@ -3948,144 +4069,32 @@ class AgenticMetaAgent(MetaAgent):
                 return JSONResponse({"error": str(e)}, status_code=500)
 
         @self.fastapi_app.get("/api/agents/health")
-        async def get_all_agents_health():
-            """Get comprehensive health information for all agents."""
+        async def get_all_agents_health(refresh: bool = False):
+            """
+            Get comprehensive health information for all agents.
+            
+            Served from the background health registry; ``refresh=true``
+            probes every agent first.
+            """
             try:
-                import aiohttp
-                import asyncio
-                
-                # Define all agent configurations
-                agent_configs = {
-                    'vault': {'name': 'Vault', 'port': 8200, 'endpoint': '/v1/sys/health'},
-                    'db': {'name': 'TimescaleDB', 'port': 5432, 'endpoint': '/health'},
-                    'research': {'name': 'Research Agent', 'port': 8000, 'endpoint': '/health'},  # Internal port is 8000
-                    'execution': {'name': 'Execution Agent', 'port': 8002, 'endpoint': '/health'},
-                    'signal': {'name': 'Signal Agent', 'port': 8003, 'endpoint': '/health'},
-                    'meta': {'name': 'Meta Agent', 'port': 8004, 'endpoint': '/health'},
-                    'strategy': {'name': 'Strategy Agent', 'port': 8011, 'endpoint': '/health'},
-                    'risk': {'name': 'Risk Agent', 'port': 8009, 'endpoint': '/health'},
-                    'compliance': {'name': 'Compliance Agent', 'port': 8010, 'endpoint': '/health'},
-                    'backtest': {'name': 'Backtest Agent', 'port': 8006, 'endpoint': '/health'},
-                    'optimize': {'name': 'Optimize Agent', 'port': 8007, 'endpoint': '/health'},
-                    'monitor': {'name': 'Monitor Agent', 'port': 8008, 'endpoint': '/health'},
-                    'news_sentiment': {'name': 'News Sentiment Agent', 'port': 8024, 'endpoint': '/health'},
-                }
-                
-                async def fetch_agent_health(agent_id: str, config: dict) -> dict:
-                    """Fetch health information for a single agent."""
-                    try:
-                        # Special handling for vault and db
-                        if agent_id == 'vault':
-                            return {
-                                'id': agent_id,
-                                'name': config['name'],
-                                'port': config['port'],
-                                'status': 'healthy',
-                                'version': '1.18.3',
-                                'timestamp': datetime.now().isoformat(),
-                                'uptime': '5h 15m',
-                                'endpoints': [config['endpoint']],
-                                'dependencies': []
-                            }
-                        elif agent_id == 'db':
-                            return {
-                                'id': agent_id,
-                                'name': config['name'],
-                                'port': config['port'],
-                                'status': 'healthy',
-                                'version': '2.11.0',
-                                'timestamp': datetime.now().isoformat(),
-                                'uptime': '5h 15m',
-                                'endpoints': [config['endpoint']],
-                                'dependencies': []
-                            }
-                        
-                        # For other agents, make HTTP requests
-                        timeout = aiohttp.ClientTimeout(total=3)
-                        async with aiohttp.ClientSession(timeout=timeout) as session:
-                            # Use container names for internal communication
-                            container_names = {
-                                'research': 'volexswarm-research-1',
-                                'execution': 'volexswarm-execution-1',
-                                'signal': 'volexswarm-signal-1',
-                                'meta': 'volexswarm-meta-1',
-                                'strategy': 'volexswarm-strategy-1',
-                                'risk': 'volexswarm-risk-1',
-                                'compliance': 'volexswarm-compliance-1',
-                                'backtest': 'volexswarm-backtest-1',
-                                'optimize': 'volexswarm-optimize-1',
-                                'monitor': 'volexswarm-monitor-1',
-                                'news_sentiment': 'volexswarm-news_sentiment-1',
-                            }
-                            
-                            # Use container name for internal communication, localhost for external
-                            host = container_names.get(agent_id, 'localhost')
-                            url = f"http://{host}:{config['port']}{config['endpoint']}"
-                            async with session.get(url) as response:
-                                if response.status == 200:
-                                    health_data = await response.json()
-                                    return {
-                                        'id': agent_id,
-                                        'name': config['name'],
-                                        'port': config['port'],
-                                        'status': health_data.get('status', 'healthy'),
-                                        'version': health_data.get('version', '1.0.0'),
-                                        'timestamp': health_data.get('timestamp', datetime.now().isoformat()),
-                                        'uptime': health_data.get('uptime', 'Unknown'),
-                                        'websocket_clients': health_data.get('websocket_clients'),
-                                        'connected_agents': health_data.get('connected_agents'),
-                                        'active_tasks': health_data.get('active_tasks'),
-                                        'endpoints': [config['endpoint']],
-                                        'dependencies': []
-                                    }
-                                else:
-                                    return {
-                                        'id': agent_id,
-                                        'name': config['name'],
-                                        'port': config['port'],
-                                        'status': 'unhealthy',
-                                        'timestamp': datetime.now().isoformat(),
-                                        'error': f'HTTP {response.status}',
-                                        'endpoints': [config['endpoint']],
-                                        'dependencies': []
-                                    }
-                    except Exception as e:
-                        return {
-                            'id': agent_id,
-                            'name': config['name'],
-                            'port': config['port'],
-                            'status': 'unhealthy',
-                            'timestamp': datetime.now().isoformat(),
-                            'error': str(e),
-                            'endpoints': [config['endpoint']],
-                            'dependencies': []
-                        }
-                
-                # Fetch health for all agents concurrently
-                tasks = [fetch_agent_health(agent_id, config) for agent_id, config in agent_configs.items()]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                # Convert results to a dictionary
-                agents_health = {}
-                for result in results:
-                    if isinstance(result, dict):
-                        agents_health[result['id']] = result
-                    else:
-                        # Handle exceptions
-                        logger.error(f"Error fetching agent health: {result}")
-                
-                return JSONResponse({
-                    'agents': agents_health,
-                    'total_agents': len(agents_health),
-                    'healthy_agents': len([a for a in agents_health.values() if a.get('status') == 'healthy']),
-                    'unhealthy_agents': len([a for a in agents_health.values() if a.get('status') != 'healthy']),
-                    'timestamp': datetime.now().isoformat()
-                })
+                self.health_registry.start()
+                if refresh:
+                    await self.health_registry.refresh()
+                return JSONResponse(self.health_registry.view())
                 
             except Exception as e:
                 logger.error(f"Error getting all agents health: {e}")
                 return JSONResponse({"error": str(e)}, status_code=500)
         
+        @self.fastapi_app.get("/api/retention")
+        async def get_retention_stats():
+            """Memory use, caps and spill counters of each retained history."""
+            try:
+                return JSONResponse(self.retention.get_stats())
+            except Exception as e:
+                logger.error(f"Error getting retention stats: {e}")
+                return JSONResponse({"error": str(e)}, status_code=500)
+        
         @self.fastapi_app.get("/api/tasks")
         async def get_tasks():
             """Get all active tasks."""
@@ -4112,6 +4121,8 @@ class AgenticMetaAgent(MetaAgent):
                     "connected_agents": len(self.connected_agents),
                     "active_tasks": len(self.tasks),
                     "server_port": self.websocket_port,
+                    "broadcast": self.broadcaster.get_stats(),
+                    "status_stream": self.status_stream.get_stats(),
                     "timestamp": datetime.now().isoformat()
                 }
             except Exception as e:
@@ -4125,6 +4136,7 @@ class AgenticMetaAgent(MetaAgent):
                 # Force close all websocket connections
                 disconnected_count = 0
                 for websocket in list(self.websocket_clients):
+                    self.broadcaster.discard(websocket)
                     try:
                         await websocket.close(code=1000, reason="Server reset")
                         disconnected_count += 1
@@ -4161,19 +4173,24 @@ class AgenticMetaAgent(MetaAgent):
                 client_count = len(self.websocket_clients)
                 logger.info(f"WebSocket client {websocket._client_id} connected. Total clients: {client_count}")
                 
-                # Send initial status
+                # Send initial status snapshot
                 try:
-                    status = await self.get_agent_status()
-                    await websocket.send_text(json.dumps({
-                        "type": "initial_status",
-                        "data": status
-                    }))
-                    # Update activity timestamp after sending
-                    websocket._last_activity = datetime.now()
+                    try:
+                        await self.broadcast_agent_status()
+                    except Exception as e:
+                        if self.status_stream.state is None:
+                            raise
+                        # The last recorded status is still a consistent snapshot
+                        logger.warning(f"Agent status refresh failed, sending the last snapshot: {e}")
+                    # Registered before the snapshot is queued, so the client's
+                    # writer sends it ahead of any later delta
+                    self.broadcaster.add(websocket, websocket._client_id)
+                    self.broadcaster.send(websocket, self.status_stream.snapshot())
                 except Exception as e:
                     logger.error(f"Error sending initial status: {e}")
                     # If we can't send initial status, close the connection
                     await websocket.close(code=1011, reason="Failed to send initial status")
+                    self.broadcaster.discard(websocket)
                     self.websocket_clients.discard(websocket)
                     return
                 
@@ -4188,15 +4205,16 @@ class AgenticMetaAgent(MetaAgent):
                             try:
                                 data = json.loads(message)
                                 if data.get("type") == "ping":
-                                    await websocket.send_text(json.dumps({"type": "pong"}))
-                                    websocket._last_activity = datetime.now()
+                                    self.broadcaster.send(websocket, {"type": "pong"})
                                 elif data.get("type") == "heartbeat":
                                     # Respond to heartbeat to keep connection alive
-                                    await websocket.send_text(json.dumps({
+                                    self.broadcaster.send(websocket, {
                                         "type": "heartbeat_ack",
                                         "timestamp": datetime.now().isoformat()
-                                    }))
-                                    websocket._last_activity = datetime.now()
+                                    })
+                                elif data.get("type") == RESYNC:
+                                    # Client saw a sequence gap; send a fresh snapshot
+                                    self.broadcaster.send(websocket, self.status_stream.snapshot(resync=True))
                                 elif data.get("type") == "agent_status":
                                     # Track agent connection
                                     agent_name = data.get("data", {}).get("agent", "unknown")
@@ -4223,6 +4241,7 @@ class AgenticMetaAgent(MetaAgent):
                     logger.error(f"WebSocket message loop error: {e}")
                 finally:
                     # Always ensure cleanup
+                    self.broadcaster.discard(websocket)
                     if websocket in self.websocket_clients:
                         self.websocket_clients.discard(websocket)
                         remaining_count = len(self.websocket_clients)
@@ -4236,6 +4255,7 @@ class AgenticMetaAgent(MetaAgent):
             except Exception as e:
                 logger.error(f"WebSocket connection error: {e}")
                 # Ensure cleanup even if connection wasn't fully established
+                self.broadcaster.discard(websocket)
                 if websocket in self.websocket_clients:
                     self.websocket_clients.discard(websocket)
                     
@@ -4284,41 +4304,47 @@ class AgenticMetaAgent(MetaAgent):
         logger.info(f"Started FastAPI server with WebSocket support on port {self.api_port}")
 
     async def _broadcast_status_update(self, message: Dict[str, Any]):
-        """Broadcast status update to all connected WebSocket clients."""
-        if not self.websocket_clients:
-            return
-        
-        message_json = json.dumps(message)
-        disconnected_clients = set()
+        """
+        Broadcast status update to all connected WebSocket clients.
         
-        for websocket in self.websocket_clients:
-            try:
-                await websocket.send(message_json)
-                # Update activity timestamp after successful send
-                if hasattr(websocket, '_last_activity'):
-                    websocket._last_activity = datetime.now()
-            except websockets.exceptions.ConnectionClosed:
-                disconnected_clients.add(websocket)
-            except Exception as e:
-                logger.error(f"Error broadcasting to WebSocket client: {e}")
-                disconnected_clients.add(websocket)
+        The message is serialized once and queued per client; a client that
+        falls behind only gets the latest progress per task rather than every
+        intermediate one.
+        """
+        if not self.broadcaster:
+            return
         
-        # Remove disconnected clients
-        if disconnected_clients:
-            self.websocket_clients -= disconnected_clients
-            logger.info(f"Removed {len(disconnected_clients)} disconnected websocket clients. Remaining: {len(self.websocket_clients)}")
+        message_type = message.get("type")
+        if message_type == "task_progress":
+            conflate_key = f"task_progress:{message.get('task_id')}"
+        else:
+            conflate_key = None
+        self.broadcaster.broadcast(message, conflate_key=conflate_key)
+    
+    def _on_websocket_evicted(self, websocket: Any, reason: str):
+        """Forget a client the broadcaster evicted (slow, stalled or broken)."""
+        self.websocket_clients.discard(websocket)
+        agent_name = getattr(websocket, '_agent_name', None)
+        if agent_name:
+            self.connected_agents.discard(agent_name)
+        logger.info(f"WebSocket client {getattr(websocket, '_client_id', '?')} evicted ({reason}). "
+                    f"Remaining: {len(self.websocket_clients)}")
 
     async def broadcast_agent_status(self):
-        """Broadcast current agent status to all connected clients."""
-        try:
-            status = await self.get_agent_status()
-            await self._broadcast_status_update({
-                "type": "agent_status_update",
-                "data": status,
-                "timestamp": datetime.now().isoformat()
-            })
-        except Exception as e:
-            logger.error(f"Error broadcasting agent status: {e}")
+        """
+        Broadcast what changed in agent status since the last tick.
+        
+        Clients get a snapshot with a sequence number on connect and a delta
+        (only the changed fields) per tick afterwards. Deltas are never
+        conflated or skipped by design: a client that misses one sees the
+        sequence gap and sends a resync request for a new snapshot. Errors
+        propagate; a connecting client still gets the last recorded
+        snapshot, and is only turned away when there is none.
+        """
+        status = await self.get_agent_status()
+        delta = self.status_stream.update(status)
+        if delta is not None:
+            await self._broadcast_status_update(delta)
 
     async def broadcast_task_progress(self, task_id: str, progress: Dict[str, Any]):
         """Broadcast task progress update."""
@@ -4436,6 +4462,7 @@ class AgenticMetaAgent(MetaAgent):
             except Exception as e:
                 logger.error(f"Error closing timeout websocket: {e}")
             finally:
+                self.broadcaster.discard(websocket)
                 self.websocket_clients.discard(websocket)
         
         # Log current state
@@ -4461,6 +4488,7 @@ class AgenticMetaAgent(MetaAgent):
                     except Exception as e:
                         logger.error(f"Error force closing websocket: {e}")
                     finally:
+                        self.broadcaster.discard(websocket)
                         self.websocket_clients.discard(websocket)
             
             logger.info(f"Force cleaned websocket connections. New count: {len(self.websocket_clients)}")
\ No newline at end of file
@@ -57,6 +57,9 @@ from common.vault import get_vault_client, get_agent_config
 from common.db import get_db_client
 from common.logging import get_logger
 from common.openai_client import get_openai_client
+from common.health_registry import HealthRegistry, HealthTarget, http_probe
+from common.wire_format import negotiate_subprotocol, decode_frame, WireFormatError, WireCodec
+from common.ws_rpc import RPCEndpoint, RPCUnavailable, RPC_TYPES, asgi_dispatcher, agent_key
 
 logger = get_logger("hybrid_meta_agent")
 
@@ -153,6 +156,7 @@ class HybridMetaAgent(MetaAgent):
         self.db_client = None
         self.openai_client = None
         self.websocket_clients = set()
+        self.agent_rpc: Dict[str, RPCEndpoint] = {}  # Agents reachable over their WebSocket, by agent_endpoints name
         self.tasks: Dict[str, HybridTask] = {}
         self.agent_coordinator = None
         
@@ -168,6 +172,12 @@ class HybridMetaAgent(MetaAgent):
             "signal": "http://signal:8003"
         }
         
+        # Background health probes of the coordinated agents
+        self.health_registry = HealthRegistry(
+            HealthTarget(name, name, http_probe(f"{endpoint}/health"), info={"endpoint": endpoint})
+            for name, endpoint in self.agent_endpoints.items()
+        )
+        
         # Agent capabilities for intelligent assignment
         self.agent_capabilities = {
             'execution': ['trade_execution', 'order_management', 'position_tracking'],
@@ -213,6 +223,9 @@ class HybridMetaAgent(MetaAgent):
             # Start servers
             self._start_servers()
             
+            # Start background agent health checks
+            self.health_registry.start()
+            
             logger.info("✅ Hybrid Meta Agent initialized successfully")
             
         except Exception as e:
@@ -347,14 +360,13 @@ class HybridMetaAgent(MetaAgent):
                 Respond with a JSON list of agent names, e.g., ["execution", "risk", "signal"]
                 """
                 
-                response = await self.openai_client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[{"role": "user", "content": prompt}],
+                response = await self.openai_client.generate_completion(
+                    [{"role": "user", "content": prompt}],
                     temperature=0.3
                 )
                 
                 # Parse LLM response
-                content = response.choices[0].message.content.strip()
+                content = (response or "").strip()
                 if content.startswith('[') and content.endswith(']'):
                     import json
                     assigned_agents = json.loads(content)
@@ -402,13 +414,12 @@ class HybridMetaAgent(MetaAgent):
                 """
                 
                 try:
-                    response = await self.openai_client.chat.completions.create(
-                        model="gpt-4o-mini",
-                        messages=[{"role": "user", "content": prompt}],
+                    response = await self.openai_client.generate_completion(
+                        [{"role": "user", "content": prompt}],
                         temperature=0.3
                     )
                     
-                    content = response.choices[0].message.content.strip()
+                    content = (response or "").strip()
                     if content.startswith('{') and content.endswith('}'):
                         guidance = json.loads(content)
                         endpoint = guidance.get("endpoint", "/health")
@@ -1003,6 +1014,7 @@ class HybridMetaAgent(MetaAgent):
                 return {
                     "active_connections": len(self.websocket_clients),
                     "total_connections_handled": len(self.websocket_clients),
+                    "rpc_agents": {name: rpc.get_stats() for name, rpc in self.agent_rpc.items()},
                     "websocket_server_status": "active",
                     "port": 8004,
                     "endpoint": "/ws",
@@ -1091,7 +1103,12 @@ class HybridMetaAgent(MetaAgent):
                 return
                 
             try:
-                await websocket.accept()
+                # Agents offering the msgpack subprotocol get binary frames; others stay on JSON text
+                subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols", []))
+                await websocket.accept(subprotocol=subprotocol)
+                websocket._codec = WireCodec(subprotocol)
+                websocket._rpc = RPCEndpoint(lambda message: self._send_websocket_frame(websocket, message),
+                                             asgi_dispatcher(self.app), name="websocket client")
                 
                 # Track connection metadata for cleanup
                 websocket._connected_at = datetime.now()
@@ -1141,25 +1158,32 @@ class HybridMetaAgent(MetaAgent):
                 try:
                     while True:
                         try:
-                            message = await websocket.receive_text()
+                            frame = await websocket.receive()
+                            if frame["type"] == "websocket.disconnect":
+                                logger.info(f"WebSocket client {websocket._client_id} connection closed: {frame.get('code')}")
+                                break
                             websocket._last_activity = datetime.now()
                             
                             try:
-                                data = json.loads(message)
-                                await self._handle_websocket_message(websocket, data)
-                            except json.JSONDecodeError:
-                                await websocket.send_text(json.dumps({
-                                    "type": "error",
-                                    "message": "Invalid JSON format",
-                                    "timestamp": datetime.now().isoformat()
-                                }))
-                            except Exception as e:
-                                logger.error(f"WebSocket message error: {e}")
+                                # Text frames hold one JSON message, binary frames one or a batch of msgpack messages
+                                messages = decode_frame(frame["bytes"] if frame.get("bytes") is not None else frame.get("text", ""))
+                            except WireFormatError:
                                 await websocket.send_text(json.dumps({
                                     "type": "error",
-                                    "message": "Message processing error",
+                                    "message": "Invalid message format",
                                     "timestamp": datetime.now().isoformat()
                                 }))
+                                continue
+                            for data in messages:
+                                try:
+                                    await self._handle_websocket_message(websocket, data)
+                                except Exception as e:
+                                    logger.error(f"WebSocket message error: {e}")
+                                    await websocket.send_text(json.dumps({
+                                        "type": "error",
+                                        "message": "Message processing error",
+                                        "timestamp": datetime.now().isoformat()
+                                    }))
                                 
                         except Exception as e:
                             logger.info(f"WebSocket client {websocket._client_id} connection closed: {e}")
@@ -1169,6 +1193,7 @@ class HybridMetaAgent(MetaAgent):
                     logger.error(f"WebSocket message loop error: {e}")
                 finally:
                     # Always ensure cleanup
+                    self._unregister_agent_rpc(websocket)
                     if websocket in self.websocket_clients:
                         self.websocket_clients.discard(websocket)
                         remaining_count = len(self.websocket_clients)
@@ -1177,36 +1202,39 @@ class HybridMetaAgent(MetaAgent):
             except Exception as e:
                 logger.error(f"WebSocket connection error: {e}")
                 # Ensure cleanup even if connection wasn't fully established
+                self._unregister_agent_rpc(websocket)
                 if websocket in self.websocket_clients:
                     self.websocket_clients.discard(websocket)
+    
+    async def _send_websocket_frame(self, websocket, message: Dict[str, Any]):
+        """Send one message in the client's negotiated wire format."""
+        frame = websocket._codec.encode([message])
+        if isinstance(frame, bytes):
+            await websocket.send_bytes(frame)
+        else:
+            await websocket.send_text(frame)
+    
+    def _unregister_agent_rpc(self, websocket):
+        """Fail RPC calls in flight on a closed socket; later calls to its agent go over HTTP."""
+        rpc = getattr(websocket, "_rpc", None)
+        if rpc is None:
+            return
+        rpc.close()
+        for name, endpoint in list(self.agent_rpc.items()):
+            if endpoint is rpc:
+                del self.agent_rpc[name]
+                logger.info(f"🔌 {name} agent RPC unregistered")
 
     async def _check_all_agents(self) -> Dict[str, Any]:
-        """Check the health of all coordinated agents."""
-        agent_status = {}
-        healthy_count = 0
+        """
+        Health of all coordinated agents from the background health registry.
         
-        for agent_name, endpoint in self.agent_endpoints.items():
-            try:
-                response = requests.get(f"{endpoint}/health", timeout=3)
-                if response.status_code == 200:
-                    agent_status[agent_name] = {
-                        "status": "healthy",
-                        "endpoint": endpoint,
-                        "response_time": response.elapsed.total_seconds()
-                    }
-                    healthy_count += 1
-                else:
-                    agent_status[agent_name] = {
-                        "status": "unhealthy",
-                        "endpoint": endpoint,
-                        "http_status": response.status_code
-                    }
-            except Exception as e:
-                agent_status[agent_name] = {
-                    "status": "unreachable",
-                    "endpoint": endpoint,
-                    "error": str(e)
-                }
+        Each entry has the result of the agent's latest probe with when it
+        was checked and whether that result is stale.
+        """
+        self.health_registry.start()
+        agent_status = await self._get_all_agent_status()
+        healthy_count = sum(1 for status in agent_status.values() if status["status"] == "healthy")
         
         return {
             "meta_agent": "healthy",
@@ -1218,19 +1246,39 @@ class HybridMetaAgent(MetaAgent):
             "health_percentage": (healthy_count / len(self.agent_endpoints)) * 100
         }
     
-    async def _call_agent(self, agent_name: str, endpoint: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Make a call to a specific agent."""
+    async def _call_agent(self, agent_name: str, endpoint: str, data: Dict[str, Any] = None,
+                          timeout: float = 30) -> Dict[str, Any]:
+        """
+        Make a call to a specific agent.
+        
+        Goes over the agent's WebSocket as an RPC when the agent serves RPC
+        there, and over HTTP when it doesn't or the socket is down.
+        """
         if agent_name not in self.agent_endpoints:
             raise ValueError(f"Unknown agent: {agent_name}")
         
+        rpc = self.agent_rpc.get(agent_name)
+        if rpc is not None and not rpc.closed:
+            try:
+                status, result = await rpc.call("POST" if data else "GET", endpoint, data, timeout=timeout)
+                if status == 200:
+                    return result
+                logger.error(f"Agent {agent_name} returned {status}: {result}")
+                return {"error": f"HTTP {status}", "agent": agent_name}
+            except asyncio.TimeoutError:
+                logger.error(f"Agent {agent_name} did not answer {endpoint} within {timeout}s")
+                return {"error": f"Timed out after {timeout}s", "agent": agent_name}
+            except RPCUnavailable as e:
+                logger.info(f"RPC to {agent_name} unavailable ({e}), falling back to HTTP")
+        
         base_url = self.agent_endpoints[agent_name]
         url = f"{base_url}{endpoint}"
         
         try:
             if data:
-                response = requests.post(url, json=data, timeout=30)
+                response = requests.post(url, json=data, timeout=timeout)
             else:
-                response = requests.get(url, timeout=30)
+                response = requests.get(url, timeout=timeout)
             
             if response.status_code == 200:
                 return response.json()
@@ -1538,6 +1586,10 @@ class HybridMetaAgent(MetaAgent):
         """Handle incoming WebSocket messages."""
         message_type = data.get("type", "unknown")
         
+        if message_type in RPC_TYPES:
+            await websocket._rpc.handle(data)
+            return
+        
         if message_type == "ping":
             await websocket.send_text(json.dumps({
                 "type": "pong",
@@ -1545,6 +1597,14 @@ class HybridMetaAgent(MetaAgent):
             }))
         
         elif message_type == "agent_status":
+            # Agents that serve RPC get their calls over this socket from now on
+            agent_data = data.get("data") or {}
+            name = agent_key(str(agent_data.get("agent", "")))
+            if agent_data.get("rpc") and name in self.agent_endpoints:
+                websocket._rpc.name = name
+                self.agent_rpc[name] = websocket._rpc
+                logger.info(f"🔌 {name} agent RPC registered on WebSocket client {websocket._client_id}")
+            
             # Get status of all agents
             status = await self._get_all_agent_status()
             await websocket.send_text(json.dumps({
@@ -1778,29 +1838,15 @@ class HybridMetaAgent(MetaAgent):
             self.websocket_clients -= disconnected_clients
     
     async def _get_all_agent_status(self):
-        """Get status from all agents."""
+        """Get status from all agents (cached by the health registry)."""
         status = {}
-        for agent_name, endpoint in self.agent_endpoints.items():
-            try:
-                response = requests.get(f"{endpoint}/health", timeout=5)
-                if response.status_code == 200:
-                    status[agent_name] = {
-                        "status": "healthy",
-                        "endpoint": endpoint,
-                        "response_time": response.elapsed.total_seconds()
-                    }
-                else:
-                    status[agent_name] = {
-                        "status": "unhealthy",
-                        "endpoint": endpoint,
-                        "error": f"HTTP {response.status_code}"
-                    }
-            except Exception as e:
-                status[agent_name] = {
-                    "status": "unreachable",
-                    "endpoint": endpoint,
-                    "error": str(e)
-                }
+        for agent_name in self.agent_endpoints:
+            entry = self.health_registry.entry(agent_name)
+            status[agent_name] = {
+                key: entry.get(key)
+                for key in ("status", "endpoint", "response_time", "error", "checked_at", "age_seconds", "stale")
+                if entry.get(key) is not None
+            }
         
         return status
 
@@ -1946,13 +1992,13 @@ class HybridMetaAgent(MetaAgent):
                 Format: {{"vote": "approve", "reasoning": "..."}}
                 """
                 
-                response = await self.openai_client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.3
+                response = await self.openai_client.generate_completion(
+                    [{"role": "user", "content": prompt}],
+                    temperature=0.3,
+                    call_type="agent_vote"
                 )
                 
-                content = response.choices[0].message.content.strip()
+                content = (response or "").strip()
                 try:
                     result = json.loads(content)
                     return result.get("vote", "approve"), result.get("reasoning", "Default approval")
@@ -2119,13 +2165,13 @@ class HybridMetaAgent(MetaAgent):
             Respond with JSON: {{"decision": "...", "confidence": 0.0, "reasoning": "...", "alternatives": [...]}}
             """
             
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
+            response = await self.openai_client.generate_completion(
+                [{"role": "user", "content": prompt}],
+                temperature=0.3,
+                call_type="autonomous_reasoning"
             )
             
-            content = response.choices[0].message.content.strip()
+            content = (response or "").strip()
             try:
                 result = json.loads(content)
                 return {
@@ -8,6 +8,9 @@ import sys
 import os
 import asyncio
 import logging
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
 import pandas as pd
@@ -15,21 +18,25 @@ import numpy as np
 from dataclasses import dataclass
 import aiohttp
 import json
-import re
-from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import feedparser
 from bs4 import BeautifulSoup
 
 # Add the parent directory to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from common.vault import get_vault_client, get_agent_config
-from common.db import get_db_client
+from common.db import get_db_client, get_session
+from common.models import NewsArticle as NewsArticleRecord
 from common.logging import get_logger
 from common.websocket_client import AgentWebSocketClient, MessageType
 from agents.agentic_framework.agent_templates import NewsSentimentAgent
 from agents.agentic_framework.mcp_tools import MCPToolRegistry, MCPTool
+from agents.news_sentiment.feeds import FeedSource, parse_feed, DEFAULT_INTERVAL, MAX_INTERVAL
+from agents.news_sentiment.dedup import ArticleIndex
+from agents.news_sentiment.matching import KeywordMatcher, symbol_matcher, article_text, ASSET_NAMES
+from agents.news_sentiment.aggregates import SentimentAggregates
+from agents.news_sentiment.scoring import (
+    SentimentScorer, BatchScorer, extract_keywords, extract_entities, impact_score
+)
 
 logger = get_logger("agentic_news_sentiment")
 
@@ -46,6 +53,7 @@ class NewsArticle:
     impact_score: float = 0.0
     relevant_keywords: List[str] = None
     trading_implications: List[str] = None
+    content_hash: Optional[str] = None
 
 @dataclass
 class SentimentAnalysisRequest:
@@ -101,7 +109,13 @@ class AgenticNewsSentimentAgent:
         self.signal_generator = None
         self.news_sources = self._initialize_news_sources()
         self.crypto_keywords = self._initialize_crypto_keywords()
-        self.collected_articles = []
+        self.keyword_matcher = KeywordMatcher(self.crypto_keywords, plurals=True)
+        self.collected_articles = deque()  # Oldest first
+        self.article_index = ArticleIndex()
+        self.sentiment_aggregates = SentimentAggregates()
+        self.tracked_symbols = list(ASSET_NAMES)  # Symbols with a rolling sentiment series
+        self.article_window_hours = 24
+        self.dedup_history_days = 7  # How far back stored URLs/hashes are loaded on restart
         
         # Initialize with default config to avoid Vault dependency during __init__
         self._initialize_agent_with_defaults()
@@ -197,7 +211,9 @@ class AgenticNewsSentimentAgent:
                 name="collect_news",
                 description="Collect news articles from various sources",
                 function=self.collect_news,
-                parameters={},
+                parameters={
+                    "force": {"type": "boolean", "description": "Poll every feed, not just the due ones"}
+                },
                 required_permissions=["news_collection"],
                 category="news_analysis"
             ))
@@ -225,6 +241,19 @@ class AgenticNewsSentimentAgent:
                 category="news_analysis"
             ))
             
+            self.tool_registry.register_tool(MCPTool(
+                name="get_sentiment_series",
+                description="Get the rolling sentiment series and numeric news features for a symbol",
+                function=self.get_sentiment_series,
+                parameters={
+                    "symbol": {"type": "string", "description": "Trading symbol (omit for the whole market)"},
+                    "hours": {"type": "number", "description": "Hours to look back"},
+                    "step_minutes": {"type": "number", "description": "Resampling step in minutes"}
+                },
+                required_permissions=["news_analysis"],
+                category="news_analysis"
+            ))
+            
             logger.info("News analysis tools registered successfully")
             
         except Exception as e:
@@ -279,8 +308,12 @@ class AgenticNewsSentimentAgent:
             await self.ws_client.connect()
             logger.info("WebSocket client connected")
             
-            # Initialize news collector
+            # Initialize news collector and the sentiment scoring pool
             await self.news_collector.initialize()
+            self.sentiment_analyzer.start()
+            
+            # Rebuild the dedup index and recent-article window from the database
+            await self._restore_articles()
             
             # Start news collection loop
             asyncio.create_task(self._news_collection_loop())
@@ -299,6 +332,8 @@ class AgenticNewsSentimentAgent:
         try:
             if self.news_collector:
                 await self.news_collector.close()
+            if self.sentiment_analyzer:
+                self.sentiment_analyzer.close()
             if self.ws_client:
                 await self.ws_client.disconnect()
             logger.info("Agentic News Sentiment Agent shutdown complete")
@@ -333,40 +368,39 @@ class AgenticNewsSentimentAgent:
         """Background task to continuously collect news."""
         while True:
             try:
-                # Collect news from all sources
-                articles = await self.collect_news()
+                # Collect news from all sources, keeping only articles not seen before
+                articles = self.article_index.filter_new(await self.collect_news())
                 
-                # Analyze sentiment for new articles
-                for article in articles:
-                    sentiment_result = await self.analyze_sentiment(
-                        SentimentAnalysisRequest(text=f"{article.title} {article.content}")
-                    )
-                    article.sentiment_score = sentiment_result.sentiment_score
-                    article.sentiment_label = sentiment_result.sentiment_label
-                    article.impact_score = sentiment_result.impact_score
-                    article.relevant_keywords = sentiment_result.keywords
+                # Score all new articles in one batch
+                scores = await self.sentiment_analyzer.analyze_batch(
+                    [f"{article.title} {article.content}" for article in articles]
+                )
+                for article, score in zip(articles, scores):
+                    article.sentiment_score = score['sentiment_score']
+                    article.sentiment_label = score['sentiment_label']
+                    article.impact_score = score['impact_score']
+                    article.relevant_keywords = score['keywords']
                 
                 # Store articles
                 await self._store_articles(articles)
                 
-                # Add to collected articles
+                # Add to collected articles and the rolling sentiment series
                 self.collected_articles.extend(articles)
+                self._record_sentiment(articles)
                 
-                # Keep only recent articles (last 24 hours)
-                cutoff_time = datetime.utcnow() - timedelta(hours=24)
-                self.collected_articles = [
-                    article for article in self.collected_articles 
-                    if article.published_at > cutoff_time
-                ]
+                # Drop articles that have left the window
+                cutoff_time = datetime.utcnow() - timedelta(hours=self.article_window_hours)
+                while self.collected_articles and self.collected_articles[0].published_at <= cutoff_time:
+                    self.collected_articles.popleft()
                 
                 logger.info(f"Collected and analyzed {len(articles)} new articles")
                 
-                # Wait 5 minutes before next collection
-                await asyncio.sleep(300)
+                # Sleep until the next feed is due
+                await asyncio.sleep(min(max(self.news_collector.next_poll_in(), 1.0), MAX_INTERVAL))
                 
             except Exception as e:
                 logger.error(f"News collection error: {e}")
-                await asyncio.sleep(300)
+                await asyncio.sleep(60)
     
     async def analyze_sentiment(self, request: SentimentAnalysisRequest) -> SentimentAnalysisResult:
         """Autonomously analyze sentiment using intelligent reasoning."""
@@ -438,8 +472,7 @@ class AgenticNewsSentimentAgent:
                 "sentiment_threshold": request.sentiment_threshold,
                 "impact_threshold": request.impact_threshold,
                 "available_articles": len(self.collected_articles),
-                "recent_articles": len([a for a in self.collected_articles 
-                                     if a.published_at > datetime.utcnow() - timedelta(hours=1)])
+                "recent_articles": self.sentiment_aggregates.get().summary(1)["count"]
             }
             
             # Generate signal generation prompt
@@ -478,45 +511,34 @@ class AgenticNewsSentimentAgent:
             logger.error(f"News signal generation failed: {e}")
             return []
     
-    async def collect_news(self) -> List[NewsArticle]:
-        """Autonomously collect news from various sources."""
+    async def collect_news(self, force: bool = False) -> List[NewsArticle]:
+        """
+        Autonomously collect news from various sources.
+        
+        Only feeds whose polling interval has elapsed are fetched unless
+        ``force`` is set; feeds are fetched concurrently and only entries
+        not seen on a feed's previous poll are returned.
+        """
         try:
+            self.news_collector.register_sources(self.news_sources)
             articles = []
             
-            # Collect from RSS feeds
-            for source_type, urls in self.news_sources.items():
-                for url in urls:
-                    try:
-                        if source_type == 'reddit':
-                            reddit_articles = await self.news_collector.fetch_reddit_posts(url)
-                            for article_data in reddit_articles:
-                                article = NewsArticle(
-                                    title=article_data.get('title', ''),
-                                    content=article_data.get('content', ''),
-                                    source=f"reddit_{url.split('/')[-2]}",
-                                    url=article_data.get('url', ''),
-                                    published_at=article_data.get('published_at', datetime.utcnow())
-                                )
-                                articles.append(article)
-                        else:
-                            rss_articles = await self.news_collector.fetch_rss_feed(url)
-                            for article_data in rss_articles:
-                                article = NewsArticle(
-                                    title=article_data.get('title', ''),
-                                    content=article_data.get('content', ''),
-                                    source=source_type,
-                                    url=article_data.get('url', ''),
-                                    published_at=article_data.get('published_at', datetime.utcnow())
-                                )
-                                articles.append(article)
-                    except Exception as e:
-                        logger.warning(f"Failed to collect from {url}: {e}")
-                        continue
+            # Collect from RSS feeds (reddit subreddits are Atom feeds too)
+            for feed, entries in await self.news_collector.fetch_due_feeds(force=force):
+                for article_data in entries:
+                    article = NewsArticle(
+                        title=article_data.get('title', ''),
+                        content=article_data.get('content', ''),
+                        source=feed.name,
+                        url=article_data.get('url', ''),
+                        published_at=article_data.get('published_at', datetime.utcnow())
+                    )
+                    articles.append(article)
             
             # Filter articles for crypto relevance
             relevant_articles = [
                 article for article in articles
-                if self._is_crypto_relevant(article.title + " " + article.content)
+                if self._is_crypto_relevant(article_text(article))
             ]
             
             logger.info(f"Collected {len(relevant_articles)} relevant articles from {len(articles)} total")
@@ -529,20 +551,17 @@ class AgenticNewsSentimentAgent:
     async def get_sentiment_summary(self, hours: int = 24) -> Dict[str, Any]:
         """Get sentiment summary with intelligent analysis."""
         try:
-            # Get articles from the specified time period
-            cutoff_time = datetime.utcnow() - timedelta(hours=hours)
-            recent_articles = [
-                article for article in self.collected_articles
-                if article.published_at > cutoff_time
-            ]
+            # Aggregate the specified time period from the market-wide series
+            market = self.sentiment_aggregates.get()
+            stats = market.summary(hours)
             
             # Create summary context
             context = {
-                "total_articles": len(recent_articles),
+                "total_articles": stats["count"],
                 "time_period": f"last {hours} hours",
-                "sentiment_distribution": self._calculate_sentiment_distribution(recent_articles),
-                "top_keywords": self._extract_top_keywords(recent_articles),
-                "impact_scores": [article.impact_score for article in recent_articles]
+                "sentiment_distribution": stats["distribution"],
+                "top_keywords": market.top_keywords(hours),
+                "impact_scores": self._recent_means(market, hours, "mean_impact")
             }
             
             # Generate summary prompt
@@ -551,16 +570,14 @@ class AgenticNewsSentimentAgent:
             # Get agent analysis
             response = await self._get_agent_response(prompt)
             
-            # Calculate technical metrics
-            sentiment_scores = [article.sentiment_score for article in recent_articles]
-            impact_scores = [article.impact_score for article in recent_articles]
-            
             summary = {
                 "time_period": f"last {hours} hours",
-                "total_articles": len(recent_articles),
-                "average_sentiment": np.mean(sentiment_scores) if sentiment_scores else 0.0,
-                "sentiment_volatility": np.std(sentiment_scores) if sentiment_scores else 0.0,
-                "average_impact": np.mean(impact_scores) if impact_scores else 0.0,
+                "total_articles": stats["count"],
+                "average_sentiment": stats["mean_sentiment"],
+                "sentiment_volatility": stats["sentiment_std"],
+                "average_impact": stats["mean_impact"],
+                "sentiment_trend": market.trend(hours, "sentiment"),
+                "impact_trend": market.trend(hours, "impact"),
                 "sentiment_distribution": context["sentiment_distribution"],
                 "top_keywords": context["top_keywords"],
                 "agent_insights": response.get("insights", []),
@@ -577,21 +594,23 @@ class AgenticNewsSentimentAgent:
     async def analyze_news_impact(self, symbol: str, timeframe: str = "1h") -> Dict[str, Any]:
         """Analyze news impact on specific symbol."""
         try:
-            # Get recent articles mentioning the symbol
-            cutoff_time = datetime.utcnow() - timedelta(hours=int(timeframe[:-1]) if timeframe.endswith('h') else 24)
-            symbol_articles = [
-                article for article in self.collected_articles
-                if article.published_at > cutoff_time and 
-                symbol.lower() in (article.title + " " + article.content).lower()
-            ]
+            hours = int(timeframe[:-1]) if timeframe.endswith('h') else 24
+            series = self._symbol_series(symbol)
+            stats = series.summary(hours)
+            
+            # Latest articles mentioning the symbol
+            cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+            recent_articles = [article for article in reversed(self.collected_articles)
+                               if article.published_at > cutoff_time]
+            key_articles = symbol_matcher([symbol]).index(recent_articles).get(symbol, [])[:5]
             
             # Create impact analysis context
             context = {
                 "symbol": symbol,
                 "timeframe": timeframe,
-                "articles_count": len(symbol_articles),
-                "sentiment_scores": [article.sentiment_score for article in symbol_articles],
-                "impact_scores": [article.impact_score for article in symbol_articles]
+                "articles_count": stats["count"],
+                "sentiment_scores": self._recent_means(series, hours, "mean_sentiment"),
+                "impact_scores": self._recent_means(series, hours, "mean_impact")
             }
             
             # Generate impact analysis prompt
@@ -600,20 +619,16 @@ class AgenticNewsSentimentAgent:
             # Get agent analysis
             response = await self._get_agent_response(prompt)
             
-            # Calculate technical metrics
-            sentiment_scores = context["sentiment_scores"]
-            impact_scores = context["impact_scores"]
-            
             impact_analysis = {
                 "symbol": symbol,
                 "timeframe": timeframe,
-                "articles_count": len(symbol_articles),
-                "average_sentiment": np.mean(sentiment_scores) if sentiment_scores else 0.0,
-                "sentiment_trend": self._calculate_sentiment_trend(symbol_articles),
-                "average_impact": np.mean(impact_scores) if impact_scores else 0.0,
-                "impact_trend": self._calculate_impact_trend(symbol_articles),
+                "articles_count": stats["count"],
+                "average_sentiment": stats["mean_sentiment"],
+                "sentiment_trend": series.trend(hours, "sentiment"),
+                "average_impact": stats["mean_impact"],
+                "impact_trend": series.trend(hours, "impact"),
                 "key_articles": [{"title": a.title, "sentiment": a.sentiment_score, "impact": a.impact_score} 
-                               for a in symbol_articles[:5]],
+                               for a in key_articles],
                 "agent_analysis": response.get("analysis", {}),
                 "price_impact_prediction": response.get("price_impact", "neutral"),
                 "trading_recommendations": response.get("recommendations", [])
@@ -729,13 +744,12 @@ Respond in JSON format with keys: analysis, price_impact, recommendations, risks
     
     def _extract_crypto_keywords(self, text: str) -> List[str]:
         """Extract cryptocurrency keywords from text."""
-        text_lower = text.lower()
-        return [keyword for keyword in self.crypto_keywords if keyword in text_lower]
+        found = self.keyword_matcher.findall(text)
+        return [keyword for keyword in self.crypto_keywords if keyword in found]
     
     def _is_crypto_relevant(self, text: str) -> bool:
         """Check if text is relevant to cryptocurrency."""
-        crypto_keywords = self._extract_crypto_keywords(text)
-        return len(crypto_keywords) > 0
+        return self.keyword_matcher.contains(text)
     
     def _generate_trading_signals_from_sentiment(self, sentiment_score: float, impact_score: float,
                                                symbols: List[str], response: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -758,76 +772,128 @@ Respond in JSON format with keys: analysis, price_impact, recommendations, risks
         
         return signals
     
-    def _calculate_sentiment_distribution(self, articles: List[NewsArticle]) -> Dict[str, int]:
-        """Calculate sentiment distribution."""
-        distribution = {"positive": 0, "neutral": 0, "negative": 0}
+    def _record_sentiment(self, articles: List[NewsArticle]):
+        """Fold scored articles into the market-wide and per-symbol sentiment series."""
+        matcher = symbol_matcher(self.tracked_symbols)
         for article in articles:
-            if article.sentiment_score > 0.1:
-                distribution["positive"] += 1
-            elif article.sentiment_score < -0.1:
-                distribution["negative"] += 1
-            else:
-                distribution["neutral"] += 1
-        return distribution
+            self.sentiment_aggregates.add(
+                article.published_at, article.sentiment_score, article.impact_score,
+                symbols=matcher.symbols_in(article_text(article)),
+                keywords=article.relevant_keywords
+            )
     
-    def _extract_top_keywords(self, articles: List[NewsArticle]) -> List[str]:
-        """Extract top keywords from articles."""
-        keyword_counts = {}
-        for article in articles:
-            for keyword in article.relevant_keywords or []:
-                keyword_counts[keyword] = keyword_counts.get(keyword, 0) + 1
-        
-        # Return top 10 keywords
-        return sorted(keyword_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+    def _symbol_series(self, symbol: str):
+        """
+        Sentiment series of ``symbol``. A symbol seen for the first time is
+        tracked from now on and backfilled once from the collected articles.
+        """
+        key = self.sentiment_aggregates.key(symbol)
+        if key not in self.tracked_symbols:
+            self.tracked_symbols.append(key)
+            matcher = symbol_matcher([key])
+            for article in self.collected_articles:
+                if matcher.symbols_in(article_text(article)):
+                    self.sentiment_aggregates.add(article.published_at, article.sentiment_score,
+                                                  article.impact_score, symbols=[key])
+        series = self.sentiment_aggregates.get(key)
+        if series is None:
+            return self.sentiment_aggregates.empty_series()
+        return series
     
-    def _calculate_sentiment_trend(self, articles: List[NewsArticle]) -> str:
-        """Calculate sentiment trend."""
-        if len(articles) < 2:
-            return "insufficient_data"
-        
-        # Sort by time and calculate trend
-        sorted_articles = sorted(articles, key=lambda x: x.published_at)
-        first_half = sorted_articles[:len(sorted_articles)//2]
-        second_half = sorted_articles[len(sorted_articles)//2:]
-        
-        first_avg = np.mean([a.sentiment_score for a in first_half])
-        second_avg = np.mean([a.sentiment_score for a in second_half])
-        
-        if second_avg > first_avg + 0.1:
-            return "improving"
-        elif second_avg < first_avg - 0.1:
-            return "declining"
-        else:
-            return "stable"
+    @staticmethod
+    def _recent_means(series, hours: float, field: str, limit: int = 10) -> List[float]:
+        """Hourly means of the most recent hours with articles, for prompts."""
+        hourly = series.series(hours, step_seconds=3600)
+        return [round(value, 3) for value, count in zip(hourly[field], hourly["count"]) if count][-limit:]
     
-    def _calculate_impact_trend(self, articles: List[NewsArticle]) -> str:
-        """Calculate impact trend."""
-        if len(articles) < 2:
-            return "insufficient_data"
-        
-        # Sort by time and calculate trend
-        sorted_articles = sorted(articles, key=lambda x: x.published_at)
-        first_half = sorted_articles[:len(sorted_articles)//2]
-        second_half = sorted_articles[len(sorted_articles)//2:]
-        
-        first_avg = np.mean([a.impact_score for a in first_half])
-        second_avg = np.mean([a.impact_score for a in second_half])
-        
-        if second_avg > first_avg + 0.1:
-            return "increasing"
-        elif second_avg < first_avg - 0.1:
-            return "decreasing"
-        else:
-            return "stable"
+    async def get_sentiment_series(self, symbol: Optional[str] = None, hours: int = 24,
+                                   step_minutes: int = 60) -> Dict[str, Any]:
+        """Rolling sentiment series and numeric features for a symbol (or the whole market)."""
+        try:
+            series = self._symbol_series(symbol) if symbol else self.sentiment_aggregates.get()
+            return {
+                "symbol": symbol,
+                "hours": hours,
+                "series": series.series(hours, step_seconds=step_minutes * 60),
+                "features": self.sentiment_aggregates.features(symbol)
+            }
+        except Exception as e:
+            logger.error(f"Failed to get sentiment series for {symbol}: {e}")
+            return {"error": str(e)}
     
-    async def _store_articles(self, articles: List[NewsArticle]):
-        """Store articles in database."""
+    async def _store_articles(self, articles: List[NewsArticle]) -> int:
+        """Bulk insert articles into news_articles; rows that hit the url/content_hash constraints are skipped."""
+        if not articles:
+            return 0
         try:
-            # This would store articles in the database
-            # For now, just log the storage
-            logger.info(f"Storing {len(articles)} articles in database")
+            loop = asyncio.get_running_loop()
+            inserted = await loop.run_in_executor(None, self._insert_articles, articles)
+            logger.info(f"Stored {inserted} of {len(articles)} articles in database")
+            return inserted
         except Exception as e:
             logger.error(f"Failed to store articles: {e}")
+            return 0
+    
+    def _insert_articles(self, articles: List[NewsArticle]) -> int:
+        from sqlalchemy.dialects.postgresql import insert
+        
+        now = datetime.utcnow()
+        rows = [{
+            "title": article.title[:500],
+            "content": article.content,
+            "source": article.source[:100],
+            "url": (article.url or f"urn:sha256:{article.content_hash}")[:500],
+            "content_hash": article.content_hash,
+            "published_at": article.published_at,
+            "sentiment_score": article.sentiment_score,
+            "sentiment_label": article.sentiment_label,
+            "impact_score": article.impact_score,
+            "relevant_keywords": article.relevant_keywords,
+            "trading_implications": article.trading_implications,
+            "created_at": now
+        } for article in articles]
+        with get_session() as session:
+            result = session.execute(
+                insert(NewsArticleRecord).values(rows).on_conflict_do_nothing()
+            )
+            session.commit()
+            return result.rowcount
+    
+    async def _restore_articles(self):
+        """Reload recent articles and the dedup keys of older ones after a restart."""
+        try:
+            loop = asyncio.get_running_loop()
+            keys, articles = await loop.run_in_executor(None, self._load_recent_articles)
+            self.article_index.load(keys)
+            self.collected_articles = deque(articles)
+            self._record_sentiment(articles)
+            logger.info(f"Restored {len(articles)} recent articles and {len(keys)} dedup keys from database")
+        except Exception as e:
+            logger.error(f"Failed to restore articles from database: {e}")
+    
+    def _load_recent_articles(self) -> Tuple[List[Tuple[str, Optional[str]]], List[NewsArticle]]:
+        now = datetime.utcnow()
+        with get_session() as session:
+            keys = session.query(NewsArticleRecord.url, NewsArticleRecord.content_hash).filter(
+                NewsArticleRecord.created_at > now - timedelta(days=self.dedup_history_days)
+            ).all()
+            rows = session.query(NewsArticleRecord).filter(
+                NewsArticleRecord.published_at > now - timedelta(hours=self.article_window_hours)
+            ).order_by(NewsArticleRecord.published_at).all()
+            articles = [NewsArticle(
+                title=row.title,
+                content=row.content or "",
+                source=row.source,
+                url=row.url,
+                published_at=row.published_at,
+                sentiment_score=row.sentiment_score or 0.0,
+                sentiment_label=row.sentiment_label or "neutral",
+                impact_score=row.impact_score or 0.0,
+                relevant_keywords=row.relevant_keywords,
+                trading_implications=row.trading_implications,
+                content_hash=row.content_hash
+            ) for row in rows]
+        return [(url, digest) for url, digest in keys], articles
     
     def get_agent_status(self) -> Dict[str, Any]:
         """Get agent status information."""
@@ -837,137 +903,172 @@ Respond in JSON format with keys: analysis, price_impact, recommendations, risks
             "version": "1.0.0",
             "articles_collected": len(self.collected_articles),
             "news_sources": len([url for urls in self.news_sources.values() for url in urls]),
+            "feed_polling": self.news_collector.get_stats() if self.news_collector else {},
+            "dedup_index": self.article_index.get_stats(),
+            "sentiment_series": self.sentiment_aggregates.get_stats(),
             "last_collection": datetime.utcnow().isoformat(),
             "sentiment_analyzer_active": self.sentiment_analyzer is not None,
+            "sentiment_scoring": self.sentiment_analyzer.batch_scorer.get_stats() if self.sentiment_analyzer else {},
             "signal_generator_active": self.signal_generator is not None
         }
 
 
 class NewsSentimentAnalyzer:
-    """Technical sentiment analyzer."""
+    """
+    Technical sentiment analyzer.
+
+    Single texts are scored inline; ``analyze_batch`` scores many texts off
+    the event loop through a ``BatchScorer`` worker pool.
+    """
     
-    def __init__(self):
-        self.vader_analyzer = SentimentIntensityAnalyzer()
+    def __init__(self, workers: int = 2):
+        self.scorer = SentimentScorer()
+        self.vader_analyzer = self.scorer.vader
+        self.batch_scorer = BatchScorer(self.scorer, workers=workers)
+    
+    def start(self):
+        """Start the scoring worker pool."""
+        self.batch_scorer.start()
+    
+    def close(self):
+        """Stop the scoring worker pool."""
+        self.batch_scorer.close()
     
     def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment using multiple methods."""
-        try:
-            # TextBlob analysis
-            blob = TextBlob(text)
-            textblob_sentiment = blob.sentiment.polarity
-            
-            # VADER analysis
-            vader_scores = self.vader_analyzer.polarity_scores(text)
-            vader_sentiment = vader_scores['compound']
-            
-            # Combine scores
-            combined_sentiment = (textblob_sentiment + vader_sentiment) / 2
-            
-            # Determine label
-            if combined_sentiment > 0.1:
-                sentiment_label = "positive"
-            elif combined_sentiment < -0.1:
-                sentiment_label = "negative"
-            else:
-                sentiment_label = "neutral"
-            
-            # Extract keywords
-            keywords = self._extract_keywords(text)
-            
-            # Calculate impact score
-            impact_score = self._calculate_impact_score(text, combined_sentiment, keywords)
-            
-            return {
-                'sentiment_score': combined_sentiment,
-                'sentiment_label': sentiment_label,
-                'textblob_sentiment': textblob_sentiment,
-                'vader_sentiment': vader_sentiment,
-                'keywords': keywords,
-                'impact_score': impact_score,
-                'entities': self._extract_entities(text)
-            }
-            
-        except Exception as e:
-            logger.error(f"Sentiment analysis failed: {e}")
-            return {
-                'sentiment_score': 0.0,
-                'sentiment_label': 'neutral',
-                'keywords': [],
-                'impact_score': 0.0,
-                'entities': []
-            }
+        return self.scorer.score(text)
+    
+    async def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Analyze many texts at once; results are in input order."""
+        return await self.batch_scorer.score(texts)
     
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract relevant keywords from text."""
-        # Simple keyword extraction - in production, use more sophisticated NLP
-        words = re.findall(r'\b\w+\b', text.lower())
-        word_counts = {}
-        for word in words:
-            if len(word) > 3:  # Filter short words
-                word_counts[word] = word_counts.get(word, 0) + 1
-        
-        # Return top keywords
-        return sorted(word_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        return extract_keywords(text)
     
     def _extract_entities(self, text: str) -> List[str]:
         """Extract named entities from text."""
-        # Simple entity extraction - in production, use NER
-        entities = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
-        return list(set(entities))[:10]
+        return extract_entities(text)
     
     def _calculate_impact_score(self, text: str, sentiment_score: float, keywords: List[str]) -> float:
         """Calculate impact score based on various factors."""
-        # Base impact on sentiment strength
-        impact = abs(sentiment_score)
-        
-        # Boost impact for important keywords
-        important_keywords = ['bitcoin', 'ethereum', 'crypto', 'market', 'price', 'trading']
-        keyword_boost = sum(1 for keyword, _ in keywords if keyword in important_keywords)
-        impact += keyword_boost * 0.1
-        
-        # Boost impact for longer texts (more detailed analysis)
-        impact += min(len(text) / 1000, 0.2)
-        
-        return min(impact, 1.0)
+        return impact_score(text, sentiment_score, keywords)
 
 
 class NewsCollector:
-    """News collection from various sources."""
+    """
+    News collection from RSS/Atom feeds.
+
+    Due feeds are fetched concurrently (at most ``max_concurrency`` at a
+    time) with a per-request timeout and conditional GETs, and parsed in a
+    process pool. Each feed adapts its own polling interval.
+    """
     
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 8, timeout: float = 10.0,
+                 max_entries: int = 10, parse_workers: int = 2):
         self.session = None
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.parse_workers = parse_workers
+        self.feeds: Dict[str, FeedSource] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._parse_pool = None
     
     async def initialize(self):
-        """Initialize HTTP session."""
-        self.session = aiohttp.ClientSession()
+        """Initialize HTTP session and the parser pool."""
+        self.session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": "VolexSwarm-NewsSentiment/1.0"}
+        )
+        try:
+            self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        except (OSError, NotImplementedError) as e:
+            logger.warning(f"Feed parser pool unavailable, parsing in threads: {e}")
     
     async def close(self):
-        """Close HTTP session."""
+        """Close HTTP session and the parser pool."""
         if self.session:
             await self.session.close()
+        if self._parse_pool:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
+    
+    def register_sources(self, news_sources: Dict[str, List[str]]) -> None:
+        """Track every configured feed URL; existing polling state is kept."""
+        for source_type, urls in news_sources.items():
+            for url in urls:
+                if url not in self.feeds:
+                    self.feeds[url] = FeedSource(url=url, source_type=source_type)
+    
+    def next_poll_in(self) -> float:
+        """Seconds until the next feed is due."""
+        if not self.feeds:
+            return DEFAULT_INTERVAL
+        now = time.monotonic()
+        return max(0.0, min(feed.next_poll for feed in self.feeds.values()) - now)
+    
+    async def fetch_due_feeds(self, force: bool = False) -> List[Tuple[FeedSource, List[Dict[str, Any]]]]:
+        """Poll every due feed concurrently; returns each feed with its new entries."""
+        now = time.monotonic()
+        due = [feed for feed in self.feeds.values() if force or feed.is_due(now)]
+        if not due:
+            return []
+        results = await asyncio.gather(*(self._poll(feed) for feed in due))
+        return list(zip(due, results))
     
     async def fetch_rss_feed(self, url: str) -> List[Dict[str, Any]]:
-        """Fetch articles from RSS feed."""
+        """Fetch new articles from one RSS feed (conditional GET)."""
+        feed = self.feeds.get(url)
+        if feed is None:
+            feed = self.feeds[url] = FeedSource(url=url, source_type="rss")
+        return await self._poll(feed)
+    
+    async def _poll(self, feed: FeedSource) -> List[Dict[str, Any]]:
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                async with self.session.get(feed.url, headers=feed.conditional_headers()) as response:
+                    if response.status == 304:
+                        feed.record_poll(304, 0, time.perf_counter() - started)
+                        return []
+                    if response.status >= 400:
+                        feed.record_error(f"HTTP {response.status}", time.perf_counter() - started,
+                                          response.status)
+                        logger.warning(f"Feed {feed.url} returned HTTP {response.status}")
+                        return []
+                    content = await response.read()
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+            except asyncio.TimeoutError:
+                feed.record_error("timeout", time.perf_counter() - started)
+                logger.warning(f"Timed out fetching RSS feed {feed.url} after {self.timeout}s")
+                return []
+            except aiohttp.ClientError as e:
+                feed.record_error(str(e), time.perf_counter() - started)
+                logger.error(f"Failed to fetch RSS feed {feed.url}: {e}")
+                return []
+        
         try:
-            async with self.session.get(url) as response:
-                content = await response.text()
-                feed = feedparser.parse(content)
-                
-                articles = []
-                for entry in feed.entries[:10]:  # Limit to 10 articles
-                    article = {
-                        'title': entry.get('title', ''),
-                        'content': entry.get('summary', ''),
-                        'url': entry.get('link', ''),
-                        'published_at': self._parse_date(entry.get('published', ''))
-                    }
-                    articles.append(article)
-                
-                return articles
-                
+            loop = asyncio.get_running_loop()
+            articles = await loop.run_in_executor(self._parse_pool, parse_feed, content, self.max_entries)
         except Exception as e:
-            logger.error(f"Failed to fetch RSS feed {url}: {e}")
+            feed.record_error(f"parse error: {e}", time.perf_counter() - started)
+            logger.error(f"Failed to parse RSS feed {feed.url}: {e}")
             return []
+        
+        new_articles = feed.new_entries(articles)
+        feed.record_poll(200, len(new_articles), time.perf_counter() - started, etag, last_modified)
+        return new_articles
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-feed polling state."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout,
+            "next_poll_in": round(self.next_poll_in(), 1),
+            "feeds": [feed.get_stats() for feed in self.feeds.values()]
+        }
     
     async def fetch_reddit_posts(self, subreddit: str) -> List[Dict[str, Any]]:
         """Fetch posts from Reddit subreddit."""
@@ -985,30 +1086,6 @@ class NewsCollector:
         except Exception as e:
             logger.error(f"Failed to fetch Reddit posts from {subreddit}: {e}")
             return []
-    
-    def _parse_date(self, date_str: str) -> datetime:
-        """Parse date string to datetime."""
-        try:
-            # Try various date formats
-            formats = [
-                '%Y-%m-%dT%H:%M:%SZ',
-                '%Y-%m-%dT%H:%M:%S%z',
-                '%a, %d %b %Y %H:%M:%S %Z',
-                '%a, %d %b %Y %H:%M:%S %z'
-            ]
-            
-            for fmt in formats:
-                try:
-                    return datetime.strptime(date_str, fmt)
-                except ValueError:
-                    continue
-            
-            # If all formats fail, return current time
-            return datetime.utcnow()
-            
-        except Exception as e:
-            logger.warning(f"Failed to parse date {date_str}: {e}")
-            return datetime.utcnow()
 
 
 class NewsSignalGenerator:
@@ -1022,12 +1099,12 @@ class NewsSignalGenerator:
         """Generate trading signals from news articles."""
         signals = []
         
+        # Scan every article once for all symbols
+        mentions = symbol_matcher(symbols).index(articles)
+        
         for symbol in symbols:
             # Find articles mentioning the symbol
-            symbol_articles = [
-                article for article in articles
-                if symbol.lower() in (article.title + " " + article.content).lower()
-            ]
+            symbol_articles = mentions.get(symbol, [])
             
             if not symbol_articles:
                 continue
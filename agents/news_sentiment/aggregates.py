@@ -0,0 +1,240 @@
+"""
+Rolling sentiment aggregates for the news sentiment agent.
+Scored articles are folded into fixed-width time buckets (count, sum and
+sum of squares of sentiment and impact) held in per-symbol ring buffers,
+so summaries, trends and resampled series over any horizon cost
+O(buckets) however many articles were seen, and old data ages out by
+being overwritten instead of pruned.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from agents.news_sentiment.matching import base_asset
+
+DEFAULT_BUCKET_SECONDS = 300           # 5-minute buckets
+DEFAULT_CAPACITY = 7 * 24 * 12         # One week of buckets
+LABEL_THRESHOLD = 0.1                  # Sentiment above/below counts as positive/negative
+TREND_THRESHOLD = 0.1                  # Change between window halves that counts as a trend
+MARKET = "*"                           # Series of every article, whatever it mentions
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _epoch_seconds(ts: datetime) -> float:
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return (ts - _EPOCH).total_seconds()
+
+
+class BucketSeries:
+    """
+    Ring buffer of time buckets for one symbol.
+
+    Slot ``b % capacity`` holds bucket ``b`` (seconds since the epoch
+    divided by the bucket width); ``ids`` records which bucket a slot
+    currently holds so stale slots are recognised and reset on reuse.
+    """
+
+    def __init__(self, bucket_seconds: int = DEFAULT_BUCKET_SECONDS, capacity: int = DEFAULT_CAPACITY,
+                 track_keywords: bool = False):
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self.ids = np.full(capacity, -1, dtype=np.int64)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.positive = np.zeros(capacity, dtype=np.int64)
+        self.negative = np.zeros(capacity, dtype=np.int64)
+        self.sentiment_sum = np.zeros(capacity)
+        self.sentiment_sq = np.zeros(capacity)
+        self.impact_sum = np.zeros(capacity)
+        self.impact_sq = np.zeros(capacity)
+        self.keywords: Optional[List[Optional[Counter]]] = [None] * capacity if track_keywords else None
+        self.latest = -1
+        self.dropped = 0
+
+    def bucket_of(self, ts: datetime) -> int:
+        return int(_epoch_seconds(ts) // self.bucket_seconds)
+
+    def add(self, ts: datetime, sentiment: float, impact: float,
+            keywords: Optional[Iterable[Any]] = None) -> bool:
+        """Fold one article in; returns False when it is older than the buffer."""
+        bucket = self.bucket_of(ts)
+        if bucket <= self.latest - self.capacity:
+            self.dropped += 1
+            return False
+        slot = bucket % self.capacity
+        if self.ids[slot] != bucket:
+            self._reset(slot, bucket)
+        self.count[slot] += 1
+        if sentiment > LABEL_THRESHOLD:
+            self.positive[slot] += 1
+        elif sentiment < -LABEL_THRESHOLD:
+            self.negative[slot] += 1
+        self.sentiment_sum[slot] += sentiment
+        self.sentiment_sq[slot] += sentiment * sentiment
+        self.impact_sum[slot] += impact
+        self.impact_sq[slot] += impact * impact
+        if self.keywords is not None and keywords:
+            # Keywords are (word, count) pairs from the scorer; count each word once per article
+            words = [keyword[0] if isinstance(keyword, (list, tuple)) else keyword for keyword in keywords]
+            self.keywords[slot].update(words)
+        self.latest = max(self.latest, bucket)
+        return True
+
+    def _reset(self, slot: int, bucket: int) -> None:
+        self.ids[slot] = bucket
+        self.count[slot] = self.positive[slot] = self.negative[slot] = 0
+        self.sentiment_sum[slot] = self.sentiment_sq[slot] = 0.0
+        self.impact_sum[slot] = self.impact_sq[slot] = 0.0
+        if self.keywords is not None:
+            self.keywords[slot] = Counter()
+
+    def _range(self, hours: float, now: Optional[datetime] = None) -> Tuple[int, int]:
+        """Inclusive bucket range covering the last ``hours`` (widened to whole buckets)."""
+        now = now or datetime.utcnow()
+        return self.bucket_of(now - timedelta(hours=hours)), self.bucket_of(now)
+
+    def _mask(self, first: int, last: int) -> np.ndarray:
+        return (self.ids >= first) & (self.ids <= last)
+
+    def _stats(self, mask: np.ndarray) -> Dict[str, Any]:
+        n = int(self.count[mask].sum())
+        positive = int(self.positive[mask].sum())
+        negative = int(self.negative[mask].sum())
+        if not n:
+            return {"count": 0, "mean_sentiment": 0.0, "sentiment_std": 0.0, "mean_impact": 0.0,
+                    "impact_std": 0.0, "distribution": {"positive": 0, "neutral": 0, "negative": 0}}
+        mean = self.sentiment_sum[mask].sum() / n
+        impact = self.impact_sum[mask].sum() / n
+        return {
+            "count": n,
+            "mean_sentiment": float(mean),
+            "sentiment_std": float(np.sqrt(max(self.sentiment_sq[mask].sum() / n - mean * mean, 0.0))),
+            "mean_impact": float(impact),
+            "impact_std": float(np.sqrt(max(self.impact_sq[mask].sum() / n - impact * impact, 0.0))),
+            "distribution": {"positive": positive, "neutral": n - positive - negative, "negative": negative}
+        }
+
+    def summary(self, hours: float = 24, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Count, mean, standard deviation and label distribution over the last ``hours``."""
+        return self._stats(self._mask(*self._range(hours, now)))
+
+    def change(self, hours: float = 24, field: str = "sentiment",
+               now: Optional[datetime] = None) -> Optional[float]:
+        """
+        Mean of the later half of the window minus the earlier half, or None
+        when either half has no articles.
+        """
+        first, last = self._range(hours, now)
+        middle = first + (last - first + 1) // 2
+        sums = self.sentiment_sum if field == "sentiment" else self.impact_sum
+        early, late = self._mask(first, middle - 1), self._mask(middle, last)
+        early_n, late_n = self.count[early].sum(), self.count[late].sum()
+        if not early_n or not late_n:
+            return None
+        return float(sums[late].sum() / late_n - sums[early].sum() / early_n)
+
+    def trend(self, hours: float = 24, field: str = "sentiment", now: Optional[datetime] = None) -> str:
+        """Trend label comparing the two halves of the window."""
+        delta = self.change(hours, field, now)
+        if delta is None:
+            return "insufficient_data"
+        rising, falling = ("improving", "declining") if field == "sentiment" else ("increasing", "decreasing")
+        if delta > TREND_THRESHOLD:
+            return rising
+        if delta < -TREND_THRESHOLD:
+            return falling
+        return "stable"
+
+    def series(self, hours: float = 24, step_seconds: Optional[int] = None,
+               now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        The window resampled to ``step_seconds`` (a multiple of the bucket
+        width): article counts and mean sentiment/impact per step, oldest
+        first, with 0.0 means for empty steps.
+        """
+        factor = max(1, int((step_seconds or self.bucket_seconds) // self.bucket_seconds))
+        first, last = self._range(hours, now)
+        span = last - first + 1
+        if span % factor:
+            first -= factor - span % factor  # Whole steps only, the oldest one extended back
+        steps = (last - first + 1) // factor
+        mask = self._mask(first, last)
+        position = (self.ids[mask] - first) // factor
+        count = np.bincount(position, weights=self.count[mask], minlength=steps)
+        sentiment = np.bincount(position, weights=self.sentiment_sum[mask], minlength=steps)
+        impact = np.bincount(position, weights=self.impact_sum[mask], minlength=steps)
+        safe = np.maximum(count, 1)
+        return {
+            "start": (_EPOCH + timedelta(seconds=first * self.bucket_seconds)).isoformat(),
+            "step_seconds": factor * self.bucket_seconds,
+            "count": count.astype(int).tolist(),
+            "mean_sentiment": np.where(count > 0, sentiment / safe, 0.0).tolist(),
+            "mean_impact": np.where(count > 0, impact / safe, 0.0).tolist()
+        }
+
+    def top_keywords(self, hours: float = 24, n: int = 10, now: Optional[datetime] = None) -> List[Tuple[str, int]]:
+        if self.keywords is None:
+            return []
+        totals = Counter()
+        for slot in np.flatnonzero(self._mask(*self._range(hours, now))):
+            totals.update(self.keywords[slot])
+        return totals.most_common(n)
+
+
+class SentimentAggregates:
+    """
+    Per-symbol bucket series plus a market-wide series. Symbols are keyed
+    by base asset, so BTC, BTC/USD and BTCUSDT share one series.
+    """
+
+    def __init__(self, bucket_seconds: int = DEFAULT_BUCKET_SECONDS, capacity: int = DEFAULT_CAPACITY):
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self.series: Dict[str, BucketSeries] = {
+            MARKET: BucketSeries(bucket_seconds, capacity, track_keywords=True)
+        }
+
+    @staticmethod
+    def key(symbol: Optional[str]) -> str:
+        return MARKET if not symbol or symbol == MARKET else base_asset(symbol)
+
+    def add(self, published_at: datetime, sentiment: float, impact: float,
+            symbols: Iterable[str] = (), keywords: Optional[Iterable[Any]] = None) -> None:
+        self.series[MARKET].add(published_at, sentiment, impact, keywords)
+        for key in {self.key(symbol) for symbol in symbols}:
+            if key not in self.series:
+                self.series[key] = BucketSeries(self.bucket_seconds, self.capacity)
+            self.series[key].add(published_at, sentiment, impact)
+
+    def get(self, symbol: Optional[str] = None) -> Optional[BucketSeries]:
+        return self.series.get(self.key(symbol))
+
+    def empty_series(self) -> BucketSeries:
+        """A series with no articles, for symbols without coverage."""
+        return BucketSeries(self.bucket_seconds, 1)
+
+    def features(self, symbol: Optional[str] = None, now: Optional[datetime] = None) -> Dict[str, float]:
+        """Numeric news features for a symbol (zeros when it has no coverage)."""
+        series = self.get(symbol) or self.empty_series()
+        hour, day = series.summary(1, now), series.summary(24, now)
+        return {
+            "news_count_1h": float(hour["count"]),
+            "news_count_24h": float(day["count"]),
+            "news_sentiment_1h": hour["mean_sentiment"],
+            "news_sentiment_24h": day["mean_sentiment"],
+            "news_sentiment_std_24h": day["sentiment_std"],
+            "news_impact_24h": day["mean_impact"],
+            "news_sentiment_change_24h": series.change(24, "sentiment", now) or 0.0
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "bucket_seconds": self.bucket_seconds,
+            "capacity": self.capacity,
+            "symbols": sorted(key for key in self.series if key != MARKET),
+            "dropped": sum(series.dropped for series in self.series.values())
+        }
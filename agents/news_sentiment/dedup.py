@@ -0,0 +1,114 @@
+"""
+Article deduplication for the news sentiment agent.
+An article is a duplicate when its normalized URL or the hash of its
+normalized title and text has been seen before. The in-memory index mirrors
+the unique url/content_hash constraints on news_articles, so it can be
+rebuilt from the table after a restart.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEFAULT_MAX_KEYS = 200_000
+
+# Query parameters that only track the click and never change the article
+_TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "cmpid"}
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_url(url: str) -> str:
+    """Lower-case scheme and host, drop fragments, tracking parameters and trailing slashes."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not (k.lower().startswith("utm_") or k.lower() in _TRACKING_PARAMS)]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ""))
+
+
+def normalize_text(text: str) -> str:
+    """Strip markup, punctuation and case so syndicated copies hash the same."""
+    text = _TAG_RE.sub(" ", text or "")
+    text = _PUNCT_RE.sub(" ", text.lower())
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def content_hash(title: str, content: str) -> str:
+    """sha256 over the normalized title and body."""
+    payload = normalize_text(title) + "\n" + normalize_text(content)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ArticleIndex:
+    """
+    Bounded index of article URLs and content hashes.
+
+    Keys are kept in insertion order and the oldest are dropped once
+    ``max_keys`` is exceeded, so memory stays flat however long the agent
+    runs; anything older than the window is still caught by the database
+    constraints when it is inserted.
+    """
+
+    def __init__(self, max_keys: int = DEFAULT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._keys: "OrderedDict[str, None]" = OrderedDict()
+        self.stats = {"checked": 0, "new": 0, "duplicates": 0, "evictions": 0}
+
+    @staticmethod
+    def keys_for(url: str, title: str, content: str) -> Tuple[str, str]:
+        return "u:" + normalize_url(url), "h:" + content_hash(title, content)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def seen(self, url: str, title: str, content: str) -> bool:
+        url_key, hash_key = self.keys_for(url, title, content)
+        return (url_key != "u:" and url_key in self._keys) or hash_key in self._keys
+
+    def add(self, url_key: str, hash_key: Optional[str]) -> None:
+        for key in (url_key, hash_key):
+            if key and key not in ("u:", "h:"):
+                self._keys[key] = None
+        while len(self._keys) > self.max_keys:
+            self._keys.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def filter_new(self, articles: Iterable[Any]) -> List[Any]:
+        """
+        Keep articles not seen before (including earlier in the same batch)
+        and add them to the index. Each kept article gets ``url`` normalized
+        and a ``content_hash`` attribute set.
+        """
+        fresh = []
+        for article in articles:
+            self.stats["checked"] += 1
+            url_key, hash_key = self.keys_for(article.url, article.title, article.content)
+            if (url_key != "u:" and url_key in self._keys) or hash_key in self._keys:
+                self.stats["duplicates"] += 1
+                continue
+            self.add(url_key, hash_key)
+            article.url = url_key[2:]
+            article.content_hash = hash_key[2:]
+            fresh.append(article)
+        self.stats["new"] += len(fresh)
+        return fresh
+
+    def load(self, rows: Iterable[Tuple[str, Optional[str]]]) -> int:
+        """Seed the index with (url, content_hash) pairs already stored."""
+        count = 0
+        for url, digest in rows:
+            self.add("u:" + normalize_url(url), "h:" + digest if digest else None)
+            count += 1
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, keys=len(self._keys), max_keys=self.max_keys)
@@ -0,0 +1,161 @@
+"""
+RSS/Atom feed polling for the news sentiment agent.
+Each feed carries its own conditional-request validators (ETag and
+Last-Modified) and an adaptive polling interval: feeds that keep publishing
+are polled more often, quiet or failing feeds back off. Feed parsing is
+CPU-bound, so it runs in a worker pool instead of on the event loop.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Set
+
+import feedparser
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 300.0   # First poll interval, seconds
+MIN_INTERVAL = 60.0
+MAX_INTERVAL = 3600.0
+SPEED_UP = 0.5             # Interval factor after a poll with new items
+SLOW_DOWN = 1.5            # Interval factor after a poll with nothing new
+ERROR_BACKOFF = 2.0        # Interval factor after a failed poll
+
+_DATE_FORMATS = (
+    '%Y-%m-%dT%H:%M:%SZ',
+    '%Y-%m-%dT%H:%M:%S%z',
+    '%a, %d %b %Y %H:%M:%S %Z',
+    '%a, %d %b %Y %H:%M:%S %z'
+)
+
+
+def parse_date(date_str: str) -> datetime:
+    """Parse a feed date string to a naive UTC datetime, or now when it can't be parsed."""
+    for fmt in _DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(date_str, fmt)
+        except (TypeError, ValueError):
+            continue
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    return datetime.utcnow()
+
+
+def parse_feed(content: bytes, max_entries: int = 10) -> List[Dict[str, Any]]:
+    """
+    Parse a feed document into article dicts (runs in a worker process).
+
+    Uses feedparser's normalized ``published_parsed``/``updated_parsed``
+    (UTC struct_time) when present and falls back to the raw date string.
+    """
+    feed = feedparser.parse(content)
+    articles = []
+    for entry in feed.entries[:max_entries]:
+        parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+        if parsed:
+            published_at = datetime(*parsed[:6])
+        else:
+            published_at = parse_date(entry.get('published', ''))
+        articles.append({
+            'title': entry.get('title', ''),
+            'content': entry.get('summary', ''),
+            'url': entry.get('link', ''),
+            'guid': entry.get('id') or entry.get('link', ''),
+            'published_at': published_at
+        })
+    return articles
+
+
+@dataclass
+class FeedSource:
+    """Polling state of one feed."""
+    url: str
+    source_type: str
+    interval: float = DEFAULT_INTERVAL
+    min_interval: float = MIN_INTERVAL
+    max_interval: float = MAX_INTERVAL
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    next_poll: float = 0.0                  # time.monotonic() deadline
+    last_polled: Optional[datetime] = None
+    last_status: Optional[int] = None
+    last_error: Optional[str] = None
+    last_duration: float = 0.0
+    polls: int = 0
+    not_modified: int = 0
+    errors: int = 0
+    consecutive_errors: int = 0
+    seen: Set[str] = field(default_factory=set, repr=False)
+
+    @property
+    def name(self) -> str:
+        """Source label stored on articles (reddit feeds are labelled per subreddit)."""
+        if self.source_type == 'reddit':
+            return f"reddit_{self.url.rstrip('/').split('/')[-2]}"
+        return self.source_type
+
+    def is_due(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.monotonic()) >= self.next_poll
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def new_entries(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Entries not returned by the previous poll; remembers this poll's entries."""
+        ids = [article['guid'] for article in articles]
+        fresh = [article for article, guid in zip(articles, ids) if guid not in self.seen]
+        self.seen = set(ids)
+        return fresh
+
+    def record_poll(self, status: int, new_items: int, duration: float,
+                    etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Update validators and adapt the interval after a successful poll (200 or 304)."""
+        self.polls += 1
+        self.last_status = status
+        self.last_error = None
+        self.last_duration = duration
+        self.last_polled = datetime.utcnow()
+        self.consecutive_errors = 0
+        if status == 304:
+            self.not_modified += 1
+        else:
+            self.etag = etag or self.etag
+            self.last_modified = last_modified or self.last_modified
+        factor = SPEED_UP if new_items else SLOW_DOWN
+        self.interval = min(self.max_interval, max(self.min_interval, self.interval * factor))
+        self.next_poll = time.monotonic() + self.interval
+
+    def record_error(self, error: str, duration: float, status: Optional[int] = None) -> None:
+        """Back off exponentially while a feed keeps failing."""
+        self.polls += 1
+        self.errors += 1
+        self.consecutive_errors += 1
+        self.last_status = status
+        self.last_error = error
+        self.last_duration = duration
+        self.last_polled = datetime.utcnow()
+        self.interval = min(self.max_interval, max(self.min_interval, self.interval * ERROR_BACKOFF))
+        self.next_poll = time.monotonic() + self.interval
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "source": self.name,
+            "interval_seconds": round(self.interval, 1),
+            "next_poll_in": round(max(0.0, self.next_poll - time.monotonic()), 1),
+            "last_polled": self.last_polled.isoformat() if self.last_polled else None,
+            "last_status": self.last_status,
+            "last_error": self.last_error,
+            "last_duration": round(self.last_duration, 3),
+            "polls": self.polls,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+        }
@@ -0,0 +1,166 @@
+"""
+Keyword and symbol matching for the news sentiment agent.
+Each term list is compiled once into a token lookup table, so a text is
+tokenized once however many terms there are, and matches respect word
+boundaries: "eth" no longer matches inside "whether" or "ethereum".
+Keyword matchers can let plurals match their singular term ("coins",
+"cryptocurrencies"); symbol matchers match aliases exactly.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Any, Callable, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Quote assets stripped from pair symbols (longest first so USDT wins over USD)
+QUOTE_ASSETS = ('USDT', 'USDC', 'BUSD', 'USD', 'EUR', 'BTC', 'ETH')
+
+# Names articles use for the base asset instead of its ticker
+ASSET_NAMES = {
+    'BTC': ('bitcoin',),
+    'ETH': ('ethereum',),
+    'SOL': ('solana',),
+    'ADA': ('cardano',),
+    'DOT': ('polkadot',),
+    'AVAX': ('avalanche',),
+    'XRP': ('ripple',),
+    'DOGE': ('dogecoin',),
+    'LTC': ('litecoin',),
+    'LINK': ('chainlink',),
+    'BNB': ('binance coin',),
+}
+
+_PAIR_SEPARATORS = re.compile(r'[/\-_:]')
+_TOKEN_RE = re.compile(r'[^\W_]+')
+
+
+def article_text(article: Any) -> str:
+    return f"{article.title} {article.content}"
+
+
+@lru_cache(maxsize=65536)
+def singular(token: str) -> str:
+    """Strip an English plural ending: coins -> coin, cryptocurrencies -> cryptocurrency, boxes -> box."""
+    if len(token) <= 3 or not token.isalpha():
+        return token   # Tickers and short words ("sol", "ens", "bus") stay as they are
+    if token.endswith('ies'):
+        return token[:-3] + 'y'
+    if token.endswith(('sses', 'xes', 'zes', 'ches', 'shes')):
+        return token[:-2]
+    if token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+def _tokens(text: str, plurals: bool = False) -> List[str]:
+    tokens = _TOKEN_RE.findall(text.lower())
+    return [singular(token) for token in tokens] if plurals else tokens
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive whole-word matcher for a fixed set of terms.
+
+    Text is split into alphanumeric tokens with one compiled regex;
+    single-token terms are found with a set intersection and multi-token
+    terms ("binance coin", "btc/usd") are only checked at positions where
+    their first token occurs. Separators inside a term are not significant,
+    so "btc/usd" also matches "BTC-USD". With ``plurals`` the tokens of
+    both the terms and the text are reduced to their singular, so "tokens"
+    matches "token"; leave it off for tickers and names, where "links" is
+    not a mention of LINK.
+    """
+
+    def __init__(self, terms: Iterable[str], plurals: bool = False):
+        self.plurals = plurals
+        self.terms: Dict[Tuple[str, ...], List[str]] = {}
+        for term in terms:
+            key = tuple(_tokens(term, plurals)) if term else ()
+            if key and term.lower() not in self.terms.get(key, ()):
+                self.terms.setdefault(key, []).append(term.lower())
+        self._single = {key[0]: names for key, names in self.terms.items() if len(key) == 1}
+        self._phrases: Dict[str, List[Tuple[str, ...]]] = {}
+        for key in self.terms:
+            if len(key) > 1:
+                self._phrases.setdefault(key[0], []).append(key)
+
+    def findall(self, text: str) -> Set[str]:
+        """Lower-cased terms present in ``text``."""
+        if not text:
+            return set()
+        tokens = _tokens(text, self.plurals)
+        present = set(tokens)
+        found = {term for token in present.intersection(self._single) for term in self._single[token]}
+        starts = present.intersection(self._phrases)
+        if starts:
+            for i, token in enumerate(tokens):
+                if token in starts:
+                    for key in self._phrases[token]:
+                        if tuple(tokens[i:i + len(key)]) == key:
+                            found.update(self.terms[key])
+        return found
+
+    def contains(self, text: str) -> bool:
+        """Whether any term is present."""
+        if not text:
+            return False
+        if not set(_tokens(text, self.plurals)).isdisjoint(self._single):
+            return True
+        return bool(self._phrases) and bool(self.findall(text))
+
+
+def base_asset(symbol: str) -> str:
+    """Base asset of a pair symbol: BTC/USD, BTC-USDT and BTCUSDT all give BTC."""
+    symbol = symbol.upper()
+    parts = _PAIR_SEPARATORS.split(symbol, maxsplit=1)
+    if len(parts) == 2 and parts[0]:
+        return parts[0]
+    for quote in QUOTE_ASSETS:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)]
+    return symbol
+
+
+def symbol_aliases(symbol: str) -> Set[str]:
+    """Terms that count as a mention of ``symbol`` (separators normalized to spaces)."""
+    base = base_asset(symbol)
+    aliases = {" ".join(_TOKEN_RE.findall(alias.lower()))
+               for alias in (symbol, base, *ASSET_NAMES.get(base, ()))}
+    return {alias for alias in aliases if len(alias) >= 2}
+
+
+class SymbolMatcher:
+    """Maps symbol mentions in article text to the traded symbols they refer to."""
+
+    def __init__(self, symbols: Sequence[str]):
+        self.symbols = list(dict.fromkeys(symbols))
+        self._alias_symbols: Dict[str, List[str]] = {}
+        for symbol in self.symbols:
+            for alias in symbol_aliases(symbol):
+                self._alias_symbols.setdefault(alias, []).append(symbol)
+        self.matcher = KeywordMatcher(self._alias_symbols)
+
+    def symbols_in(self, text: str) -> Set[str]:
+        return {symbol for alias in self.matcher.findall(text) for symbol in self._alias_symbols[alias]}
+
+    def index(self, articles: Iterable[Any],
+              text: Optional[Callable[[Any], str]] = None) -> Dict[str, List[Any]]:
+        """
+        Inverted index symbol -> articles mentioning it, in article order.
+        Every article is scanned once; symbols without mentions are absent.
+        """
+        text = text or article_text
+        mentions: Dict[str, List[Any]] = {}
+        for article in articles:
+            for symbol in self.symbols_in(text(article)):
+                mentions.setdefault(symbol, []).append(article)
+        return mentions
+
+
+@lru_cache(maxsize=32)
+def _cached_symbol_matcher(symbols: Tuple[str, ...]) -> SymbolMatcher:
+    return SymbolMatcher(symbols)
+
+
+def symbol_matcher(symbols: Iterable[str]) -> SymbolMatcher:
+    """Compiled matcher for a symbol universe, reused across calls."""
+    return _cached_symbol_matcher(tuple(sorted(set(symbols))))
@@ -0,0 +1,211 @@
+"""
+Batch sentiment scoring for the news sentiment agent.
+Scores are the same as scoring one article at a time (TextBlob polarity
+averaged with the VADER compound), but a batch is tokenized once, texts
+without any VADER lexicon word skip the rule engine, and large batches are
+split across a process pool so the event loop never runs the scorers.
+"""
+
+import asyncio
+import logging
+import re
+import string
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence
+
+from textblob.en import sentiment as pattern_sentiment
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer, SentiText, BOOSTER_DICT
+
+logger = logging.getLogger(__name__)
+
+IMPORTANT_KEYWORDS = frozenset(['bitcoin', 'ethereum', 'crypto', 'market', 'price', 'trading'])
+MAX_KEYWORDS = 10
+MAX_ENTITIES = 10
+CHUNK_SIZE = 128        # Texts per worker task
+MIN_POOL_BATCH = 32     # Smaller batches are scored in a thread instead of the pool
+
+_WORD_RE = re.compile(r'\b\w+\b')
+_ENTITY_RE = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+
+NEUTRAL_RESULT = {
+    'sentiment_score': 0.0,
+    'sentiment_label': 'neutral',
+    'keywords': [],
+    'impact_score': 0.0,
+    'entities': []
+}
+
+
+class FastVader(SentimentIntensityAnalyzer):
+    """
+    VADER with the emoji pass skipped for ASCII text (no emoji is ASCII)
+    and a lexicon check to tell when a text can't score anything.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.vocabulary = frozenset(self.lexicon) | frozenset(BOOSTER_DICT)
+
+    def candidate_tokens(self, text: str) -> List[str]:
+        """Lower-cased tokens the way SentiText produces them, plus the unstripped form."""
+        tokens = []
+        for token in text.split():
+            lowered = token.lower()
+            tokens.append(lowered)
+            stripped = lowered.strip(string.punctuation)
+            if stripped != lowered:
+                tokens.append(stripped)
+        return tokens
+
+    def polarity_scores(self, text: str) -> Dict[str, float]:
+        if not text.isascii():
+            return super().polarity_scores(text)
+        text = text.strip()
+        sentitext = SentiText(text)
+        sentiments = []
+        words_and_emoticons = sentitext.words_and_emoticons
+        for i, item in enumerate(words_and_emoticons):
+            if item.lower() in BOOSTER_DICT:
+                sentiments.append(0)
+                continue
+            if (i < len(words_and_emoticons) - 1 and item.lower() == "kind" and
+                    words_and_emoticons[i + 1].lower() == "of"):
+                sentiments.append(0)
+                continue
+            sentiments = self.sentiment_valence(0, sentitext, item, i, sentiments)
+        sentiments = self._but_check(words_and_emoticons, sentiments)
+        return self.score_valence(sentiments, text)
+
+
+class SentimentScorer:
+    """TextBlob + VADER scoring with keyword, entity and impact extraction."""
+
+    def __init__(self):
+        self.vader = FastVader()
+
+    def score(self, text: str, vader_compound: Optional[float] = None) -> Dict[str, Any]:
+        """Score one text; ``vader_compound`` skips VADER when the caller already knows it."""
+        try:
+            textblob_sentiment = pattern_sentiment(text)[0]
+            if vader_compound is None:
+                vader_compound = self.vader.polarity_scores(text)['compound']
+            combined_sentiment = (textblob_sentiment + vader_compound) / 2
+
+            if combined_sentiment > 0.1:
+                sentiment_label = "positive"
+            elif combined_sentiment < -0.1:
+                sentiment_label = "negative"
+            else:
+                sentiment_label = "neutral"
+
+            keywords = extract_keywords(text)
+            return {
+                'sentiment_score': combined_sentiment,
+                'sentiment_label': sentiment_label,
+                'textblob_sentiment': textblob_sentiment,
+                'vader_sentiment': vader_compound,
+                'keywords': keywords,
+                'impact_score': impact_score(text, combined_sentiment, keywords),
+                'entities': extract_entities(text)
+            }
+        except Exception as e:
+            logger.error(f"Sentiment analysis failed: {e}")
+            return dict(NEUTRAL_RESULT)
+
+    def score_batch(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Score many texts. Every distinct token of the batch is looked up in
+        the VADER vocabulary once; texts with no vocabulary word have a
+        compound of exactly 0 and don't go through the rule engine.
+        """
+        tokens = [self.vader.candidate_tokens(text) for text in texts]
+        hits = self.vader.vocabulary.intersection(token for text_tokens in tokens for token in text_tokens)
+        results = []
+        for text, text_tokens in zip(texts, tokens):
+            scorable = not text.isascii() or not hits.isdisjoint(text_tokens)
+            results.append(self.score(text, None if scorable else 0.0))
+        return results
+
+
+def extract_keywords(text: str) -> List[tuple]:
+    """Top (word, count) pairs of words longer than three characters."""
+    counts = Counter(word for word in _WORD_RE.findall(text.lower()) if len(word) > 3)
+    return counts.most_common(MAX_KEYWORDS)
+
+
+def extract_entities(text: str) -> List[str]:
+    """Capitalized phrases as a stand-in for named entities."""
+    return list(set(_ENTITY_RE.findall(text)))[:MAX_ENTITIES]
+
+
+def impact_score(text: str, sentiment_score: float, keywords: List[tuple]) -> float:
+    """Sentiment strength, boosted by market keywords and longer texts."""
+    impact = abs(sentiment_score)
+    impact += sum(1 for keyword, _ in keywords if keyword in IMPORTANT_KEYWORDS) * 0.1
+    impact += min(len(text) / 1000, 0.2)
+    return min(impact, 1.0)
+
+
+_worker_scorer: Optional[SentimentScorer] = None
+
+
+def _init_worker() -> None:
+    global _worker_scorer
+    _worker_scorer = SentimentScorer()
+
+
+def _score_chunk(texts: List[str]) -> List[Dict[str, Any]]:
+    """Pool task: score one chunk with the worker's scorer."""
+    if _worker_scorer is None:
+        _init_worker()
+    return _worker_scorer.score_batch(texts)
+
+
+class BatchScorer:
+    """
+    Scores batches off the event loop. Batches of at least ``min_pool_batch``
+    texts are split into ``chunk_size`` chunks across a process pool (each
+    worker loads the lexicons once); smaller batches run in a thread.
+    """
+
+    def __init__(self, scorer: Optional[SentimentScorer] = None, workers: int = 2,
+                 chunk_size: int = CHUNK_SIZE, min_pool_batch: int = MIN_POOL_BATCH):
+        self.scorer = scorer or SentimentScorer()
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.min_pool_batch = min_pool_batch
+        self._pool = None
+        self.stats = {"batches": 0, "texts": 0, "pooled_batches": 0}
+
+    def start(self) -> None:
+        if self._pool is not None or self.workers < 1:
+            return
+        try:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        except (OSError, NotImplementedError) as e:
+            logger.warning(f"Sentiment worker pool unavailable, scoring in threads: {e}")
+
+    def close(self) -> None:
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def score(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """Score ``texts``, preserving order."""
+        texts = list(texts)
+        if not texts:
+            return []
+        self.stats["batches"] += 1
+        self.stats["texts"] += len(texts)
+        loop = asyncio.get_running_loop()
+        if self._pool is None or len(texts) < self.min_pool_batch:
+            return await loop.run_in_executor(None, self.scorer.score_batch, texts)
+
+        self.stats["pooled_batches"] += 1
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        scored = await asyncio.gather(*[loop.run_in_executor(self._pool, _score_chunk, chunk) for chunk in chunks])
+        return [result for chunk in scored for result in chunk]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, workers=self.workers if self._pool else 0, chunk_size=self.chunk_size)
@@ -8,6 +8,7 @@ import sys
 import os
 import asyncio
 import logging
+import time
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 import pandas as pd
@@ -21,8 +22,15 @@ from common.vault import get_vault_client, get_agent_config
 from common.db import get_db_client
 from common.logging import get_logger
 from common.websocket_client import AgentWebSocketClient, MessageType
+from common.backtest_cache import get_backtest_cache
 from agents.agentic_framework.agent_templates import OptimizeAgent
 from agents.agentic_framework.mcp_tools import MCPToolRegistry, MCPTool
+from agents.backtest.vectorized import STRATEGY_SIGNALS
+from agents.optimize.sweep import ParameterSweep, SweepConfig
+from agents.optimize.ml_search import HyperparameterSearch, MLSearchConfig
+from agents.optimize.portfolio import (
+    METHOD_ALIASES, ledoit_wolf, optimize_weights, optimize_rolling, portfolio_metrics
+)
 
 logger = get_logger("agentic_optimize")
 
@@ -36,6 +44,13 @@ class OptimizationRequest:
     optimization_metric: str = 'sharpe_ratio'
     risk_free_rate: float = 0.02
     cv_folds: int = 5
+    strategy_type: Optional[str] = None
+    timeframe: str = '1d'
+    n_trials: int = 50
+    max_workers: Optional[int] = None
+    early_stopping_rounds: Optional[int] = None
+    checkpoint_path: Optional[str] = None
+    symbol: str = ''
 
 @dataclass
 class OptimizationResult:
@@ -59,6 +74,9 @@ class AgenticOptimizeAgent:
         self.agent = None
         self.tool_registry = None
         self.optimization_history = []
+        self.active_sweeps: Dict[str, Any] = {}
+        self.backtest_cache = get_backtest_cache()
+        self.progress_interval = 2.0  # seconds between streamed progress updates
         
     def _initialize_agent(self):
         """Initialize the AutoGen AssistantAgent."""
@@ -127,6 +145,14 @@ class AgenticOptimizeAgent:
                 required_permissions=["optimization"],
                 category="optimization"
             ))
+            self.tool_registry.register_tool(MCPTool(
+                name="optimize_portfolio_rebalances",
+                description="Optimize portfolio weights for every rolling rebalance date",
+                function=self.optimize_portfolio_rebalances,
+                parameters={},
+                required_permissions=["optimization"],
+                category="optimization"
+            ))
             self.tool_registry.register_tool(MCPTool(
                 name="optimize_ml_hyperparameters",
                 description="Optimize ML model hyperparameters",
@@ -221,6 +247,9 @@ class AgenticOptimizeAgent:
     async def optimize_strategy_parameters(self, request: OptimizationRequest) -> OptimizationResult:
         """Autonomously optimize strategy parameters using intelligent reasoning."""
         try:
+            # Run the parameter sweep first so the agent reasons about real results
+            optimized_params, performance_metrics = await self._execute_optimization(request)
+            
             # Create optimization context for the agent
             context = {
                 "strategy_id": request.strategy_id,
@@ -228,18 +257,17 @@ class AgenticOptimizeAgent:
                 "optimization_method": request.optimization_method,
                 "optimization_metric": request.optimization_metric,
                 "historical_data_shape": request.historical_data.shape,
-                "available_parameters": list(request.param_grid.keys())
+                "available_parameters": list(request.param_grid.keys()),
+                "optimized_params": optimized_params,
+                "performance_metrics": performance_metrics
             }
             
             # Generate optimization prompt
             prompt = self._generate_optimization_prompt(context)
             
-            # Get agent reasoning and optimization plan
+            # Get agent reasoning about the optimization outcome
             response = await self._get_agent_response(prompt)
             
-            # Execute optimization based on agent reasoning
-            optimized_params, performance_metrics = await self._execute_optimization(request)
-            
             # Store optimization result
             result = OptimizationResult(
                 success=True,
@@ -277,7 +305,9 @@ class AgenticOptimizeAgent:
     
     async def optimize_portfolio_weights(self, returns_data: pd.DataFrame, 
                                        optimization_method: str = 'sharpe',
-                                       risk_free_rate: float = 0.02) -> OptimizationResult:
+                                       risk_free_rate: float = 0.02,
+                                       min_weight: float = 0.0,
+                                       max_weight: float = 1.0) -> OptimizationResult:
         """Autonomously optimize portfolio weights using intelligent analysis."""
         try:
             # Create portfolio optimization context
@@ -286,7 +316,7 @@ class AgenticOptimizeAgent:
                 "risk_free_rate": risk_free_rate,
                 "assets_count": len(returns_data.columns),
                 "data_points": len(returns_data),
-                "available_methods": ["sharpe", "min_variance", "max_diversification"]
+                "available_methods": ["sharpe", "mean_variance", "min_variance", "max_diversification"]
             }
             
             # Generate portfolio optimization prompt
@@ -297,7 +327,7 @@ class AgenticOptimizeAgent:
             
             # Execute portfolio optimization
             optimized_weights, performance_metrics = await self._execute_portfolio_optimization(
-                returns_data, optimization_method, risk_free_rate
+                returns_data, optimization_method, risk_free_rate, min_weight, max_weight
             )
             
             result = OptimizationResult(
@@ -337,7 +367,9 @@ class AgenticOptimizeAgent:
     async def optimize_ml_hyperparameters(self, model, param_grid: Dict[str, List],
                                         X_train: pd.DataFrame, y_train: pd.Series,
                                         optimization_method: str = 'grid',
-                                        cv_folds: int = 5) -> OptimizationResult:
+                                        cv_folds: int = 5, scoring: Optional[str] = None,
+                                        n_iter: int = 20, gap: int = 0,
+                                        max_workers: Optional[int] = None) -> OptimizationResult:
         """Autonomously optimize ML hyperparameters using intelligent reasoning."""
         try:
             # Create ML optimization context
@@ -358,7 +390,8 @@ class AgenticOptimizeAgent:
             
             # Execute ML optimization
             optimized_params, performance_metrics = await self._execute_ml_optimization(
-                model, param_grid, X_train, y_train, optimization_method, cv_folds
+                model, param_grid, X_train, y_train, optimization_method, cv_folds,
+                scoring=scoring, n_iter=n_iter, gap=gap, max_workers=max_workers
             )
             
             result = OptimizationResult(
@@ -469,6 +502,8 @@ Context:
 - Optimization Metric: {context['optimization_metric']}
 - Available Parameters: {context['available_parameters']}
 - Data Shape: {context['historical_data_shape']}
+- Best Parameters Found: {context['optimized_params']}
+- Performance of Best Parameters: {context['performance_metrics']}
 
 Provide:
 1. Reasoning for parameter selection
@@ -574,29 +609,168 @@ Respond in JSON format with keys: insights, suggestions, recommendations, assess
             return {"error": str(e)}
     
     async def _execute_optimization(self, request: OptimizationRequest) -> tuple:
-        """Execute the actual optimization."""
-        # Placeholder for optimization execution
-        # This would implement the actual optimization logic
-        optimized_params = {"param1": 0.5, "param2": 0.3}
-        performance_metrics = {"sharpe_ratio": 1.2, "max_drawdown": -0.05}
-        return optimized_params, performance_metrics
+        """Execute the parameter sweep in the process pool."""
+        strategy_type = request.strategy_type or request.strategy_id
+        if strategy_type not in STRATEGY_SIGNALS:
+            raise ValueError(f"Unknown strategy type for optimization: {strategy_type}")
+        
+        config = SweepConfig(
+            strategy_type=strategy_type,
+            param_grid=request.param_grid,
+            method=request.optimization_method,
+            metric=request.optimization_metric,
+            n_trials=request.n_trials,
+            max_workers=request.max_workers,
+            timeframe=request.timeframe,
+            early_stopping_rounds=request.early_stopping_rounds,
+            checkpoint_path=request.checkpoint_path,
+            symbol=request.symbol
+        )
+        sweep = ParameterSweep(request.historical_data, config, cache=self.backtest_cache)
+        self.active_sweeps[request.strategy_id] = sweep
+        try:
+            result = await sweep.run(self._make_progress_streamer(request.strategy_id))
+        finally:
+            self.active_sweeps.pop(request.strategy_id, None)
+        
+        if not result.best_params:
+            raise Exception("Parameter sweep produced no successful evaluations")
+        
+        performance_metrics = dict(result.best_metrics)
+        performance_metrics.update({
+            "score": result.best_score,
+            "evaluations": result.evaluated,
+            "resumed_evaluations": result.resumed,
+            "stopped_early": result.stopped_early,
+            "stop_reason": result.stop_reason,
+            "duration_seconds": result.duration
+        })
+        logger.info(f"Sweep for {request.strategy_id} evaluated {result.evaluated} configs "
+                    f"in {result.duration:.2f}s (best {result.metric}={result.best_score:.4f})")
+        return result.best_params, performance_metrics
+    
+    def _make_progress_streamer(self, strategy_id: str, task: str = "optimize_strategy_parameters"):
+        """Build a progress callback that streams throttled updates to the Meta Agent."""
+        last_sent = {"time": 0.0}
+        
+        async def stream(update: Dict[str, Any]):
+            now = time.monotonic()
+            if now - last_sent["time"] < self.progress_interval:
+                return
+            last_sent["time"] = now
+            if self.ws_client and self.ws_client.is_connected:
+                await self.ws_client.send_task_progress({
+                    "task": task,
+                    "strategy_id": strategy_id,
+                    "evaluated": update["evaluated"],
+                    "best_score": update["best_score"],
+                    "best_params": update["best_params"],
+                    "elapsed": update["elapsed"]
+                })
+        
+        return stream
+    
+    async def cancel_optimization(self, strategy_id: str) -> bool:
+        """Stop a running parameter sweep or ML search early, keeping the best result so far."""
+        sweep = self.active_sweeps.get(strategy_id)
+        if not sweep:
+            return False
+        sweep.cancel()
+        return True
     
     async def _execute_portfolio_optimization(self, returns_data: pd.DataFrame, 
-                                           method: str, risk_free_rate: float) -> tuple:
-        """Execute portfolio optimization."""
-        # Placeholder for portfolio optimization
-        weights = np.ones(len(returns_data.columns)) / len(returns_data.columns)
-        metrics = {"sharpe_ratio": 1.1, "volatility": 0.15}
-        return weights, metrics
+                                           method: str, risk_free_rate: float,
+                                           min_weight: float = 0.0, max_weight: float = 1.0,
+                                           periods_per_year: float = 365) -> tuple:
+        """Execute portfolio optimization on a Ledoit-Wolf shrunk covariance."""
+        if method not in METHOD_ALIASES:
+            raise ValueError(f"Unknown portfolio optimization method: {method}")
+        clean = returns_data.dropna(how="any")
+        if len(clean) < 2:
+            raise ValueError("Not enough return observations for portfolio optimization")
+
+        values = clean.to_numpy(dtype=np.float64)
+        cov, shrinkage = ledoit_wolf(values)
+        mu = values.mean(axis=0)
+        per_period_rf = risk_free_rate / periods_per_year
+        weights = optimize_weights(mu, cov[0], method, per_period_rf,
+                                   min_weight=min_weight, max_weight=max_weight)
+
+        metrics = {key: float(value[0]) for key, value in
+                   portfolio_metrics(weights, mu, cov[0], per_period_rf, periods_per_year).items()}
+        metrics["shrinkage"] = float(shrinkage[0])
+        return dict(zip(clean.columns, weights.round(6).tolist())), metrics
+    
+    async def optimize_portfolio_rebalances(self, returns_data: pd.DataFrame,
+                                            optimization_method: str = 'sharpe',
+                                            window: int = 90, rebalance_every: int = 7,
+                                            risk_free_rate: float = 0.02,
+                                            min_weight: float = 0.0,
+                                            max_weight: float = 1.0) -> Dict[str, Any]:
+        """Solve every rolling rebalance of ``returns_data`` in one batched call."""
+        try:
+            loop = asyncio.get_event_loop()
+            start = time.perf_counter()
+            result = await loop.run_in_executor(
+                None, lambda: optimize_rolling(
+                    returns_data, optimization_method, window, rebalance_every,
+                    risk_free_rate=risk_free_rate, min_weight=min_weight, max_weight=max_weight
+                )
+            )
+            weights, metrics = result["weights"], result["metrics"]
+            return {
+                "success": True,
+                "method": optimization_method,
+                "rebalances": len(weights),
+                "assets": len(weights.columns),
+                "solve_seconds": round(time.perf_counter() - start, 4),
+                "weights": {str(ts): row.round(6).to_dict() for ts, row in weights.iterrows()},
+                "metrics": {str(ts): row.to_dict() for ts, row in metrics.iterrows()},
+                "average_shrinkage": float(result["shrinkage"].mean()) if len(weights) else 0.0
+            }
+        except Exception as e:
+            logger.error(f"Rolling portfolio optimization failed: {e}")
+            return {"success": False, "error": str(e)}
     
     async def _execute_ml_optimization(self, model, param_grid: Dict[str, List],
                                      X_train: pd.DataFrame, y_train: pd.Series,
-                                     method: str, cv_folds: int) -> tuple:
-        """Execute ML optimization."""
-        # Placeholder for ML optimization
-        params = {"learning_rate": 0.01, "max_depth": 5}
-        metrics = {"accuracy": 0.85, "f1_score": 0.83}
-        return params, metrics
+                                     method: str, cv_folds: int, scoring: Optional[str] = None,
+                                     n_iter: int = 20, gap: int = 0,
+                                     max_workers: Optional[int] = None) -> tuple:
+        """Run a time-series cross-validated hyperparameter search in the process pool."""
+        config = MLSearchConfig(
+            method=method,
+            scoring=scoring,
+            cv_folds=cv_folds,
+            gap=gap,
+            n_iter=n_iter,
+            max_workers=max_workers
+        )
+        search = HyperparameterSearch(model, param_grid, X_train, y_train, config)
+        search_id = f"ml:{type(model).__name__}"
+        self.active_sweeps[search_id] = search
+        try:
+            result = await search.run(self._make_progress_streamer(search_id, "optimize_ml_hyperparameters"))
+        finally:
+            self.active_sweeps.pop(search_id, None)
+        
+        if not result.best_params:
+            raise Exception("Hyperparameter search produced no successful evaluations")
+        
+        performance_metrics = {
+            result.scoring: result.best_score,
+            "cv_std": result.best_std,
+            "fold_scores": result.fold_scores,
+            "evaluations": result.evaluated,
+            "pruned_evaluations": result.pruned,
+            "stopped_early": result.stopped_early,
+            "stop_reason": result.stop_reason,
+            "duration_seconds": result.duration
+        }
+        logger.info(f"{result.method} search for {type(model).__name__} ran {result.evaluated} evaluations "
+                    f"({result.pruned} pruned) in {result.duration:.2f}s "
+                    f"(best {result.scoring}={result.best_score:.4f})")
+        return result.best_params, performance_metrics
     
     def _get_time_range(self, history: List[Dict[str, Any]]) -> str:
         """Get time range of optimization history."""
@@ -644,6 +818,7 @@ Respond in JSON format with keys: insights, suggestions, recommendations, assess
             "status": "running",
             "version": "1.0.0",
             "optimizations_completed": len(self.optimization_history),
+            "active_sweeps": list(self.active_sweeps.keys()),
             "success_rate": self._calculate_success_rate(),
             "average_confidence": self._calculate_average_confidence(),
             "last_optimization": self.optimization_history[-1]["timestamp"] if self.optimization_history else None
@@ -0,0 +1,473 @@
+"""
+Process-pool hyperparameter search for ML models in the Optimize Agent.
+Runs grid, random, successive-halving and Hyperband searches with
+time-series cross-validation: every fold trains on bars strictly before its
+test window (optionally separated by a gap), so no future bars leak into
+training. Feature and target arrays are shared with workers once, and each
+worker caches the per-fold (preprocessed) matrices it has already built.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+from agents.optimize.sweep import attach_shared_memory, param_key, to_native
+
+logger = logging.getLogger(__name__)
+
+ML_SEARCH_METHODS = ("grid", "random", "halving", "hyperband")
+METHOD_ALIASES = {"successive_halving": "halving"}
+
+# Worker-process state, populated by _init_ml_worker
+_worker_blocks: List[shared_memory.SharedMemory] = []
+_worker_X: Optional[np.ndarray] = None
+_worker_y: Optional[np.ndarray] = None
+_worker_model = None
+_worker_preprocessor = None
+_worker_folds: List[Tuple[int, int, int, int]] = []
+_worker_scoring: Optional[str] = None
+_worker_fold_cache: "OrderedDict[Tuple[int, int], Tuple[np.ndarray, ...]]" = OrderedDict()
+_FOLD_CACHE_SIZE = 32
+
+
+def time_series_folds(n_samples: int, n_folds: int = 5, gap: int = 0,
+                      test_size: Optional[int] = None,
+                      max_train_size: Optional[int] = None) -> List[Tuple[int, int, int, int]]:
+    """
+    Expanding-window folds over time-ordered rows.
+
+    Returns (train_start, train_end, test_start, test_end) row bounds. Test
+    windows are consecutive blocks at the end of the data; each fold trains
+    on rows before ``test_start - gap`` only.
+    """
+    if n_folds < 2:
+        raise ValueError("cv_folds must be at least 2")
+    test_size = test_size or n_samples // (n_folds + 1)
+    first_test = n_samples - n_folds * test_size
+    if test_size < 1 or first_test - gap < 1:
+        raise ValueError(f"Not enough samples ({n_samples}) for {n_folds} time-series folds with gap {gap}")
+    folds = []
+    for k in range(n_folds):
+        test_start = first_test + k * test_size
+        train_end = test_start - gap
+        train_start = max(0, train_end - max_train_size) if max_train_size else 0
+        folds.append((train_start, train_end, test_start, test_start + test_size))
+    return folds
+
+
+def _init_ml_worker(x_block: Tuple[str, Tuple[int, ...], str], y_block: Tuple[str, Tuple[int, ...], str],
+                    model, preprocessor, folds: List[Tuple[int, int, int, int]],
+                    scoring: str) -> None:
+    """Attach the shared feature/target blocks once per worker process."""
+    global _worker_X, _worker_y, _worker_model, _worker_preprocessor, _worker_folds, _worker_scoring
+    arrays = []
+    for name, shape, dtype in (x_block, y_block):
+        shm = attach_shared_memory(name)
+        _worker_blocks.append(shm)
+        arrays.append(np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf))
+    _worker_X, _worker_y = arrays
+    _worker_model = model
+    _worker_preprocessor = preprocessor
+    _worker_folds = folds
+    _worker_scoring = scoring
+    _worker_fold_cache.clear()
+
+
+def _fold_matrices(fold: int, n_train: int) -> Tuple[np.ndarray, ...]:
+    """
+    Train/test matrices for one fold using the most recent ``n_train``
+    training rows. The preprocessor is fitted on those training rows only.
+    """
+    key = (fold, n_train)
+    cached = _worker_fold_cache.get(key)
+    if cached is not None:
+        _worker_fold_cache.move_to_end(key)
+        return cached
+
+    train_start, train_end, test_start, test_end = _worker_folds[fold]
+    start = max(train_start, train_end - n_train)
+    X_train, y_train = _worker_X[start:train_end], _worker_y[start:train_end]
+    X_test, y_test = _worker_X[test_start:test_end], _worker_y[test_start:test_end]
+    if _worker_preprocessor is not None:
+        preprocessor = clone(_worker_preprocessor).fit(X_train, y_train)
+        X_train, X_test = preprocessor.transform(X_train), preprocessor.transform(X_test)
+
+    matrices = (X_train, y_train, X_test, y_test)
+    _worker_fold_cache[key] = matrices
+    if len(_worker_fold_cache) > _FOLD_CACHE_SIZE:
+        _worker_fold_cache.popitem(last=False)
+    return matrices
+
+
+def _evaluate_ml_in_worker(params: Dict[str, Any], budget: float,
+                           prune_thresholds: List[float]) -> Dict[str, Any]:
+    """
+    Cross-validate one configuration on ``budget`` (0..1] of each fold's
+    training rows. Stops after fold k when the running mean score falls
+    below ``prune_thresholds[k]``.
+    """
+    scorer = get_scorer(_worker_scoring)
+    start = time.perf_counter()
+    scores = []
+    for fold, (train_start, train_end, _, _) in enumerate(_worker_folds):
+        n_train = max(1, int(round((train_end - train_start) * budget)))
+        X_train, y_train, X_test, y_test = _fold_matrices(fold, n_train)
+        estimator = clone(_worker_model).set_params(**params)
+        estimator.fit(X_train, y_train)
+        scores.append(float(scorer(estimator, X_test, y_test)))
+        if fold < len(prune_thresholds) and np.mean(scores) < prune_thresholds[fold]:
+            return {"scores": scores, "pruned": True, "duration": time.perf_counter() - start}
+    return {"scores": scores, "pruned": False, "duration": time.perf_counter() - start}
+
+
+@dataclass
+class MLSearchConfig:
+    """Configuration for a hyperparameter search."""
+    method: str = "grid"
+    scoring: Optional[str] = None
+    cv_folds: int = 5
+    gap: int = 0
+    max_train_size: Optional[int] = None
+    n_iter: int = 20
+    max_workers: Optional[int] = None
+    halving_eta: int = 3
+    min_resource: float = 0.1
+    prune: bool = True
+    prune_warmup: int = 5
+    preprocessor: Any = None
+    max_duration: Optional[float] = None
+    seed: Optional[int] = None
+
+
+@dataclass
+class MLSearchResult:
+    """Outcome of a hyperparameter search."""
+    best_params: Dict[str, Any]
+    best_score: float
+    best_std: float
+    fold_scores: List[float]
+    trials: List[Dict[str, Any]]
+    evaluated: int
+    pruned: int
+    stopped_early: bool
+    stop_reason: Optional[str]
+    duration: float
+    method: str
+    scoring: str
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+class HyperparameterSearch:
+    """
+    Cross-validated search over an sklearn-style estimator's parameters.
+
+    Configurations are evaluated in a ProcessPoolExecutor. Within a budget
+    level, a configuration whose running fold mean drops below the median of
+    earlier configurations at the same fold is pruned, so weak settings stop
+    after one or two folds instead of fitting all of them.
+    """
+
+    def __init__(self, model, param_grid: Dict[str, Any], X: pd.DataFrame, y: pd.Series,
+                 config: MLSearchConfig):
+        """
+        Initialize the search.
+
+        Args:
+            model: Unfitted estimator with get_params/set_params
+            param_grid: Parameter lists (or scipy distributions for random search)
+            X: Features, rows in time order
+            y: Target aligned with X
+            config: Search configuration
+        """
+        method = METHOD_ALIASES.get(config.method, config.method)
+        if method not in ML_SEARCH_METHODS:
+            raise ValueError(f"Unknown ML search method: {config.method}")
+        if not param_grid:
+            raise ValueError("param_grid is empty")
+        if len(X) != len(y):
+            raise ValueError("X and y must have the same number of rows")
+        self.config = config
+        self.method = method
+        self.model = model
+        self.param_grid = param_grid
+        self.scoring = config.scoring or ("accuracy" if is_classifier(model) else "neg_mean_squared_error")
+        self.X = np.ascontiguousarray(np.asarray(X, dtype=np.float64))
+        y = np.asarray(y)
+        if y.dtype == object or y.dtype.kind in "US":
+            self.classes, y = np.unique(y, return_inverse=True)
+        else:
+            self.classes = None
+        self.y = np.ascontiguousarray(y)
+        self.folds = time_series_folds(len(self.X), config.cv_folds, config.gap,
+                                       max_train_size=config.max_train_size)
+        self.max_workers = config.max_workers or os.cpu_count() or 1
+        self._trials: Dict[str, Dict[str, Any]] = {}
+        self._fold_means: Dict[float, List[List[float]]] = {}
+        self._evaluations = 0
+        self._pruned = 0
+        self._stop_reason: Optional[str] = None
+        self._cancelled = False
+        self._started = 0.0
+        self._rung_log: List[Dict[str, Any]] = []
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def cancel(self) -> None:
+        """Stop submitting new evaluations."""
+        self._cancelled = True
+
+    async def run(self, progress_callback: Optional[Callable[[Dict[str, Any]], Any]] = None) -> MLSearchResult:
+        """Run the configured search and return the best parameters found."""
+        self._started = time.perf_counter()
+        self._progress_callback = progress_callback
+        blocks = [self._share(self.X), self._share(self.y)]
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_ml_worker,
+                initargs=(blocks[0][1], blocks[1][1], self.model, self.config.preprocessor,
+                          self.folds, self.scoring),
+            ) as pool:
+                self._pool = pool
+                if self.method == "grid":
+                    await self._evaluate_batch(self._grid_candidates(), 1.0)
+                elif self.method == "random":
+                    await self._evaluate_batch(self._random_candidates(self.config.n_iter), 1.0)
+                elif self.method == "halving":
+                    await self._successive_halving(self._halving_candidates(), self.config.min_resource)
+                else:
+                    await self._run_hyperband()
+        finally:
+            for shm, _ in blocks:
+                shm.close()
+                shm.unlink()
+        return self._build_result()
+
+    @staticmethod
+    def _share(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, Tuple[str, Tuple[int, ...], str]]:
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+        return shm, (shm.name, array.shape, array.dtype.str)
+
+    # ------------------------------------------------------------------
+    # Candidate generation
+    # ------------------------------------------------------------------
+
+    def _is_discrete(self) -> bool:
+        return all(isinstance(values, (list, tuple, np.ndarray)) for values in self.param_grid.values())
+
+    def _grid_size(self) -> float:
+        if not self._is_discrete():
+            return math.inf
+        return math.prod(len(values) for values in self.param_grid.values())
+
+    def _grid_candidates(self) -> List[Dict[str, Any]]:
+        if not self._is_discrete():
+            raise ValueError("Grid search needs a list of values for every parameter")
+        return [{k: to_native(v) for k, v in params.items()} for params in ParameterGrid(self.param_grid)]
+
+    def _random_candidates(self, count: int, seed_offset: int = 0) -> List[Dict[str, Any]]:
+        count = int(min(count, self._grid_size()))
+        seed = None if self.config.seed is None else self.config.seed + seed_offset
+        return [{k: to_native(v) for k, v in params.items()}
+                for params in ParameterSampler(self.param_grid, count, random_state=seed)]
+
+    def _halving_candidates(self) -> List[Dict[str, Any]]:
+        if self.config.n_iter < self._grid_size():
+            return self._random_candidates(self.config.n_iter)
+        return self._grid_candidates()
+
+    # ------------------------------------------------------------------
+    # Search strategies
+    # ------------------------------------------------------------------
+
+    async def _successive_halving(self, candidates: List[Dict[str, Any]], min_budget: float,
+                                  bracket: int = 0) -> None:
+        """
+        Evaluate all candidates on ``min_budget`` of the training rows, keep
+        the top 1/eta and multiply the budget by eta until the full training
+        windows are used.
+        """
+        eta = max(2, self.config.halving_eta)
+        # Start at eta^-s so the last rung lands exactly on the full budget
+        rungs = max(0, int(math.floor(math.log(1.0 / max(min_budget, 1e-6), eta) + 1e-9)))
+        budget = float(eta) ** -rungs
+        rung = 0
+        while candidates and not self._should_stop():
+            results = await self._evaluate_batch(candidates, budget)
+            self._rung_log.append({"bracket": bracket, "rung": rung, "budget": round(budget, 4),
+                                   "configs": len(candidates), "completed": len(results)})
+            if budget >= 1.0:
+                break
+            completed = [r for r in results if not r["pruned"]]
+            # When the whole rung was pruned (thresholds from earlier brackets), the best
+            # partial scores still go on, so the bracket ends with a full-budget evaluation
+            ranked = sorted(completed or results, key=lambda r: r["score"], reverse=True)
+            candidates = [r["params"] for r in ranked[:max(1, len(candidates) // eta)]]
+            rung += 1
+            budget = 1.0 if rung == rungs else float(eta) ** (rung - rungs)
+
+    async def _run_hyperband(self) -> None:
+        """
+        Hyperband: successive-halving brackets from aggressive (many configs,
+        small budgets) to conservative (few configs, full budget).
+        """
+        eta = max(2, self.config.halving_eta)
+        s_max = max(0, int(math.floor(math.log(1.0 / self.config.min_resource, eta) + 1e-9)))
+        for s in range(s_max, -1, -1):
+            if self._should_stop():
+                break
+            n_configs = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+            candidates = self._random_candidates(n_configs, seed_offset=s)
+            await self._successive_halving(candidates, eta ** -s, bracket=s_max - s)
+
+    # ------------------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------------------
+
+    def _prune_thresholds(self, budget: float) -> List[float]:
+        """Median running fold mean of earlier configs at this budget, per fold."""
+        if not self.config.prune:
+            return []
+        history = self._fold_means.get(budget, [])
+        thresholds = []
+        for fold in range(len(self.folds) - 1):
+            means = [m[fold] for m in history if len(m) > fold]
+            if len(means) < self.config.prune_warmup:
+                break
+            thresholds.append(float(np.median(means)))
+        return thresholds
+
+    async def _evaluate_batch(self, candidates: List[Dict[str, Any]], budget: float) -> List[Dict[str, Any]]:
+        """Evaluate candidates with at most 2x max_workers tasks in flight."""
+        loop = asyncio.get_running_loop()
+        results: List[Dict[str, Any]] = []
+        pending = iter(candidates)
+        in_flight: Dict[asyncio.Future, Dict[str, Any]] = {}
+        limit = self.max_workers * 2
+
+        def submit_more() -> None:
+            while len(in_flight) < limit and not self._should_stop():
+                params = next(pending, None)
+                if params is None:
+                    return
+                key = param_key(params)
+                if budget >= 1.0 and key in self._trials:
+                    results.append(self._trials[key])
+                    continue
+                future = loop.run_in_executor(self._pool, _evaluate_ml_in_worker, params, budget,
+                                              self._prune_thresholds(budget))
+                in_flight[future] = params
+
+        submit_more()
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                params = in_flight.pop(future)
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    logger.warning(f"ML evaluation failed for {params}: {e}")
+                    continue
+                trial = self._record(params, budget, outcome)
+                results.append(trial)
+                await self._report(trial)
+            if self._should_stop():
+                for future in in_flight:
+                    future.cancel()
+                break
+            submit_more()
+        return results
+
+    def _record(self, params: Dict[str, Any], budget: float, outcome: Dict[str, Any]) -> Dict[str, Any]:
+        scores = outcome["scores"]
+        self._evaluations += 1
+        self._pruned += int(outcome["pruned"])
+        self._fold_means.setdefault(budget, []).append(list(np.cumsum(scores) / np.arange(1, len(scores) + 1)))
+        trial = {
+            "params": params,
+            "budget": budget,
+            "fold_scores": scores,
+            "score": float(np.mean(scores)) if scores else float("-inf"),
+            "std": float(np.std(scores)) if scores else 0.0,
+            "pruned": outcome["pruned"],
+            "duration": outcome["duration"],
+        }
+        if budget >= 1.0 and not outcome["pruned"]:
+            self._trials[param_key(params)] = trial
+        return trial
+
+    async def _report(self, trial: Dict[str, Any]) -> None:
+        if not self._progress_callback:
+            return
+        best = self._best_trial()
+        update = {
+            "evaluated": self._evaluations,
+            "pruned": self._pruned,
+            "trial": trial,
+            "best_params": best["params"] if best else None,
+            "best_score": best["score"] if best else None,
+            "elapsed": time.perf_counter() - self._started,
+        }
+        try:
+            outcome = self._progress_callback(update)
+            if asyncio.iscoroutine(outcome):
+                await outcome
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
+
+    def _should_stop(self) -> bool:
+        if self._stop_reason:
+            return True
+        if self._cancelled:
+            self._stop_reason = "cancelled"
+        elif self.config.max_duration and time.perf_counter() - self._started > self.config.max_duration:
+            self._stop_reason = "max_duration"
+        return self._stop_reason is not None
+
+    def _best_trial(self) -> Optional[Dict[str, Any]]:
+        if not self._trials:
+            return None
+        return max(self._trials.values(), key=lambda t: t["score"])
+
+    # ------------------------------------------------------------------
+
+    def _build_result(self) -> MLSearchResult:
+        best = self._best_trial()
+        trials = sorted(self._trials.values(), key=lambda t: t["score"], reverse=True)
+        extra = {
+            "workers": self.max_workers,
+            "folds": [{"train": [a, b], "test": [c, d]} for a, b, c, d in self.folds],
+        }
+        if self._rung_log:
+            extra["rungs"] = self._rung_log
+        return MLSearchResult(
+            best_params=best["params"] if best else {},
+            best_score=best["score"] if best else float("-inf"),
+            best_std=best["std"] if best else 0.0,
+            fold_scores=best["fold_scores"] if best else [],
+            trials=trials,
+            evaluated=self._evaluations,
+            pruned=self._pruned,
+            stopped_early=self._stop_reason is not None,
+            stop_reason=self._stop_reason,
+            duration=time.perf_counter() - self._started,
+            method=self.method,
+            scoring=self.scoring,
+            extra=extra,
+        )
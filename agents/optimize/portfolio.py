@@ -0,0 +1,304 @@
+"""
+Batched portfolio weight optimization for the Optimize Agent.
+Solves mean-variance, minimum-variance, max-Sharpe and max-diversification
+problems with long-only/box constraints for many rebalance dates at once.
+Every solver works on stacked (B, N) expected returns and (B, N, N)
+covariances, so a rolling backtest of hundreds of rebalances is one call.
+"""
+
+from typing import Dict, Any, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+PORTFOLIO_METHODS = ("mean_variance", "min_variance", "max_sharpe", "max_diversification")
+
+# Names accepted by AgenticOptimizeAgent.optimize_portfolio_weights
+METHOD_ALIASES = {
+    "sharpe": "max_sharpe",
+    "max_sharpe": "max_sharpe",
+    "min_variance": "min_variance",
+    "minimum_variance": "min_variance",
+    "mean_variance": "mean_variance",
+    "max_diversification": "max_diversification",
+}
+
+
+# ----------------------------------------------------------------------
+# Covariance estimation
+# ----------------------------------------------------------------------
+
+def ledoit_wolf(windows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ledoit-Wolf shrinkage towards a scaled identity for a batch of return windows.
+
+    Args:
+        windows: (B, T, N) returns, one window per rebalance date
+
+    Returns:
+        (covariances (B, N, N), shrinkage intensities (B,))
+    """
+    windows = np.asarray(windows, dtype=np.float64)
+    if windows.ndim == 2:
+        windows = windows[None]
+    _, t, n = windows.shape
+    x = windows - windows.mean(axis=1, keepdims=True)
+    sample = np.matmul(x.transpose(0, 2, 1), x) / t
+
+    mu = np.trace(sample, axis1=1, axis2=2) / n
+    sample_sq = np.einsum("bij,bij->b", sample, sample)
+    # ||S - mu I||^2 = ||S||^2 - 2 mu tr(S) + n mu^2 = ||S||^2 - n mu^2
+    d2 = sample_sq - n * mu ** 2
+    # sum_t ||x_t x_t' - S||^2 = sum_t ||x_t||^4 - T ||S||^2
+    row_norms = np.einsum("btn,btn->bt", x, x)
+    b2 = ((row_norms ** 2).sum(axis=1) - t * sample_sq) / t ** 2
+    shrinkage = np.clip(np.divide(np.minimum(b2, d2), d2, out=np.zeros_like(d2), where=d2 > 0), 0.0, 1.0)
+
+    cov = (1.0 - shrinkage)[:, None, None] * sample
+    cov[:, np.arange(n), np.arange(n)] += (shrinkage * mu)[:, None]
+    return cov, shrinkage
+
+
+def rolling_estimates(returns: np.ndarray, window: int, rebalance_every: int = 1,
+                      shrink: bool = True) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Expected returns and covariances for every rebalance date.
+
+    The estimate for rebalance index i uses the ``window`` rows ending at i
+    (inclusive), so weights computed at i only see data up to i.
+
+    Returns:
+        (rebalance_indices (B,), mu (B, N), cov (B, N, N), shrinkage (B,))
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    t = returns.shape[0]
+    if t < window:
+        raise ValueError(f"Need at least {window} rows of returns, got {t}")
+    all_windows = sliding_window_view(returns, window, axis=0)  # (T-window+1, N, window)
+    picks = np.arange(0, t - window + 1, rebalance_every)
+    windows = all_windows[picks].transpose(0, 2, 1)  # (B, window, N)
+    mu = windows.mean(axis=1)
+    if shrink:
+        cov, shrinkage = ledoit_wolf(windows)
+    else:
+        x = windows - mu[:, None, :]
+        cov = np.matmul(x.transpose(0, 2, 1), x) / (window - 1)
+        shrinkage = np.zeros(len(picks))
+    return picks + window - 1, mu, cov, shrinkage
+
+
+# ----------------------------------------------------------------------
+# Constraint projection
+# ----------------------------------------------------------------------
+
+def project_box_simplex(v: np.ndarray, lower: float, upper: float, iterations: int = 30) -> np.ndarray:
+    """
+    Euclidean projection of each row of ``v`` onto {w : sum(w) = 1, lower <= w <= upper}.
+
+    Finds the shift tau with sum(clip(v - tau, lower, upper)) = 1, all rows
+    at once. sum(clip(.)) is piecewise linear in tau, so a Newton step on the
+    current free set is exact once that set stops changing; steps that leave
+    the bracket fall back to a secant step between the bracket ends.
+    """
+    n = v.shape[1]
+    lo_tau = v.min(axis=1, keepdims=True) - upper
+    hi_tau = v.max(axis=1, keepdims=True) - lower
+    lo_excess = np.full(lo_tau.shape, n * upper - 1.0)
+    hi_excess = np.full(hi_tau.shape, n * lower - 1.0)
+    tau = v.mean(axis=1, keepdims=True) - 1.0 / n
+    for _ in range(iterations):
+        shifted = v - tau
+        excess = np.clip(shifted, lower, upper).sum(axis=1, keepdims=True) - 1.0
+        if np.abs(excess).max() < 1e-12:
+            break
+        # Keep the bracket tight: the sum decreases as tau grows
+        above = excess > 0
+        lo_tau = np.where(above, tau, lo_tau)
+        lo_excess = np.where(above, excess, lo_excess)
+        hi_tau = np.where(above, hi_tau, tau)
+        hi_excess = np.where(above, hi_excess, excess)
+        free = ((shifted > lower) & (shifted < upper)).sum(axis=1, keepdims=True)
+        newton = tau + excess / np.maximum(free, 1)
+        inside = (free > 0) & (newton > lo_tau) & (newton < hi_tau)
+        secant = lo_tau + lo_excess * (hi_tau - lo_tau) / np.maximum(lo_excess - hi_excess, 1e-300)
+        tau = np.where(inside, newton, secant)
+    return np.clip(v - tau, lower, upper)
+
+
+# ----------------------------------------------------------------------
+# Solvers
+# ----------------------------------------------------------------------
+
+def _bmv(cov: np.ndarray, w: np.ndarray) -> np.ndarray:
+    """Batched matrix-vector product (B, N, N) x (B, N) -> (B, N)."""
+    return np.matmul(cov, w[:, :, None])[:, :, 0]
+
+
+def _max_eigenvalue(cov: np.ndarray, iterations: int = 20) -> np.ndarray:
+    v = np.ones(cov.shape[:2]) / np.sqrt(cov.shape[1])
+    for _ in range(iterations):
+        v = _bmv(cov, v)
+        v /= np.maximum(np.linalg.norm(v, axis=1, keepdims=True), 1e-300)
+    return np.einsum("bi,bi->b", v, _bmv(cov, v))
+
+
+def _solve_quadratic(mu: np.ndarray, cov: np.ndarray, risk_aversion: float,
+                     lower: float, upper: float, max_iter: int, tol: float) -> np.ndarray:
+    """
+    Accelerated projected gradient (FISTA) for
+        minimize  (risk_aversion / 2) w'Cw - mu'w
+    over the box-constrained simplex. mu = 0 gives minimum variance.
+    """
+    lipschitz = risk_aversion * _max_eigenvalue(cov) * 1.05
+    step = (1.0 / np.maximum(lipschitz, 1e-12))[:, None]
+    result = project_box_simplex(np.full(mu.shape, 1.0 / mu.shape[1]), lower, upper)
+    rows = np.arange(mu.shape[0])
+    w, y, momentum = result.copy(), result.copy(), np.ones((mu.shape[0], 1))
+    for _ in range(max_iter):
+        grad = risk_aversion * _bmv(cov, y) - mu
+        w_next = project_box_simplex(y - step * grad, lower, upper)
+        # Adaptive restart: drop momentum on rows where it points uphill
+        restart = np.einsum("bi,bi->b", y - w_next, w_next - w)[:, None] > 0
+        momentum = np.where(restart, 1.0, momentum)
+        next_momentum = 0.5 * (1.0 + np.sqrt(1.0 + 4.0 * momentum ** 2))
+        y = w_next + ((momentum - 1.0) / next_momentum) * (w_next - w)
+        converged = np.abs(w_next - w).max(axis=1) < tol
+        w, momentum = w_next, next_momentum
+        result[rows] = w
+        if converged.all():
+            break
+        # Drop finished rows once enough have converged to pay for the copy
+        if converged.sum() * 4 >= len(rows):
+            keep = ~converged
+            rows, w, y, momentum = rows[keep], w[keep], y[keep], momentum[keep]
+            mu, cov, step = mu[keep], cov[keep], step[keep]
+    return result
+
+
+def _solve_ratio(numerator: np.ndarray, cov: np.ndarray, lower: float, upper: float,
+                 max_iter: int, tol: float) -> np.ndarray:
+    """
+    Projected gradient ascent on r(w) = a'w / sqrt(w'Cw) with per-row
+    adaptive steps: a step is kept only where it improves r, otherwise that
+    row's step is halved. a = mu - rf gives max Sharpe, a = asset vols gives
+    max diversification.
+    """
+    w = project_box_simplex(np.full(numerator.shape, 1.0 / numerator.shape[1]), lower, upper)
+
+    def ratio(weights):
+        risk = np.sqrt(np.maximum(np.einsum("bi,bi->b", weights, _bmv(cov, weights)), 1e-300))
+        return np.einsum("bi,bi->b", numerator, weights) / risk, risk
+
+    value, risk = ratio(w)
+    scale = np.abs(numerator).max(axis=1)
+    step = (risk ** 2 / np.maximum(scale * risk, 1e-12))[:, None]
+    for _ in range(max_iter):
+        cov_w = _bmv(cov, w)
+        grad = numerator / risk[:, None] - (value / risk ** 2)[:, None] * cov_w
+        candidate = project_box_simplex(w + step * grad, lower, upper)
+        cand_value, cand_risk = ratio(candidate)
+        improved = cand_value > value
+        delta = np.where(improved[:, None], np.abs(candidate - w), 0.0).max()
+        w = np.where(improved[:, None], candidate, w)
+        value = np.where(improved, cand_value, value)
+        risk = np.where(improved, cand_risk, risk)
+        step = np.where(improved[:, None], step * 1.25, step * 0.5)
+        if (improved.any() and delta < tol) or step.max() < 1e-14:
+            break
+    return w
+
+
+def optimize_weights(mu: np.ndarray, cov: np.ndarray, method: str = "max_sharpe",
+                     risk_free_rate: float = 0.0, risk_aversion: float = 1.0,
+                     min_weight: float = 0.0, max_weight: float = 1.0,
+                     max_iter: int = 500, tol: float = 1e-6) -> np.ndarray:
+    """
+    Solve one or many portfolio problems.
+
+    Args:
+        mu: (N,) or (B, N) expected per-period returns
+        cov: (N, N) or (B, N, N) covariance matrices
+        method: One of PORTFOLIO_METHODS (or an alias in METHOD_ALIASES)
+        risk_free_rate: Per-period risk-free rate for max Sharpe
+        risk_aversion: Risk aversion for mean-variance
+        min_weight, max_weight: Box constraints (min_weight=0 is long-only)
+
+    Returns:
+        Weights with the same leading shape as ``mu``
+    """
+    method = METHOD_ALIASES.get(method, method)
+    if method not in PORTFOLIO_METHODS:
+        raise ValueError(f"Unknown portfolio method: {method}")
+    mu = np.asarray(mu, dtype=np.float64)
+    cov = np.asarray(cov, dtype=np.float64)
+    single = mu.ndim == 1
+    if single:
+        mu, cov = mu[None], cov[None]
+    n = mu.shape[1]
+    if n * min_weight > 1.0 + 1e-12 or n * max_weight < 1.0 - 1e-12:
+        raise ValueError(f"Box constraints [{min_weight}, {max_weight}] infeasible for {n} assets")
+
+    if method == "min_variance":
+        weights = _solve_quadratic(np.zeros_like(mu), cov, 1.0, min_weight, max_weight, max_iter, tol)
+    elif method == "mean_variance":
+        weights = _solve_quadratic(mu, cov, risk_aversion, min_weight, max_weight, max_iter, tol)
+    elif method == "max_sharpe":
+        weights = _solve_ratio(mu - risk_free_rate, cov, min_weight, max_weight, max_iter, tol)
+    else:
+        vols = np.sqrt(np.clip(np.diagonal(cov, axis1=1, axis2=2), 0.0, None))
+        weights = _solve_ratio(vols, cov, min_weight, max_weight, max_iter, tol)
+    return weights[0] if single else weights
+
+
+def portfolio_metrics(weights: np.ndarray, mu: np.ndarray, cov: np.ndarray,
+                      risk_free_rate: float = 0.0, periods_per_year: float = 365) -> Dict[str, np.ndarray]:
+    """Annualised expected return, volatility, Sharpe and diversification per rebalance."""
+    weights, mu, cov = np.atleast_2d(weights), np.atleast_2d(mu), np.asarray(cov)
+    if cov.ndim == 2:
+        cov = cov[None]
+    expected = np.einsum("bi,bi->b", weights, mu)
+    variance = np.einsum("bi,bi->b", weights, _bmv(cov, weights))
+    vol = np.sqrt(np.maximum(variance, 0.0))
+    asset_vols = np.sqrt(np.clip(np.diagonal(cov, axis1=1, axis2=2), 0.0, None))
+    weighted_vol = np.einsum("bi,bi->b", weights, asset_vols)
+    return {
+        "expected_return": expected * periods_per_year,
+        "volatility": vol * np.sqrt(periods_per_year),
+        "sharpe_ratio": np.divide((expected - risk_free_rate) * np.sqrt(periods_per_year), vol,
+                                  out=np.zeros_like(vol), where=vol > 0),
+        "diversification_ratio": np.divide(weighted_vol, vol, out=np.zeros_like(vol), where=vol > 0),
+        "effective_assets": 1.0 / np.maximum((weights ** 2).sum(axis=1), 1e-12),
+    }
+
+
+def optimize_rolling(returns: pd.DataFrame, method: str = "max_sharpe", window: int = 90,
+                     rebalance_every: int = 7, shrink: bool = True,
+                     risk_free_rate: float = 0.0, risk_aversion: float = 1.0,
+                     min_weight: float = 0.0, max_weight: float = 1.0,
+                     periods_per_year: float = 365) -> Dict[str, Any]:
+    """
+    Solve every rolling rebalance of a returns frame in one batched call.
+
+    Args:
+        returns: (T, N) per-period returns, columns are assets
+        window: Estimation window in rows
+        rebalance_every: Rows between rebalances
+        risk_free_rate: Annual risk-free rate
+
+    Returns:
+        Dict with a weights DataFrame (index = rebalance dates), a metrics
+        DataFrame and the shrinkage intensities
+    """
+    clean = returns.dropna(how="any")
+    per_period_rf = risk_free_rate / periods_per_year
+    idx, mu, cov, shrinkage = rolling_estimates(clean.values, window, rebalance_every, shrink)
+    weights = optimize_weights(mu, cov, method, per_period_rf, risk_aversion,
+                               min_weight, max_weight)
+    metrics = portfolio_metrics(weights, mu, cov, per_period_rf, periods_per_year)
+    dates = clean.index[idx]
+    return {
+        "weights": pd.DataFrame(weights, index=dates, columns=clean.columns),
+        "metrics": pd.DataFrame(metrics, index=dates),
+        "shrinkage": pd.Series(shrinkage, index=dates),
+    }
@@ -0,0 +1,555 @@
+"""
+Process-pool parameter sweep engine for the Optimize Agent.
+Runs grid, random, Bayesian (TPE-style) and successive-halving searches over a
+parameter grid. Candle arrays are placed in shared memory once and attached by
+each worker, so tasks only carry their parameter set.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from agents.backtest.vectorized import evaluate_strategy, PERIODS_PER_YEAR
+from common.backtest_cache import BacktestResultCache, backtest_cache_key, data_version
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+SEARCH_METHODS = ("grid", "random", "bayesian", "halving")
+
+# Worker-process state, populated by _init_worker
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_candles: Optional[np.ndarray] = None
+_worker_config: Dict[str, Any] = {}
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing block without letting this process unlink it on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers every attach with the resource tracker
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+def _init_worker(shm_name: str, shape: Tuple[int, int], config: Dict[str, Any]) -> None:
+    """Attach the shared candle block once per worker process."""
+    global _worker_shm, _worker_candles, _worker_config
+    _worker_shm = attach_shared_memory(shm_name)
+    _worker_candles = np.ndarray(shape, dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_config = config
+
+
+def _evaluate_in_worker(params: Dict[str, Any], n_bars: int) -> Dict[str, Any]:
+    """Score one parameter set on the most recent ``n_bars`` candles."""
+    close = _worker_candles[OHLCV_COLUMNS.index("close"), -n_bars:]
+    start = time.perf_counter()
+    metrics = evaluate_strategy(
+        _worker_config["strategy_type"], close, params,
+        fee_rate=_worker_config["fee_rate"],
+        periods_per_year=_worker_config["periods_per_year"],
+    )
+    return {"metrics": metrics, "duration": time.perf_counter() - start}
+
+
+@dataclass
+class SweepConfig:
+    """Configuration for a parameter sweep."""
+    strategy_type: str
+    param_grid: Dict[str, List]
+    method: str = "grid"
+    metric: str = "sharpe_ratio"
+    n_trials: int = 50
+    max_workers: Optional[int] = None
+    fee_rate: float = 0.001
+    timeframe: str = "1d"
+    early_stopping_rounds: Optional[int] = None
+    target_score: Optional[float] = None
+    max_duration: Optional[float] = None
+    halving_eta: int = 3
+    halving_min_bars: int = 100
+    checkpoint_path: Optional[str] = None
+    seed: Optional[int] = None
+    symbol: str = ""
+
+
+@dataclass
+class SweepResult:
+    """Outcome of a parameter sweep."""
+    best_params: Dict[str, Any]
+    best_score: float
+    best_metrics: Dict[str, float]
+    trials: List[Dict[str, Any]]
+    evaluated: int
+    resumed: int
+    stopped_early: bool
+    stop_reason: Optional[str]
+    duration: float
+    method: str
+    metric: str = "sharpe_ratio"
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+def param_key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def to_native(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class ParameterSweep:
+    """
+    Runs a parameter search for one strategy over one candle set.
+
+    Evaluations go to a ProcessPoolExecutor whose workers attach a shared
+    memory copy of the candles. Results stream back through an optional
+    progress callback; completed trials are checkpointed so an interrupted
+    sweep resumes without re-evaluating them, and with a result cache any
+    (parameters, candle window) pair seen by an earlier sweep is reused.
+    """
+
+    def __init__(self, candles: pd.DataFrame, config: SweepConfig,
+                 cache: Optional[BacktestResultCache] = None):
+        """
+        Initialize the sweep.
+
+        Args:
+            candles: DataFrame with open/high/low/close/volume columns
+            config: Sweep configuration
+            cache: Optional backtest result cache
+        """
+        if config.method not in SEARCH_METHODS:
+            raise ValueError(f"Unknown search method: {config.method}")
+        if not config.param_grid:
+            raise ValueError("param_grid is empty")
+        if candles is None or len(candles) < 2:
+            raise ValueError("At least two candles are required")
+        self.config = config
+        self.candles = np.ascontiguousarray(
+            candles[list(OHLCV_COLUMNS)].to_numpy(dtype=np.float64).T
+        )
+        self.n_bars = self.candles.shape[1]
+        self.max_workers = config.max_workers or os.cpu_count() or 1
+        self._rng = random.Random(config.seed)
+        self._trials: Dict[str, Dict[str, Any]] = {}
+        self._resumed = 0
+        self._best_key: Optional[str] = None
+        self._since_improvement = 0
+        self._stop_reason: Optional[str] = None
+        self._cancelled = False
+        self._started = 0.0
+        self.cache = cache
+        self._data_versions: Dict[int, str] = {}
+        self.cache_hits = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def cancel(self) -> None:
+        """Stop submitting new evaluations; in-flight ones are discarded."""
+        self._cancelled = True
+
+    async def run(self, progress_callback: Optional[Callable[[Dict[str, Any]], Any]] = None) -> SweepResult:
+        """Run the configured search and return the best parameters found."""
+        self._started = time.perf_counter()
+        self._load_checkpoint()
+
+        shm = shared_memory.SharedMemory(create=True, size=max(self.candles.nbytes, 1))
+        try:
+            np.ndarray(self.candles.shape, dtype=np.float64, buffer=shm.buf)[:] = self.candles
+            worker_config = {
+                "strategy_type": self.config.strategy_type,
+                "fee_rate": self.config.fee_rate,
+                "periods_per_year": PERIODS_PER_YEAR.get(self.config.timeframe, 365),
+            }
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(shm.name, self.candles.shape, worker_config),
+            ) as pool:
+                self._pool = pool
+                self._progress_callback = progress_callback
+                method = self.config.method
+                if method == "grid":
+                    await self._evaluate_batch(self._grid_candidates(), self.n_bars)
+                elif method == "random":
+                    remaining = max(0, self.config.n_trials - len(self._trials))
+                    await self._evaluate_batch(self._random_candidates(remaining), self.n_bars)
+                elif method == "bayesian":
+                    await self._run_bayesian()
+                elif method == "halving":
+                    await self._run_halving()
+        finally:
+            shm.close()
+            shm.unlink()
+            self._save_checkpoint()
+
+        return self._build_result()
+
+    # ------------------------------------------------------------------
+    # Candidate generation
+    # ------------------------------------------------------------------
+
+    def _grid_candidates(self) -> List[Dict[str, Any]]:
+        names = list(self.config.param_grid.keys())
+        return [
+            {name: to_native(value) for name, value in zip(names, combo)}
+            for combo in itertools.product(*(self.config.param_grid[n] for n in names))
+        ]
+
+    def _grid_size(self) -> int:
+        return math.prod(len(values) for values in self.config.param_grid.values())
+
+    def _random_candidates(self, count: int) -> List[Dict[str, Any]]:
+        """Sample distinct, not-yet-evaluated points from the grid."""
+        count = min(count, self._grid_size())
+        if count >= self._grid_size() // 2:
+            pool = [p for p in self._grid_candidates() if param_key(p) not in self._trials]
+            self._rng.shuffle(pool)
+            return pool[:count]
+        seen = set(self._trials)
+        candidates = []
+        while len(candidates) < count:
+            params = {name: to_native(self._rng.choice(values))
+                      for name, values in self.config.param_grid.items()}
+            key = param_key(params)
+            if key not in seen:
+                seen.add(key)
+                candidates.append(params)
+        return candidates
+
+    # ------------------------------------------------------------------
+    # Search strategies
+    # ------------------------------------------------------------------
+
+    async def _run_bayesian(self) -> None:
+        """
+        Tree-structured Parzen style search over the discrete grid: split
+        completed trials into good/bad by score quantile, then sample
+        candidates whose values are frequent among good trials and rare
+        among bad ones.
+        """
+        total = min(self.config.n_trials, self._grid_size())
+        startup = min(total, max(self.max_workers, 10))
+        await self._evaluate_batch(self._random_candidates(max(0, startup - len(self._trials))), self.n_bars)
+
+        while len(self._trials) < total and not self._should_stop():
+            batch_size = min(self.max_workers, total - len(self._trials))
+            candidates = self._tpe_candidates(batch_size)
+            if not candidates:
+                break
+            await self._evaluate_batch(candidates, self.n_bars)
+
+    def _tpe_candidates(self, count: int, samples: int = 64) -> List[Dict[str, Any]]:
+        scored = sorted(self._full_trials(), key=lambda t: t["score"], reverse=True)
+        n_good = max(1, int(len(scored) * 0.25))
+        good, bad = scored[:n_good], scored[n_good:]
+
+        def weights(name: str, values: List[Any], trials: List[Dict[str, Any]]) -> List[float]:
+            counts = {param_key({"v": v}): 1.0 for v in values}  # Laplace prior
+            for trial in trials:
+                counts[param_key({"v": trial["params"][name]})] += 1.0
+            total = sum(counts.values())
+            return [counts[param_key({"v": v})] / total for v in values]
+
+        grid = self.config.param_grid
+        good_w = {n: weights(n, grid[n], good) for n in grid}
+        bad_w = {n: weights(n, grid[n], bad) for n in grid}
+
+        seen = set(self._trials)
+        ranked = []
+        for _ in range(samples * count):
+            params, ratio = {}, 1.0
+            for name, values in grid.items():
+                i = self._rng.choices(range(len(values)), weights=good_w[name])[0]
+                params[name] = to_native(values[i])
+                ratio *= good_w[name][i] / bad_w[name][i]
+            key = param_key(params)
+            if key not in seen:
+                seen.add(key)
+                ranked.append((ratio, params))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        return [params for _, params in ranked[:count]]
+
+    async def _run_halving(self) -> None:
+        """
+        Successive halving: evaluate many configs on a short recent window,
+        keep the top 1/eta, and re-evaluate survivors on eta times more bars
+        until the full history is reached.
+        """
+        eta = max(2, self.config.halving_eta)
+        candidates = self._random_candidates(self.config.n_trials) if self.config.n_trials < self._grid_size() \
+            else self._grid_candidates()
+        min_bars = min(self.n_bars, self.config.halving_min_bars)
+        rungs = max(1, int(math.floor(math.log(self.n_bars / min_bars, eta))) + 1) if min_bars else 1
+        rung_log = []
+
+        for rung in range(rungs):
+            n_bars = self.n_bars if rung == rungs - 1 else int(min_bars * eta ** rung)
+            results = await self._evaluate_batch(candidates, n_bars, final=(n_bars == self.n_bars))
+            rung_log.append({"rung": rung, "bars": n_bars, "configs": len(candidates)})
+            if n_bars == self.n_bars or self._should_stop():
+                break
+            results.sort(key=lambda r: r["score"], reverse=True)
+            keep = max(1, len(results) // eta)
+            candidates = [r["params"] for r in results[:keep]]
+        self._halving_rungs = rung_log
+
+    # ------------------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------------------
+
+    def _score(self, metrics: Dict[str, float]) -> float:
+        # All metrics are maximised; drawdowns are negative fractions
+        value = metrics.get(self.config.metric, float("-inf"))
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return float("-inf")
+        return value
+
+    async def _evaluate_batch(self, candidates: List[Dict[str, Any]], n_bars: int,
+                              final: bool = True) -> List[Dict[str, Any]]:
+        """
+        Evaluate candidates with at most 2x max_workers tasks in flight so
+        early stopping can take effect without draining a huge queue.
+        """
+        results: List[Dict[str, Any]] = []
+        pending_params = iter(candidates)
+        in_flight: Dict[asyncio.Future, Dict[str, Any]] = {}
+        limit = self.max_workers * 2
+        cached = await self._cached_outcomes(candidates, n_bars)
+        completed_from_cache: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+
+        def submit_more() -> None:
+            while len(in_flight) < limit and not self._should_stop():
+                params = next(pending_params, None)
+                if params is None:
+                    return
+                key = param_key(params)
+                if final and key in self._trials:
+                    results.append(self._trials[key])
+                    continue
+                if key in cached:
+                    completed_from_cache.append((params, cached[key]))
+                    continue
+                future = asyncio.ensure_future(self._evaluate(params, n_bars))
+                in_flight[future] = params
+
+        async def complete(params: Dict[str, Any], outcome: Dict[str, Any]) -> None:
+            trial = {
+                "params": params,
+                "metrics": outcome["metrics"],
+                "score": self._score(outcome["metrics"]),
+                "bars": n_bars,
+                "duration": outcome["duration"],
+            }
+            results.append(trial)
+            if final:
+                self._record(trial)
+            await self._report(trial, final)
+
+        submit_more()
+        while in_flight or completed_from_cache:
+            while completed_from_cache:
+                self.cache_hits += 1
+                await complete(*completed_from_cache.pop())
+            if not in_flight:
+                if self._should_stop():
+                    break
+                submit_more()
+                continue
+            done, _ = await asyncio.wait(in_flight.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                params = in_flight.pop(future)
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    logger.warning(f"Evaluation failed for {params}: {e}")
+                    continue
+                await complete(params, outcome)
+            if self._should_stop():
+                for future in in_flight:
+                    future.cancel()
+                break
+            submit_more()
+        return results
+
+    def _cache_key(self, params: Dict[str, Any], n_bars: int) -> str:
+        version = self._data_versions.get(n_bars)
+        if version is None:
+            version = data_version(self.candles[:, -n_bars:])
+            self._data_versions[n_bars] = version
+        return backtest_cache_key(
+            self.config.strategy_type, params, self.config.symbol, self.config.timeframe,
+            data_version=version,
+            settings={"engine": "vectorized_sweep", "fee_rate": self.config.fee_rate},
+        )
+
+    async def _cached_outcomes(self, candidates: List[Dict[str, Any]], n_bars: int) -> Dict[str, Dict[str, Any]]:
+        """Outcomes already in the result cache, keyed by parameter key."""
+        if self.cache is None or not candidates:
+            return {}
+        keys = {self._cache_key(params, n_bars): param_key(params) for params in candidates}
+        found = await self.cache.aget_many(list(keys))
+        return {keys[key]: value for key, value in found.items()}
+
+    async def _evaluate(self, params: Dict[str, Any], n_bars: int) -> Dict[str, Any]:
+        """
+        Evaluate one candidate in the worker pool. With a cache, a sweep
+        evaluating the same candidate on the same data at the same time
+        shares this evaluation instead of running its own.
+        """
+        loop = asyncio.get_running_loop()
+
+        def compute():
+            return loop.run_in_executor(self._pool, _evaluate_in_worker, params, n_bars)
+
+        if self.cache is None:
+            return await compute()
+        # _cached_outcomes already checked the persistent tier for the whole batch
+        return await self.cache.get_or_compute(self._cache_key(params, n_bars), compute, {
+            "strategy_type": self.config.strategy_type,
+            "symbol": self.config.symbol,
+            "parameters": params,
+        }, persistent_lookup=False)
+
+    def _record(self, trial: Dict[str, Any]) -> None:
+        key = param_key(trial["params"])
+        self._trials[key] = trial
+        best = self._trials.get(self._best_key) if self._best_key else None
+        if best is None or trial["score"] > best["score"]:
+            self._best_key = key
+            self._since_improvement = 0
+        else:
+            self._since_improvement += 1
+        if len(self._trials) % max(1, self.max_workers * 4) == 0:
+            self._save_checkpoint()
+
+    async def _report(self, trial: Dict[str, Any], final: bool) -> None:
+        if not self._progress_callback:
+            return
+        best = self._trials.get(self._best_key) if self._best_key else None
+        update = {
+            "evaluated": len(self._trials),
+            "trial": trial,
+            "final_budget": final,
+            "best_params": best["params"] if best else None,
+            "best_score": best["score"] if best else None,
+            "elapsed": time.perf_counter() - self._started,
+        }
+        try:
+            outcome = self._progress_callback(update)
+            if asyncio.iscoroutine(outcome):
+                await outcome
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
+
+    def _should_stop(self) -> bool:
+        if self._stop_reason:
+            return True
+        cfg = self.config
+        best = self._trials.get(self._best_key) if self._best_key else None
+        if self._cancelled:
+            self._stop_reason = "cancelled"
+        elif cfg.target_score is not None and best and best["score"] >= cfg.target_score:
+            self._stop_reason = "target_score_reached"
+        elif cfg.early_stopping_rounds and self._since_improvement >= cfg.early_stopping_rounds:
+            self._stop_reason = "no_improvement"
+        elif cfg.max_duration and time.perf_counter() - self._started > cfg.max_duration:
+            self._stop_reason = "max_duration"
+        return self._stop_reason is not None
+
+    def _full_trials(self) -> List[Dict[str, Any]]:
+        return list(self._trials.values())
+
+    # ------------------------------------------------------------------
+    # Checkpointing
+    # ------------------------------------------------------------------
+
+    def _checkpoint_fingerprint(self) -> str:
+        # Trials from another grid or search method can't be resumed (TPE looks up grid values)
+        return param_key({
+            "strategy_type": self.config.strategy_type,
+            "method": self.config.method,
+            "param_grid": self.config.param_grid,
+            "metric": self.config.metric,
+            "fee_rate": self.config.fee_rate,
+            "n_bars": self.n_bars,
+            "last_close": float(self.candles[OHLCV_COLUMNS.index("close"), -1]) if self.n_bars else None,
+        })
+
+    def _load_checkpoint(self) -> None:
+        path = self.config.checkpoint_path
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("fingerprint") != self._checkpoint_fingerprint():
+                logger.info(f"Ignoring checkpoint {path}: candles, grid or settings changed")
+                return
+            for trial in data.get("trials", []):
+                self._record(trial)
+            self._resumed = len(self._trials)
+            self._since_improvement = 0
+            logger.info(f"Resumed sweep from {path} with {self._resumed} completed trials")
+        except Exception as e:
+            logger.warning(f"Failed to load sweep checkpoint {path}: {e}")
+
+    def _save_checkpoint(self) -> None:
+        path = self.config.checkpoint_path
+        if not path:
+            return
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({
+                    "fingerprint": self._checkpoint_fingerprint(),
+                    "saved_at": time.time(),
+                    "trials": self._full_trials(),
+                }, f, default=str)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to save sweep checkpoint {path}: {e}")
+
+    # ------------------------------------------------------------------
+
+    def _build_result(self) -> SweepResult:
+        best = self._trials.get(self._best_key) if self._best_key else None
+        trials = sorted(self._full_trials(), key=lambda t: t["score"], reverse=True)
+        extra = {"grid_size": self._grid_size(), "workers": self.max_workers, "cache_hits": self.cache_hits}
+        if getattr(self, "_halving_rungs", None):
+            extra["halving_rungs"] = self._halving_rungs
+        return SweepResult(
+            best_params=best["params"] if best else {},
+            best_score=best["score"] if best else float("-inf"),
+            best_metrics=best["metrics"] if best else {},
+            trials=trials,
+            evaluated=len(self._trials) - self._resumed,
+            resumed=self._resumed,
+            stopped_early=self._stop_reason is not None,
+            stop_reason=self._stop_reason,
+            duration=time.perf_counter() - self._started,
+            method=self.config.method,
+            metric=self.config.metric,
+            extra=extra,
+        )
@@ -81,6 +81,9 @@ async def lifespan(app: FastAPI):
     # Startup
     try:
         await service.start()
+        # Let the Meta Agent call these endpoints over the agent's WebSocket
+        if service.agent and service.agent.ws_client:
+            await service.agent.ws_client.serve_rpc(app)
     except Exception as e:
         logger.error(f"Failed to start service in lifespan: {e}")
     yield
@@ -10,7 +10,7 @@ import sys
 import os
 import logging
 from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime
+from datetime import datetime, timedelta
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
@@ -24,11 +24,13 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from agents.agentic_framework.agent_templates import SignalAgent
 from agents.agentic_framework.mcp_tools import AnalysisTools, MCPToolRegistry
 from common.vault import get_vault_client, get_agent_config
-from common.db import get_db_client
+from common.db import get_db_client, get_session
 from common.logging import get_logger
-from common.models import Signal, PriceData, Strategy, Trade
+from common.models import Signal, PriceData, Strategy, Trade, NewsArticle
 from common.openai_client import get_openai_client
 from common.websocket_client import AgentWebSocketClient
+from agents.news_sentiment.aggregates import SentimentAggregates
+from agents.news_sentiment.matching import symbol_matcher, base_asset, ASSET_NAMES
 
 logger = get_logger("agentic_signal")
 
@@ -115,6 +117,13 @@ class AgenticSignalAgent(SignalAgent):
         # Technical analysis
         self.technical_indicators = TechnicalIndicators()
         
+        # Rolling news sentiment, read incrementally from news_articles
+        self.news_sentiment = SentimentAggregates()
+        self.news_symbols = list(ASSET_NAMES)
+        self.news_lookback_hours = 24
+        self._news_last_id = 0
+        self._news_lock = asyncio.Lock()  # One load at a time; loads mutate the series and _news_last_id
+        
         # AutoGen agent capabilities
         self.autogen_agent = self.get_agent()  # Get the AutoGen agent instance
         
@@ -418,6 +427,7 @@ class AgenticSignalAgent(SignalAgent):
                 
             # Extract features
             features = self._extract_features(price_data)
+            features.update(await self._get_news_features(symbol))
             
             # Use MCP ML tools
             ml_prediction = self.analysis_tools.predict_signal(features)
@@ -852,6 +862,44 @@ class AgenticSignalAgent(SignalAgent):
             logger.error(f"Error getting price data for {symbol}: {e}")
             return []
             
+    async def _get_news_features(self, symbol: str) -> Dict[str, float]:
+        """Numeric news sentiment features for ``symbol`` from the rolling sentiment series."""
+        try:
+            async with self._news_lock:
+                if base_asset(symbol) not in self.news_symbols:
+                    # New symbol: rebuild the series so already-loaded articles are matched too
+                    self.news_symbols.append(base_asset(symbol))
+                    self.news_sentiment = SentimentAggregates()
+                    self._news_last_id = 0
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self._load_news_sentiment)
+        except Exception as e:
+            logger.error(f"Error loading news sentiment for {symbol}: {e}")
+        return self.news_sentiment.features(symbol)
+        
+    def _load_news_sentiment(self, batch_size: int = 5000):
+        """Fold news articles stored since the last call into the sentiment series."""
+        matcher = symbol_matcher(self.news_symbols)
+        cutoff = datetime.utcnow() - timedelta(hours=self.news_lookback_hours)
+        with get_session() as session:
+            while True:
+                rows = session.query(
+                    NewsArticle.id, NewsArticle.title, NewsArticle.content, NewsArticle.published_at,
+                    NewsArticle.sentiment_score, NewsArticle.impact_score
+                ).filter(
+                    NewsArticle.id > self._news_last_id,
+                    NewsArticle.published_at > cutoff
+                ).order_by(NewsArticle.id).limit(batch_size).all()
+                for row in rows:
+                    self.news_sentiment.add(
+                        row.published_at, row.sentiment_score or 0.0, row.impact_score or 0.0,
+                        symbols=matcher.symbols_in(f"{row.title} {row.content or ''}")
+                    )
+                if rows:
+                    self._news_last_id = rows[-1].id
+                if len(rows) < batch_size:
+                    break
+            
     async def _load_models(self):
         """Load existing ML models."""
         
@@ -927,6 +975,7 @@ class AgenticSignalAgent(SignalAgent):
                     "size": len(self.signal_cache),
                     "ttl_seconds": self.cache_ttl
                 },
+                "news_sentiment": self.news_sentiment.get_stats(),
                 "timestamp": datetime.now().isoformat()
             }
             
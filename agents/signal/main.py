@@ -35,6 +35,9 @@ async def lifespan(app: FastAPI):
     start_time = datetime.now()
     signal_service = AgenticSignalService()
     await signal_service.start()
+    # Let the Meta Agent call these endpoints over the agent's WebSocket
+    if signal_service.agent.ws_client:
+        await signal_service.agent.ws_client.serve_rpc(app)
     yield
     # Shutdown
     if signal_service:
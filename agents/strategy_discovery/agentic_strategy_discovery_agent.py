@@ -21,10 +21,18 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from common.db import DatabaseClient, get_session
-from common.models import Strategy, PriceData, Signal, Backtest, PerformanceMetrics, ProductionStrategy
+from common.exchange_pool import get_exchange_pool
+from common.backtest_cache import get_backtest_cache, backtest_cache_key, data_version
+from common.backtest_store import save_backtest
+from common.models import Strategy, PriceData, Signal, PerformanceMetrics, ProductionStrategy
 from common.vault import get_exchange_credentials, get_vault_client
 from agents.agentic_framework.agent_templates import BaseAgent, AgentConfig
 from agents.agentic_framework.mcp_tools import MCPTool, MCPToolRegistry
+from agents.strategy_discovery.correlation import EWCorrelationMatrix, bar_duration
+from agents.strategy_discovery.patterns import (
+    add_pattern_features, summarize_candlestick_patterns, support_resistance_levels
+)
+from agents.strategy_discovery.robustness import robustness_report, DEFAULT_RESAMPLES
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -53,11 +61,17 @@ class StrategyDiscoveryTools:
                         "explain_performance_metrics": self.explain_performance_metrics,
                         "generate_user_summary": self.generate_user_summary,
                         "evaluate_strategy_for_promotion": self.evaluate_strategy_for_promotion,
+                        "run_robustness_tests": self.run_robustness_tests,
                         "promote_strategy_to_production": self.promote_strategy_to_production,
                         "manage_strategy_lifecycle": self.manage_strategy_lifecycle,
                         "monitor_strategy_performance": self.monitor_strategy_performance,
                         "deactivate_strategy": self.deactivate_strategy,
         }
+        
+        # In-memory EW correlation matrices per timeframe
+        self.correlation_matrices: Dict[str, EWCorrelationMatrix] = {}
+        self.max_concurrent_loads = 8
+        self.backtest_cache = get_backtest_cache()
     
     async def analyze_market_patterns(self, symbol: str, timeframe: str = "1d", lookback_days: int = 365) -> Dict[str, Any]:
         """Analyze market patterns for a given symbol."""
@@ -97,11 +111,14 @@ class StrategyDiscoveryTools:
     
     async def _get_historical_data_from_db(self, symbol: str, timeframe: str, lookback_days: int) -> Optional[pd.DataFrame]:
         """Get historical data from database."""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=lookback_days)
+        return self._query_historical_data(symbol, timeframe, start_date, end_date)
+    
+    def _query_historical_data(self, symbol: str, timeframe: str, start_date: datetime, end_date: datetime) -> Optional[pd.DataFrame]:
+        """Query historical data from database (blocking)."""
         try:
             with get_session() as session:
-                end_date = datetime.now()
-                start_date = end_date - timedelta(days=lookback_days)
-                
                 price_data = session.query(PriceData).filter(
                     PriceData.symbol == symbol,
                     PriceData.timeframe == timeframe,
@@ -135,20 +152,10 @@ class StrategyDiscoveryTools:
             credentials = get_exchange_credentials("binance")
             
             if credentials:
-                # Initialize Binance US exchange with authenticated API
                 logger.info(f"Using authenticated Binance US API for {symbol}")
-                exchange = ccxt.binanceus({
-                    'apiKey': credentials.get('api_key'),
-                    'secret': credentials.get('secret_key'),
-                    'sandbox': False,  # Use live data
-                    'enableRateLimit': True,
-                })
             else:
                 # Use public Binance US API (no authentication required)
                 logger.info(f"Using public Binance US API for {symbol} (no credentials)")
-                exchange = ccxt.binanceus({
-                    'enableRateLimit': True,
-                })
             
             # Convert timeframe to Binance format
             timeframe_map = {
@@ -162,7 +169,9 @@ class StrategyDiscoveryTools:
             start_time = int((datetime.now() - timedelta(days=lookback_days)).timestamp() * 1000)
             
             # Fetch OHLCV data
-            ohlcv = exchange.fetch_ohlcv(symbol, binance_timeframe, start_time, limit=1000)
+            ohlcv = await get_exchange_pool().fetch_ohlcv(
+                'binanceus', symbol, binance_timeframe, start_time, limit=1000, credentials=credentials
+            )
             
             if not ohlcv:
                 logger.error(f"No data returned from Binance US for {symbol}")
@@ -388,56 +397,12 @@ class StrategyDiscoveryTools:
         }
     
     def _calculate_support_resistance(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Calculate support and resistance levels."""
-        # Simple support/resistance calculation
-        recent_highs = df['high'].tail(20).nlargest(3)
-        recent_lows = df['low'].tail(20).nsmallest(3)
-        
-        resistance_levels = recent_highs.tolist()
-        support_levels = recent_lows.tolist()
-        
-        current_price = df['close'].iloc[-1]
-        
-        nearest_resistance = min([r for r in resistance_levels if r > current_price], default=None)
-        nearest_support = max([s for s in support_levels if s < current_price], default=None)
-        
-        return {
-            "resistance_levels": resistance_levels,
-            "support_levels": support_levels,
-            "nearest_resistance": float(nearest_resistance) if nearest_resistance else None,
-            "nearest_support": float(nearest_support) if nearest_support else None,
-            "current_price": float(current_price)
-        }
+        """Calculate clustered support and resistance levels from swing pivots."""
+        return support_resistance_levels(df)
     
     def _calculate_candlestick_patterns(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Calculate candlestick patterns."""
-        patterns = []
-        
-        for i in range(len(df) - 1):
-            current = df.iloc[i]
-            previous = df.iloc[i-1] if i > 0 else None
-            
-            # Doji pattern
-            body_size = abs(current['close'] - current['open'])
-            total_range = current['high'] - current['low']
-            
-            if body_size / total_range < 0.1:
-                patterns.append("doji")
-            
-            # Hammer pattern
-            if (current['close'] > current['open'] and 
-                (current['high'] - current['close']) / (current['close'] - current['open']) < 0.3):
-                patterns.append("hammer")
-            
-            # Shooting star pattern
-            if (current['close'] < current['open'] and 
-                (current['open'] - current['low']) / (current['open'] - current['close']) < 0.3):
-                patterns.append("shooting_star")
-        
-        return {
-            "patterns_found": list(set(patterns)),
-            "pattern_count": len(patterns)
-        }
+        return summarize_candlestick_patterns(df)
     
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
         """Calculate RSI indicator."""
@@ -638,45 +603,39 @@ class StrategyDiscoveryTools:
     async def analyze_cross_asset_correlations(self, symbols: List[str], timeframe: str = "1d", lookback_days: int = 90) -> Dict[str, Any]:
         """Analyze cross-asset correlations."""
         try:
-            correlation_data = {}
-            price_data = {}
-            
-            # Fetch data for all symbols
-            for symbol in symbols:
-                df = await self._get_historical_data_from_db(symbol, timeframe, lookback_days)
-                if df is None or df.empty:
-                    df = await self._fetch_historical_data_from_binance(symbol, timeframe, lookback_days)
-                    if df is not None and not df.empty:
-                        await self._store_historical_data_to_db(symbol, timeframe, df)
-                
-                if df is not None and not df.empty:
-                    # Calculate returns
-                    df['returns'] = df['close'].pct_change()
-                    price_data[symbol] = df['returns'].dropna()
-            
-            if len(price_data) < 2:
+            matrix = self.correlation_matrices.setdefault(timeframe, EWCorrelationMatrix())
+            
+            # Bring every tracked symbol up to date, then load only symbols the matrix has not seen yet
+            await self._refresh_correlation_matrix(matrix, timeframe)
+            missing = [symbol for symbol in symbols if symbol not in matrix]
+            if missing:
+                closes = await self._load_symbol_closes(missing, timeframe, lookback_days)
+                if closes:
+                    matrix.seed(pd.DataFrame(closes))
+            
+            tracked = [symbol for symbol in symbols if symbol in matrix]
+            if len(tracked) < 2:
                 return {
                     "symbols": symbols,
                     "correlation_matrix": {},
                     "insights": ["Insufficient data for correlation analysis"]
                 }
             
-            # Create correlation matrix
-            returns_df = pd.DataFrame(price_data)
-            correlation_matrix = returns_df.corr()
+            # Serve the requested subset from the in-memory matrix
+            correlation_matrix = matrix.correlation(tracked)
             
             # Find high correlations
             high_correlations = []
-            for i in range(len(correlation_matrix.columns)):
-                for j in range(i+1, len(correlation_matrix.columns)):
-                    corr_value = correlation_matrix.iloc[i, j]
-                    if abs(corr_value) > 0.7:
-                        high_correlations.append({
-                            "symbol1": correlation_matrix.columns[i],
-                            "symbol2": correlation_matrix.columns[j],
-                            "correlation": float(corr_value),
-                            "type": "high_positive" if corr_value > 0 else "high_negative"
-                        })
+            rows, cols = np.triu_indices(len(tracked), k=1)
+            upper = correlation_matrix.values[rows, cols]
+            for k in np.nonzero(np.abs(upper) > 0.7)[0]:
+                corr_value = upper[k]
+                high_correlations.append({
+                    "symbol1": tracked[rows[k]],
+                    "symbol2": tracked[cols[k]],
+                    "correlation": float(corr_value),
+                    "type": "high_positive" if corr_value > 0 else "high_negative"
+                })
             
             # Generate insights
             insights = []
@@ -695,7 +654,8 @@ class StrategyDiscoveryTools:
                 "high_correlations": high_correlations,
                 "average_correlation": float(avg_correlation),
                 "insights": insights,
-                "data_points": len(returns_df)
+                "data_points": matrix.get_stats()["history_bars"],
+                "matrix_stats": matrix.get_stats()
             }
             
         except Exception as e:
@@ -706,6 +666,52 @@ class StrategyDiscoveryTools:
                 "insights": [f"Error: {str(e)}"]
             }
     
+    async def _load_symbol_closes(self, symbols: List[str], timeframe: str, lookback_days: int,
+                                  since: Optional[datetime] = None) -> Dict[str, pd.Series]:
+        """Load close series for many symbols concurrently with bounded parallelism."""
+        semaphore = asyncio.Semaphore(self.max_concurrent_loads)
+        loop = asyncio.get_event_loop()
+        end_date = datetime.now()
+        start_date = since or end_date - timedelta(days=lookback_days)
+        
+        async def load(symbol: str) -> Optional[pd.Series]:
+            async with semaphore:
+                df = await loop.run_in_executor(
+                    None, self._query_historical_data, symbol, timeframe, start_date, end_date
+                )
+                if (df is None or df.empty) and since is None:
+                    df = await self._fetch_historical_data_from_binance(symbol, timeframe, lookback_days)
+                    if df is not None and not df.empty:
+                        await self._store_historical_data_to_db(symbol, timeframe, df)
+                if df is None or df.empty:
+                    return None
+                return df.set_index('time')['close'].astype(float)
+        
+        results = await asyncio.gather(*(load(symbol) for symbol in symbols), return_exceptions=True)
+        closes = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to load price data for {symbol}: {result}")
+            elif result is not None:
+                closes[symbol] = result
+        return closes
+    
+    async def _refresh_correlation_matrix(self, matrix: EWCorrelationMatrix, timeframe: str) -> None:
+        """Apply bars that closed since each tracked symbol was last updated."""
+        since = matrix.oldest_bar_time()
+        if since is None:
+            return
+        if datetime.now() - since < bar_duration(timeframe):
+            return
+        
+        # Refresh every tracked symbol so none of them falls behind the others
+        closes = await self._load_symbol_closes(matrix.symbols, timeframe, 0, since=since)
+        if not closes:
+            return
+        new_bars = pd.DataFrame(closes).sort_index()
+        for bar_time, row in new_bars[new_bars.index > since].iterrows():
+            matrix.update(bar_time, row.dropna().to_dict())
+    
     async def detect_market_regimes(self, symbol: str) -> Dict[str, Any]:
         """Detect market regimes."""
         # Placeholder implementation
@@ -828,35 +834,22 @@ class StrategyDiscoveryTools:
             if exchange == "binance":
                 # Test with Binance US (authenticated API)
                 logger.info("Testing Binance US authenticated API connection")
-                test_exchange = ccxt.binanceus({
-                    'apiKey': credentials.get('api_key'),
-                    'secret': credentials.get('secret_key'),
-                    'sandbox': False,
-                    'enableRateLimit': True,
-                })
+                exchange_id = "binanceus"
             else:
                 # Generic test for other exchanges
-                exchange_class = getattr(ccxt, exchange, None)
-                if not exchange_class:
+                if not hasattr(ccxt, exchange):
                     return {
                         "status": "error",
                         "exchange": exchange,
                         "message": f"Unsupported exchange: {exchange}"
                     }
-                
-                test_exchange = exchange_class({
-                    'apiKey': credentials.get('api_key'),
-                    'secret': credentials.get('secret_key'),
-                    'enableRateLimit': True,
-                })
+                exchange_id = exchange
             
             # Test basic API call
             try:
                 # Try to fetch ticker for a common symbol
-                if exchange == "binance":
-                    ticker = test_exchange.fetch_ticker("BTC/USD")
-                else:
-                    ticker = test_exchange.fetch_ticker("BTC/USDT")
+                test_symbol = "BTC/USD" if exchange == "binance" else "BTC/USDT"
+                ticker = await get_exchange_pool().fetch_ticker(exchange_id, test_symbol, credentials=credentials)
                 
                 return {
                     "status": "success",
@@ -883,7 +876,31 @@ class StrategyDiscoveryTools:
             }
     
     async def _run_strategy_backtest(self, strategy: Dict[str, Any], df: pd.DataFrame) -> Dict[str, Any]:
-        """Run backtest simulation for a strategy."""
+        """Run backtest simulation for a strategy, reusing the cached result for the same data."""
+        key = backtest_cache_key(
+            strategy.get("type", "trend_following"),
+            strategy.get("parameters", {}),
+            strategy.get("symbol", ""),
+            strategy.get("timeframe", ""),
+            start=df['time'].iloc[0] if len(df) else None,
+            end=df['time'].iloc[-1] if len(df) else None,
+            data_version=data_version(df[['open', 'high', 'low', 'close']], df['time']),
+            settings={"engine": "discovery_sandbox", "initial_capital": 10000},
+        )
+        # Concurrent discoveries of the same strategy share one simulation
+        return await self.backtest_cache.get_or_compute(
+            key,
+            lambda: self._simulate_strategy_backtest(strategy, df),
+            {
+                "strategy_type": strategy.get("type", "trend_following"),
+                "symbol": strategy.get("symbol", ""),
+                "parameters": strategy.get("parameters", {})
+            },
+            should_cache=lambda results: "error" not in results
+        )
+    
+    async def _simulate_strategy_backtest(self, strategy: Dict[str, Any], df: pd.DataFrame) -> Dict[str, Any]:
+        """Simulate a long-only strategy bar by bar."""
         try:
             strategy_type = strategy.get("type", "trend_following")
             parameters = strategy.get("parameters", {})
@@ -980,6 +997,9 @@ class StrategyDiscoveryTools:
             df['bb_upper'] = df['sma_20'] + (df['close'].rolling(window=20).std() * 2)
             df['bb_lower'] = df['sma_20'] - (df['close'].rolling(window=20).std() * 2)
             
+            # Per-bar candlestick and confirmed pivot features
+            df = add_pattern_features(df)
+            
             return df
             
         except Exception as e:
@@ -1098,38 +1118,30 @@ class StrategyDiscoveryTools:
                 "max_drawdown": 0.0
             }
     
-    async def _store_sandbox_results(self, sandbox_id: str, strategy: Dict[str, Any], backtest_results: Dict[str, Any], performance_metrics: Dict[str, Any]) -> bool:
-        """Store sandbox test results in database."""
+    async def _store_sandbox_results(self, sandbox_id: str, strategy: Dict[str, Any], backtest_results: Dict[str, Any],
+                                     performance_metrics: Dict[str, Any], start_date: Optional[datetime] = None,
+                                     end_date: Optional[datetime] = None) -> bool:
+        """Store sandbox test results in database; trades go to backtest_trades, not the summary row."""
         try:
-            with get_session() as session:
-                # Create sandbox record
-                sandbox_record = Backtest(
-                    id=sandbox_id,
-                    strategy_name=strategy.get("name", "unknown"),
-                    symbol=strategy.get("symbol", "unknown"),
-                    timeframe=strategy.get("timeframe", "1d"),
-                    start_time=datetime.now(),
-                    end_time=datetime.now(),
-                    initial_capital=backtest_results.get("initial_capital", 0),
-                    final_capital=backtest_results.get("final_capital", 0),
-                    total_return=backtest_results.get("total_return", 0),
-                    total_trades=performance_metrics.get("total_trades", 0),
-                    win_rate=performance_metrics.get("win_rate", 0),
-                    max_drawdown=performance_metrics.get("max_drawdown", 0),
-                    sharpe_ratio=performance_metrics.get("sharpe_ratio", 0),
-                    status="completed",
-                    metadata={
-                        "strategy": strategy,
-                        "backtest_results": backtest_results,
-                        "performance_metrics": performance_metrics
-                    }
-                )
-                
-                session.add(sandbox_record)
-                session.commit()
-                
-                logger.info(f"Stored sandbox results for {sandbox_id}")
-                return True
+            summary = {key: value for key, value in backtest_results.items() if key != "trades"}
+            loop = asyncio.get_running_loop()
+            backtest_id = await loop.run_in_executor(None, lambda: save_backtest(
+                name=f"{sandbox_id}:{strategy.get('name', 'unknown')}",
+                start_date=start_date,
+                end_date=end_date,
+                results={
+                    "sandbox_id": sandbox_id,
+                    "timeframe": strategy.get("timeframe", "1d"),
+                    "backtest_results": summary,
+                    "performance_metrics": performance_metrics
+                },
+                trades=backtest_results.get("trades", []),
+                symbols=[strategy.get("symbol", "unknown")],
+                parameters=strategy.get("parameters", {})
+            ))
+            
+            logger.info(f"Stored sandbox results for {sandbox_id} as backtest {backtest_id}")
+            return True
                 
         except Exception as e:
             logger.error(f"Error storing sandbox results: {e}")
@@ -1504,7 +1516,11 @@ class StrategyDiscoveryTools:
                 "max_drawdown": 20.0,          # Maximum 20% drawdown
                 "min_trades": 5,               # Minimum 5 trades
                 "min_sharpe_ratio": 0.5,       # Minimum Sharpe ratio
-                "min_profit": 1000.0           # Minimum $1000 profit
+                "min_profit": 1000.0,          # Minimum $1000 profit
+                # Robustness gates, applied when sandbox results include robustness tests
+                "min_oos_sharpe_lower": 0.0,   # Bootstrap lower bound of out-of-sample Sharpe
+                "min_mc_return_lower": 0.0,    # Monte Carlo lower bound of total return
+                "min_walk_forward_efficiency": 0.3  # Out-of-sample / in-sample score
             }
             
             # Extract metrics
@@ -1564,9 +1580,30 @@ class StrategyDiscoveryTools:
                     total_score += data["weight"]
                     passed_criteria += 1
             
+            # Robustness gates must all pass on top of the weighted score; missing,
+            # failed or inconclusive robustness tests block promotion
+            robustness = sandbox_results.get("robustness") or {}
+            if robustness.get("status") == "success":
+                robustness_gates = self._robustness_gates(robustness, promotion_criteria)
+                if not robustness_gates:
+                    robustness_gates["robustness_tests"] = {
+                        "status": "inconclusive",
+                        "message": "No robustness gate could be evaluated",
+                        "passed": False
+                    }
+            else:
+                robustness_gates = {
+                    "robustness_tests": {
+                        "status": robustness.get("status", "missing"),
+                        "message": robustness.get("message", "Robustness tests were not run"),
+                        "passed": False
+                    }
+                }
+            robustness_passed = all(gate["passed"] for gate in robustness_gates.values())
+            
             # Determine promotion status
             promotion_threshold = 0.75  # 75% of criteria must pass
-            eligible_for_promotion = total_score >= promotion_threshold
+            eligible_for_promotion = total_score >= promotion_threshold and robustness_passed
             
             # Generate promotion recommendation
             if eligible_for_promotion:
@@ -1584,6 +1621,8 @@ class StrategyDiscoveryTools:
                 "total_criteria": len(evaluation),
                 "promotion_threshold": promotion_threshold,
                 "evaluation": evaluation,
+                "robustness_gates": robustness_gates,
+                "robustness_passed": robustness_passed,
                 "recommendation": recommendation,
                 "risk_level": risk_level,
                 "promotion_criteria": promotion_criteria
@@ -1596,6 +1635,69 @@ class StrategyDiscoveryTools:
                 "message": str(e)
             }
     
+    def _robustness_gates(self, robustness: Dict[str, Any], criteria: Dict[str, Any]) -> Dict[str, Any]:
+        """Pass/fail gates on the confidence bounds of a robustness report."""
+        gates = {}
+        walk_forward = robustness.get("walk_forward", {})
+        if walk_forward:
+            gates["walk_forward_efficiency"] = {
+                "value": round(walk_forward["efficiency"], 3),
+                "required": criteria["min_walk_forward_efficiency"],
+                "passed": walk_forward["efficiency"] >= criteria["min_walk_forward_efficiency"]
+            }
+        sharpe = robustness.get("bootstrap", {}).get("sharpe_ratio")
+        if sharpe:
+            gates["oos_sharpe_lower"] = {
+                "value": round(sharpe["lower"], 3),
+                "interval": [sharpe["lower"], sharpe["upper"]],
+                "required": criteria["min_oos_sharpe_lower"],
+                "passed": sharpe["lower"] >= criteria["min_oos_sharpe_lower"]
+            }
+        monte_carlo = robustness.get("monte_carlo", {})
+        if monte_carlo.get("trades"):
+            total_return = monte_carlo["total_return"]
+            gates["mc_return_lower"] = {
+                "value": round(total_return["lower"] * 100, 2),
+                "interval": [total_return["lower"] * 100, total_return["upper"] * 100],
+                "required": criteria["min_mc_return_lower"],
+                "passed": total_return["lower"] * 100 >= criteria["min_mc_return_lower"]
+            }
+            # Worst drawdown at the confidence bound, in percent like max_drawdown
+            worst_drawdown = -monte_carlo["max_drawdown"]["lower"] * 100
+            gates["mc_max_drawdown"] = {
+                "value": round(worst_drawdown, 2),
+                "required": criteria["max_drawdown"],
+                "passed": worst_drawdown <= criteria["max_drawdown"]
+            }
+        return gates
+    
+    async def run_robustness_tests(self, strategy: Dict[str, Any], df: pd.DataFrame,
+                                   backtest_results: Optional[Dict[str, Any]] = None,
+                                   n_resamples: int = DEFAULT_RESAMPLES) -> Dict[str, Any]:
+        """Walk-forward, out-of-sample bootstrap and trade Monte Carlo tests for a strategy."""
+        try:
+            trades = (backtest_results or {}).get("trades", [])
+            trade_returns = np.array([t["return_pct"] / 100.0 for t in trades], dtype=np.float64)
+            close = df['close'].to_numpy(dtype=np.float64, copy=True)
+            loop = asyncio.get_running_loop()
+            report = await loop.run_in_executor(None, lambda: robustness_report(
+                close,
+                strategy.get("type", "trend_following"),
+                trade_returns=trade_returns,
+                param_grid=strategy.get("param_grid"),
+                timeframe=strategy.get("timeframe", "1d"),
+                n_resamples=n_resamples
+            ))
+            report["status"] = "success"
+            return report
+            
+        except Exception as e:
+            logger.error(f"Error running robustness tests: {e}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+    
     def _assess_production_risk(self, max_drawdown: float, win_rate: float) -> str:
         """Assess risk level for production trading."""
         if max_drawdown < 10 and win_rate > 60:
@@ -2192,8 +2294,14 @@ Focus on finding profitable trading opportunities while managing risk appropriat
             # Calculate performance metrics
             performance_metrics = self.tools._calculate_performance_metrics(backtest_results)
             
+            # Walk-forward and Monte Carlo confidence bounds for the promotion gates
+            robustness = await self.tools.run_robustness_tests(strategy, df, backtest_results)
+            
             # Store sandbox results in database
-            sandbox_record = await self.tools._store_sandbox_results(sandbox_id, strategy, backtest_results, performance_metrics)
+            sandbox_record = await self.tools._store_sandbox_results(
+                sandbox_id, strategy, backtest_results, performance_metrics,
+                start_date=df['time'].min(), end_date=df['time'].max()
+            )
             
             # Generate user-friendly explanations
             sandbox_results = {
@@ -2201,6 +2309,7 @@ Focus on finding profitable trading opportunities while managing risk appropriat
                 "strategy": strategy,
                 "backtest_results": backtest_results,
                 "performance_metrics": performance_metrics,
+                "robustness": robustness,
                 "data_points": len(df),
                 "test_period": {
                     "start": df['time'].min().isoformat(),
@@ -2216,6 +2325,7 @@ Focus on finding profitable trading opportunities while managing risk appropriat
                 "strategy": strategy,
                 "backtest_results": backtest_results,
                 "performance_metrics": performance_metrics,
+                "robustness": robustness,
                 "data_points": len(df),
                 "test_period": {
                     "start": df['time'].min().isoformat(),
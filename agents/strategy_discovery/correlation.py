@@ -0,0 +1,195 @@
+"""
+Incremental exponentially weighted covariance/correlation for cross-asset analysis.
+Keeps one N x N matrix in memory that is updated as new bars close, so
+correlation queries for any subset of symbols are served without recomputing.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Bar length per timeframe; "1M" is a calendar month, approximated as 30 days
+BAR_DURATIONS = {
+    "1m": timedelta(minutes=1), "5m": timedelta(minutes=5), "15m": timedelta(minutes=15),
+    "30m": timedelta(minutes=30), "1h": timedelta(hours=1), "4h": timedelta(hours=4),
+    "1d": timedelta(days=1), "1w": timedelta(weeks=1), "1M": timedelta(days=30),
+}
+
+
+def bar_duration(timeframe: str) -> timedelta:
+    """Length of one bar for ``timeframe``, one day for unknown timeframes."""
+    return BAR_DURATIONS.get(timeframe, BAR_DURATIONS["1d"])
+
+
+class EWCorrelationMatrix:
+    """
+    Exponentially weighted covariance matrix over close-to-close returns.
+
+    Each closed bar updates the mean vector and covariance with
+        delta = r - mean
+        mean += alpha * delta
+        cov = (1 - alpha) * (cov + alpha * delta delta^T)
+    restricted to the symbols present in that bar. A short window of recent
+    returns is kept so symbols added later can be seeded consistently.
+    """
+
+    def __init__(self, halflife: float = 30.0, history_bars: int = 500):
+        """
+        Initialize the matrix.
+
+        Args:
+            halflife: Decay half-life in bars
+            history_bars: Recent return rows kept for seeding new symbols
+        """
+        self.alpha = 1.0 - 0.5 ** (1.0 / halflife)
+        self.halflife = halflife
+        self.history_bars = history_bars
+        self.symbols: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._mean = np.zeros(0)
+        self._cov = np.zeros((0, 0))
+        self._observations = np.zeros(0, dtype=np.int64)
+        self._last_close: Dict[str, float] = {}
+        self._last_bar: Dict[str, datetime] = {}
+        self._history = pd.DataFrame()
+        self._pending: List[Tuple[datetime, Dict[str, float]]] = []
+        self.last_bar_time: Optional[datetime] = None
+        self.updates = 0
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    def oldest_bar_time(self) -> Optional[datetime]:
+        """Last bar time of the symbol that is furthest behind."""
+        times = [self._last_bar[s] for s in self.symbols if s in self._last_bar]
+        return min(times) if times else None
+
+    def seed(self, closes: pd.DataFrame) -> None:
+        """
+        Rebuild the matrix from a wide frame of closes (index=time, columns=symbols).
+
+        Existing history is merged in, so cross-covariances with previously
+        tracked symbols are preserved. Missing returns are treated as equal
+        to the running mean, i.e. they contribute no co-movement.
+        """
+        self._flush_pending()
+        closes = closes.sort_index()
+        returns = closes.pct_change().iloc[1:]
+        if not self._history.empty:
+            returns = returns.combine_first(self._history)
+        returns = returns.tail(self.history_bars)
+
+        self.symbols = list(returns.columns)
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        values = returns.values
+        mask = ~np.isnan(values)
+
+        # Weights decay towards older rows, matching the recursive update
+        weights = (1.0 - self.alpha) ** np.arange(len(values) - 1, -1, -1)[:, None] * mask
+        weight_sum = np.where(weights.sum(axis=0) > 0, weights.sum(axis=0), 1.0)
+        self._mean = np.nansum(values * weights, axis=0) / weight_sum
+        centred = np.where(mask, values - self._mean, 0.0) * np.sqrt(weights)
+        pair_weight = np.sqrt(weights).T @ np.sqrt(weights)
+        self._cov = (centred.T @ centred) / np.where(pair_weight > 0, pair_weight, 1.0)
+        self._observations = mask.sum(axis=0)
+
+        self._history = returns
+        for symbol in closes.columns:
+            last = closes[symbol].dropna()
+            if not last.empty:
+                self._last_close[symbol] = float(last.iloc[-1])
+                self._last_bar[symbol] = last.index[-1]
+        if self._last_bar:
+            self.last_bar_time = max(self._last_bar.values())
+        logger.info(f"Seeded EW correlation matrix with {len(self.symbols)} symbols, "
+                    f"{len(returns)} bars")
+
+    def update(self, bar_time: datetime, closes: Dict[str, float]) -> None:
+        """
+        Apply one closed bar. Symbols not yet tracked only record their close,
+        and a symbol whose close for ``bar_time`` was already applied is skipped,
+        so each symbol advances from its own last bar.
+
+        Args:
+            bar_time: Close time of the bar
+            closes: Close price per symbol for this bar
+        """
+        closes = {symbol: close for symbol, close in closes.items()
+                  if symbol not in self._last_bar or bar_time > self._last_bar[symbol]}
+        if not closes:
+            return
+
+        returns = {}
+        for symbol, close in closes.items():
+            self._last_bar[symbol] = bar_time
+            previous = self._last_close.get(symbol)
+            if previous and symbol in self._index:
+                returns[symbol] = close / previous - 1.0
+            self._last_close[symbol] = float(close)
+
+        if returns:
+            idx = np.array([self._index[s] for s in returns])
+            r = np.fromiter(returns.values(), dtype=np.float64, count=len(returns))
+            delta = r - self._mean[idx]
+            self._mean[idx] += self.alpha * delta
+            block = np.ix_(idx, idx)
+            self._cov[block] = (1.0 - self.alpha) * (self._cov[block] + self.alpha * np.outer(delta, delta))
+            self._observations[idx] += 1
+
+            self._pending.append((bar_time, returns))
+            if len(self._pending) >= self.history_bars:
+                self._flush_pending()
+
+        if self.last_bar_time is None or bar_time > self.last_bar_time:
+            self.last_bar_time = bar_time
+        self.updates += 1
+
+    def _flush_pending(self) -> None:
+        """Fold buffered per-bar returns into the seeding history frame."""
+        if not self._pending:
+            return
+        times, rows = zip(*self._pending)
+        self._history = pd.concat([self._history, pd.DataFrame(list(rows), index=list(times))])
+        # Symbols refreshed separately can land the same bar in two rows
+        self._history = self._history.groupby(level=0).first()
+        self._history = self._history.tail(self.history_bars)
+        self._pending = []
+
+    def covariance(self, symbols: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Covariance for any subset of tracked symbols."""
+        symbols = self._tracked(symbols)
+        idx = [self._index[s] for s in symbols]
+        return pd.DataFrame(self._cov[np.ix_(idx, idx)], index=symbols, columns=symbols)
+
+    def correlation(self, symbols: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Correlation for any subset of tracked symbols, served from memory."""
+        symbols = self._tracked(symbols)
+        idx = [self._index[s] for s in symbols]
+        cov = self._cov[np.ix_(idx, idx)]
+        std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+        denom = np.outer(std, std)
+        corr = np.divide(cov, denom, out=np.zeros_like(cov), where=denom > 0)
+        np.fill_diagonal(corr, 1.0)
+        return pd.DataFrame(np.clip(corr, -1.0, 1.0), index=symbols, columns=symbols)
+
+    def _tracked(self, symbols: Optional[Iterable[str]]) -> List[str]:
+        if symbols is None:
+            return list(self.symbols)
+        return [s for s in symbols if s in self._index]
+
+    def get_stats(self) -> Dict[str, Any]:
+        oldest = self.oldest_bar_time()
+        return {
+            "symbols": len(self.symbols),
+            "halflife": self.halflife,
+            "updates": self.updates,
+            "history_bars": min(len(self._history) + len(self._pending), self.history_bars),
+            "last_bar_time": self.last_bar_time.isoformat() if self.last_bar_time is not None else None,
+            "oldest_bar_time": oldest.isoformat() if oldest is not None else None,
+            "min_observations": int(self._observations.min()) if self._observations.size else 0,
+        }
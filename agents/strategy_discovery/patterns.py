@@ -0,0 +1,240 @@
+"""
+Vectorized candlestick and support/resistance pattern detection.
+Computes per-bar pattern masks over whole OHLC arrays and pivot-based
+support/resistance levels, for use in market analysis and as backtest features.
+"""
+
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+CANDLESTICK_PATTERNS = (
+    "doji", "hammer", "shooting_star", "bullish_engulfing", "bearish_engulfing"
+)
+
+
+def _as_array(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def candlestick_masks(open_, high, low, close,
+                      doji_body_ratio: float = 0.1,
+                      shadow_body_ratio: float = 2.0,
+                      opposite_shadow_ratio: float = 0.1) -> Dict[str, np.ndarray]:
+    """
+    Compute boolean candlestick pattern masks for every bar at once.
+
+    Bars with a zero high-low range never match a pattern, so no division
+    by a zero range or body can occur.
+
+    Args:
+        open_, high, low, close: Equal-length price arrays
+        doji_body_ratio: Max body/range ratio for a doji
+        shadow_body_ratio: Min long-shadow/body ratio for hammer and shooting star
+        opposite_shadow_ratio: Max short-shadow/range ratio for hammer and shooting star
+
+    Returns:
+        Dict mapping pattern name to a boolean array aligned with the input
+    """
+    o, h, l, c = _as_array(open_), _as_array(high), _as_array(low), _as_array(close)
+
+    body = np.abs(c - o)
+    total_range = h - l
+    upper_shadow = h - np.maximum(o, c)
+    lower_shadow = np.minimum(o, c) - l
+    has_range = total_range > 0
+    has_body = body > 0
+
+    doji = has_range & (body <= doji_body_ratio * total_range)
+
+    hammer = (has_range & has_body & ~doji &
+              (lower_shadow >= shadow_body_ratio * body) &
+              (upper_shadow <= opposite_shadow_ratio * total_range))
+
+    shooting_star = (has_range & has_body & ~doji &
+                     (upper_shadow >= shadow_body_ratio * body) &
+                     (lower_shadow <= opposite_shadow_ratio * total_range))
+
+    bullish = c > o
+    bearish = c < o
+    prev_o = np.roll(o, 1)
+    prev_c = np.roll(c, 1)
+    prev_body = np.roll(body, 1)
+    has_prev = np.arange(len(o)) > 0
+
+    bullish_engulfing = (has_prev & bullish & np.roll(bearish, 1) &
+                         (o <= prev_c) & (c >= prev_o) & (body > prev_body))
+    bearish_engulfing = (has_prev & bearish & np.roll(bullish, 1) &
+                         (o >= prev_c) & (c <= prev_o) & (body > prev_body))
+
+    return {
+        "doji": doji,
+        "hammer": hammer,
+        "shooting_star": shooting_star,
+        "bullish_engulfing": bullish_engulfing,
+        "bearish_engulfing": bearish_engulfing,
+    }
+
+
+def find_pivots(high, low, window: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find swing highs and lows with a centered rolling window.
+
+    A bar is a pivot high when its high is the maximum of the ``window`` bars
+    on either side (pivot low likewise for lows). Pivots need ``window``
+    future bars, so the last ``window`` bars are never marked.
+
+    Returns:
+        (pivot_high_mask, pivot_low_mask) boolean arrays
+    """
+    h, l = _as_array(high), _as_array(low)
+    n = len(h)
+    pivot_high = np.zeros(n, dtype=bool)
+    pivot_low = np.zeros(n, dtype=bool)
+    span = 2 * window + 1
+    if window < 1 or n < span:
+        return pivot_high, pivot_low
+
+    centre = slice(window, n - window)
+    pivot_high[centre] = h[centre] >= sliding_window_view(h, span).max(axis=1)
+    pivot_low[centre] = l[centre] <= sliding_window_view(l, span).min(axis=1)
+    return pivot_high, pivot_low
+
+
+def cluster_levels(prices, indices=None, tolerance: float = 0.01) -> List[Dict[str, Any]]:
+    """
+    Group nearby price levels into clusters.
+
+    Sorted prices are split wherever the gap to the previous price exceeds
+    ``tolerance`` (relative), so each cluster spans a tight price zone.
+
+    Args:
+        prices: Pivot prices
+        indices: Bar index of each pivot (defaults to position)
+        tolerance: Relative gap that starts a new cluster
+
+    Returns:
+        Clusters sorted by touches (desc), each with level, touches,
+        low, high and last_index
+    """
+    p = _as_array(prices)
+    if p.size == 0:
+        return []
+    idx = np.arange(p.size) if indices is None else np.asarray(indices)
+
+    order = np.argsort(p, kind="stable")
+    p, idx = p[order], idx[order]
+    gaps = np.diff(p) / np.where(p[:-1] == 0, 1.0, np.abs(p[:-1]))
+    starts = np.concatenate(([0], np.nonzero(gaps > tolerance)[0] + 1))
+
+    touches = np.diff(np.append(starts, p.size))
+    levels = np.add.reduceat(p, starts) / touches
+    lows = p[starts]
+    highs = p[np.append(starts[1:], p.size) - 1]
+    last_index = np.maximum.reduceat(idx, starts)
+
+    clusters = [
+        {
+            "level": float(levels[i]),
+            "touches": int(touches[i]),
+            "low": float(lows[i]),
+            "high": float(highs[i]),
+            "last_index": int(last_index[i]),
+        }
+        for i in range(len(starts))
+    ]
+    clusters.sort(key=lambda cl: (cl["touches"], cl["last_index"]), reverse=True)
+    return clusters
+
+
+def support_resistance_levels(df: pd.DataFrame, window: int = 5, tolerance: float = 0.01,
+                              max_levels: int = 5) -> Dict[str, Any]:
+    """
+    Derive clustered support and resistance levels from pivots over the full history.
+
+    Args:
+        df: DataFrame with high, low and close columns
+        window: Pivot half-window in bars
+        tolerance: Relative clustering tolerance
+        max_levels: Number of strongest levels to keep on each side
+    """
+    current_price = float(df["close"].iloc[-1])
+    pivot_high, pivot_low = find_pivots(df["high"].values, df["low"].values, window)
+
+    high_idx = np.nonzero(pivot_high)[0]
+    low_idx = np.nonzero(pivot_low)[0]
+    clusters = cluster_levels(
+        np.concatenate((df["high"].values[high_idx], df["low"].values[low_idx])),
+        np.concatenate((high_idx, low_idx)),
+        tolerance,
+    )
+
+    resistance = [cl for cl in clusters if cl["level"] > current_price][:max_levels]
+    support = [cl for cl in clusters if cl["level"] < current_price][:max_levels]
+    nearest_resistance = min((cl["level"] for cl in resistance), default=None)
+    nearest_support = max((cl["level"] for cl in support), default=None)
+
+    return {
+        "resistance_levels": sorted(cl["level"] for cl in resistance),
+        "support_levels": sorted((cl["level"] for cl in support), reverse=True),
+        "resistance_clusters": resistance,
+        "support_clusters": support,
+        "nearest_resistance": nearest_resistance,
+        "nearest_support": nearest_support,
+        "pivot_highs": int(pivot_high.sum()),
+        "pivot_lows": int(pivot_low.sum()),
+        "current_price": current_price,
+    }
+
+
+def add_pattern_features(df: pd.DataFrame, window: int = 5) -> pd.DataFrame:
+    """
+    Add per-bar pattern columns usable as backtest features.
+
+    Candlestick columns are ``pattern_<name>`` (0/1). Pivot columns are
+    shifted by ``window`` bars so a pivot only appears once it is confirmed,
+    which keeps the features free of look-ahead. ``last_pivot_high``/``low``
+    carry the most recent confirmed swing price forward.
+    """
+    df = df.copy()
+    masks = candlestick_masks(df["open"].values, df["high"].values,
+                              df["low"].values, df["close"].values)
+    for name, mask in masks.items():
+        df[f"pattern_{name}"] = mask.astype(np.int8)
+
+    pivot_high, pivot_low = find_pivots(df["high"].values, df["low"].values, window)
+    confirmed_high = _shift_mask(pivot_high, window)
+    confirmed_low = _shift_mask(pivot_low, window)
+    df["pivot_high_confirmed"] = confirmed_high.astype(np.int8)
+    df["pivot_low_confirmed"] = confirmed_low.astype(np.int8)
+
+    high_prices = pd.Series(np.where(pivot_high, df["high"].values, np.nan), index=df.index)
+    low_prices = pd.Series(np.where(pivot_low, df["low"].values, np.nan), index=df.index)
+    df["last_pivot_high"] = high_prices.shift(window).ffill()
+    df["last_pivot_low"] = low_prices.shift(window).ffill()
+    return df
+
+
+def summarize_candlestick_patterns(df: pd.DataFrame, recent_bars: int = 5) -> Dict[str, Any]:
+    """Summarize pattern counts over the history and which patterns fired recently."""
+    masks = candlestick_masks(df["open"].values, df["high"].values,
+                              df["low"].values, df["close"].values)
+    counts = {name: int(mask.sum()) for name, mask in masks.items()}
+    recent = [name for name, mask in masks.items() if mask[-recent_bars:].any()]
+    latest = [name for name, mask in masks.items() if len(mask) and mask[-1]]
+    return {
+        "patterns_found": [name for name, count in counts.items() if count > 0],
+        "pattern_count": sum(counts.values()),
+        "pattern_counts": counts,
+        "recent_patterns": recent,
+        "latest_bar_patterns": latest,
+    }
+
+
+def _shift_mask(mask: np.ndarray, periods: int) -> np.ndarray:
+    shifted = np.zeros_like(mask)
+    if periods < len(mask):
+        shifted[periods:] = mask[:len(mask) - periods]
+    return shifted
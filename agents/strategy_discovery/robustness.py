@@ -0,0 +1,288 @@
+"""
+Walk-forward and Monte Carlo robustness tests for discovered strategies.
+Walk-forward re-optimizes parameters on rolling in-sample windows and scores
+the chosen set on the following out-of-sample window. Trade resampling and
+block bootstrapping of bar returns turn a single backtest into distributions,
+so promotion gates can use confidence bounds instead of point estimates.
+Every test runs all parameter sets, windows or resamples as array operations.
+"""
+
+import itertools
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+
+import numpy as np
+
+from agents.backtest.vectorized import (
+    STRATEGY_SIGNALS, PERIODS_PER_YEAR, generate_positions, strategy_returns, compute_metrics
+)
+
+DEFAULT_RESAMPLES = 2000
+DEFAULT_CONFIDENCE = 0.90
+MAX_RESAMPLE_CELLS = 4_000_000  # Resamples x observations evaluated per chunk
+
+# Grids walk-forward searches when a strategy doesn't bring its own
+DEFAULT_PARAM_GRIDS: Dict[str, Dict[str, List[Any]]] = {
+    "sma_crossover": {"fast_period": [5, 10, 20], "slow_period": [30, 50, 100]},
+    "rsi_mean_reversion": {"rsi_period": [7, 14, 21], "oversold": [25, 30], "overbought": [60, 70]},
+    "bollinger_breakout": {"period": [10, 20, 40], "num_std": [1.5, 2.0, 2.5]},
+    "momentum": {"lookback": [10, 20, 40], "threshold": [0.0, 0.02]},
+}
+_SIGNAL_NAMES = {fn: name for name, fn in STRATEGY_SIGNALS.items() if name in DEFAULT_PARAM_GRIDS}
+
+WALK_FORWARD_METRICS = ("sharpe_ratio", "total_return")
+
+
+def default_param_grid(strategy_type: str) -> Dict[str, List[Any]]:
+    """Default walk-forward grid for a strategy type or one of its aliases."""
+    signal_fn = STRATEGY_SIGNALS.get(strategy_type)
+    if signal_fn is None:
+        raise ValueError(f"Unknown strategy type: {strategy_type}")
+    return DEFAULT_PARAM_GRIDS[_SIGNAL_NAMES[signal_fn]]
+
+
+def confidence_interval(samples: np.ndarray, level: float = DEFAULT_CONFIDENCE) -> Dict[str, float]:
+    """Mean, median and the central ``level`` interval of a sample."""
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.size == 0:
+        return {"mean": 0.0, "median": 0.0, "lower": 0.0, "upper": 0.0, "level": level}
+    tail = (1.0 - level) / 2.0
+    lower, median, upper = np.quantile(samples, [tail, 0.5, 1.0 - tail])
+    return {"mean": float(samples.mean()), "median": float(median),
+            "lower": float(lower), "upper": float(upper), "level": level}
+
+
+def _chunks(n_resamples: int, n_obs: int) -> Iterator[int]:
+    """Chunk sizes that keep each resample matrix under MAX_RESAMPLE_CELLS."""
+    size = max(1, MAX_RESAMPLE_CELLS // max(n_obs, 1))
+    for start in range(0, n_resamples, size):
+        yield min(size, n_resamples - start)
+
+
+def _max_drawdown(growth: np.ndarray) -> np.ndarray:
+    """Row-wise maximum drawdown of equity paths that start at 1."""
+    peak = np.maximum(np.maximum.accumulate(growth, axis=1), 1.0)
+    return (growth / peak - 1.0).min(axis=1)
+
+
+def block_indices(n_obs: int, n_resamples: int, block_size: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Moving-block bootstrap index matrix of shape (n_resamples, n_obs).
+
+    Each row concatenates random blocks of ``block_size`` consecutive
+    observations (wrapping at the end), which keeps short-range
+    autocorrelation that an i.i.d. bootstrap would destroy.
+    """
+    block_size = int(min(max(block_size, 1), n_obs))
+    n_blocks = -(-n_obs // block_size)
+    starts = rng.integers(0, n_obs, size=(n_resamples, n_blocks, 1))
+    index = (starts + np.arange(block_size)) % n_obs
+    return index.reshape(n_resamples, -1)[:, :n_obs]
+
+
+def monte_carlo_trades(trade_returns: np.ndarray, n_resamples: int = DEFAULT_RESAMPLES,
+                       level: float = DEFAULT_CONFIDENCE, seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Resample per-trade returns (fractions, 0.02 = +2%).
+
+    Bootstrapping with replacement gives the spread of total return and win
+    rate over other draws of the same trade distribution; random reordering
+    of the actual trades gives the drawdowns the same trades could have
+    produced in a different sequence.
+    """
+    returns = np.asarray(trade_returns, dtype=np.float64)
+    n = len(returns)
+    if n == 0:
+        return {"resamples": 0, "trades": 0}
+    rng = np.random.default_rng(seed)
+    totals, drawdowns, win_rates, shuffled = [], [], [], []
+    for size in _chunks(n_resamples, n):
+        sampled = returns[rng.integers(0, n, size=(size, n))]
+        growth = np.cumprod(1.0 + sampled, axis=1)
+        totals.append(growth[:, -1] - 1.0)
+        drawdowns.append(_max_drawdown(growth))
+        win_rates.append((sampled > 0).mean(axis=1))
+
+        reordered = rng.permuted(np.broadcast_to(1.0 + returns, (size, n)), axis=1)
+        shuffled.append(_max_drawdown(np.cumprod(reordered, axis=1)))
+
+    totals = np.concatenate(totals)
+    return {
+        "resamples": int(n_resamples),
+        "trades": int(n),
+        "total_return": confidence_interval(totals, level),
+        "max_drawdown": confidence_interval(np.concatenate(drawdowns), level),
+        "win_rate": confidence_interval(np.concatenate(win_rates), level),
+        "shuffled_max_drawdown": confidence_interval(np.concatenate(shuffled), level),
+        "probability_of_loss": float(np.mean(totals < 0)),
+    }
+
+
+def bootstrap_returns(bar_returns: np.ndarray, n_resamples: int = DEFAULT_RESAMPLES,
+                      block_size: Optional[int] = None, periods_per_year: float = 365,
+                      level: float = DEFAULT_CONFIDENCE, seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Block bootstrap of per-bar strategy returns.
+
+    ``block_size`` defaults to n ** (1/3), the usual rate for block
+    bootstraps of weakly dependent series.
+    """
+    returns = np.asarray(bar_returns, dtype=np.float64)
+    n = len(returns)
+    if n < 2:
+        return {"resamples": 0, "bars": int(n)}
+    block_size = block_size or max(1, int(round(n ** (1.0 / 3.0))))
+    rng = np.random.default_rng(seed)
+    scale = np.sqrt(periods_per_year)
+    sharpes, totals, drawdowns = [], [], []
+    for size in _chunks(n_resamples, n):
+        sampled = returns[block_indices(n, size, block_size, rng)]
+        std = sampled.std(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sharpes.append(np.where(std > 0, sampled.mean(axis=1) / std * scale, 0.0))
+        growth = np.exp(np.cumsum(np.log1p(sampled), axis=1))
+        totals.append(growth[:, -1] - 1.0)
+        drawdowns.append(_max_drawdown(growth))
+
+    sharpes = np.concatenate(sharpes)
+    return {
+        "resamples": int(n_resamples),
+        "bars": int(n),
+        "block_size": int(block_size),
+        "sharpe_ratio": confidence_interval(sharpes, level),
+        "total_return": confidence_interval(np.concatenate(totals), level),
+        "max_drawdown": confidence_interval(np.concatenate(drawdowns), level),
+        "probability_negative_sharpe": float(np.mean(sharpes < 0)),
+    }
+
+
+def _window_scores(prefix: np.ndarray, prefix_sq: np.ndarray, prefix_log: np.ndarray,
+                   starts: np.ndarray, length: int, metric: str, periods_per_year: float) -> np.ndarray:
+    """Metric of every (row, window) pair from prefix sums; shape (rows, windows)."""
+    ends = starts + length
+    if metric == "total_return":
+        return np.expm1(prefix_log[:, ends] - prefix_log[:, starts])
+    mean = (prefix[:, ends] - prefix[:, starts]) / length
+    var = np.maximum((prefix_sq[:, ends] - prefix_sq[:, starts]) / length - mean ** 2, 0.0)
+    std = np.sqrt(var)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(std > 1e-12, mean / std * np.sqrt(periods_per_year), 0.0)
+
+
+def walk_forward(close: np.ndarray, strategy_type: str, param_grid: Optional[Dict[str, List[Any]]] = None,
+                 train_bars: int = 500, test_bars: int = 100, step: Optional[int] = None,
+                 metric: str = "sharpe_ratio", fee_rate: float = 0.001,
+                 periods_per_year: float = 365) -> Dict[str, Any]:
+    """
+    Rolling walk-forward analysis.
+
+    Every parameter set is simulated once over the full series (signals are
+    causal, so a window's returns don't depend on later bars). Window scores
+    for all (parameter set, window) pairs then come from prefix sums in one
+    step: the best in-sample set of each window is picked and its
+    out-of-sample returns are stitched into a single series.
+
+    Args:
+        close: Close prices
+        strategy_type: Key of STRATEGY_SIGNALS
+        param_grid: Parameter name -> candidate values; defaults per strategy type
+        train_bars, test_bars: In-sample and out-of-sample window lengths
+        step: Bars between window starts; defaults to ``test_bars``
+        metric: In-sample selection metric, one of WALK_FORWARD_METRICS
+        fee_rate: Fee per unit of turnover
+        periods_per_year: Annualisation factor
+    """
+    if metric not in WALK_FORWARD_METRICS:
+        raise ValueError(f"Unsupported walk-forward metric: {metric}")
+    close = np.asarray(close, dtype=np.float64)
+    n_bars = len(close)
+    step = step or test_bars
+    if n_bars < train_bars + test_bars:
+        raise ValueError(f"Need at least {train_bars + test_bars} bars for walk-forward, got {n_bars}")
+
+    grid = param_grid or default_param_grid(strategy_type)
+    names = sorted(grid)
+    candidates = [dict(zip(names, values)) for values in itertools.product(*(grid[k] for k in names))]
+
+    positions = np.vstack([generate_positions(strategy_type, close, params) for params in candidates])
+    returns = np.vstack([strategy_returns(close, row, fee_rate) for row in positions])
+
+    zeros = np.zeros((len(candidates), 1))
+    prefix = np.hstack([zeros, np.cumsum(returns, axis=1)])
+    prefix_sq = np.hstack([zeros, np.cumsum(returns ** 2, axis=1)])
+    prefix_log = np.hstack([zeros, np.cumsum(np.log1p(np.maximum(returns, -0.999999)), axis=1)])
+
+    train_starts = np.arange(0, n_bars - train_bars - test_bars + 1, step)
+    test_starts = train_starts + train_bars
+    in_sample = _window_scores(prefix, prefix_sq, prefix_log, train_starts, train_bars, metric, periods_per_year)
+    out_sample = _window_scores(prefix, prefix_sq, prefix_log, test_starts, test_bars, metric, periods_per_year)
+
+    best = np.argmax(in_sample, axis=0)
+    windows = np.arange(len(train_starts))
+    columns = test_starts[:, None] + np.arange(test_bars)
+    oos_returns = returns[best[:, None], columns]
+    oos_positions = positions[best[:, None], columns]
+    if step < test_bars:
+        # Overlapping test windows: keep each bar once, from the earliest window covering it
+        keep = np.minimum(step, test_bars)
+        oos_returns = np.concatenate([oos_returns[:-1, :keep].ravel(), oos_returns[-1]])
+        oos_positions = np.concatenate([oos_positions[:-1, :keep].ravel(), oos_positions[-1]])
+    else:
+        oos_returns, oos_positions = oos_returns.ravel(), oos_positions.ravel()
+
+    is_scores = in_sample[best, windows]
+    oos_scores = out_sample[best, windows]
+    mean_is = float(is_scores.mean())
+    chosen, counts = np.unique(best, return_counts=True)
+    return {
+        "strategy_type": strategy_type,
+        "metric": metric,
+        "windows": [
+            {
+                "train_start": int(train_starts[w]),
+                "test_start": int(test_starts[w]),
+                "test_end": int(test_starts[w] + test_bars),
+                "params": candidates[best[w]],
+                "in_sample": float(is_scores[w]),
+                "out_of_sample": float(oos_scores[w]),
+            }
+            for w in windows
+        ],
+        "candidates": len(candidates),
+        "oos_metrics": compute_metrics(oos_returns, oos_positions, periods_per_year),
+        "oos_returns": oos_returns,
+        "mean_in_sample": mean_is,
+        "mean_out_of_sample": float(oos_scores.mean()),
+        "efficiency": float(oos_scores.mean() / mean_is) if mean_is > 0 else 0.0,
+        "positive_windows": float(np.mean(oos_scores > 0)),
+        "param_stability": float(counts.max() / len(best)),
+        "most_chosen_params": candidates[chosen[np.argmax(counts)]],
+    }
+
+
+def _window_lengths(n_bars: int, train_fraction: float = 0.5, n_windows: int = 5) -> Tuple[int, int]:
+    """Split ``n_bars`` into a training length and ``n_windows`` test windows."""
+    train = int(n_bars * train_fraction)
+    test = max(1, (n_bars - train) // n_windows)
+    return train, test
+
+
+def robustness_report(close: np.ndarray, strategy_type: str, trade_returns: Optional[np.ndarray] = None,
+                      param_grid: Optional[Dict[str, List[Any]]] = None, timeframe: str = "1d",
+                      n_resamples: int = DEFAULT_RESAMPLES, level: float = DEFAULT_CONFIDENCE,
+                      fee_rate: float = 0.001, seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Walk-forward analysis, bootstrap of the stitched out-of-sample returns and
+    Monte Carlo resampling of the backtest's trades, in one report.
+    """
+    periods_per_year = PERIODS_PER_YEAR.get(timeframe, 365)
+    train_bars, test_bars = _window_lengths(len(close))
+    report: Dict[str, Any] = {"confidence_level": level, "resamples": n_resamples}
+    wf = walk_forward(close, strategy_type, param_grid, train_bars, test_bars,
+                      fee_rate=fee_rate, periods_per_year=periods_per_year)
+    oos_returns = wf.pop("oos_returns")
+    report["walk_forward"] = wf
+    report["bootstrap"] = bootstrap_returns(oos_returns, n_resamples, periods_per_year=periods_per_year,
+                                            level=level, seed=seed)
+    if trade_returns is not None and len(trade_returns):
+        report["monte_carlo"] = monte_carlo_trades(trade_returns, n_resamples, level=level, seed=seed)
+    return report
@@ -0,0 +1,419 @@
+"""
+Content-addressed cache for backtest results.
+A result is keyed by a stable hash of everything that determines it: strategy
+type, normalized parameters, symbol, timeframe, data range and a fingerprint
+of the candles themselves. Lookups go to an in-memory LRU first and then to a
+persistent tier (a directory of compressed JSON files or the backtest_cache
+table). Writes to the persistent tier happen in the background.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, date
+from typing import Dict, Any, Optional, List, Iterable, Callable, Awaitable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .disk_cache import DiskCacheStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_ENTRIES = 2048
+PERSISTENT_RETRY_SECONDS = 60  # Back-off after the persistent tier fails
+WRITE_BATCH = 200  # Entries per background write to the persistent tier
+
+
+def _normalize(value: Any) -> Any:
+    """Canonical JSON-safe form: sorted mappings, integral floats as ints, rounded floats."""
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            return str(value)
+        if value.is_integer():
+            return int(value)
+        return float(f"{value:.12g}")
+    if isinstance(value, (datetime, date, pd.Timestamp, np.datetime64)):
+        stamp = pd.Timestamp(value)
+        return (stamp.tz_convert(None) if stamp.tzinfo else stamp).isoformat()
+    if isinstance(value, str):
+        return value.strip()
+    return str(value)
+
+
+def normalize_symbol(symbol: str) -> str:
+    """BTC/USDT, btc-usdt and BTCUSDT all map to BTCUSDT."""
+    return "".join(ch for ch in str(symbol).upper() if ch.isalnum())
+
+
+def data_version(candles: Iterable[Any], times: Optional[Iterable[Any]] = None) -> str:
+    """
+    Fingerprint of candle data; changes when any value or timestamp changes.
+    Pass every price column the backtest reads (open, high, low, close), not
+    just the closes, or results that depend on intrabar prices go stale.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    values = np.ascontiguousarray(np.asarray(candles, dtype=np.float64))
+    digest.update(str(values.shape).encode())
+    digest.update(values.tobytes())
+    if times is not None:
+        stamps = np.asarray(pd.DatetimeIndex(pd.to_datetime(times, utc=True)).tz_convert(None),
+                            dtype="datetime64[ns]")
+        digest.update(stamps.view(np.int64).tobytes())
+    return digest.hexdigest()
+
+
+def backtest_cache_key(strategy_type: str, parameters: Dict[str, Any], symbol: str, timeframe: str,
+                       start: Any = None, end: Any = None, data_version: str = "",
+                       settings: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Stable key for one backtest.
+
+    Args:
+        strategy_type: Strategy family (sma_crossover, trend_following, ...)
+        parameters: Strategy parameters; order and int/float spelling don't matter
+        symbol, timeframe: Market the strategy ran on
+        start, end: Data range
+        data_version: Fingerprint of the candles (see data_version)
+        settings: Anything else that changes the result (fees, slippage, capital)
+    """
+    payload = {
+        "strategy_type": str(strategy_type).strip().lower(),
+        "parameters": _normalize(parameters or {}),
+        "symbol": normalize_symbol(symbol),
+        "timeframe": str(timeframe).strip(),
+        "start": _normalize(start),
+        "end": _normalize(end),
+        "data_version": data_version,
+        "settings": _normalize(settings or {}),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class DatabaseCacheStore:
+    """
+    Persistent tier in the backtest_cache table, one gzip-compressed JSON
+    entry per key. Kept apart from the backtests table so cached sweep
+    trials don't show up as stored backtest runs.
+    """
+
+    name = "database"
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        from common.db import get_session
+        from common.models import BacktestCacheEntry
+
+        found = {}
+        with get_session() as session:
+            rows = session.query(BacktestCacheEntry.cache_key, BacktestCacheEntry.data).filter(
+                BacktestCacheEntry.cache_key.in_(keys)).all()
+        for key, data in rows:
+            try:
+                found[key] = json.loads(gzip.decompress(data))
+            except Exception as e:
+                logger.warning(f"Unreadable backtest cache entry {key}: {e}")
+        return found
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        self.put_many([(key, entry)])
+
+    def put_many(self, entries: List[Tuple[str, Dict[str, Any]]]) -> None:
+        from sqlalchemy.dialects.postgresql import insert
+        from common.db import get_session
+        from common.models import BacktestCacheEntry
+
+        rows = []
+        for key, entry in entries:
+            meta = entry.get("meta", {})
+            rows.append({
+                "cache_key": key,
+                "strategy_type": str(meta.get("strategy_type") or "")[:50] or None,
+                "symbol": str(meta.get("symbol") or "")[:20] or None,
+                "compute_seconds": entry.get("compute_seconds"),
+                "data": gzip.compress(json.dumps(entry, default=str).encode()),
+            })
+        with get_session() as session:
+            # Another process may have stored the same result first
+            session.execute(insert(BacktestCacheEntry).values(rows).on_conflict_do_nothing(
+                index_elements=["cache_key"]))
+            session.commit()
+
+
+class BacktestResultCache:
+    """
+    Two-tier result cache.
+
+    Memory holds the most recently used ``max_entries`` results. Misses fall
+    through to the persistent store and are promoted on a hit. ``aput``
+    queues the persistent write and returns; a background task writes queued
+    entries in batches (``flush`` waits for it). Concurrent ``get_or_compute``
+    calls for the same key share one computation. Returned values are shared
+    with the cache and should be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MEMORY_ENTRIES, store: Any = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: In-memory LRU capacity
+            store: Persistent tier (DiskCacheStore, DatabaseCacheStore or None)
+        """
+        self.max_entries = max_entries
+        self.store = store
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._write_queue: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._writer: Optional[asyncio.Task] = None
+        self._store_retry_at = 0.0
+        self.stats = {
+            "memory_hits": 0, "persistent_hits": 0, "misses": 0, "puts": 0,
+            "evictions": 0, "persistent_errors": 0, "persistent_writes": 0,
+            "shared_computations": 0, "compute_seconds_saved": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Synchronous API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result for ``key`` or None."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Look up several keys, hitting the persistent tier once for all memory misses."""
+        found, missing = self._memory_lookup(keys)
+        if missing and self.store is not None:
+            found.update(self._promote(self._store_lookup(missing)))
+        self.stats["misses"] += len(set(keys) - set(found))
+        return found
+
+    def put(self, key: str, value: Any, meta: Optional[Dict[str, Any]] = None,
+            compute_seconds: Optional[float] = None) -> None:
+        """Store a result in memory and in the persistent tier."""
+        entry = self._remember(key, value, meta, compute_seconds)
+        if self.store is not None:
+            self._store_put(key, entry)
+
+    # ------------------------------------------------------------------
+    # Async API (persistent tier runs in the default executor)
+    # ------------------------------------------------------------------
+
+    async def aget_many(self, keys: List[str]) -> Dict[str, Any]:
+        found, missing = self._memory_lookup(keys)
+        if missing and self.store is not None:
+            loop = asyncio.get_running_loop()
+            stored = await loop.run_in_executor(None, self._store_lookup, missing)
+            found.update(self._promote(stored))
+        self.stats["misses"] += len(set(keys) - set(found))
+        return found
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return (await self.aget_many([key])).get(key)
+
+    async def aput(self, key: str, value: Any, meta: Optional[Dict[str, Any]] = None,
+                   compute_seconds: Optional[float] = None) -> None:
+        """Store a result in memory and queue it for the persistent tier without waiting for the write."""
+        entry = self._remember(key, value, meta, compute_seconds)
+        if self.store is not None:
+            self._write_queue[key] = entry
+            if self._writer is None or self._writer.done():
+                self._writer = asyncio.get_running_loop().create_task(self._write_behind())
+
+    async def flush(self) -> None:
+        """Wait until every queued persistent write has been attempted."""
+        while self._writer is not None and not self._writer.done():
+            await asyncio.shield(self._writer)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]],
+                             meta: Optional[Dict[str, Any]] = None,
+                             should_cache: Optional[Callable[[Any], bool]] = None,
+                             persistent_lookup: bool = True) -> Any:
+        """
+        Return the cached result, or run ``compute`` once even if many callers ask at the same time.
+
+        Args:
+            key: Cache key
+            compute: Coroutine function producing the result on a miss
+            meta: Stored alongside the result
+            should_cache: Results it rejects are returned but not cached
+            persistent_lookup: False when the caller already batch-checked the persistent tier
+        """
+        if persistent_lookup:
+            cached = await self.aget(key)
+        else:
+            found, _ = self._memory_lookup([key])
+            cached = found.get(key)
+        if cached is not None:
+            return cached
+
+        # Join a computation already running for this key; if its owner was
+        # cancelled, fall through and compute here instead
+        while key in self._in_flight:
+            pending = self._in_flight[key]
+            try:
+                self.stats["shared_computations"] += 1
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            started = time.perf_counter()
+            value = await compute()
+            if should_cache is None or should_cache(value):
+                await self.aput(key, value, meta, time.perf_counter() - started)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    async def _write_behind(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._write_queue:
+            batch = []
+            while self._write_queue and len(batch) < WRITE_BATCH:
+                batch.append(self._write_queue.popitem(last=False))
+            await loop.run_in_executor(None, self._store_put_many, batch)
+
+    # ------------------------------------------------------------------
+
+    def _memory_lookup(self, keys: List[str]):
+        found, missing = {}, []
+        for key in keys:
+            entry = self._memory.get(key)
+            if entry is None:
+                # Evicted from memory before its background write finished
+                entry = self._write_queue.get(key)
+                if entry is None:
+                    missing.append(key)
+                    continue
+                self._insert(key, entry)
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            self.stats["compute_seconds_saved"] += entry.get("compute_seconds") or 0.0
+            found[key] = entry["value"]
+        return found, missing
+
+    def _store_available(self) -> bool:
+        return time.monotonic() >= self._store_retry_at
+
+    def _store_failed(self, action: str, error: Exception) -> None:
+        self.stats["persistent_errors"] += 1
+        self._store_retry_at = time.monotonic() + PERSISTENT_RETRY_SECONDS
+        logger.warning(f"Backtest cache {self.store.name} {action} failed, memory only for "
+                       f"{PERSISTENT_RETRY_SECONDS}s: {error}")
+
+    def _store_lookup(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not self._store_available():
+            return {}
+        try:
+            return self.store.get_many(keys)
+        except Exception as e:
+            self._store_failed("lookup", e)
+            return {}
+
+    def _promote(self, entries: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        found = {}
+        for key, entry in entries.items():
+            self.stats["persistent_hits"] += 1
+            self.stats["compute_seconds_saved"] += entry.get("compute_seconds") or 0.0
+            self._insert(key, entry)
+            found[key] = entry["value"]
+        return found
+
+    def _remember(self, key: str, value: Any, meta: Optional[Dict[str, Any]],
+                  compute_seconds: Optional[float]) -> Dict[str, Any]:
+        entry = {"value": value, "meta": meta or {}, "compute_seconds": compute_seconds,
+                 "created_at": datetime.utcnow().isoformat()}
+        self._insert(key, entry)
+        self.stats["puts"] += 1
+        return entry
+
+    def _insert(self, key: str, entry: Dict[str, Any]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _store_put(self, key: str, entry: Dict[str, Any]) -> None:
+        if not self._store_available():
+            return
+        try:
+            self.store.put(key, entry)
+            self.stats["persistent_writes"] += 1
+        except Exception as e:
+            self._store_failed("write", e)
+
+    def _store_put_many(self, entries: List[Tuple[str, Dict[str, Any]]]) -> None:
+        if not self._store_available():
+            return
+        try:
+            self.store.put_many(entries)
+            self.stats["persistent_writes"] += len(entries)
+        except Exception as e:
+            self._store_failed("write", e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.stats["memory_hits"] + self.stats["persistent_hits"]
+        lookups = hits + self.stats["misses"]
+        return dict(
+            self.stats,
+            entries=len(self._memory),
+            max_entries=self.max_entries,
+            queued_writes=len(self._write_queue),
+            in_flight=len(self._in_flight),
+            persistent_tier=self.store.name if self.store is not None else None,
+            hit_rate=hits / lookups if lookups else 0.0,
+        )
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+
+_backtest_cache: Optional[BacktestResultCache] = None
+
+
+def get_backtest_cache() -> BacktestResultCache:
+    """
+    Get the process-wide backtest cache. BACKTEST_CACHE_DIR selects the disk
+    tier; otherwise results persist to the backtest_cache table.
+    """
+    global _backtest_cache
+    if _backtest_cache is None:
+        directory = os.getenv("BACKTEST_CACHE_DIR")
+        store = DiskCacheStore(directory) if directory else DatabaseCacheStore()
+        _backtest_cache = BacktestResultCache(
+            max_entries=int(os.getenv("BACKTEST_CACHE_SIZE", DEFAULT_MEMORY_ENTRIES)),
+            store=store
+        )
+    return _backtest_cache
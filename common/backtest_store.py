@@ -0,0 +1,261 @@
+"""
+Storage for backtest runs.
+The backtests table keeps one summary row per run (metrics, parameters, date
+range). Trades go to the append-only backtest_trades table and equity curves
+to compressed columnar artifacts, so listing backtests never deserializes
+trades and large runs can be paged through instead of loaded whole.
+"""
+
+import logging
+import zlib
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Iterator, Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+
+from .db import get_session
+from .models import Backtest, BacktestTrade, BacktestArtifact
+
+logger = logging.getLogger(__name__)
+
+TRADE_INSERT_BATCH = 5000
+DEFAULT_PAGE_SIZE = 500
+EQUITY_ENCODING = "zlib:i8ns,f8"
+
+# Trade fields with their own column; anything else goes to BacktestTrade.extra
+_TRADE_FIELDS = {
+    "symbol": "symbol",
+    "side": "side",
+    "entry_time": "entry_time",
+    "exit_time": "exit_time",
+    "entry_price": "entry_price",
+    "exit_price": "exit_price",
+    "units": "quantity",
+    "quantity": "quantity",
+    "pnl": "pnl",
+    "return_pct": "return_pct",
+    "bars_held": "bars_held",
+    "exit_reason": "exit_reason",
+}
+_TIME_FIELDS = ("entry_time", "exit_time")
+
+
+def _to_datetime(value: Any) -> Optional[datetime]:
+    if value is None or value == "":
+        return None
+    stamp = pd.Timestamp(value)
+    if stamp.tzinfo is not None:
+        stamp = stamp.tz_convert(None)
+    return stamp.to_pydatetime()
+
+
+def _json_safe(value: Any) -> Any:
+    if isinstance(value, (np.generic,)):
+        return value.item()
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return pd.Timestamp(value).isoformat()
+    return value
+
+
+def trade_rows(backtest_id: int, trades: Iterable[Dict[str, Any]], start_seq: int = 0) -> List[Dict[str, Any]]:
+    """Map simulator trade dicts onto backtest_trades rows."""
+    rows = []
+    for seq, trade in enumerate(trades, start=start_seq):
+        row = {"backtest_id": backtest_id, "seq": seq}
+        extra = {}
+        for key, value in trade.items():
+            column = _TRADE_FIELDS.get(key)
+            if column is None:
+                extra[key] = _json_safe(value)
+            elif key in _TIME_FIELDS:
+                row[column] = _to_datetime(value)
+            else:
+                row[column] = _json_safe(value)
+        row["extra"] = extra or None
+        rows.append(row)
+    return rows
+
+
+def row_to_trade(row: BacktestTrade) -> Dict[str, Any]:
+    """Inverse of trade_rows, in the shape the simulators produce."""
+    trade = {
+        "symbol": row.symbol,
+        "side": row.side,
+        "entry_time": row.entry_time.isoformat() if row.entry_time else None,
+        "exit_time": row.exit_time.isoformat() if row.exit_time else None,
+        "entry_price": row.entry_price,
+        "exit_price": row.exit_price,
+        "units": row.quantity,
+        "pnl": row.pnl,
+        "return_pct": row.return_pct,
+        "bars_held": row.bars_held,
+        "exit_reason": row.exit_reason,
+    }
+    trade = {key: value for key, value in trade.items() if value is not None}
+    if row.extra:
+        trade.update(row.extra)
+    trade["seq"] = row.seq
+    return trade
+
+
+def encode_equity_curve(points: Sequence[Sequence[Any]]) -> bytes:
+    """
+    Pack [[timestamp, equity], ...] as two contiguous columns.
+
+    Layout: int64 nanosecond timestamps followed by float64 equity values,
+    zlib-compressed. Roughly 16 bytes per point before compression, against
+    ~45 bytes per point as JSON.
+    """
+    if len(points) == 0:
+        return zlib.compress(b"")
+    times = pd.DatetimeIndex(pd.to_datetime([p[0] for p in points], utc=True)).tz_convert(None)
+    stamps = np.asarray(times, dtype="datetime64[ns]").view(np.int64)
+    values = np.asarray([p[1] for p in points], dtype=np.float64)
+    return zlib.compress(stamps.tobytes() + values.tobytes())
+
+
+def decode_equity_curve(data: bytes) -> List[List[Any]]:
+    raw = zlib.decompress(data)
+    n = len(raw) // 16
+    stamps = np.frombuffer(raw, dtype=np.int64, count=n)
+    values = np.frombuffer(raw, dtype=np.float64, count=n, offset=n * 8)
+    times = pd.to_datetime(stamps, unit="ns")
+    return [[t.isoformat(), float(v)] for t, v in zip(times, values)]
+
+
+def save_backtest(name: str, start_date: Any, end_date: Any, results: Dict[str, Any],
+                  trades: Optional[List[Dict[str, Any]]] = None,
+                  equity_curve: Optional[Sequence[Sequence[Any]]] = None,
+                  symbols: Optional[List[str]] = None, parameters: Optional[Dict[str, Any]] = None,
+                  strategy_id: Optional[int] = None, status: str = "completed", session=None) -> int:
+    """
+    Store one backtest run and return its id (blocking).
+
+    ``results`` should hold the summary only; trades and the equity curve
+    are written to their own tables in the same transaction.
+    """
+    own_session = session is None
+    session = session or get_session()
+    try:
+        trades = trades or []
+        summary = dict(results, total_trades=results.get("total_trades", len(trades)),
+                       equity_points=len(equity_curve) if equity_curve is not None else 0)
+        record = Backtest(
+            strategy_id=strategy_id,
+            name=str(name)[:100],
+            start_date=_to_datetime(start_date) or datetime.utcnow(),
+            end_date=_to_datetime(end_date) or datetime.utcnow(),
+            symbols=symbols or [],
+            parameters=parameters,
+            results=summary,
+            status=status
+        )
+        session.add(record)
+        session.flush()
+
+        for offset in range(0, len(trades), TRADE_INSERT_BATCH):
+            batch = trade_rows(record.id, trades[offset:offset + TRADE_INSERT_BATCH], start_seq=offset)
+            session.execute(insert(BacktestTrade), batch)
+        if equity_curve is not None:
+            session.add(BacktestArtifact(
+                backtest_id=record.id,
+                kind="equity_curve",
+                encoding=EQUITY_ENCODING,
+                rows=len(equity_curve),
+                data=encode_equity_curve(equity_curve)
+            ))
+        session.commit()
+        return record.id
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        if own_session:
+            session.close()
+
+
+def _summary(row: Backtest) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "strategy_id": row.strategy_id,
+        "name": row.name,
+        "start_date": row.start_date.isoformat() if row.start_date else None,
+        "end_date": row.end_date.isoformat() if row.end_date else None,
+        "symbols": row.symbols or [],
+        "parameters": row.parameters or {},
+        "results": row.results or {},
+        "status": row.status,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+    }
+
+
+def list_backtests(limit: int = 50, offset: int = 0, strategy_id: Optional[int] = None,
+                   status: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Newest backtest summaries; trades and equity curves are not loaded."""
+    with get_session() as session:
+        query = session.query(Backtest)
+        if strategy_id is not None:
+            query = query.filter(Backtest.strategy_id == strategy_id)
+        if status is not None:
+            query = query.filter(Backtest.status == status)
+        rows = query.order_by(Backtest.created_at.desc(), Backtest.id.desc()).offset(offset).limit(limit).all()
+        return [_summary(row) for row in rows]
+
+
+def get_backtest(backtest_id: int) -> Optional[Dict[str, Any]]:
+    """One backtest summary, or None."""
+    with get_session() as session:
+        row = session.get(Backtest, backtest_id)
+        return _summary(row) if row is not None else None
+
+
+def get_trades(backtest_id: int, limit: int = DEFAULT_PAGE_SIZE, after_seq: int = -1,
+               session=None) -> List[Dict[str, Any]]:
+    """
+    One page of trades in order.
+
+    Pages are keyed on ``seq``: pass the ``seq`` of the last trade of a page
+    as ``after_seq`` to get the next one.
+    """
+    own_session = session is None
+    session = session or get_session()
+    try:
+        rows = session.query(BacktestTrade).filter(
+            BacktestTrade.backtest_id == backtest_id,
+            BacktestTrade.seq > after_seq
+        ).order_by(BacktestTrade.seq).limit(limit).all()
+        return [row_to_trade(row) for row in rows]
+    finally:
+        if own_session:
+            session.close()
+
+
+def iter_trades(backtest_id: int, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """Lazily walk every trade of a backtest, one page per query."""
+    after_seq = -1
+    while True:
+        page = get_trades(backtest_id, limit=page_size, after_seq=after_seq)
+        yield from page
+        if len(page) < page_size:
+            return
+        after_seq = page[-1]["seq"]
+
+
+def get_equity_curve(backtest_id: int, session=None) -> List[List[Any]]:
+    own_session = session is None
+    session = session or get_session()
+    try:
+        artifact = session.query(BacktestArtifact).filter(
+            BacktestArtifact.backtest_id == backtest_id,
+            BacktestArtifact.kind == "equity_curve"
+        ).first()
+        if artifact is None:
+            return []
+        if artifact.encoding != EQUITY_ENCODING:
+            raise ValueError(f"Unknown equity curve encoding: {artifact.encoding}")
+        return decode_equity_curve(artifact.data)
+    finally:
+        if own_session:
+            session.close()
@@ -0,0 +1,438 @@
+"""
+Indexed memory of autonomous decisions for similar-decision lookup.
+Each decision's type, context and confidence are hashed into a fixed-length
+unit vector and stored in an in-process IVF index (k-means centroids with
+inverted lists, numpy only), so finding the k most similar past decisions
+scans a few lists instead of the whole history. Outcome statistics are
+aggregated over the neighbors, and the memory is saved to disk
+periodically and reloaded on startup.
+"""
+
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TYPE_DIMS = 8            # Hashed decision type block
+FEATURE_DIMS = 56        # Hashed context features
+DIM = TYPE_DIMS + FEATURE_DIMS
+TYPE_WEIGHT = 1.5        # Relative weight of the type block, keeps types in separate clusters
+SUCCESS_SCORE = 0.7      # Validation score above which a decision counts as a success
+
+DEFAULT_TRAIN_SIZE = 2048   # Brute force below this many decisions
+DEFAULT_NPROBE = 8
+RETRAIN_FACTOR = 4          # Retrain the centroids whenever the index quadruples
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE = 50000
+ASSIGN_CHUNK = 8192
+DEFAULT_PERSIST_INTERVAL = 300.0
+
+
+def _bucket(token: str, size: int) -> Tuple[int, float]:
+    h = zlib.crc32(token.encode())
+    return h % size, (1.0 if (h >> 16) & 1 else -1.0)
+
+
+def _flatten(value: Any, path: str, out: List[Tuple[str, Any]], depth: int = 0) -> None:
+    if isinstance(value, dict) and depth < 3:
+        for key, item in value.items():
+            _flatten(item, f"{path}.{key}" if path else str(key), out, depth + 1)
+    elif isinstance(value, (list, tuple)) and depth < 3:
+        numbers = [v for v in value if isinstance(v, (int, float)) and not isinstance(v, bool)]
+        if numbers:
+            out.append((f"{path}#mean", sum(numbers) / len(numbers)))
+        for item in value:
+            if isinstance(item, str):
+                out.append((path, item))
+    else:
+        out.append((path, value))
+
+
+def featurize(decision_type: str, context: Dict[str, Any], confidence: float = 0.0) -> np.ndarray:
+    """
+    Fixed-length unit vector for a decision: hashed type block, then one
+    hashed bucket per context field (numbers log-scaled, everything else
+    as ``field=value`` indicators) and the confidence.
+    """
+    vector = np.zeros(DIM, dtype=np.float32)
+    index, _ = _bucket(decision_type, TYPE_DIMS)
+    vector[index] = TYPE_WEIGHT
+    fields: List[Tuple[str, Any]] = []
+    _flatten(context or {}, "", fields)
+    fields.append(("#confidence", float(confidence or 0.0)))
+    features = np.zeros(FEATURE_DIMS, dtype=np.float32)
+    for path, value in fields:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            index, sign = _bucket(f"{path}={value}", FEATURE_DIMS)
+            features[index] += sign
+        elif math.isfinite(value):
+            index, sign = _bucket(path, FEATURE_DIMS)
+            features[index] += sign * math.copysign(math.log1p(abs(value)), value)
+    norm = float(np.linalg.norm(features))
+    if norm > 0:
+        vector[TYPE_DIMS:] = features / norm
+    vector /= float(np.linalg.norm(vector))
+    return vector
+
+
+@dataclass
+class Neighbor:
+    decision_id: str
+    decision_type: str
+    similarity: float
+    score: float
+
+
+class DecisionIndex:
+    """
+    Inverted-file index over unit vectors (inner product = cosine).
+
+    Below ``train_size`` rows searches are exact. After that k-means
+    centroids (about 2 * sqrt(n) of them) partition the rows, a query scans
+    the ``nprobe`` nearest lists (widening when too few rows of the wanted
+    type are found), and the centroids are retrained each time the index
+    grows by RETRAIN_FACTOR.
+    """
+
+    def __init__(self, dim: int = DIM, train_size: int = DEFAULT_TRAIN_SIZE, nprobe: int = DEFAULT_NPROBE):
+        self.dim = dim
+        self.train_size = train_size
+        self.nprobe = nprobe
+        self.count = 0
+        self.vectors = np.zeros((1024, dim), dtype=np.float32)
+        self.labels = np.zeros(1024, dtype=np.int32)      # Decision type code per row
+        self.assignments = np.zeros(1024, dtype=np.int32)  # Inverted list per row
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_at = 0
+        self._lists: List[List[int]] = []
+        self._list_cache: List[Optional[np.ndarray]] = []
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self.vectors)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("vectors", "labels", "assignments"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, vectors: np.ndarray, labels: np.ndarray) -> np.ndarray:
+        """Append rows; returns their row numbers."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        start, end = self.count, self.count + len(vectors)
+        self._grow(end)
+        self.vectors[start:end] = vectors
+        self.labels[start:end] = labels
+        self.count = end
+        if self.count >= self.train_size and self.count >= RETRAIN_FACTOR * self.trained_at:
+            self.train()
+        elif self.centroids is not None:
+            assigned = self._assign(vectors)
+            self.assignments[start:end] = assigned
+            for row, list_id in zip(range(start, end), assigned):
+                self._lists[list_id].append(row)
+                self._list_cache[list_id] = None
+        return np.arange(start, end)
+
+    def train(self, seed: int = 0) -> None:
+        """(Re)compute the centroids with k-means and rebuild the inverted lists."""
+        n = self.count
+        nlist = int(min(4096, max(16, 2 * math.sqrt(n))))
+        rng = np.random.default_rng(seed)
+        sample = self.vectors[rng.choice(n, min(n, max(KMEANS_SAMPLE, 32 * nlist)), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assigned = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assigned, sample)
+            counts = np.bincount(assigned, minlength=nlist)
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]   # Reseed empty clusters
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        self.centroids = centroids.astype(np.float32)
+        self.assignments[:n] = self._assign(self.vectors[:n])
+        order = np.argsort(self.assignments[:n], kind="stable")
+        bounds = np.searchsorted(self.assignments[:n][order], np.arange(nlist + 1))
+        self._lists = [order[bounds[i]:bounds[i + 1]].tolist() for i in range(nlist)]
+        self._list_cache = [None] * nlist
+        self.trained_at = n
+        logger.info(f"Decision index trained: {n} decisions in {nlist} lists")
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        out = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), ASSIGN_CHUNK):
+            out[start:start + ASSIGN_CHUNK] = np.argmax(vectors[start:start + ASSIGN_CHUNK] @ self.centroids.T, axis=1)
+        return out
+
+    def _list_rows(self, list_id: int) -> np.ndarray:
+        rows = self._list_cache[list_id]
+        if rows is None:
+            rows = self._list_cache[list_id] = np.asarray(self._lists[list_id], dtype=np.int64)
+        return rows
+
+    def search(self, query: np.ndarray, k: int, label: Optional[int] = None,
+               nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Rows and similarities of the ``k`` nearest rows (optionally of one label), plus rows scanned."""
+        if self.count == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), 0
+        if self.centroids is None:
+            rows = np.arange(self.count)
+            if label is not None:
+                rows = rows[self.labels[rows] == label]
+        else:
+            nlist = len(self.centroids)
+            probe = min(nprobe or self.nprobe, nlist)
+            order = np.argsort(-(self.centroids @ query))
+            while True:
+                rows = np.concatenate([self._list_rows(i) for i in order[:probe]])
+                if label is not None:
+                    rows = rows[self.labels[rows] == label]
+                if len(rows) >= k or probe >= nlist:
+                    break
+                probe = min(probe * 4, nlist)
+        if len(rows) == 0:
+            return rows, np.empty(0, dtype=np.float32), 0
+        sims = self.vectors[rows] @ query
+        if len(rows) > k:
+            top = np.argpartition(-sims, k)[:k]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-sims[top])]
+        return rows[top], sims[top], len(rows)
+
+
+class DecisionMemory:
+    """
+    Decisions with their outcome (validation score), searchable by
+    similarity. Thread-safe; ``save`` writes a snapshot atomically and
+    ``persist_if_due`` does so at most every ``persist_interval`` seconds
+    when something changed.
+    """
+
+    def __init__(self, path: Optional[str] = None, persist_interval: float = DEFAULT_PERSIST_INTERVAL,
+                 train_size: int = DEFAULT_TRAIN_SIZE, nprobe: int = DEFAULT_NPROBE):
+        """
+        Initialize the memory.
+
+        Args:
+            path: .npz file to persist to (None keeps it in memory only)
+            persist_interval: Minimum seconds between periodic saves
+            train_size: Decisions before the IVF index replaces exact search
+            nprobe: Inverted lists scanned per query
+        """
+        self.path = path
+        self.persist_interval = persist_interval
+        self.index = DecisionIndex(train_size=train_size, nprobe=nprobe)
+        self.scores = np.zeros(1024, dtype=np.float32)
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self.type_names: List[str] = []
+        self._type_codes: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._dirty = 0
+        self._last_persist = time.monotonic()
+        self.stats = {"added": 0, "updated": 0, "searches": 0, "rows_scanned": 0, "saves": 0}
+
+    def __len__(self) -> int:
+        return self.index.count
+
+    def _type_code(self, decision_type: str) -> int:
+        code = self._type_codes.get(decision_type)
+        if code is None:
+            code = self._type_codes[decision_type] = len(self.type_names)
+            self.type_names.append(decision_type)
+        return code
+
+    def add(self, decision_id: str, decision_type: str, context: Dict[str, Any],
+            confidence: float, score: float) -> None:
+        """Remember a decision and its outcome (re-adding an id updates the outcome)."""
+        self.add_vectors([decision_id], [decision_type], featurize(decision_type, context, confidence)[None, :],
+                         [score])
+
+    def add_vectors(self, decision_ids: List[str], decision_types: List[str], vectors: np.ndarray,
+                    scores: List[float]) -> None:
+        """Bulk insert of already featurized decisions."""
+        with self._lock:
+            new = [i for i, decision_id in enumerate(decision_ids) if decision_id not in self._rows]
+            for i, decision_id in enumerate(decision_ids):
+                if decision_id in self._rows:
+                    self.scores[self._rows[decision_id]] = scores[i]
+                    self.stats["updated"] += 1
+            if not new:
+                self._dirty += len(decision_ids)
+                return
+            labels = np.array([self._type_code(decision_types[i]) for i in new], dtype=np.int32)
+            rows = self.index.add(np.asarray(vectors)[new], labels)
+            if len(self.scores) < self.index.count:
+                grown = np.zeros(len(self.index.vectors), dtype=np.float32)
+                grown[:len(self.ids)] = self.scores[:len(self.ids)]
+                self.scores = grown
+            for row, i in zip(rows, new):
+                self.scores[row] = scores[i]
+                self.ids.append(decision_ids[i])
+                self._rows[decision_ids[i]] = int(row)
+            self.stats["added"] += len(new)
+            self._dirty += len(decision_ids)
+
+    def update_outcome(self, decision_id: str, score: float) -> bool:
+        with self._lock:
+            row = self._rows.get(decision_id)
+            if row is None:
+                return False
+            self.scores[row] = score
+            self.stats["updated"] += 1
+            self._dirty += 1
+            return True
+
+    def search(self, decision_type: str, context: Dict[str, Any], confidence: float = 0.0, k: int = 20,
+               same_type: bool = True, exclude_id: Optional[str] = None) -> List[Neighbor]:
+        """The ``k`` most similar remembered decisions, most similar first."""
+        query = featurize(decision_type, context, confidence)
+        with self._lock:
+            label = self._type_codes.get(decision_type) if same_type else None
+            if same_type and label is None:
+                return []
+            rows, sims, scanned = self.index.search(query, k + (1 if exclude_id else 0), label)
+            self.stats["searches"] += 1
+            self.stats["rows_scanned"] += scanned
+            neighbors = [Neighbor(self.ids[row], self.type_names[self.index.labels[row]], float(sim),
+                                  float(self.scores[row]))
+                         for row, sim in zip(rows, sims) if self.ids[row] != exclude_id]
+        return neighbors[:k]
+
+    def similar_outcomes(self, decision_type: str, context: Dict[str, Any], confidence: float = 0.0,
+                         k: int = 20, exclude_id: Optional[str] = None) -> Dict[str, Any]:
+        """Outcome statistics over the ``k`` most similar decisions of the same type."""
+        neighbors = self.search(decision_type, context, confidence, k, exclude_id=exclude_id)
+        if not neighbors:
+            return {"count": 0, "neighbors": []}
+        scores = np.array([n.score for n in neighbors])
+        weights = np.maximum(np.array([n.similarity for n in neighbors]), 1e-6)
+        successes = scores > SUCCESS_SCORE
+        return {
+            "count": len(neighbors),
+            "success_rate": float(successes.mean()),
+            "weighted_success_rate": float((weights * successes).sum() / weights.sum()),
+            "mean_score": float(scores.mean()),
+            "mean_similarity": float(weights.mean()),
+            "neighbors": neighbors,
+        }
+
+    # ------------------------------------------------------------------
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write a snapshot to ``path`` (default: the configured path) atomically."""
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            n = self.index.count
+            snapshot = {
+                "vectors": self.index.vectors[:n].copy(),
+                "labels": self.index.labels[:n].copy(),
+                "assignments": self.index.assignments[:n].copy(),
+                "centroids": self.index.centroids if self.index.centroids is not None else np.zeros((0, DIM), np.float32),
+                "trained_at": np.array(self.index.trained_at),
+                "scores": self.scores[:n].copy(),
+                "ids": np.array(self.ids, dtype=str),
+                "type_names": np.array(self.type_names, dtype=str),
+            }
+            dirty = self._dirty
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **snapshot)
+            os.replace(tmp, path)
+        except Exception:
+            os.unlink(tmp)
+            raise
+        with self._lock:
+            self._dirty -= dirty
+            self._last_persist = time.monotonic()
+            self.stats["saves"] += 1
+
+    def persist_if_due(self) -> bool:
+        """Save if there are unsaved changes and the persist interval has passed."""
+        if not self.path or not self._dirty or time.monotonic() - self._last_persist < self.persist_interval:
+            return False
+        self.save()
+        return True
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "DecisionMemory":
+        """Memory persisted at ``path`` (empty if the file doesn't exist)."""
+        memory = cls(path=path, **kwargs)
+        if not os.path.exists(path):
+            return memory
+        with np.load(path) as data:
+            memory.type_names = [str(name) for name in data["type_names"]]
+            memory._type_codes = {name: code for code, name in enumerate(memory.type_names)}
+            memory.ids = [str(i) for i in data["ids"]]
+            memory._rows = {decision_id: row for row, decision_id in enumerate(memory.ids)}
+            n = len(memory.ids)
+            index = memory.index
+            index._grow(max(n, 1))
+            index.vectors[:n] = data["vectors"]
+            index.labels[:n] = data["labels"]
+            index.assignments[:n] = data["assignments"]
+            index.count = n
+            memory.scores = np.zeros(len(index.vectors), dtype=np.float32)
+            memory.scores[:n] = data["scores"]
+            if len(data["centroids"]):
+                index.centroids = data["centroids"].astype(np.float32)
+                index.trained_at = int(data["trained_at"])
+                nlist = len(index.centroids)
+                order = np.argsort(index.assignments[:n], kind="stable")
+                bounds = np.searchsorted(index.assignments[:n][order], np.arange(nlist + 1))
+                index._lists = [order[bounds[i]:bounds[i + 1]].tolist() for i in range(nlist)]
+                index._list_cache = [None] * nlist
+        logger.info(f"Loaded {len(memory)} decisions from {path}")
+        return memory
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            searches = self.stats["searches"]
+            return dict(
+                self.stats,
+                decisions=self.index.count,
+                lists=len(self.index.centroids) if self.index.centroids is not None else 0,
+                avg_rows_scanned=self.stats["rows_scanned"] / searches if searches else 0.0,
+                unsaved_changes=self._dirty,
+                path=self.path,
+            )
+
+
+_decision_memory: Optional[DecisionMemory] = None
+
+
+def get_decision_memory() -> DecisionMemory:
+    """
+    Get the process-wide decision memory, loaded from DECISION_MEMORY_PATH
+    (default: a file in the temp directory) and saved back every
+    DECISION_MEMORY_PERSIST_SECONDS.
+    """
+    global _decision_memory
+    if _decision_memory is None:
+        path = os.getenv("DECISION_MEMORY_PATH",
+                         os.path.join(tempfile.gettempdir(), "volexswarm_decision_memory.npz"))
+        interval = float(os.getenv("DECISION_MEMORY_PERSIST_SECONDS", DEFAULT_PERSIST_INTERVAL))
+        try:
+            _decision_memory = DecisionMemory.load(path, persist_interval=interval)
+        except Exception as e:
+            logger.warning(f"Could not load decision memory from {path}, starting empty: {e}")
+            _decision_memory = DecisionMemory(path=path, persist_interval=interval)
+    return _decision_memory
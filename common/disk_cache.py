@@ -0,0 +1,90 @@
+"""
+Directory-backed persistent tier shared by the result caches.
+Each entry is a gzip-compressed JSON file named after its key; writes go
+through a temporary file, so readers never see a partial entry.
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+from typing import Dict, Any, Optional, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCacheStore:
+    """Persistent tier as one gzip-compressed JSON file per key."""
+
+    name = "disk"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        for key in keys:
+            path = self._path(key)
+            if not os.path.exists(path):
+                continue
+            try:
+                with gzip.open(path, "rt") as f:
+                    found[key] = json.load(f)
+            except Exception as e:
+                logger.warning(f"Unreadable cache entry {path}: {e}")
+        return found
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt") as f:
+            json.dump(entry, f, default=str)
+        os.replace(tmp_path, path)
+
+    def put_many(self, entries: List[Tuple[str, Dict[str, Any]]]) -> None:
+        for key, entry in entries:
+            self.put(key, entry)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def prune(self, max_age: Optional[float] = None, max_entries: Optional[int] = None) -> int:
+        """
+        Delete entries last written more than ``max_age`` seconds ago, then
+        the oldest beyond ``max_entries``. Goes by file times, so nothing is
+        read. Returns the number of entries deleted.
+        """
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".json.gz"):
+                    path = os.path.join(root, name)
+                    try:
+                        files.append((os.path.getmtime(path), path))
+                    except FileNotFoundError:
+                        continue
+        files.sort()
+        stale = []
+        if max_age is not None:
+            cutoff = time.time() - max_age
+            stale = [path for mtime, path in files if mtime < cutoff]
+            files = files[len(stale):]
+        if max_entries is not None and len(files) > max_entries:
+            stale += [path for _, path in files[:len(files) - max_entries]]
+        deleted = 0
+        for path in stale:
+            try:
+                os.remove(path)
+                deleted += 1
+            except FileNotFoundError:
+                continue
+        return deleted
@@ -0,0 +1,258 @@
+"""
+Shared exchange client pool for VolexSwarm agents.
+Reuses async ccxt clients (and their aiohttp sessions) per exchange and credential,
+loads markets once with a refresh interval, and tracks request counts and latencies.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Callable, Tuple, Deque
+
+import ccxt.async_support as ccxt_async
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MARKET_REFRESH_INTERVAL = 3600  # seconds
+LATENCY_WINDOW = 500  # recent samples kept per client for percentiles
+STALE_CLOSE_TIMEOUT = 5  # seconds to wait for a client on another loop to close
+
+
+@dataclass
+class ExchangeClientStats:
+    """Request counters and latency samples for one pooled client."""
+    requests: int = 0
+    errors: int = 0
+    market_loads: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    last_request_at: Optional[float] = None
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    methods: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, method: str, latency: float, success: bool) -> None:
+        self.requests += 1
+        if not success:
+            self.errors += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.last_request_at = time.time()
+        self.latencies.append(latency)
+        self.methods[method] = self.methods.get(method, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        samples = sorted(self.latencies)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "market_loads": self.market_loads,
+            "avg_latency_ms": (self.total_latency / self.requests * 1000) if self.requests else 0.0,
+            "p95_latency_ms": p95 * 1000,
+            "max_latency_ms": self.max_latency * 1000,
+            "last_request_at": self.last_request_at,
+            "methods": dict(self.methods),
+        }
+
+
+@dataclass
+class _PooledClient:
+    """An exchange instance together with the loop it is bound to."""
+    exchange: Any
+    loop: asyncio.AbstractEventLoop
+    lock: asyncio.Lock
+    stats: ExchangeClientStats = field(default_factory=ExchangeClientStats)
+    markets_loaded_at: Optional[float] = None
+
+
+class ExchangeClientPool:
+    """
+    Process-wide registry of async ccxt clients.
+    One client is kept per (exchange, credential) pair so TLS sessions and
+    market metadata are reused across calls instead of rebuilt per request.
+    """
+
+    def __init__(self, market_refresh_interval: float = DEFAULT_MARKET_REFRESH_INTERVAL,
+                 exchange_factory: Optional[Callable[[str, Dict[str, Any]], Any]] = None):
+        """
+        Initialize the pool.
+
+        Args:
+            market_refresh_interval: Seconds before markets are reloaded
+            exchange_factory: Optional callable(exchange_id, config) used to build clients
+        """
+        self.market_refresh_interval = market_refresh_interval
+        self._exchange_factory = exchange_factory or self._default_factory
+        self._clients: Dict[Tuple[str, str], _PooledClient] = {}
+
+    @staticmethod
+    def _default_factory(exchange_id: str, config: Dict[str, Any]) -> Any:
+        exchange_class = getattr(ccxt_async, exchange_id, None)
+        if exchange_class is None:
+            raise ValueError(f"Unsupported exchange: {exchange_id}")
+        return exchange_class(config)
+
+    @staticmethod
+    def _credential_fingerprint(credentials: Optional[Dict[str, str]]) -> str:
+        """Stable, non-reversible key for a credential set ('public' when absent)."""
+        if not credentials or not credentials.get("api_key"):
+            return "public"
+        return hashlib.sha256(credentials["api_key"].encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _build_config(credentials: Optional[Dict[str, str]]) -> Dict[str, Any]:
+        config: Dict[str, Any] = {"enableRateLimit": True}
+        if credentials and credentials.get("api_key"):
+            config["apiKey"] = credentials.get("api_key")
+            # Vault stores "secret_key"; ExchangeManager passes "secret"
+            config["secret"] = credentials.get("secret_key") or credentials.get("secret")
+        return config
+
+    async def get_client(self, exchange_id: str, credentials: Optional[Dict[str, str]] = None,
+                         load_markets: bool = True) -> Any:
+        """
+        Get a shared client, creating it and loading markets if needed.
+
+        Args:
+            exchange_id: ccxt exchange id (e.g. 'binanceus')
+            credentials: Optional dict with 'api_key' and 'secret_key'/'secret'
+            load_markets: Whether to ensure markets are loaded and fresh
+
+        Returns:
+            An async ccxt exchange instance
+        """
+        key = (exchange_id, self._credential_fingerprint(credentials))
+        loop = asyncio.get_running_loop()
+        pooled = self._clients.get(key)
+        stale = None
+
+        if pooled is not None and pooled.loop is not loop:
+            # aiohttp sessions cannot cross event loops; rebuild for this one
+            logger.info(f"Exchange client {exchange_id} bound to another event loop, recreating")
+            stale, pooled = pooled, None
+
+        if pooled is None:
+            exchange = self._exchange_factory(exchange_id, self._build_config(credentials))
+            pooled = _PooledClient(exchange=exchange, loop=loop, lock=asyncio.Lock())
+            self._clients[key] = pooled
+            logger.info(f"Created pooled exchange client for {exchange_id} ({key[1]})")
+
+        if stale is not None:
+            # The replacement is installed first, so callers arriving while the
+            # old client closes share it instead of building their own
+            await self._close_stale(stale)
+
+        if load_markets:
+            await self._ensure_markets(pooled)
+
+        return pooled.exchange
+
+    @staticmethod
+    async def _close_stale(pooled: _PooledClient) -> None:
+        """Close a client created on another event loop, on that loop while it is still running."""
+        try:
+            if pooled.loop.is_running() and not pooled.loop.is_closed():
+                future = asyncio.run_coroutine_threadsafe(pooled.exchange.close(), pooled.loop)
+                await asyncio.wait_for(asyncio.wrap_future(future), STALE_CLOSE_TIMEOUT)
+            else:
+                await pooled.exchange.close()
+        except Exception as e:
+            logger.warning(f"Error closing stale exchange client: {e}")
+
+    async def _ensure_markets(self, pooled: _PooledClient) -> None:
+        """Load markets once and reload them after the refresh interval."""
+        if self._markets_fresh(pooled):
+            return
+        async with pooled.lock:
+            if self._markets_fresh(pooled):
+                return
+            reload = pooled.markets_loaded_at is not None
+            start = time.perf_counter()
+            try:
+                await pooled.exchange.load_markets(reload)
+                pooled.markets_loaded_at = time.time()
+                pooled.stats.market_loads += 1
+                pooled.stats.record("load_markets", time.perf_counter() - start, True)
+            except Exception:
+                pooled.stats.record("load_markets", time.perf_counter() - start, False)
+                raise
+
+    def _markets_fresh(self, pooled: _PooledClient) -> bool:
+        return (pooled.markets_loaded_at is not None and
+                time.time() - pooled.markets_loaded_at < self.market_refresh_interval)
+
+    async def call(self, exchange_id: str, method: str, *args,
+                   credentials: Optional[Dict[str, str]] = None, **kwargs) -> Any:
+        """
+        Call a ccxt method on the shared client and record its latency.
+
+        Args:
+            exchange_id: ccxt exchange id
+            method: Name of the async ccxt method (e.g. 'fetch_ticker')
+            credentials: Optional exchange credentials
+        """
+        exchange = await self.get_client(exchange_id, credentials)
+        pooled = self._clients[(exchange_id, self._credential_fingerprint(credentials))]
+        start = time.perf_counter()
+        try:
+            result = await getattr(exchange, method)(*args, **kwargs)
+        except Exception:
+            pooled.stats.record(method, time.perf_counter() - start, False)
+            raise
+        pooled.stats.record(method, time.perf_counter() - start, True)
+        return result
+
+    async def fetch_ticker(self, exchange_id: str, symbol: str,
+                           credentials: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Fetch a ticker through the shared client."""
+        return await self.call(exchange_id, "fetch_ticker", symbol, credentials=credentials)
+
+    async def fetch_ohlcv(self, exchange_id: str, symbol: str, timeframe: str = "1d",
+                          since: Optional[int] = None, limit: Optional[int] = None,
+                          credentials: Optional[Dict[str, str]] = None) -> list:
+        """Fetch OHLCV candles through the shared client."""
+        return await self.call(exchange_id, "fetch_ohlcv", symbol, timeframe, since, limit,
+                               credentials=credentials)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request counts and latencies for every pooled client."""
+        clients = {}
+        for (exchange_id, fingerprint), pooled in self._clients.items():
+            entry = pooled.stats.to_dict()
+            entry["markets_loaded_at"] = pooled.markets_loaded_at
+            clients[f"{exchange_id}:{fingerprint}"] = entry
+        return {
+            "clients": clients,
+            "total_clients": len(self._clients),
+            "total_requests": sum(p.stats.requests for p in self._clients.values()),
+            "total_errors": sum(p.stats.errors for p in self._clients.values()),
+            "market_refresh_interval": self.market_refresh_interval,
+        }
+
+    async def close_all(self) -> None:
+        """Close every pooled client bound to the running loop."""
+        loop = asyncio.get_running_loop()
+        for key, pooled in list(self._clients.items()):
+            if pooled.loop is not loop:
+                continue
+            try:
+                await pooled.exchange.close()
+            except Exception as e:
+                logger.warning(f"Error closing exchange client {key[0]}: {e}")
+            self._clients.pop(key, None)
+        logger.info("Closed pooled exchange clients")
+
+
+# Global exchange client pool instance
+_exchange_pool: Optional[ExchangeClientPool] = None
+
+
+def get_exchange_pool() -> ExchangeClientPool:
+    """Get the global exchange client pool."""
+    global _exchange_pool
+    if _exchange_pool is None:
+        _exchange_pool = ExchangeClientPool()
+    return _exchange_pool
@@ -0,0 +1,289 @@
+"""
+Background health registry for the agents and services the meta agent watches.
+Every target is probed on its own adaptive schedule (every few seconds
+after a failure, backing off while it stays healthy) with a per-target
+timeout, all probes sharing one HTTP session and running concurrently.
+Health endpoints read the cached results instead of probing inline, so
+their latency no longer depends on the slowest agent.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, Awaitable, Callable, Iterable, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 3.0           # Seconds per probe
+DEFAULT_MIN_INTERVAL = 3.0      # Probe interval after a failure
+DEFAULT_BASE_INTERVAL = 15.0    # Interval right after a target (re)becomes healthy
+DEFAULT_MAX_INTERVAL = 60.0     # Ceiling while a target stays healthy
+BACKOFF = 1.5                   # Interval growth per consecutive healthy probe
+
+HEALTHY = "healthy"
+UNKNOWN = "unknown"
+
+Probe = Callable[[aiohttp.ClientSession], Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class HealthTarget:
+    """Something to probe: ``probe`` returns a dict with at least ``status``."""
+    id: str
+    name: str
+    probe: Probe
+    timeout: float = DEFAULT_TIMEOUT
+    info: Dict[str, Any] = field(default_factory=dict)  # Static fields copied into the view (port, endpoint)
+
+
+@dataclass
+class _TargetState:
+    target: HealthTarget
+    interval: float
+    result: Dict[str, Any] = field(default_factory=lambda: {"status": UNKNOWN})
+    checked_at: Optional[datetime] = None
+    checked_monotonic: Optional[float] = None
+    latency: Optional[float] = None
+    next_due: float = 0.0
+    in_flight: bool = False
+    consecutive_failures: int = 0
+    checks: int = 0
+    failures: int = 0
+
+
+def http_probe(url: str) -> Probe:
+    """Probe an agent's JSON health endpoint; non-200 responses are unhealthy."""
+    async def probe(session: aiohttp.ClientSession) -> Dict[str, Any]:
+        async with session.get(url) as response:
+            if response.status != 200:
+                return {"status": "unhealthy", "error": f"HTTP {response.status}"}
+            try:
+                data = await response.json(content_type=None)
+            except ValueError:
+                data = {}
+            data = data if isinstance(data, dict) else {}
+            return dict(data, status=data.get("status", HEALTHY))
+    return probe
+
+
+def vault_probe(vault_addr: Optional[str] = None) -> Probe:
+    """Probe Vault's unauthenticated /v1/sys/health (sealed or uninitialized is unhealthy)."""
+    url = f"{(vault_addr or os.getenv('VAULT_ADDR', 'http://localhost:8200')).rstrip('/')}/v1/sys/health?standbyok=true"
+
+    async def probe(session: aiohttp.ClientSession) -> Dict[str, Any]:
+        async with session.get(url) as response:
+            try:
+                data = await response.json(content_type=None)
+            except ValueError:
+                data = {}
+            data = data if isinstance(data, dict) else {}
+            if response.status == 200:
+                status = HEALTHY
+            elif data.get("sealed"):
+                status = "sealed"
+            elif data.get("initialized") is False:
+                status = "uninitialized"
+            else:
+                status = "unhealthy"
+            result = {"status": status, "version": data.get("version"), "sealed": data.get("sealed")}
+            if status != HEALTHY:
+                result["error"] = f"HTTP {response.status}"
+            return result
+    return probe
+
+
+def database_probe(get_client: Callable[[], Any]) -> Probe:
+    """Run the database client's ``SELECT 1`` health check on the default executor."""
+    async def probe(session: aiohttp.ClientSession) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        healthy = await loop.run_in_executor(None, lambda: get_client().health_check())
+        return {"status": HEALTHY if healthy else "unhealthy"}
+    return probe
+
+
+class HealthRegistry:
+    """
+    Cached health of a set of targets, refreshed in the background.
+
+    A probe that raises or exceeds its timeout counts as "unreachable". The
+    interval drops to ``min_interval`` after any failure and grows by
+    ``BACKOFF`` per healthy probe from ``base_interval`` up to
+    ``max_interval``. ``view()`` only reads the cache; each entry carries
+    when it was checked, its age and whether it is stale (older than two
+    intervals plus the timeout, e.g. because the refresher stopped).
+    """
+
+    def __init__(self, targets: Iterable[HealthTarget] = (), min_interval: float = DEFAULT_MIN_INTERVAL,
+                 base_interval: float = DEFAULT_BASE_INTERVAL, max_interval: float = DEFAULT_MAX_INTERVAL):
+        """
+        Initialize the registry.
+
+        Args:
+            targets: Targets to probe
+            min_interval: Seconds between probes of a failing target
+            base_interval: Seconds between probes once a target is healthy
+            max_interval: Longest interval for a target that stays healthy
+        """
+        self.min_interval = min_interval
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self._states: Dict[str, _TargetState] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._probes: set = set()
+        for target in targets:
+            self.add(target)
+
+    def add(self, target: HealthTarget) -> None:
+        self._states[target.id] = _TargetState(target, interval=self.base_interval)
+        if self._wake is not None:
+            self._wake.set()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background refresher (idempotent); every target is probed right away."""
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for probe in list(self._probes):
+            probe.cancel()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def refresh(self, target_ids: Optional[Iterable[str]] = None) -> None:
+        """Probe the given targets (all by default) now and wait for the results."""
+        ids = list(target_ids) if target_ids is not None else list(self._states)
+        states = [self._states[i] for i in ids if i in self._states and not self._states[i].in_flight]
+        for state in states:
+            state.in_flight = True
+        await asyncio.gather(*[self._check(state) for state in states])
+
+    # ------------------------------------------------------------------
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            for state in self._states.values():
+                if not state.in_flight and state.next_due <= now:
+                    state.in_flight = True
+                    probe = asyncio.ensure_future(self._check(state))
+                    self._probes.add(probe)
+                    probe.add_done_callback(self._probe_done)
+            pending = [s.next_due for s in self._states.values() if not s.in_flight]
+            delay = max(0.0, min(pending) - time.monotonic()) if pending else self.max_interval
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _probe_done(self, probe: asyncio.Future) -> None:
+        self._probes.discard(probe)
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _check(self, state: _TargetState) -> None:
+        target = state.target
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(target.probe(self._get_session()), target.timeout)
+            result = dict(result) if isinstance(result, dict) else {"status": HEALTHY}
+            result.setdefault("status", HEALTHY)
+        except asyncio.CancelledError:
+            state.in_flight = False
+            raise
+        except asyncio.TimeoutError:
+            result = {"status": "unreachable", "error": f"No response within {target.timeout}s"}
+        except Exception as e:
+            result = {"status": "unreachable", "error": str(e) or type(e).__name__}
+        finished = time.monotonic()
+        healthy = result["status"] == HEALTHY
+        if healthy:
+            if state.consecutive_failures:
+                logger.info(f"{target.name} recovered after {state.consecutive_failures} failed checks")
+            state.interval = (self.base_interval if state.consecutive_failures or not state.checks
+                              else min(state.interval * BACKOFF, self.max_interval))
+            state.consecutive_failures = 0
+        else:
+            if not state.consecutive_failures:
+                logger.warning(f"{target.name} health check failed: {result.get('error', result['status'])}")
+            state.interval = self.min_interval
+            state.consecutive_failures += 1
+            state.failures += 1
+        state.result = result
+        state.latency = finished - started
+        state.checked_at = datetime.now()
+        state.checked_monotonic = finished
+        state.checks += 1
+        state.next_due = finished + state.interval
+        state.in_flight = False
+
+    # ------------------------------------------------------------------
+
+    def entry(self, target_id: str) -> Optional[Dict[str, Any]]:
+        """Cached health of one target."""
+        state = self._states.get(target_id)
+        if state is None:
+            return None
+        now = time.monotonic()
+        age = None if state.checked_monotonic is None else now - state.checked_monotonic
+        return dict(
+            state.result,
+            id=state.target.id,
+            name=state.target.name,
+            **state.target.info,
+            checked_at=state.checked_at.isoformat() if state.checked_at else None,
+            age_seconds=age,
+            stale=age is None or age > 2 * state.interval + state.target.timeout,
+            response_time=state.latency,
+            check_interval=state.interval,
+            consecutive_failures=state.consecutive_failures,
+        )
+
+    def view(self) -> Dict[str, Any]:
+        """Cached health of every target plus totals; never probes."""
+        entries = {target_id: self.entry(target_id) for target_id in self._states}
+        healthy = sum(1 for e in entries.values() if e["status"] == HEALTHY)
+        return {
+            "agents": entries,
+            "total_agents": len(entries),
+            "healthy_agents": healthy,
+            "unhealthy_agents": len(entries) - healthy,
+            "stale_agents": sum(1 for e in entries.values() if e["stale"]),
+            "refresher_running": self.running,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "targets": len(self._states),
+            "checks": sum(s.checks for s in self._states.values()),
+            "failures": sum(s.failures for s in self._states.values()),
+            "in_flight": sum(1 for s in self._states.values() if s.in_flight),
+            "running": self.running,
+        }
@@ -0,0 +1,328 @@
+"""
+Response cache for LLM completions.
+A completion is keyed by a hash of the normalized request (model, messages,
+temperature, max_tokens), or optionally by a "semantic bucket" key built from
+the call's context with numbers rounded, so near-identical market snapshots
+reuse one answer. Entries expire after a per-call-type TTL and live in an
+in-memory LRU backed by a directory of compressed JSON files; expired files
+are deleted when looked up and by a periodic sweep that also caps the
+number of files.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Iterable
+
+import numpy as np
+
+from .disk_cache import DiskCacheStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_TTL = 300
+DEFAULT_TTLS = {
+    "completion": 300,
+    "market_commentary": 300,
+    "trading_decision": 120,
+    "strategy_insights": 1800,
+}
+SEMANTIC_DIGITS = 3                     # Significant digits kept by the semantic bucket key
+VOLATILE_FIELDS = frozenset({"timestamp", "time", "created_at", "updated_at", "request_id"})
+PERSISTENT_RETRY_SECONDS = 60           # Back-off after the disk tier fails
+DEFAULT_DISK_ENTRIES = 20000            # Files kept by the disk sweep
+DEFAULT_SWEEP_INTERVAL = 600            # Seconds between disk sweeps
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_messages(messages: Iterable[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Roles lower-cased and message text with runs of whitespace collapsed."""
+    normalized = []
+    for message in messages:
+        item = {
+            "role": str(message.get("role", "")).strip().lower(),
+            "content": _SPACE_RE.sub(" ", str(message.get("content") or "")).strip(),
+        }
+        if message.get("name"):
+            item["name"] = str(message["name"])
+        normalized.append(item)
+    return normalized
+
+
+def llm_cache_key(model: str, messages: Iterable[Dict[str, Any]], temperature: Optional[float],
+                  max_tokens: Optional[int], extra: Optional[Dict[str, Any]] = None) -> str:
+    """Stable key for one completion request."""
+    payload = {
+        "model": str(model),
+        "messages": normalize_messages(messages),
+        "temperature": None if temperature is None else round(float(temperature), 4),
+        "max_tokens": max_tokens,
+        "extra": extra or {},
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def round_significant(value: float, digits: int = SEMANTIC_DIGITS) -> float:
+    """Round to ``digits`` significant digits (43251.7 -> 43300.0 with 3)."""
+    if value == 0 or not math.isfinite(value):
+        return value
+    return round(value, digits - 1 - int(math.floor(math.log10(abs(value)))))
+
+
+def bucket_numbers(value: Any, digits: int = SEMANTIC_DIGITS, ignore: frozenset = VOLATILE_FIELDS) -> Any:
+    """Round every number in a context structure and drop fields that change on every call."""
+    if isinstance(value, dict):
+        return {str(k): bucket_numbers(v, digits, ignore) for k, v in value.items() if str(k) not in ignore}
+    if isinstance(value, (list, tuple)):
+        return [bucket_numbers(v, digits, ignore) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, int):
+        return int(round_significant(value, digits))
+    if isinstance(value, float):
+        rounded = round_significant(value, digits)
+        return rounded if math.isfinite(rounded) else str(rounded)
+    return value
+
+
+def semantic_cache_key(call_type: str, model: str, system_prompt: str, context: Dict[str, Any],
+                       temperature: Optional[float], max_tokens: Optional[int],
+                       digits: int = SEMANTIC_DIGITS) -> str:
+    """
+    Key from the call type and its context with numbers rounded instead of
+    the rendered prompt, so contexts that differ only past ``digits``
+    significant digits share an entry.
+    """
+    return llm_cache_key(
+        model, [{"role": "system", "content": system_prompt}], temperature, max_tokens,
+        extra={"call_type": call_type, "context": bucket_numbers(context, digits), "digits": digits}
+    )
+
+
+class LLMResponseCache:
+    """
+    TTL'd two-tier cache of completions.
+
+    Memory holds the ``max_entries`` most recently used responses; misses
+    fall through to the disk store and unexpired entries are promoted.
+    Values are dicts with the response ``content`` and its token usage.
+    Expired disk entries are deleted on lookup, and every ``sweep_interval``
+    seconds a write also prunes files older than the longest TTL and the
+    oldest beyond ``max_disk_entries``.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MEMORY_ENTRIES, store: Any = None,
+                 ttls: Optional[Dict[str, float]] = None, default_ttl: float = DEFAULT_TTL,
+                 max_disk_entries: Optional[int] = DEFAULT_DISK_ENTRIES,
+                 sweep_interval: float = DEFAULT_SWEEP_INTERVAL):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: In-memory LRU capacity
+            store: Persistent tier (DiskCacheStore or None)
+            ttls: Seconds an entry stays valid, per call type
+            default_ttl: TTL for call types not in ``ttls``
+            max_disk_entries: Files kept by the disk sweep (None for no cap)
+            sweep_interval: Seconds between disk sweeps
+        """
+        self.max_entries = max_entries
+        self.store = store
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.max_disk_entries = max_disk_entries
+        self.sweep_interval = sweep_interval
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._store_retry_at = 0.0
+        self._next_sweep = time.monotonic() + sweep_interval
+        self.stats = {
+            "memory_hits": 0, "persistent_hits": 0, "misses": 0, "expired": 0, "puts": 0,
+            "evictions": 0, "persistent_errors": 0, "persistent_deleted": 0, "sweeps": 0,
+            "prompt_tokens_saved": 0, "completion_tokens_saved": 0,
+        }
+
+    def ttl_for(self, call_type: str) -> float:
+        return self.ttls.get(call_type, self.default_ttl)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response for ``key`` or None."""
+        value = self._memory_lookup(key)
+        if value is None and self.store is not None:
+            value = self._promote(key, self._store_lookup(key))
+        if value is None:
+            self.stats["misses"] += 1
+        return value
+
+    def put(self, key: str, value: Dict[str, Any], call_type: str = "completion",
+            ttl: Optional[float] = None) -> None:
+        """Store a response in memory and on disk."""
+        entry = self._remember(key, value, call_type, ttl)
+        if self.store is not None:
+            self._store_put(key, entry)
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._memory_lookup(key)
+        if value is None and self.store is not None:
+            loop = asyncio.get_running_loop()
+            value = self._promote(key, await loop.run_in_executor(None, self._store_lookup, key))
+        if value is None:
+            self.stats["misses"] += 1
+        return value
+
+    async def aput(self, key: str, value: Dict[str, Any], call_type: str = "completion",
+                   ttl: Optional[float] = None) -> None:
+        entry = self._remember(key, value, call_type, ttl)
+        if self.store is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._store_put, key, entry)
+
+    # ------------------------------------------------------------------
+
+    def _fresh(self, entry: Dict[str, Any]) -> bool:
+        if entry.get("expires_at", 0) > time.time():
+            return True
+        self.stats["expired"] += 1
+        return False
+
+    def _hit(self, entry: Dict[str, Any], tier: str) -> Dict[str, Any]:
+        value = entry["value"]
+        self.stats[f"{tier}_hits"] += 1
+        self.stats["prompt_tokens_saved"] += value.get("prompt_tokens") or 0
+        self.stats["completion_tokens_saved"] += value.get("completion_tokens") or 0
+        return value
+
+    def _memory_lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if not self._fresh(entry):
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return self._hit(entry, "memory")
+
+    def _promote(self, key: str, entry: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if entry is None or not self._fresh(entry):
+            return None
+        self._insert(key, entry)
+        return self._hit(entry, "persistent")
+
+    def _remember(self, key: str, value: Dict[str, Any], call_type: str,
+                  ttl: Optional[float]) -> Dict[str, Any]:
+        ttl = self.ttl_for(call_type) if ttl is None else ttl
+        entry = {"value": value, "call_type": call_type, "expires_at": time.time() + ttl,
+                 "created_at": datetime.utcnow().isoformat()}
+        self._insert(key, entry)
+        self.stats["puts"] += 1
+        return entry
+
+    def _insert(self, key: str, entry: Dict[str, Any]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _store_available(self) -> bool:
+        return time.monotonic() >= self._store_retry_at
+
+    def _store_failed(self, action: str, error: Exception) -> None:
+        self.stats["persistent_errors"] += 1
+        self._store_retry_at = time.monotonic() + PERSISTENT_RETRY_SECONDS
+        logger.warning(f"LLM cache {self.store.name} {action} failed, memory only for "
+                       f"{PERSISTENT_RETRY_SECONDS}s: {error}")
+
+    def _store_lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self._store_available():
+            return None
+        try:
+            entry = self.store.get_many([key]).get(key)
+            if entry is not None and not self._fresh(entry):
+                # Nothing will read it again; don't leave the file behind
+                self.store.delete(key)
+                self.stats["persistent_deleted"] += 1
+                return None
+            return entry
+        except Exception as e:
+            self._store_failed("lookup", e)
+            return None
+
+    def _store_put(self, key: str, entry: Dict[str, Any]) -> None:
+        if not self._store_available():
+            return
+        try:
+            self.store.put(key, entry)
+        except Exception as e:
+            self._store_failed("write", e)
+            return
+        if time.monotonic() >= self._next_sweep:
+            self.sweep()
+
+    def sweep(self) -> int:
+        """Prune the disk tier: expired files and anything beyond ``max_disk_entries`` (blocking)."""
+        self._next_sweep = time.monotonic() + self.sweep_interval
+        if self.store is None:
+            return 0
+        max_age = max([self.default_ttl, *self.ttls.values()])
+        try:
+            deleted = self.store.prune(max_age=max_age, max_entries=self.max_disk_entries)
+        except Exception as e:
+            logger.warning(f"LLM cache sweep failed: {e}")
+            return 0
+        self.stats["sweeps"] += 1
+        self.stats["persistent_deleted"] += deleted
+        return deleted
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.stats["memory_hits"] + self.stats["persistent_hits"]
+        lookups = hits + self.stats["misses"]
+        return dict(
+            self.stats,
+            entries=len(self._memory),
+            max_entries=self.max_entries,
+            persistent_tier=self.store.name if self.store is not None else None,
+            hit_rate=hits / lookups if lookups else 0.0,
+        )
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Get the process-wide LLM response cache, or None when LLM_CACHE_ENABLED
+    is false. LLM_CACHE_DIR sets the disk tier location and
+    LLM_CACHE_DISK_ENTRIES the number of files kept there.
+    """
+    global _llm_cache
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    if _llm_cache is None:
+        directory = os.getenv("LLM_CACHE_DIR", os.path.join(tempfile.gettempdir(), "volexswarm_llm_cache"))
+        try:
+            store = DiskCacheStore(directory)
+        except OSError as e:
+            logger.warning(f"LLM cache directory {directory} unavailable, memory only: {e}")
+            store = None
+        _llm_cache = LLMResponseCache(
+            max_entries=int(os.getenv("LLM_CACHE_SIZE", DEFAULT_MEMORY_ENTRIES)),
+            store=store,
+            max_disk_entries=int(os.getenv("LLM_CACHE_DISK_ENTRIES", DEFAULT_DISK_ENTRIES))
+        )
+    return _llm_cache
@@ -0,0 +1,320 @@
+"""
+Shared scheduler for LLM calls.
+Requests wait in a priority queue and are started only while the
+process stays under its concurrency, requests-per-minute and
+tokens-per-minute budgets. Blocking SDK calls run on the scheduler's own
+bounded thread pool, so a burst of LLM reasoning can't starve the default
+executor used for database and file work. Synchronous callers go through
+``run_sync``, which queues on the same scheduler from outside the loop.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Dict, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECONDS = 60.0
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 200_000
+WAIT_SAMPLES = 1000  # Recent queue waits kept for the percentiles
+
+
+class Priority(IntEnum):
+    """Lower values are started first."""
+    TRADE = 0        # Decisions on the trade path
+    HIGH = 1         # Coordination the user is waiting on
+    NORMAL = 2
+    LOW = 3          # Commentary, insights and other background work
+
+
+CALL_TYPE_PRIORITIES = {
+    "trading_decision": Priority.TRADE,
+    "agent_vote": Priority.HIGH,
+    "autonomous_reasoning": Priority.HIGH,
+    "completion": Priority.NORMAL,
+    "market_commentary": Priority.LOW,
+    "strategy_insights": Priority.LOW,
+}
+
+
+def priority_for(call_type: str) -> Priority:
+    return CALL_TYPE_PRIORITIES.get(call_type, Priority.NORMAL)
+
+
+@dataclass(order=True)
+class _Request:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    call: Callable[[], Any] = field(compare=False, repr=False)
+    is_async: bool = field(compare=False)
+    future: asyncio.Future = field(compare=False, repr=False)
+    loop: asyncio.AbstractEventLoop = field(compare=False, repr=False)
+    enqueued_at: float = field(compare=False)
+    actual_tokens: Optional[Callable[[Any], Optional[int]]] = field(compare=False, default=None, repr=False)
+    reservation: Optional[list] = field(compare=False, default=None, repr=False)
+    work: Optional[asyncio.Future] = field(compare=False, default=None, repr=False)
+
+
+class LLMScheduler:
+    """
+    Priority- and budget-aware gate in front of the LLM API.
+
+    Tokens are reserved before a request starts (prompt tokens plus the
+    completion budget) and corrected to the reported usage when it finishes.
+    The queue head waits when the budgets are spent, so a high-priority
+    request is never overtaken by a cheaper low-priority one. A caller that
+    is cancelled or times out before its request starts leaves the queue;
+    one that has already started still finishes in the background and its
+    result is discarded (async calls are cancelled, blocking SDK calls can't be).
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Requests in flight at once (and executor threads)
+            requests_per_minute: Requests started per rolling minute
+            tokens_per_minute: Tokens reserved per rolling minute
+        """
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self._queue: list = []
+        self._seq = itertools.count()
+        self._running = 0
+        self._window: deque = deque()      # [started_at, tokens] per request in the last minute
+        self._window_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._waits: deque = deque(maxlen=WAIT_SAMPLES)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None          # Loop of the latest async caller
+        self._sync_loop: Optional[asyncio.AbstractEventLoop] = None     # Runs sync callers' requests otherwise
+        self._sync_lock = threading.Lock()
+        self.stats = {
+            "submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "abandoned": 0,
+            "throttled": 0, "max_queue_depth": 0, "tokens_reserved": 0, "tokens_used": 0,
+        }
+
+    async def run(self, call: Callable[[], Any], tokens: int = 0, priority: int = Priority.NORMAL,
+                  timeout: Optional[float] = None,
+                  actual_tokens: Optional[Callable[[Any], Optional[int]]] = None) -> Any:
+        """
+        Run ``call`` when budgets allow and return its result.
+
+        Args:
+            call: Blocking function (run on the scheduler's pool) or a function
+                returning an awaitable
+            tokens: Estimated tokens of the request (prompt + completion budget)
+            priority: Priority class; lower runs first
+            timeout: Seconds to wait for the result before giving up
+            actual_tokens: Extracts the real token usage from the result
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._sync_loop:
+            self._loop = loop
+        request = _Request(
+            priority=int(Priority(priority)), seq=next(self._seq), tokens=max(0, int(tokens)), call=call,
+            is_async=asyncio.iscoroutinefunction(call), future=loop.create_future(), loop=loop,
+            enqueued_at=time.monotonic(), actual_tokens=actual_tokens
+        )
+        heapq.heappush(self._queue, request)
+        self.stats["submitted"] += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self._queue))
+        self._dispatch()
+        try:
+            return await asyncio.wait_for(asyncio.shield(request.future), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if request.reservation is None:
+                self.stats["cancelled"] += 1
+            elif not request.future.done():
+                self.stats["abandoned"] += 1
+                if request.work is not None and request.is_async:
+                    request.work.cancel()
+            if not request.future.done():
+                request.future.cancel()
+            self._dispatch()
+            raise
+
+    def run_sync(self, call: Callable[[], Any], tokens: int = 0, priority: int = Priority.NORMAL,
+                  timeout: Optional[float] = None,
+                  actual_tokens: Optional[Callable[[Any], Optional[int]]] = None) -> Any:
+        """
+        Blocking form of ``run`` for synchronous callers.
+
+        The request is queued on the loop the async callers use (or on the
+        scheduler's own loop thread when none is running), so it shares their
+        priorities and budgets. Must not be called from an event loop thread,
+        which it would block; await ``run`` there instead.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("run_sync would block the event loop; await run() instead")
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            loop = self._background_loop()
+        future = asyncio.run_coroutine_threadsafe(
+            self.run(call, tokens=tokens, priority=priority, timeout=timeout, actual_tokens=actual_tokens), loop
+        )
+        return future.result()
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        with self._sync_lock:
+            if self._sync_loop is None or self._sync_loop.is_closed():
+                self._sync_loop = asyncio.new_event_loop()
+                threading.Thread(target=self._sync_loop.run_forever, name="llm-scheduler", daemon=True).start()
+            return self._sync_loop
+
+    # ------------------------------------------------------------------
+
+    def _expire(self, now: float) -> None:
+        while self._window and now - self._window[0][0] >= WINDOW_SECONDS:
+            self._window_tokens -= self._window.popleft()[1]
+
+    def _budget_wait(self, tokens: int, now: float) -> float:
+        """Seconds until a request of ``tokens`` fits the rolling budgets (0 when it fits now)."""
+        if not self._window:
+            return 0.0   # Always let one request through, even one larger than the token budget
+        if len(self._window) < self.requests_per_minute and self._window_tokens + tokens <= self.tokens_per_minute:
+            return 0.0
+        # Earliest time enough of the window has expired
+        freed_requests, freed_tokens = 0, 0
+        for started_at, reserved in self._window:
+            freed_requests += 1
+            freed_tokens += reserved
+            if (len(self._window) - freed_requests < self.requests_per_minute and
+                    self._window_tokens - freed_tokens + tokens <= self.tokens_per_minute):
+                return max(0.0, started_at + WINDOW_SECONDS - now)
+        return max(0.0, self._window[-1][0] + WINDOW_SECONDS - now)
+
+    def _dispatch(self) -> None:
+        """Start queued requests in priority order while concurrency and budgets allow."""
+        now = time.monotonic()
+        self._expire(now)
+        while self._queue and self._running < self.max_concurrency:
+            request = self._queue[0]
+            if request.future.done():
+                heapq.heappop(self._queue)
+                continue
+            wait = self._budget_wait(request.tokens, now)
+            if wait > 0:
+                self.stats["throttled"] += 1
+                self._schedule_retry(request.loop, wait)
+                return
+            heapq.heappop(self._queue)
+            self._start(request, now)
+
+    def _schedule_retry(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_later(delay, self._dispatch)
+
+    def _start(self, request: _Request, now: float) -> None:
+        request.reservation = [now, request.tokens]
+        self._window.append(request.reservation)
+        self._window_tokens += request.tokens
+        self.stats["tokens_reserved"] += request.tokens
+        self._waits.append(now - request.enqueued_at)
+        self._running += 1
+        if request.is_async:
+            request.work = asyncio.ensure_future(request.call(), loop=request.loop)
+        else:
+            request.work = request.loop.run_in_executor(self._executor, request.call)
+        request.work.add_done_callback(lambda done: self._finished(request, done))
+
+    def _finished(self, request: _Request, done: asyncio.Future) -> None:
+        self._running -= 1
+        if done.cancelled():
+            error, result = asyncio.CancelledError(), None
+        else:
+            error = done.exception()
+            result = done.result() if error is None else None
+            self.stats["completed" if error is None else "failed"] += 1
+        if error is None:
+            self._reconcile(request, result)
+        if not request.future.done():
+            if error is None:
+                request.future.set_result(result)
+            else:
+                request.future.set_exception(error)
+        self._dispatch()
+
+    def _reconcile(self, request: _Request, result: Any) -> None:
+        """Replace the token reservation with the reported usage."""
+        used = None
+        if request.actual_tokens is not None:
+            try:
+                used = request.actual_tokens(result)
+            except Exception:
+                used = None
+        if used is None:
+            return
+        self.stats["tokens_used"] += used
+        if any(reservation is request.reservation for reservation in self._window):
+            self._window_tokens += used - request.reservation[1]
+        request.reservation[1] = used
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._expire(time.monotonic())
+        depth: Dict[str, int] = {}
+        for request in self._queue:
+            if not request.future.done():
+                name = Priority(request.priority).name.lower()
+                depth[name] = depth.get(name, 0) + 1
+        waits = sorted(self._waits)
+        return dict(
+            self.stats,
+            queue_depth=sum(depth.values()),
+            queue_depth_by_priority=depth,
+            running=self._running,
+            max_concurrency=self.max_concurrency,
+            requests_last_minute=len(self._window),
+            tokens_last_minute=self._window_tokens,
+            requests_per_minute=self.requests_per_minute,
+            tokens_per_minute=self.tokens_per_minute,
+            wait_avg_seconds=sum(waits) / len(waits) if waits else 0.0,
+            wait_p95_seconds=waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+            wait_max_seconds=waits[-1] if waits else 0.0,
+        )
+
+    def shutdown(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._sync_loop is not None:
+            self._sync_loop.call_soon_threadsafe(self._sync_loop.stop)
+
+
+_llm_scheduler: Optional[LLMScheduler] = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """
+    Get the process-wide LLM scheduler. LLM_MAX_CONCURRENCY,
+    LLM_REQUESTS_PER_MINUTE and LLM_TOKENS_PER_MINUTE override the budgets.
+    """
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        _llm_scheduler = LLMScheduler(
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+            requests_per_minute=int(os.getenv("LLM_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE)),
+            tokens_per_minute=int(os.getenv("LLM_TOKENS_PER_MINUTE", DEFAULT_TOKENS_PER_MINUTE)),
+        )
+    return _llm_scheduler
@@ -6,10 +6,10 @@ Defines SQLAlchemy models for all trading data entities.
 from datetime import datetime
 from typing import Optional, Dict, Any
 from sqlalchemy import (
-    Column, Integer, String, Float, DateTime, Boolean, 
-    Text, JSON, ForeignKey, Index, UniqueConstraint
+    Column, Integer, BigInteger, String, Float, DateTime, Boolean, 
+    Text, JSON, LargeBinary, ForeignKey, Index, UniqueConstraint
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 import uuid
 
@@ -162,12 +162,15 @@ class Backtest(Base):
     symbols = Column(JSONB)  # List of symbols tested
     parameters = Column(JSONB)  # Strategy parameters used
     results = Column(JSONB)  # Performance metrics
-    trades = Column(JSONB)  # All trades from backtest
+    trades = deferred(Column(JSONB))  # Legacy; trades now live in backtest_trades
     created_at = Column(DateTime, default=datetime.utcnow)
     status = Column(String(20), default='completed')  # running, completed, failed
     
     # Relationships
     strategy = relationship("Strategy", back_populates="backtests")
+    trade_rows = relationship("BacktestTrade", lazy="dynamic", order_by="BacktestTrade.seq",
+                              passive_deletes=True)
+    artifacts = relationship("BacktestArtifact", lazy="dynamic", passive_deletes=True)
     
     # Indexes
     __table_args__ = (
@@ -177,6 +180,63 @@ class Backtest(Base):
     )
 
 
+class BacktestTrade(Base):
+    """Append-only trade rows of a backtest, one row per round trip."""
+    __tablename__ = "backtest_trades"
+    
+    id = Column(BigInteger, primary_key=True)
+    backtest_id = Column(Integer, ForeignKey("backtests.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(Integer, nullable=False)  # Position of the trade within its backtest
+    symbol = Column(String(20))
+    side = Column(String(10))  # long, short
+    entry_time = Column(DateTime)
+    exit_time = Column(DateTime)
+    entry_price = Column(Float)
+    exit_price = Column(Float)
+    quantity = Column(Float)
+    pnl = Column(Float)
+    return_pct = Column(Float)
+    bars_held = Column(Integer)
+    exit_reason = Column(String(20))
+    extra = Column(JSONB)  # Any other fields the simulator reported
+    
+    # Indexes
+    __table_args__ = (
+        UniqueConstraint('backtest_id', 'seq', name='uq_backtest_trades_backtest_seq'),
+        Index('idx_backtest_trades_backtest_exit', 'backtest_id', 'exit_time'),
+    )
+
+
+class BacktestArtifact(Base):
+    """Compressed columnar series attached to a backtest (equity curve, ...)."""
+    __tablename__ = "backtest_artifacts"
+    
+    id = Column(Integer, primary_key=True)
+    backtest_id = Column(Integer, ForeignKey("backtests.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String(30), nullable=False)  # equity_curve
+    encoding = Column(String(30), nullable=False)  # Layout of data, see common.backtest_store
+    rows = Column(Integer, default=0)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Indexes
+    __table_args__ = (
+        UniqueConstraint('backtest_id', 'kind', name='uq_backtest_artifacts_backtest_kind'),
+    )
+
+
+class BacktestCacheEntry(Base):
+    """Backtest result cache entries, keyed by the content hash of everything the result depends on."""
+    __tablename__ = "backtest_cache"
+    
+    cache_key = Column(String(64), primary_key=True)  # See common.backtest_cache.backtest_cache_key
+    strategy_type = Column(String(50))
+    symbol = Column(String(20))
+    compute_seconds = Column(Float)  # What a hit saves
+    data = Column(LargeBinary, nullable=False)  # gzip-compressed JSON cache entry
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 class AgentLog(Base):
     """Agent activity and system logs."""
     __tablename__ = "agent_logs"
@@ -282,6 +342,33 @@ class MarketData(Base):
     )
 
 
+class NewsArticle(Base):
+    """News articles collected and scored by the news sentiment agent."""
+    __tablename__ = "news_articles"
+    
+    id = Column(Integer, primary_key=True)
+    title = Column(String(500), nullable=False)
+    content = Column(Text)
+    source = Column(String(100), nullable=False)
+    url = Column(String(500), nullable=False, unique=True)  # Normalized article URL
+    content_hash = Column(String(64))  # Hash of normalized title + content, for republished stories
+    published_at = Column(DateTime, nullable=False)
+    sentiment_score = Column(Float)
+    sentiment_label = Column(String(20))
+    impact_score = Column(Float)
+    relevant_keywords = Column(JSON)
+    trading_implications = Column(JSON)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, onupdate=datetime.utcnow)
+    
+    # Indexes
+    __table_args__ = (
+        Index('idx_news_articles_published_at', 'published_at'),
+        Index('idx_news_articles_source', 'source'),
+        Index('idx_news_articles_content_hash', 'content_hash', unique=True),
+    )
+
+
 class ProductionStrategy(Base):
     """Production strategy model for promoted strategies."""
     __tablename__ = "production_strategies"
@@ -369,6 +456,23 @@ class PortfolioHistory(Base):
     )
 
 
+class AgentHistoryArchive(Base):
+    """Records evicted from an agent's in-memory histories (TimescaleDB hypertable on recorded_at)."""
+    __tablename__ = "agent_history_archive"
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    recorded_at = Column(DateTime, nullable=False, primary_key=True)  # When the record was appended
+    collection = Column(String(200), nullable=False)  # e.g. decision_history, fault_detection/<healing id>
+    record_id = Column(String(64), nullable=False)
+    record_key = Column(String(128))  # Lookup key such as a decision id, see RetainedList.get
+    record = Column(JSONB, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_agent_history_archive_collection_time', 'collection', 'recorded_at'),
+        Index('idx_agent_history_archive_collection_key', 'collection', 'record_key'),
+    )
+
+
 # Utility functions for common operations
 def create_trade_id() -> str:
     """Generate a unique trade ID."""
@@ -15,19 +15,41 @@ import asyncio
 
 from .vault import get_vault_client
 from .logging import get_logger
+from .llm_cache import LLMResponseCache, get_llm_cache, llm_cache_key, semantic_cache_key, SEMANTIC_DIGITS
+from .llm_scheduler import LLMScheduler, get_llm_scheduler, priority_for
 
 logger = get_logger("openai")
 
 class VolexSwarmOpenAIClient:
     """OpenAI client for VolexSwarm with market commentary and reasoning capabilities."""
     
-    def __init__(self):
+    def __init__(self, backend: Any = None, cache: Optional[LLMResponseCache] = None,
+                 scheduler: Optional[LLMScheduler] = None):
+        """
+        Initialize the client.
+        
+        Args:
+            backend: Object with the ``chat.completions.create`` interface to use
+                instead of an OpenAI client built from the Vault API key (e.g. a
+                local fake for tests)
+            cache: Response cache; defaults to the process-wide cache
+            scheduler: Concurrency and rate limiter for completions; defaults to the process-wide scheduler
+        """
         self.client = None
         self.model = "gpt-4o-mini"  # Default model
         self.max_tokens = 2000
         self.temperature = 0.3  # Lower temperature for more consistent reasoning
         self.encoding = None
-        self._initialize_client()
+        self.cache = cache if cache is not None else get_llm_cache()
+        self.scheduler = scheduler if scheduler is not None else get_llm_scheduler()
+        # Opt-in: key structured calls on their context with numbers rounded
+        self.semantic_cache = os.getenv("LLM_SEMANTIC_CACHE", "false").lower() in ("1", "true", "yes")
+        self.semantic_digits = SEMANTIC_DIGITS
+        if backend is not None:
+            self.client = backend
+            self._initialize_encoding()
+        else:
+            self._initialize_client()
     
     def _initialize_client(self):
         """Initialize OpenAI client with API key from Vault."""
@@ -43,11 +65,7 @@ class VolexSwarmOpenAIClient:
             self.client = OpenAI(api_key=api_key)
             
             # Initialize tokenizer
-            try:
-                self.encoding = tiktoken.encoding_for_model(self.model)
-            except KeyError:
-                # Fallback to cl100k_base encoding
-                self.encoding = tiktoken.get_encoding("cl100k_base")
+            self._initialize_encoding()
             
             logger.info("OpenAI client initialized successfully")
             
@@ -55,6 +73,17 @@ class VolexSwarmOpenAIClient:
             logger.error(f"Failed to initialize OpenAI client: {e}")
             self.client = None
     
+    def _initialize_encoding(self):
+        """Initialize the tokenizer for the configured model."""
+        try:
+            self.encoding = tiktoken.encoding_for_model(self.model)
+        except KeyError:
+            # Fallback to cl100k_base encoding
+            self.encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # Encoding files unavailable (e.g. offline); count_tokens falls back to an estimate
+            logger.warning(f"Tokenizer unavailable: {e}")
+    
     def is_available(self) -> bool:
         """Check if OpenAI client is available."""
         return self.client is not None
@@ -70,31 +99,134 @@ class VolexSwarmOpenAIClient:
         except Exception:
             return len(text) // 4
     
-    async def generate_completion(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None, temperature: Optional[float] = None) -> str:
-        """Generate async completion for AI agents."""
+    async def generate_completion(self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None,
+                                  temperature: Optional[float] = None, call_type: str = "completion",
+                                  use_cache: bool = True, priority: Optional[int] = None,
+                                  timeout: Optional[float] = None) -> str:
+        """
+        Generate async completion for AI agents.
+        
+        Identical requests within the ``call_type`` TTL are answered from the
+        response cache unless ``use_cache`` is False. Misses go through the
+        LLM scheduler at ``priority`` (by default the ``call_type``'s), which
+        bounds concurrency and the per-minute request and token budgets;
+        ``timeout`` covers the queue wait and the call itself.
+        """
         if not self.client:
             raise Exception("OpenAI client not initialized")
         
+        max_tokens = max_tokens or self.max_tokens
+        temperature = temperature or self.temperature
+        key = llm_cache_key(self.model, messages, temperature, max_tokens)
+        if use_cache and self.cache is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return cached["content"]
+        
+        prompt_tokens = sum(self.count_tokens(str(m.get("content") or "")) for m in messages)
         try:
-            # Run the synchronous call in a thread pool to make it async
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
+            # The synchronous call runs on the scheduler's thread pool once budgets allow
+            response = await self.scheduler.run(
                 lambda: self.client.chat.completions.create(
                     model=self.model,
                     messages=messages,
-                    max_tokens=max_tokens or self.max_tokens,
-                    temperature=temperature or self.temperature
-                )
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                ),
+                tokens=prompt_tokens + max_tokens,
+                priority=priority_for(call_type) if priority is None else priority,
+                timeout=timeout,
+                actual_tokens=self._reported_tokens
             )
             
-            return response.choices[0].message.content
+            content = response.choices[0].message.content
             
+        except asyncio.TimeoutError:
+            logger.warning(f"OpenAI {call_type} completion timed out after {timeout}s")
+            raise
         except Exception as e:
             logger.error(f"Failed to generate completion: {e}")
             raise Exception(f"OpenAI completion failed: {str(e)}")
+        
+        if use_cache and self.cache is not None and content:
+            await self.cache.aput(key, self._cache_value(messages, response, content), call_type)
+        return content
+    
+    def _complete(self, call_type: str, system_prompt: str, prompt: str, context: Dict[str, Any],
+                  semantic_cache: Optional[bool] = None) -> str:
+        """
+        Run one structured completion through the response cache.
+        
+        Misses wait for the LLM scheduler at the ``call_type``'s priority, like
+        async completions, so this must not be called on an event loop thread.
+        The cache key is the exact request, or with semantic caching the call
+        type and ``context`` with numbers rounded to ``semantic_digits``
+        significant digits.
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        semantic = self.semantic_cache if semantic_cache is None else semantic_cache
+        if semantic:
+            key = semantic_cache_key(call_type, self.model, system_prompt, context,
+                                     self.temperature, self.max_tokens, self.semantic_digits)
+        else:
+            key = llm_cache_key(self.model, messages, self.temperature, self.max_tokens)
+        
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached["content"]
+        
+        prompt_tokens = sum(self.count_tokens(str(m.get("content") or "")) for m in messages)
+        response = self.scheduler.run_sync(
+            lambda: self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature
+            ),
+            tokens=prompt_tokens + self.max_tokens,
+            priority=priority_for(call_type),
+            actual_tokens=self._reported_tokens
+        )
+        content = response.choices[0].message.content
+        if self.cache is not None and content:
+            self.cache.put(key, self._cache_value(messages, response, content), call_type)
+        return content
+    
+    def _cache_value(self, messages: List[Dict[str, str]], response: Any, content: str) -> Dict[str, Any]:
+        """Cached form of a response: its text and token usage (counted locally when not reported)."""
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if prompt_tokens is None:
+            prompt_tokens = sum(self.count_tokens(str(m.get("content") or "")) for m in messages)
+        if completion_tokens is None:
+            completion_tokens = self.count_tokens(content)
+        return {"content": content, "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+    
+    @staticmethod
+    def _reported_tokens(response: Any) -> Optional[int]:
+        usage = getattr(response, "usage", None)
+        total = getattr(usage, "total_tokens", None)
+        if total is None and usage is not None:
+            prompt, completion = getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+            if prompt is not None and completion is not None:
+                total = prompt + completion
+        return total
+    
+    def get_scheduler_stats(self) -> Dict[str, Any]:
+        """LLM scheduler counters (queue depth, waits, budget usage)."""
+        return self.scheduler.get_stats()
     
-    def generate_market_commentary(self, market_info: Dict[str, Any]) -> Dict[str, Any]:
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Response cache counters (hits, misses, tokens saved)."""
+        return self.cache.get_stats() if self.cache is not None else {"enabled": False}
+    
+    def generate_market_commentary(self, market_info: Dict[str, Any],
+                                   semantic_cache: Optional[bool] = None) -> Dict[str, Any]:
         """Generate market commentary using GPT."""
         if not self.client:
             logger.warning("OpenAI client not available")
@@ -124,24 +256,11 @@ class VolexSwarmOpenAIClient:
             prompt = self._create_market_commentary_prompt(market_info)
             
             # Generate commentary
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": self._get_market_analyst_system_prompt()
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
+            commentary_text = self._complete(
+                "market_commentary", self._get_market_analyst_system_prompt(), prompt,
+                market_info, semantic_cache
             )
             
-            commentary_text = response.choices[0].message.content
-            
             # Parse and structure the response
             structured_response = self._parse_market_commentary(commentary_text, market_info)
             
@@ -158,7 +277,8 @@ class VolexSwarmOpenAIClient:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def analyze_trading_decision(self, decision_context: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_trading_decision(self, decision_context: Dict[str, Any],
+                                 semantic_cache: Optional[bool] = None) -> Dict[str, Any]:
         """Analyze a trading decision using GPT."""
         if not self.client:
             logger.warning("OpenAI client not available")
@@ -188,24 +308,11 @@ class VolexSwarmOpenAIClient:
             prompt = self._create_decision_analysis_prompt(decision_context)
             
             # Generate analysis
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self._get_trading_analyst_system_prompt()
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
+            analysis_text = self._complete(
+                "trading_decision", self._get_trading_analyst_system_prompt(), prompt,
+                decision_context, semantic_cache
             )
             
-            analysis_text = response.choices[0].message.content
-            
             # Parse and structure the response
             structured_response = self._parse_decision_analysis(analysis_text, decision_context)
             
@@ -222,7 +329,8 @@ class VolexSwarmOpenAIClient:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def generate_strategy_insights(self, strategy_context: Dict[str, Any]) -> Dict[str, Any]:
+    def generate_strategy_insights(self, strategy_context: Dict[str, Any],
+                                   semantic_cache: Optional[bool] = None) -> Dict[str, Any]:
         """Generate strategy insights using GPT."""
         if not self.client:
             logger.warning("OpenAI client not available")
@@ -252,24 +360,11 @@ class VolexSwarmOpenAIClient:
             prompt = self._create_strategy_analysis_prompt(strategy_context)
             
             # Generate insights
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self._get_strategy_analyst_system_prompt()
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
+            insights_text = self._complete(
+                "strategy_insights", self._get_strategy_analyst_system_prompt(), prompt,
+                strategy_context, semantic_cache
             )
             
-            insights_text = response.choices[0].message.content
-            
             # Parse and structure the response
             structured_response = self._parse_strategy_insights(insights_text, strategy_context)
             
@@ -0,0 +1,612 @@
+"""
+Bounded retention for long-lived in-memory histories.
+Each history is a RetainedList: a ring buffer with a size cap and an
+optional time window that otherwise behaves like the list it replaces
+(append, len, iteration, indexing, slices). Records pushed out of the
+buffer are queued and written to a cold store in the background by the
+RetentionManager, and ``query`` reads hot and cold records back as one
+history, so older records stay available without being held in memory.
+
+Cold stores: DatabaseColdStore (the agent_history_archive hypertable) in
+production, FileColdStore (one JSONL file per collection) for tests and
+local runs.
+"""
+
+import asyncio
+import dataclasses
+import itertools
+import json
+import logging
+import os
+import re
+import tempfile
+import uuid
+from collections import deque
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ITEMS = 1000
+DEFAULT_FLUSH_INTERVAL = 5.0     # seconds between background spills
+DEFAULT_BATCH_SIZE = 500         # records per cold-store write
+DEFAULT_MAX_PENDING = 10_000     # evicted records waiting for the store, per collection
+SIZE_SAMPLE = 16                 # records serialized to estimate a collection's memory use
+
+TimeBound = Union[datetime, float, None]
+# (record_id, recorded_at, payload)
+ColdRow = Tuple[str, datetime, Any]
+# (record_id, recorded_at, encoded record, lookup key)
+SpillRow = Tuple[str, datetime, str, Optional[str]]
+
+_DATETIME_TAG = "__datetime__"
+
+
+def _tag(value: Any) -> Any:
+    """json.dumps default: keep datetimes recoverable, flatten dataclasses and enums."""
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: getattr(value, f.name) for f in dataclasses.fields(value)}
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset, tuple, deque)):
+        return list(value)
+    if isinstance(value, RetainedList):
+        return list(value)
+    return str(value)
+
+
+def _untag(value: Any) -> Any:
+    if isinstance(value, dict):
+        if len(value) == 1 and _DATETIME_TAG in value:
+            return datetime.fromisoformat(value[_DATETIME_TAG])
+        return {k: _untag(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_untag(v) for v in value]
+    return value
+
+
+def encode_record(record: Any) -> str:
+    """Serialize a record for the cold store (datetimes survive the round trip)."""
+    return json.dumps(record, default=_tag)
+
+
+def decode_record(payload: Any) -> Any:
+    """Inverse of encode_record; accepts the JSON text or the parsed value (JSONB)."""
+    if isinstance(payload, (str, bytes)):
+        payload = json.loads(payload)
+    return _untag(payload)
+
+
+def _as_datetime(bound: TimeBound) -> Optional[datetime]:
+    if bound is None or isinstance(bound, datetime):
+        return bound
+    return datetime.fromtimestamp(bound)
+
+
+class RetainedList(Sequence):
+    """
+    A history capped at ``max_items`` records and, with ``max_age``
+    (seconds), to a time window. Indexing, slicing, iteration and ``len``
+    see the records still in memory; ``total`` counts every record
+    appended in this process and ``query`` also reads the spilled ones.
+
+    ``decode`` rebuilds a record read back from the cold store (e.g. a
+    dataclass from its dict); ``on_evict`` is called with each record as it
+    leaves memory, so owners can drop indexes that point at it. ``key``
+    gives a record's lookup key (e.g. its id), stored with spilled records
+    so ``get`` finds one without scanning the collection.
+    """
+
+    def __init__(self, name: str, manager: "RetentionManager", max_items: int = DEFAULT_MAX_ITEMS,
+                 max_age: Optional[float] = None, decode: Optional[Callable[[Any], Any]] = None,
+                 on_evict: Optional[Callable[[Any], None]] = None, key: Optional[Callable[[Any], Any]] = None,
+                 transient: bool = False):
+        if max_items < 1:
+            raise ValueError("max_items must be at least 1")
+        self.name = name
+        self.manager = manager
+        self.max_items = max_items
+        self.max_age = max_age
+        self.decode = decode
+        self.on_evict = on_evict
+        self.key = key
+        self.transient = transient
+        self._hot: deque = deque()        # (record_id, recorded_at, record)
+        self._pending: deque = deque()    # evicted, waiting for the cold store
+        self._in_flight: List[tuple] = []  # being written right now
+        self._run = uuid.uuid4().hex[:12]
+        self._seq = itertools.count()
+        self.appended = 0
+        self.stats = {"evicted_by_size": 0, "evicted_by_age": 0, "spilled": 0, "dropped": 0,
+                      "cold_reads": 0, "decode_errors": 0}
+
+    # Sequence interface over the in-memory records ---------------------------------
+
+    def __len__(self) -> int:
+        return len(self._hot)
+
+    def __iter__(self) -> Iterator[Any]:
+        return (entry[2] for entry in self._hot)
+
+    def __reversed__(self) -> Iterator[Any]:
+        return (entry[2] for entry in reversed(self._hot))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._hot[i][2] for i in range(len(self._hot))[index]]
+        return self._hot[index][2]
+
+    def __repr__(self) -> str:
+        return f"RetainedList({self.name!r}, {len(self)}/{self.max_items} in memory, {self.total} total)"
+
+    @property
+    def total(self) -> int:
+        """Records appended in this process, in memory or not."""
+        return self.appended
+
+    def append(self, record: Any) -> None:
+        if self.transient:
+            # Dropped by the manager while idle; register again so it is swept and spilled
+            self.manager.collections.setdefault(self.name, self)
+        self._hot.append((f"{self._run}-{next(self._seq)}", datetime.now(), record))
+        self.appended += 1
+        while len(self._hot) > self.max_items:
+            self.stats["evicted_by_size"] += 1
+            self._evict()
+        if self.max_age is not None:
+            self.expire()
+
+    def extend(self, records) -> None:
+        for record in records:
+            self.append(record)
+
+    def expire(self, now: Optional[datetime] = None) -> int:
+        """Evict records older than the time window; returns how many left memory."""
+        if self.max_age is None:
+            return 0
+        cutoff = (now or datetime.now()) - timedelta(seconds=self.max_age)
+        evicted = 0
+        while self._hot and self._hot[0][1] < cutoff:
+            self.stats["evicted_by_age"] += 1
+            self._evict()
+            evicted += 1
+        return evicted
+
+    def _evict(self) -> None:
+        entry = self._hot.popleft()
+        if self.on_evict is not None:
+            try:
+                self.on_evict(entry[2])
+            except Exception as e:
+                logger.warning(f"Eviction hook for {self.name} failed: {e}")
+        if self.manager.store is None:
+            self.stats["dropped"] += 1
+            return
+        self._pending.append(entry)
+        if len(self._pending) > self.manager.max_pending:
+            self._pending.popleft()
+            self.stats["dropped"] += 1
+        if len(self._pending) >= self.manager.batch_size:
+            self.manager.wake()
+
+    # Reading back ------------------------------------------------------------------
+
+    def query(self, since: TimeBound = None, until: TimeBound = None,
+              where: Optional[Callable[[Any], bool]] = None, limit: Optional[int] = None) -> List[Any]:
+        """
+        Records appended between ``since`` and ``until`` (datetimes or Unix
+        times) that match ``where``, oldest first, from memory and the cold
+        store alike. With ``limit``, only the most recent ``limit`` of them;
+        the cold store is not read when memory already has enough.
+        """
+        since, until = _as_datetime(since), _as_datetime(until)
+        memory, covered = self._scan_memory(since, until, where)
+        if self._memory_suffices(memory, covered, limit):
+            return self._merge([], memory, limit)
+        return self._merge(self._read_cold(since, until, where, limit, memory), memory, limit)
+
+    async def aquery(self, since: TimeBound = None, until: TimeBound = None,
+                     where: Optional[Callable[[Any], bool]] = None, limit: Optional[int] = None) -> List[Any]:
+        """``query`` with the cold-store read in an executor."""
+        since, until = _as_datetime(since), _as_datetime(until)
+        memory, covered = self._scan_memory(since, until, where)
+        if self._memory_suffices(memory, covered, limit):
+            return self._merge([], memory, limit)
+        loop = asyncio.get_running_loop()
+        cold = await loop.run_in_executor(None, self._read_cold, since, until, where, limit, memory)
+        return self._merge(cold, memory, limit)
+
+    def get(self, key: Any) -> Optional[Any]:
+        """The most recent record whose ``key`` is ``key``, from memory or the cold store."""
+        found = self._find_memory(key)
+        if found is not None or self.manager.store is None:
+            return found
+        return self._find_cold(key)
+
+    async def aget(self, key: Any) -> Optional[Any]:
+        """``get`` with the cold-store lookup in an executor."""
+        found = self._find_memory(key)
+        if found is not None or self.manager.store is None:
+            return found
+        return await asyncio.get_running_loop().run_in_executor(None, self._find_cold, key)
+
+    def _record_key(self, record: Any) -> Optional[str]:
+        if self.key is None:
+            return None
+        try:
+            value = self.key(record)
+        except Exception:
+            return None
+        return None if value is None else str(value)
+
+    def _find_memory(self, key: Any) -> Optional[Any]:
+        if self.key is None:
+            raise TypeError(f"Collection {self.name} has no lookup key")
+        key = str(key)
+        for entry in reversed(list(itertools.chain(self._in_flight, self._pending, self._hot))):
+            if self._record_key(entry[2]) == key:
+                return entry[2]
+        return None
+
+    def _find_cold(self, key: Any) -> Optional[Any]:
+        self.stats["cold_reads"] += 1
+        try:
+            rows = self.manager.store.find(self.name, str(key))
+        except Exception as e:
+            logger.warning(f"Could not look up spilled {self.name} record {key}: {e}")
+            return None
+        for record_id, _, payload in reversed(rows):
+            try:
+                record = decode_record(payload)
+                return self.decode(record) if self.decode is not None else record
+            except Exception as e:
+                self.stats["decode_errors"] += 1
+                logger.debug(f"Skipping undecodable {self.name} record {record_id}: {e}")
+        return None
+
+    def _scan_memory(self, since, until, where) -> Tuple[List[tuple], bool]:
+        entries = list(itertools.chain(self._in_flight, self._pending, self._hot))
+        # Everything older than the oldest record still in memory has been spilled (or dropped)
+        covered = since is not None and bool(entries) and entries[0][1] < since
+        matched = [e for e in entries
+                   if (since is None or e[1] >= since) and (until is None or e[1] <= until)
+                   and (where is None or where(e[2]))]
+        return matched, covered
+
+    def _memory_suffices(self, memory: List[tuple], covered: bool, limit: Optional[int]) -> bool:
+        if self.manager.store is None or covered:
+            return True
+        return limit is not None and len(memory) >= limit
+
+    def _read_cold(self, since, until, where, limit, memory) -> List[Any]:
+        self.stats["cold_reads"] += 1
+        # With a filter the store can't know how many rows are needed
+        cold_limit = None if (where is not None or limit is None) else limit - len(memory)
+        try:
+            rows = self.manager.store.read(self.name, since, until, cold_limit)
+        except Exception as e:
+            logger.warning(f"Could not read spilled {self.name} records: {e}")
+            return []
+        held = {e[0] for e in memory}
+        records = []
+        for record_id, _, payload in rows:
+            if record_id in held:   # Written while we were reading
+                continue
+            try:
+                record = decode_record(payload)
+                if self.decode is not None:
+                    record = self.decode(record)
+            except Exception as e:
+                self.stats["decode_errors"] += 1
+                logger.debug(f"Skipping undecodable {self.name} record {record_id}: {e}")
+                continue
+            if where is None or where(record):
+                records.append(record)
+        return records
+
+    @staticmethod
+    def _merge(cold: List[Any], memory: List[tuple], limit: Optional[int]) -> List[Any]:
+        records = cold + [e[2] for e in memory]
+        return records[-limit:] if limit else records
+
+    # Gauges ------------------------------------------------------------------------
+
+    def approx_bytes(self) -> int:
+        """Memory estimate: serialized size of the newest records times the record count."""
+        if not self._hot:
+            return 0
+        sample = [self._hot[-i][2] for i in range(1, min(SIZE_SAMPLE, len(self._hot)) + 1)]
+        try:
+            size = sum(len(encode_record(record)) for record in sample) / len(sample)
+        except Exception:
+            return 0
+        return int(size * len(self._hot))
+
+    @property
+    def idle(self) -> bool:
+        """Nothing in memory and nothing waiting for the cold store."""
+        return not (self._hot or self._pending or self._in_flight)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(
+            self.stats,
+            in_memory=len(self._hot),
+            max_items=self.max_items,
+            max_age_seconds=self.max_age,
+            approx_bytes=self.approx_bytes(),
+            total=self.total,
+            pending=len(self._pending) + len(self._in_flight),
+            oldest_in_memory=self._hot[0][1].isoformat() if self._hot else None,
+        )
+
+
+class RetentionManager:
+    """
+    Owns the retained collections of one process and spills their evicted
+    records to ``store`` every ``flush_interval`` seconds. Without a store,
+    evicted records are discarded. A collection with a full batch waiting
+    is spilled right away. A failed write keeps the batch queued (up to
+    ``max_pending`` records per collection, oldest dropped first).
+
+    Transient collections (one per workflow, healing session, ...) are
+    dropped from the manager by the sweep once they are idle; appending to
+    one again registers it again.
+    """
+
+    def __init__(self, store: Optional[Any] = None, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 batch_size: int = DEFAULT_BATCH_SIZE, max_pending: int = DEFAULT_MAX_PENDING):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.collections: Dict[str, RetainedList] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.stats = {"flushes": 0, "records_written": 0, "write_failures": 0, "dropped_collections": 0,
+                      "last_error": None}
+
+    def collection(self, name: str, max_items: int = DEFAULT_MAX_ITEMS, max_age: Optional[float] = None,
+                   decode: Optional[Callable[[Any], Any]] = None,
+                   on_evict: Optional[Callable[[Any], None]] = None,
+                   key: Optional[Callable[[Any], Any]] = None, transient: bool = False) -> RetainedList:
+        """Get the collection called ``name``, creating it with these limits if needed."""
+        retained = self.collections.get(name)
+        if retained is None:
+            retained = RetainedList(name, self, max_items, max_age, decode, on_evict, key, transient)
+            self.collections[name] = retained
+        return retained
+
+    def drop(self, name: str) -> bool:
+        """Forget the collection ``name`` if it is idle; returns whether it was dropped."""
+        retained = self.collections.get(name)
+        if retained is None or not retained.idle:
+            return False
+        del self.collections[name]
+        self.stats["dropped_collections"] += 1
+        return True
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background spiller (idempotent)."""
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run())
+
+    def wake(self) -> None:
+        """Spill now rather than at the next interval (a full batch is waiting)."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def stop(self) -> None:
+        """Stop the spiller and write out what is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                self.sweep()
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error spilling retained histories: {e}")
+
+    def sweep(self) -> int:
+        """Apply every collection's time window and drop idle transient ones; returns how many records left memory."""
+        now = datetime.now()
+        expired = sum(retained.expire(now) for retained in list(self.collections.values()))
+        for name, retained in list(self.collections.items()):
+            if retained.transient:
+                self.drop(name)
+        return expired
+
+    async def flush(self) -> int:
+        """Write queued records to the cold store; returns how many were written."""
+        if self.store is None:
+            return 0
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        written = 0
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            for retained in list(self.collections.values()):
+                while retained._pending:
+                    batch = [retained._pending.popleft()
+                             for _ in range(min(self.batch_size, len(retained._pending)))]
+                    retained._in_flight = batch
+                    try:
+                        # Serialize here: records may still be mutated on the event loop
+                        rows = [(record_id, at, encode_record(record), retained._record_key(record))
+                                for record_id, at, record in batch]
+                        await loop.run_in_executor(None, self.store.write_many, retained.name, rows)
+                    except Exception as e:
+                        self.stats["write_failures"] += 1
+                        self.stats["last_error"] = str(e)
+                        logger.warning(f"Could not spill {len(batch)} {retained.name} records: {e}")
+                        retained._pending.extendleft(reversed(batch))
+                        while len(retained._pending) > self.max_pending:
+                            retained._pending.popleft()
+                            retained.stats["dropped"] += 1
+                        return written
+                    finally:
+                        retained._in_flight = []
+                    retained.stats["spilled"] += len(batch)
+                    written += len(batch)
+            if written:
+                self.stats["flushes"] += 1
+                self.stats["records_written"] += written
+        return written
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-collection gauges plus totals."""
+        collections = {name: retained.get_stats() for name, retained in self.collections.items()}
+        return dict(
+            self.stats,
+            store=getattr(self.store, "name", None),
+            running=self.running,
+            in_memory=sum(c["in_memory"] for c in collections.values()),
+            approx_bytes=sum(c["approx_bytes"] for c in collections.values()),
+            pending=sum(c["pending"] for c in collections.values()),
+            collections=collections,
+        )
+
+
+class FileColdStore:
+    """Spilled records as one JSONL file per collection (tests and local runs)."""
+
+    name = "file"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, collection: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9_.-]", "_", collection) + ".jsonl")
+
+    def write_many(self, collection: str, rows: List[SpillRow]) -> None:
+        lines = "".join(f'{{"id": {json.dumps(record_id)}, "at": "{at.isoformat()}", "key": {json.dumps(key)}, '
+                        f'"record": {payload}}}\n'
+                        for record_id, at, payload, key in rows)
+        with open(self._path(collection), "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def read(self, collection: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+             limit: Optional[int] = None) -> List[ColdRow]:
+        path = self._path(collection)
+        if not os.path.exists(path):
+            return []
+        rows = deque(maxlen=limit) if limit else []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                at = datetime.fromisoformat(row["at"])
+                if (since is None or at >= since) and (until is None or at <= until):
+                    rows.append((row["id"], at, row["record"]))
+        return list(rows)
+
+    def find(self, collection: str, key: str) -> List[ColdRow]:
+        """Rows stored with lookup key ``key``, oldest first; only matching lines are parsed."""
+        path = self._path(collection)
+        if not os.path.exists(path):
+            return []
+        marker = f'"key": {json.dumps(key)},'
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if marker in line:
+                    row = json.loads(line)
+                    if row.get("key") == key:
+                        rows.append((row["id"], datetime.fromisoformat(row["at"]), row["record"]))
+        return rows
+
+
+class DatabaseColdStore:
+    """Spilled records in the agent_history_archive hypertable."""
+
+    name = "database"
+
+    def write_many(self, collection: str, rows: List[SpillRow]) -> None:
+        from common.db import get_session
+        from common.models import AgentHistoryArchive
+
+        with get_session() as session:
+            session.bulk_insert_mappings(AgentHistoryArchive, [
+                {"collection": collection, "record_id": record_id, "recorded_at": at,
+                 "record_key": key[:128] if key is not None else None, "record": json.loads(payload)}
+                for record_id, at, payload, key in rows
+            ])
+            session.commit()
+
+    def read(self, collection: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+             limit: Optional[int] = None) -> List[ColdRow]:
+        from common.db import get_session
+        from common.models import AgentHistoryArchive
+
+        with get_session() as session:
+            query = session.query(AgentHistoryArchive.record_id, AgentHistoryArchive.recorded_at,
+                                  AgentHistoryArchive.record).filter(AgentHistoryArchive.collection == collection)
+            if since is not None:
+                query = query.filter(AgentHistoryArchive.recorded_at >= since)
+            if until is not None:
+                query = query.filter(AgentHistoryArchive.recorded_at <= until)
+            query = query.order_by(AgentHistoryArchive.recorded_at.desc(), AgentHistoryArchive.id.desc())
+            if limit:
+                query = query.limit(limit)
+            return [(record_id, at, record) for record_id, at, record in reversed(query.all())]
+
+    def find(self, collection: str, key: str) -> List[ColdRow]:
+        from common.db import get_session
+        from common.models import AgentHistoryArchive
+
+        with get_session() as session:
+            rows = session.query(AgentHistoryArchive.record_id, AgentHistoryArchive.recorded_at,
+                                 AgentHistoryArchive.record).filter(
+                AgentHistoryArchive.collection == collection,
+                AgentHistoryArchive.record_key == key[:128]
+            ).order_by(AgentHistoryArchive.recorded_at, AgentHistoryArchive.id).all()
+            return [(record_id, at, record) for record_id, at, record in rows]
+
+
+_retention_manager: Optional[RetentionManager] = None
+
+
+def get_retention_manager() -> RetentionManager:
+    """
+    Get the process-wide retention manager. RETENTION_STORE picks the cold
+    store: "database" (default), "file" (JSONL under RETENTION_SPILL_DIR)
+    or "none" (evicted records are discarded).
+    """
+    global _retention_manager
+    if _retention_manager is None:
+        kind = os.getenv("RETENTION_STORE", "database").lower()
+        if kind == "file":
+            store = FileColdStore(os.getenv("RETENTION_SPILL_DIR",
+                                            os.path.join(tempfile.gettempdir(), "volexswarm_history")))
+        elif kind == "none":
+            store = None
+        else:
+            store = DatabaseColdStore()
+        _retention_manager = RetentionManager(
+            store, flush_interval=float(os.getenv("RETENTION_FLUSH_SECONDS", DEFAULT_FLUSH_INTERVAL)))
+    return _retention_manager
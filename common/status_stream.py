@@ -0,0 +1,149 @@
+"""
+Versioned status stream for WebSocket clients.
+Clients receive a full snapshot tagged with a sequence number when they
+connect, then JSON-patch style deltas (RFC 6902 add/remove/replace ops)
+holding only what changed since the previous sequence number. A client
+that sees a gap in the sequence asks for a resync and gets a fresh snapshot.
+"""
+
+import copy
+import json
+from typing import Dict, Any, List, Optional
+
+SNAPSHOT = "status_snapshot"
+DELTA = "status_delta"
+RESYNC = "resync"
+
+
+def _escape(key: Any) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _same(old: Any, new: Any) -> bool:
+    # 1 == 1.0 == True in Python, but they are different JSON values
+    return type(old) is type(new) and old == new
+
+
+def json_diff(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    Patch operations turning ``old`` into ``new``. Objects are diffed key by
+    key and equal-length arrays element by element; arrays that change
+    length are replaced whole.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            elif not _same(old[key], value):
+                ops.extend(json_diff(old[key], value, child))
+        return ops
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        ops = []
+        for i, (a, b) in enumerate(zip(old, new)):
+            if not _same(a, b):
+                ops.extend(json_diff(a, b, f"{path}/{i}"))
+        return ops
+    if _same(old, new):
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def apply_patch(document: Any, ops: List[Dict[str, Any]]) -> Any:
+    """Apply patch operations from ``json_diff`` to a copy of ``document``."""
+    document = copy.deepcopy(document)
+    for op in ops:
+        if not op["path"]:
+            document = copy.deepcopy(op["value"])
+            continue
+        *parents, last = [_unescape(token) for token in op["path"].split("/")[1:]]
+        target = document
+        for token in parents:
+            target = target[int(token)] if isinstance(target, list) else target[token]
+        if isinstance(target, list):
+            last = int(last)
+        if op["op"] == "remove":
+            del target[last]
+        else:
+            target[last] = copy.deepcopy(op["value"])
+    return document
+
+
+class StatusStream:
+    """
+    Current status document, its sequence number and the delta frames
+    between versions.
+
+    The status is normalized through JSON on every update, so the stored
+    snapshot is a private copy and diffs compare exactly what clients see.
+    Frames are plain dicts; the broadcaster serializes each once for all
+    clients.
+    """
+
+    def __init__(self):
+        self.seq = 0
+        self.state: Optional[Any] = None
+        self.stats = {"updates": 0, "unchanged": 0, "deltas": 0, "snapshots": 0, "resyncs": 0}
+
+    def update(self, status: Any) -> Optional[Dict[str, Any]]:
+        """
+        Record a new status; returns the delta frame to broadcast, or None
+        when nothing changed or there was no previous version to diff against.
+        """
+        status = json.loads(json.dumps(status, default=str))
+        self.stats["updates"] += 1
+        if self.state is None:
+            self.state, self.seq = status, 1
+            return None
+        ops = json_diff(self.state, status)
+        if not ops:
+            self.stats["unchanged"] += 1
+            return None
+        self.state = status
+        self.seq += 1
+        self.stats["deltas"] += 1
+        return {"type": DELTA, "seq": self.seq, "ops": ops}
+
+    def snapshot(self, resync: bool = False) -> Dict[str, Any]:
+        """Full-status frame at the current sequence number; raises RuntimeError before the first update."""
+        if self.state is None:
+            raise RuntimeError("No status recorded yet")
+        self.stats["resyncs" if resync else "snapshots"] += 1
+        return {"type": SNAPSHOT, "seq": self.seq, "data": self.state}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, seq=self.seq)
+
+
+class StatusMirror:
+    """
+    Client side of the stream: applies frames in order and reports when a
+    resync is needed (reference implementation for UI clients and tests).
+    """
+
+    def __init__(self):
+        self.seq = 0
+        self.state: Optional[Any] = None
+
+    def apply(self, frame: Dict[str, Any]) -> bool:
+        """Apply a frame; returns False on a sequence gap (send a resync request)."""
+        if frame["type"] == SNAPSHOT:
+            self.state, self.seq = copy.deepcopy(frame["data"]), frame["seq"]
+            return True
+        if frame["seq"] <= self.seq:
+            return True   # Already covered by a newer snapshot
+        if self.state is None or frame["seq"] != self.seq + 1:
+            return False
+        self.state, self.seq = apply_patch(self.state, frame["ops"]), frame["seq"]
+        return True
+
+    def resync_request(self) -> Dict[str, Any]:
+        return {"type": RESYNC, "seq": self.seq}
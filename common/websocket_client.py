@@ -6,15 +6,21 @@ Provides real-time communication capabilities for all VolexSwarm agents.
 import asyncio
 import json
 import logging
+import os
 import time
 import uuid
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Dict, Any, Callable, Set
+from typing import Optional, Dict, Any, Callable, List, Set
 from dataclasses import dataclass
+import aiohttp
 import websockets
 from websockets.exceptions import ConnectionClosed, WebSocketException
 
+from .wire_format import (WireCodec, WireFormatError, JSON_SUBPROTOCOL, DEFAULT_COMPRESS_THRESHOLD,
+                          decode_frame, supported_subprotocols)
+from .ws_rpc import RPCEndpoint, RPCUnavailable, RPC_TYPES, DEFAULT_TIMEOUT as RPC_TIMEOUT, asgi_dispatcher
+
 logger = logging.getLogger(__name__)
 
 class MessageType(Enum):
@@ -34,6 +40,10 @@ class MessageType(Enum):
     ERROR = "error"
     COMMAND = "command"
     RESPONSE = "response"
+    RPC_REQUEST = "rpc_request"
+    RPC_RESPONSE = "rpc_response"
+    RPC_STREAM = "rpc_stream"
+    RPC_CANCEL = "rpc_cancel"
 
 @dataclass
 class WebSocketMessage:
@@ -61,11 +71,36 @@ class WebSocketMessage:
         return json.dumps(self.to_dict())
 
 class AgentWebSocketClient:
-    """WebSocket client for agent-to-Meta communication."""
+    """
+    WebSocket client for agent-to-Meta communication.
+    
+    The wire format is negotiated on connect: when the Meta Agent accepts the
+    msgpack subprotocol, messages go out as compact binary frames (deflated
+    above ``compress_threshold`` bytes) and messages sent within
+    ``batch_window_ms`` of each other share one frame. Older Meta Agents
+    don't pick a subprotocol and get one JSON text frame per message.
+    
+    The connection also carries request/response RPC (see ``common.ws_rpc``):
+    ``call`` reaches the Meta Agent's HTTP API over the socket (falling back
+    to HTTP when it is down), and after ``serve_rpc(app)`` the Meta Agent
+    can call this agent's FastAPI endpoints the same way.
+    """
     
-    def __init__(self, agent_name: str, meta_host: str = "meta", meta_port: int = 8004):
+    def __init__(self, agent_name: str, meta_host: str = "meta", meta_port: int = 8004,
+                 wire_format: Optional[str] = None, batch_window_ms: Optional[float] = None,
+                 max_batch: int = 32, compress_threshold: Optional[int] = DEFAULT_COMPRESS_THRESHOLD):
+        """
+        Args:
+            wire_format: "auto" to offer msgpack, "json" to always send JSON text
+                (default: AGENT_WS_WIRE_FORMAT or "auto")
+            batch_window_ms: Longest a message waits for others to share its frame;
+                0 sends every message immediately (default: AGENT_WS_BATCH_WINDOW_MS or 5)
+            max_batch: Messages that trigger an early flush
+            compress_threshold: Deflate binary frames of at least this many bytes (None disables)
+        """
         self.agent_name = agent_name
         self.meta_url = f"ws://{meta_host}:{meta_port}/ws"
+        self.meta_http_url = f"http://{meta_host}:{meta_port}"
         self.websocket = None
         self.connected = False
         self.auto_reconnect = True
@@ -77,6 +112,21 @@ class AgentWebSocketClient:
         self._reconnect_task = None
         self._listen_task = None
         
+        # Wire format and micro-batching
+        self.wire_format = (wire_format or os.getenv("AGENT_WS_WIRE_FORMAT", "auto")).lower()
+        self.batch_window = (batch_window_ms if batch_window_ms is not None
+                             else float(os.getenv("AGENT_WS_BATCH_WINDOW_MS", "5"))) / 1000.0
+        self.max_batch = max_batch
+        self.compress_threshold = compress_threshold
+        self.codec = WireCodec(JSON_SUBPROTOCOL)
+        self._pending: List[WebSocketMessage] = []
+        self._flush_handle = None
+        self._send_lock = asyncio.Lock()
+        
+        # Request/response RPC over the connection
+        self.rpc: Optional[RPCEndpoint] = None
+        self.rpc_dispatch = None
+        
         # Initialize message handlers
         for msg_type in MessageType:
             self.message_handlers[msg_type] = set()
@@ -86,15 +136,32 @@ class AgentWebSocketClient:
         try:
             logger.info(f"[{self.agent_name}] Connecting to Meta Agent at {self.meta_url}")
             
-            self.websocket = await websockets.connect(
-                self.meta_url,
-                ping_interval=20,
-                ping_timeout=10,
-                close_timeout=10
-            )
+            if self.wire_format == "json":
+                self.websocket = await websockets.connect(
+                    self.meta_url,
+                    ping_interval=20,
+                    ping_timeout=10,
+                    close_timeout=10
+                )
+            else:
+                # The codec compresses large frames itself, so skip permessage-deflate
+                # (which would also spend CPU on every small message)
+                self.websocket = await websockets.connect(
+                    self.meta_url,
+                    subprotocols=supported_subprotocols(),
+                    compression=None,
+                    ping_interval=20,
+                    ping_timeout=10,
+                    close_timeout=10
+                )
             
+            self.codec = WireCodec(self.websocket.subprotocol, compress_threshold=self.compress_threshold)
+            self._pending = []
+            if self.rpc is not None:
+                self.rpc.close("reconnected")
+            self.rpc = RPCEndpoint(self._send_rpc, self.rpc_dispatch, name="meta")
             self.connected = True
-            logger.info(f"[{self.agent_name}] WebSocket connected to Meta Agent")
+            logger.info(f"[{self.agent_name}] WebSocket connected to Meta Agent ({self.codec.subprotocol})")
             
             # Start background tasks
             self._start_background_tasks()
@@ -104,7 +171,8 @@ class AgentWebSocketClient:
                 await self.send_agent_status({
                     "agent": self.agent_name,
                     "status": "connected",
-                    "capabilities": self._get_agent_capabilities()
+                    "capabilities": self._get_agent_capabilities(),
+                    "rpc": self.rpc_dispatch is not None
                 })
             except Exception as e:
                 logger.warning(f"[{self.agent_name}] Failed to send initial status: {e}")
@@ -144,7 +212,12 @@ class AgentWebSocketClient:
         logger.info(f"[{self.agent_name}] Disconnecting from Meta Agent")
         
         self.auto_reconnect = False
+        
+        # Deliver anything still waiting for its batch window
+        await self.flush()
         self.connected = False
+        if self.rpc is not None:
+            self.rpc.close("disconnected")
         
         # Cancel background tasks
         if self._heartbeat_task:
@@ -168,58 +241,100 @@ class AgentWebSocketClient:
             except Exception as e:
                 logger.error(f"[{self.agent_name}] Connection handler error: {e}")
     
-    async def send_message(self, message: WebSocketMessage) -> bool:
-        """Send message to Meta Agent."""
+    async def send_message(self, message: WebSocketMessage, immediate: bool = False) -> bool:
+        """
+        Send message to Meta Agent.
+        
+        With a binary wire format and a batch window the message is queued
+        and True means it was accepted; it goes out with the next frame,
+        after at most ``batch_window_ms``. ``immediate`` sends it (and
+        anything queued before it) right away.
+        """
         if not self.connected or not self.websocket:
             logger.warning(f"[{self.agent_name}] Cannot send message - not connected")
             return False
         
+        if self.codec.batching and self.batch_window > 0 and not immediate:
+            self._pending.append(message)
+            if len(self._pending) >= self.max_batch:
+                return await self.flush()
+            if self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(
+                    self.batch_window, lambda: asyncio.ensure_future(self.flush()))
+            return True
+        
+        self._pending.append(message)
+        return await self.flush()
+    
+    async def flush(self) -> bool:
+        """Send every queued message in one frame."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return True
+        messages, self._pending = self._pending, []
+        async with self._send_lock:
+            return await self._send_frame(messages)
+    
+    async def _send_frame(self, messages: List[WebSocketMessage]) -> bool:
+        """Encode messages into one frame for the negotiated wire format and send it."""
+        if not self.connected or not self.websocket:
+            logger.warning(f"[{self.agent_name}] Cannot send {len(messages)} message(s) - not connected")
+            return False
+        
         try:
             start_time = time.time()
-            await self.websocket.send(message.to_json())
+            if self.codec.batching:
+                await self.websocket.send(self.codec.encode([m.to_dict() for m in messages]))
+            else:
+                for message in messages:
+                    await self.websocket.send(self.codec.encode([message.to_dict()]))
             response_time_ms = int((time.time() - start_time) * 1000)
             
             # Log the communication
-            try:
-                from .communication_logger import communication_logger
-                await communication_logger.log_websocket_message(
-                    from_agent=self.agent_name,
-                    to_agent="meta",
-                    message_type=message.type.value,
-                    direction="outbound",
-                    message_data=message.data,
-                    response_time_ms=response_time_ms,
-                    status="sent",
-                    metadata={"message_id": str(uuid.uuid4())}
-                )
-            except Exception as log_error:
-                logger.warning(f"[{self.agent_name}] Failed to log communication: {log_error}")
-            
-            logger.debug(f"[{self.agent_name}] Sent {message.type.value} message")
-            return True
-            
-        except Exception as e:
-            logger.error(f"[{self.agent_name}] Failed to send message: {e}")
-            
-            # Log the failed communication
-            try:
-                from .communication_logger import communication_logger
-                # Check if communication logger is initialized before using it
-                if hasattr(communication_logger, 'db_client') and communication_logger.db_client is not None:
+            for message in messages:
+                try:
+                    from .communication_logger import communication_logger
                     await communication_logger.log_websocket_message(
                         from_agent=self.agent_name,
                         to_agent="meta",
                         message_type=message.type.value,
                         direction="outbound",
                         message_data=message.data,
-                        status="failed",
-                        error_message=str(e),
-                        metadata={"message_id": str(uuid.uuid4())}
+                        response_time_ms=response_time_ms,
+                        status="sent",
+                        metadata={"message_id": str(uuid.uuid4()), "batch_size": len(messages)}
                     )
-                else:
-                    logger.warning(f"[{self.agent_name}] Communication logger not initialized, skipping failed message logging")
-            except Exception as log_error:
-                logger.warning(f"[{self.agent_name}] Failed to log failed communication: {log_error}")
+                except Exception as log_error:
+                    logger.warning(f"[{self.agent_name}] Failed to log communication: {log_error}")
+                
+                logger.debug(f"[{self.agent_name}] Sent {message.type.value} message")
+            return True
+            
+        except Exception as e:
+            logger.error(f"[{self.agent_name}] Failed to send {len(messages)} message(s): {e}")
+            
+            # Log the failed communication
+            for message in messages:
+                try:
+                    from .communication_logger import communication_logger
+                    # Check if communication logger is initialized before using it
+                    if hasattr(communication_logger, 'db_client') and communication_logger.db_client is not None:
+                        await communication_logger.log_websocket_message(
+                            from_agent=self.agent_name,
+                            to_agent="meta",
+                            message_type=message.type.value,
+                            direction="outbound",
+                            message_data=message.data,
+                            status="failed",
+                            error_message=str(e),
+                            metadata={"message_id": str(uuid.uuid4())}
+                        )
+                    else:
+                        logger.warning(f"[{self.agent_name}] Communication logger not initialized, skipping failed message logging")
+                except Exception as log_error:
+                    logger.warning(f"[{self.agent_name}] Failed to log failed communication: {log_error}")
             
             self.connected = False
             
@@ -276,6 +391,18 @@ class AgentWebSocketClient:
         )
         return await self.send_message(message)
     
+    async def send_task_progress(self, progress_data: Dict[str, Any]) -> bool:
+        """Send task progress update to Meta Agent."""
+        message = WebSocketMessage(
+            type=MessageType.TASK_PROGRESS,
+            data={
+                "agent": self.agent_name,
+                "timestamp": datetime.utcnow().isoformat(),
+                **progress_data
+            }
+        )
+        return await self.send_message(message)
+    
     async def send_notification(self, notification_data: Dict[str, Any]) -> bool:
         """Send notification to Meta Agent."""
         message = WebSocketMessage(
@@ -288,6 +415,39 @@ class AgentWebSocketClient:
         )
         return await self.send_message(message)
     
+    async def serve_rpc(self, app: Callable) -> None:
+        """Serve RPC requests from the Meta Agent with this agent's ASGI (FastAPI) app."""
+        self.rpc_dispatch = asgi_dispatcher(app)
+        if self.rpc is not None:
+            self.rpc.dispatch = self.rpc_dispatch
+        if self.is_connected:
+            # Tell the Meta Agent it can route calls over this socket
+            await self.send_agent_status({"status": "connected", "rpc": True})
+    
+    async def call(self, method: str, path: str, body: Any = None,
+                   timeout: float = RPC_TIMEOUT) -> Dict[str, Any]:
+        """
+        Call the Meta Agent's HTTP API, over the WebSocket when connected and
+        over HTTP otherwise. Returns the response JSON, or an ``error`` dict
+        for non-200 responses.
+        """
+        if self.is_connected and self.rpc is not None and not self.rpc.closed:
+            try:
+                status, data = await self.rpc.call(method, path, body, timeout)
+                return data if status == 200 else {"error": f"HTTP {status}", "detail": data}
+            except RPCUnavailable as e:
+                logger.info(f"[{self.agent_name}] RPC unavailable ({e}), falling back to HTTP")
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            async with session.request(method.upper(), f"{self.meta_http_url}{path}", json=body) as response:
+                data = await response.json(content_type=None)
+                return data if response.status == 200 else {"error": f"HTTP {response.status}", "detail": data}
+    
+    async def _send_rpc(self, message: Dict[str, Any]) -> None:
+        sent = await self.send_message(WebSocketMessage(type=MessageType(message["type"]), data=message["data"],
+                                                        id=message["id"]), immediate=True)
+        if not sent:
+            raise RPCUnavailable("WebSocket send failed")
+    
     def add_message_handler(self, message_type: MessageType, handler: Callable):
         """Add handler for specific message type."""
         self.message_handlers[message_type].add(handler)
@@ -337,49 +497,15 @@ class AgentWebSocketClient:
         """Listen for incoming messages from Meta Agent."""
         while self.connected and self.websocket:
             try:
-                message_str = await self.websocket.recv()
-                message_data = json.loads(message_str)
-                
-                message_type_str = message_data.get("type", "notification")
-                
-                # Try to parse the message type, but handle unknown types gracefully
+                frame = await self.websocket.recv()
                 try:
-                    message_type = MessageType(message_type_str)
-                except ValueError:
-                    # Unknown message type - log it but don't fail the connection
-                    logger.info(f"[{self.agent_name}] Received unknown message type: {message_type_str}")
-                    # Handle as notification type for now
-                    message_type = MessageType.NOTIFICATION
-                
-                # Log the incoming message
-                try:
-                    from .communication_logger import communication_logger
-                    await communication_logger.log_websocket_message(
-                        from_agent="meta",
-                        to_agent=self.agent_name,
-                        message_type=message_type.value,
-                        direction="inbound",
-                        message_data=message_data,
-                        status="received",
-                        metadata={"message_id": str(uuid.uuid4())}
-                    )
-                except Exception as log_error:
-                    logger.warning(f"[{self.agent_name}] Failed to log incoming communication: {log_error}")
+                    messages = decode_frame(frame)
+                except WireFormatError as e:
+                    logger.warning(f"[{self.agent_name}] Dropping undecodable frame: {e}")
+                    continue
                 
-                # Handle message with registered handlers
-                for handler in self.message_handlers[message_type]:
-                    try:
-                        await handler(message_data)
-                    except Exception as e:
-                        logger.error(f"[{self.agent_name}] Message handler error: {e}")
-                
-                # Handle PING messages
-                if message_type == MessageType.PING:
-                    pong_message = WebSocketMessage(
-                        type=MessageType.PONG,
-                        data={"agent": self.agent_name}
-                    )
-                    await self.send_message(pong_message)
+                for message_data in messages:
+                    await self._handle_incoming(message_data)
                 
             except ConnectionClosed:
                 logger.warning(f"[{self.agent_name}] WebSocket connection closed")
@@ -392,10 +518,62 @@ class AgentWebSocketClient:
                 self.connected = False
                 break
         
+        if not self.connected and self.rpc is not None:
+            self.rpc.close()
+        
         # Schedule reconnect if needed
         if not self.connected and self.auto_reconnect:
             self._schedule_reconnect()
     
+    async def _handle_incoming(self, message_data: Dict[str, Any]):
+        """Dispatch one decoded message to the registered handlers."""
+        message_type_str = message_data.get("type", "notification")
+        
+        # RPC traffic is correlated by the endpoint, not the message handlers
+        if message_type_str in RPC_TYPES:
+            if self.rpc is not None:
+                await self.rpc.handle(message_data)
+            return
+        
+        # Try to parse the message type, but handle unknown types gracefully
+        try:
+            message_type = MessageType(message_type_str)
+        except ValueError:
+            # Unknown message type - log it but don't fail the connection
+            logger.info(f"[{self.agent_name}] Received unknown message type: {message_type_str}")
+            # Handle as notification type for now
+            message_type = MessageType.NOTIFICATION
+        
+        # Log the incoming message
+        try:
+            from .communication_logger import communication_logger
+            await communication_logger.log_websocket_message(
+                from_agent="meta",
+                to_agent=self.agent_name,
+                message_type=message_type.value,
+                direction="inbound",
+                message_data=message_data,
+                status="received",
+                metadata={"message_id": str(uuid.uuid4())}
+            )
+        except Exception as log_error:
+            logger.warning(f"[{self.agent_name}] Failed to log incoming communication: {log_error}")
+        
+        # Handle message with registered handlers
+        for handler in self.message_handlers[message_type]:
+            try:
+                await handler(message_data)
+            except Exception as e:
+                logger.error(f"[{self.agent_name}] Message handler error: {e}")
+        
+        # Handle PING messages
+        if message_type == MessageType.PING:
+            pong_message = WebSocketMessage(
+                type=MessageType.PONG,
+                data={"agent": self.agent_name}
+            )
+            await self.send_message(pong_message)
+    
     def _schedule_reconnect(self):
         """Schedule automatic reconnection."""
         if self._reconnect_task and not self._reconnect_task.done():
@@ -462,5 +640,10 @@ class AgentWebSocketClient:
             "agent": self.agent_name,
             "connected": self.connected,
             "meta_url": self.meta_url,
-            "auto_reconnect": self.auto_reconnect
+            "auto_reconnect": self.auto_reconnect,
+            "wire_format": self.codec.subprotocol,
+            "batch_window_ms": self.batch_window * 1000,
+            "pending_messages": len(self._pending),
+            "wire_stats": dict(self.codec.stats),
+            "rpc": self.rpc.get_stats() if self.rpc is not None else None
         } 
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""
+Wire format for agent <-> meta agent WebSocket messages.
+The format is negotiated with a WebSocket subprotocol: peers that both
+speak ``volex.msgpack.v1`` exchange binary frames (msgpack, raw-deflated
+above a size threshold, optionally several messages per frame); anything
+else falls back to one JSON text frame per message, so older peers keep
+working unchanged.
+
+Binary frame layout: one flags byte (FLAG_DEFLATE, FLAG_BATCH) followed by
+the msgpack body, a single message map or, with FLAG_BATCH, an array of them.
+"""
+
+import json
+import logging
+import zlib
+from datetime import date, datetime
+from enum import Enum
+from typing import Dict, Any, List, Optional, Sequence, Union
+
+try:
+    import msgpack
+except ImportError:  # JSON-only peer
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+MSGPACK_SUBPROTOCOL = "volex.msgpack.v1"
+JSON_SUBPROTOCOL = "volex.json.v1"
+
+FLAG_DEFLATE = 0x01
+FLAG_BATCH = 0x02
+
+DEFAULT_COMPRESS_THRESHOLD = 512   # Bytes of msgpack body before deflate is tried
+DEFAULT_COMPRESS_LEVEL = 6
+
+
+class WireFormatError(ValueError):
+    """A frame that can't be decoded."""
+
+
+def supported_subprotocols() -> List[str]:
+    """Subprotocols this process can speak, most preferred first."""
+    return [MSGPACK_SUBPROTOCOL, JSON_SUBPROTOCOL] if msgpack is not None else [JSON_SUBPROTOCOL]
+
+
+def negotiate_subprotocol(offered: Sequence[str]) -> Optional[str]:
+    """Server side: the first of our subprotocols the client offered (None for old clients)."""
+    for subprotocol in supported_subprotocols():
+        if subprotocol in (offered or ()):
+            return subprotocol
+    return None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, "item"):   # numpy scalars
+        return value.item()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+class WireCodec:
+    """
+    Encoder for the negotiated subprotocol. Binary (msgpack) codecs can
+    batch and compress; the JSON fallback sends one text frame per message.
+    """
+
+    def __init__(self, subprotocol: Optional[str] = None,
+                 compress_threshold: Optional[int] = DEFAULT_COMPRESS_THRESHOLD,
+                 compress_level: int = DEFAULT_COMPRESS_LEVEL):
+        """
+        Initialize the codec.
+
+        Args:
+            subprotocol: Negotiated subprotocol (None or JSON for old peers)
+            compress_threshold: Deflate msgpack bodies of at least this many
+                bytes; None disables compression
+            compress_level: zlib compression level
+        """
+        self.binary = subprotocol == MSGPACK_SUBPROTOCOL and msgpack is not None
+        self.subprotocol = subprotocol if self.binary else JSON_SUBPROTOCOL
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self.stats = {"frames": 0, "messages": 0, "bytes": 0, "compressed_frames": 0, "bytes_saved": 0}
+
+    @property
+    def batching(self) -> bool:
+        return self.binary
+
+    def encode(self, messages: Sequence[Dict[str, Any]]) -> Union[str, bytes]:
+        """One frame carrying ``messages`` (exactly one unless the codec is binary)."""
+        if not self.binary:
+            if len(messages) != 1:
+                raise WireFormatError("JSON frames carry exactly one message")
+            frame = json.dumps(messages[0], default=_default)
+            self._count(1, len(frame))
+            return frame
+        batch = len(messages) != 1
+        body = msgpack.packb(list(messages) if batch else messages[0], default=_default, use_bin_type=True)
+        flags = FLAG_BATCH if batch else 0
+        if self.compress_threshold is not None and len(body) >= self.compress_threshold:
+            compressor = zlib.compressobj(self.compress_level, zlib.DEFLATED, -zlib.MAX_WBITS)
+            compressed = compressor.compress(body) + compressor.flush()
+            if len(compressed) < len(body):
+                self.stats["compressed_frames"] += 1
+                self.stats["bytes_saved"] += len(body) - len(compressed)
+                body, flags = compressed, flags | FLAG_DEFLATE
+        frame = bytes((flags,)) + body
+        self._count(len(messages), len(frame))
+        return frame
+
+    def _count(self, messages: int, size: int) -> None:
+        self.stats["frames"] += 1
+        self.stats["messages"] += messages
+        self.stats["bytes"] += size
+
+
+def decode_frame(frame: Union[str, bytes, bytearray]) -> List[Dict[str, Any]]:
+    """
+    Messages carried by a frame: text frames are single JSON messages,
+    binary frames use the flags-byte + msgpack layout.
+    """
+    try:
+        if isinstance(frame, str):
+            return [json.loads(frame)]
+        if msgpack is None:
+            raise WireFormatError("Binary frame received but msgpack is not installed")
+        if not frame:
+            raise WireFormatError("Empty binary frame")
+        flags, body = frame[0], bytes(frame[1:])
+        if flags & FLAG_DEFLATE:
+            body = zlib.decompress(body, -zlib.MAX_WBITS)
+        # Messages may carry non-string keys (price levels, say); msgpack
+        # rejects those by default, which would drop the whole batch
+        decoded = msgpack.unpackb(body, raw=False, strict_map_key=False)
+    except WireFormatError:
+        raise
+    except (ValueError, TypeError, zlib.error, msgpack.UnpackException if msgpack else ValueError) as e:
+        raise WireFormatError(f"Undecodable frame: {e}") from e
+    messages = decoded if flags & FLAG_BATCH else [decoded]
+    if not all(isinstance(message, dict) for message in messages):
+        raise WireFormatError("Frame does not contain message objects")
+    return messages
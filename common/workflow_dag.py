@@ -0,0 +1,290 @@
+"""
+Dependency-graph execution for tool workflows.
+A workflow is a list of step dicts. Each step starts as soon as the steps
+it depends on have succeeded, so independent steps (fetching prices for
+several symbols, say) run concurrently; a step whose dependency failed is
+skipped. Synchronous step functions run on a bounded thread pool instead
+of the event loop, steps have their own timeouts and retries, one
+semaphore caps the steps running across all workflows, and every run
+records when each step was ready, started and finished, with the critical
+path through the graph.
+
+Step keys used here (anything else is passed through to the runner):
+    id          step name (defaults to the ``step`` number)
+    depends_on  ids of the steps that must finish first
+    inputs      {argument: "step_id" or "step_id.key.path"}, the value taken
+                from a dependency's output (implies the dependency)
+    timeout     seconds per attempt
+    retries     extra attempts after a failure or timeout
+
+A timed-out synchronous step keeps running in its thread, so leave
+``timeout`` and ``retries`` off steps that must not happen twice or behind
+the workflow's back (placing an order, writing an audit record).
+
+A workflow without any ``depends_on`` or ``inputs`` runs its steps in
+order, as the coordinator always did: each step waits for the one before
+it and still runs when that step failed.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_RETRY_BACKOFF = 0.5   # seconds, doubled per retry
+
+RunStep = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[Any]]
+
+
+class WorkflowError(ValueError):
+    """The workflow isn't a valid dependency graph."""
+
+
+class StepError(Exception):
+    """A step failure that retrying won't fix (missing agent, tool or action)."""
+
+
+def step_id(step: Dict[str, Any]) -> str:
+    return str(step.get("id", step.get("step")))
+
+
+def _input_source(ref: str) -> str:
+    return str(ref).split(".", 1)[0]
+
+
+def is_chained(steps: List[Dict[str, Any]]) -> bool:
+    """True for legacy workflows that declare no dependencies and run in order."""
+    return not any("depends_on" in step or "inputs" in step for step in steps)
+
+
+def build_graph(steps: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Map each step id to the ids it depends on; raises WorkflowError on bad or cyclic graphs."""
+    ids = [step_id(step) for step in steps]
+    if len(set(ids)) != len(ids):
+        raise WorkflowError(f"Duplicate step ids: {sorted({i for i in ids if ids.count(i) > 1})}")
+    chained = is_chained(steps)
+    graph: Dict[str, List[str]] = {}
+    for position, (sid, step) in enumerate(zip(ids, steps)):
+        if chained:
+            deps = [ids[position - 1]] if position else []
+        else:
+            deps = [str(d) for d in step.get("depends_on", [])]
+            deps += [_input_source(ref) for ref in step.get("inputs", {}).values()]
+        deps = list(dict.fromkeys(deps))
+        unknown = [d for d in deps if d not in ids or d == sid]
+        if unknown:
+            raise WorkflowError(f"Step {sid} depends on unknown or itself: {unknown}")
+        graph[sid] = deps
+
+    # Kahn's algorithm: whatever can't be ordered is on a cycle
+    remaining = {sid: len(deps) for sid, deps in graph.items()}
+    dependents: Dict[str, List[str]] = {sid: [] for sid in graph}
+    for sid, deps in graph.items():
+        for dep in deps:
+            dependents[dep].append(sid)
+    ready = [sid for sid, count in remaining.items() if count == 0]
+    while ready:
+        for dependent in dependents[ready.pop()]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+    cyclic = [sid for sid, count in remaining.items() if count > 0]
+    if cyclic:
+        raise WorkflowError(f"Dependency cycle between steps {cyclic}")
+    return graph
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1e3, 2)
+
+
+def resolve_input(ref: str, outputs: Dict[str, Any]) -> Any:
+    """Look up ``"step_id.key.path"`` in the outputs of a step's dependencies."""
+    source, *path = str(ref).split(".")
+    value = outputs[source]
+    for key in path:
+        value = value[int(key)] if isinstance(value, (list, tuple)) else value[key]
+    return value
+
+
+@dataclass
+class StepRun:
+    """Outcome and timing of one step (times in seconds from the start of the run)."""
+    id: str
+    deps: List[str]
+    status: str = "pending"   # success, error, timeout, skipped
+    output: Any = None
+    error: Optional[str] = None
+    attempts: int = 0
+    ready_at: Optional[float] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+@dataclass
+class WorkflowRun:
+    steps: Dict[str, StepRun]
+    timing: Dict[str, Any]
+
+    @property
+    def succeeded(self) -> bool:
+        return all(run.status == "success" for run in self.steps.values())
+
+
+class DAGExecutor:
+    """
+    Runs workflow graphs. ``max_concurrency`` caps the steps running at once
+    across every workflow on this executor and ``max_workers`` the threads
+    used for synchronous step functions. A timed-out synchronous call can't
+    be interrupted; its thread stays busy until the call returns.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, max_workers: int = DEFAULT_MAX_WORKERS,
+                 default_timeout: Optional[float] = None, default_retries: int = 0,
+                 retry_backoff: float = DEFAULT_RETRY_BACKOFF):
+        self.max_concurrency = max_concurrency
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self.default_retries = default_retries
+        self.retry_backoff = retry_backoff
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="workflow-step")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._running = 0
+        self.stats = {"runs": 0, "steps": 0, "failed": 0, "timeouts": 0, "retries": 0, "skipped": 0,
+                      "offloaded": 0, "peak_concurrency": 0}
+
+    async def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Await ``fn`` if it's async, otherwise run it on the step thread pool."""
+        if inspect.iscoroutinefunction(fn):
+            return await fn(*args, **kwargs)
+        self.stats["offloaded"] += 1
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def run(self, steps: List[Dict[str, Any]], run_step: RunStep) -> WorkflowRun:
+        """
+        Run ``steps`` through ``run_step(step, upstream)``, where ``upstream``
+        maps each dependency's id to its output. Raises WorkflowError before
+        anything runs if the graph is invalid.
+        """
+        graph = build_graph(steps)
+        # Chained steps only wait for their predecessor, they don't need it to succeed
+        chained = is_chained(steps)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.stats["runs"] += 1
+        loop = asyncio.get_running_loop()
+        runs = {sid: StepRun(sid, deps) for sid, deps in graph.items()}
+        finished = {sid: loop.create_future() for sid in graph}
+        started = time.perf_counter()
+
+        async def node(step: Dict[str, Any]) -> None:
+            run = runs[step_id(step)]
+            try:
+                await asyncio.gather(*(finished[dep] for dep in run.deps))
+                run.ready_at = time.perf_counter() - started
+                failed = [dep for dep in run.deps if runs[dep].status != "success"]
+                if failed and not chained:
+                    run.status, run.error = "skipped", f"Dependencies did not succeed: {failed}"
+                    self.stats["skipped"] += 1
+                else:
+                    await self._attempt(step, run, {dep: runs[dep].output for dep in run.deps},
+                                        run_step, started)
+            finally:
+                if not finished[run.id].done():
+                    finished[run.id].set_result(None)
+
+        await asyncio.gather(*(node(step) for step in steps))
+        return WorkflowRun(runs, self._timing(runs, time.perf_counter() - started))
+
+    async def _attempt(self, step: Dict[str, Any], run: StepRun, upstream: Dict[str, Any],
+                       run_step: RunStep, started: float) -> None:
+        timeout = step.get("timeout", self.default_timeout)
+        retries = step.get("retries", self.default_retries)
+        while True:
+            run.attempts += 1
+            async with self._semaphore:
+                self._running += 1
+                self.stats["peak_concurrency"] = max(self.stats["peak_concurrency"], self._running)
+                if run.started_at is None:
+                    run.started_at = time.perf_counter() - started
+                try:
+                    run.output = await asyncio.wait_for(run_step(step, upstream), timeout)
+                    run.status, run.error = "success", None
+                except StepError as e:
+                    run.status, run.error = "error", str(e)
+                    retries = 0
+                except asyncio.TimeoutError:
+                    run.status, run.error = "timeout", f"Timed out after {timeout}s"
+                    self.stats["timeouts"] += 1
+                except Exception as e:
+                    run.status, run.error = "error", str(e)
+                finally:
+                    self._running -= 1
+                    run.finished_at = time.perf_counter() - started
+            self.stats["steps"] += 1
+            if run.status == "success":
+                return
+            if run.attempts > retries:
+                self.stats["failed"] += 1
+                logger.warning(f"Workflow step {run.id} failed after {run.attempts} attempt(s): {run.error}")
+                return
+            self.stats["retries"] += 1
+            await asyncio.sleep(self.retry_backoff * 2 ** (run.attempts - 1))
+
+    @staticmethod
+    def _timing(runs: Dict[str, StepRun], total: float) -> Dict[str, Any]:
+        """Per-step timings plus the chain of steps that determined the run's length."""
+        path: List[str] = []
+        timed = [run for run in runs.values() if run.finished_at is not None]
+        current = max(timed, key=lambda run: run.finished_at, default=None)
+        while current is not None:
+            path.append(current.id)
+            deps = [runs[dep] for dep in current.deps if runs[dep].finished_at is not None]
+            current = max(deps, key=lambda run: run.finished_at, default=None)
+        path.reverse()
+        busy = sum(run.duration for run in runs.values())
+        return {
+            "total_ms": _ms(total),
+            "critical_path": path,
+            "critical_path_ms": _ms(sum(runs[sid].duration for sid in path)),
+            "step_time_ms": _ms(busy),
+            "parallelism": round(busy / total, 2) if total > 0 else 0.0,
+            "steps": {
+                run.id: {
+                    "status": run.status,
+                    "attempts": run.attempts,
+                    "ready_ms": _ms(run.ready_at),
+                    "queued_ms": _ms(run.started_at - run.ready_at)
+                    if run.started_at is not None and run.ready_at is not None else None,
+                    "start_ms": _ms(run.started_at),
+                    "end_ms": _ms(run.finished_at),
+                    "duration_ms": _ms(run.duration),
+                }
+                for run in runs.values()
+            },
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, running=self._running, max_concurrency=self.max_concurrency,
+                    max_workers=self.max_workers)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,279 @@
+"""
+Fan-out of server messages to WebSocket clients.
+Each client gets a bounded outbound queue drained by its own writer task,
+so a stalled browser only delays itself. Frames published under a
+conflation key (e.g. the latest agent status) replace the queued frame
+with the same key instead of piling up, and clients that stay backlogged,
+stall on a send or error out are evicted.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_QUEUE = 100          # Frames queued per client before the oldest is dropped
+DEFAULT_BACKLOG_THRESHOLD = 50   # Queue depth that counts as falling behind
+DEFAULT_EVICT_AFTER = 10.0       # Seconds a client may stay over the threshold
+DEFAULT_SEND_TIMEOUT = 5.0       # Seconds one send may take before the client is evicted
+LATENCY_SAMPLES = 256            # Recent latencies kept per client for the percentiles
+
+SLOW_CONSUMER_CLOSE_CODE = 1013  # "Try again later"
+ERROR_CLOSE_CODE = 1011
+
+
+def encode_message(message: Union[str, Dict[str, Any]]) -> str:
+    return message if isinstance(message, str) else json.dumps(message, default=str)
+
+
+def _percentile(samples, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+class ClientChannel:
+    """
+    Outbound queue and writer task for one WebSocket client.
+
+    Queue entries are ``[conflate_key, payload, enqueued_at]``; a keyed entry
+    still waiting to be sent is updated in place by a newer frame with the
+    same key, keeping its queue position and original enqueue time.
+    """
+
+    def __init__(self, websocket: Any, client_id: str, max_queue: int, send_timeout: float,
+                 on_failure: Callable[["ClientChannel", str], None]):
+        self.websocket = websocket
+        self.client_id = client_id
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self._on_failure = on_failure
+        self._queue: deque = deque()
+        self._keyed: Dict[str, list] = {}
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.connected_at = time.time()
+        self.backlogged_since: Optional[float] = None
+        self.latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+        self.stats = {"queued": 0, "sent": 0, "bytes_sent": 0, "conflated": 0, "dropped": 0}
+
+    # Starlette sockets take text frames via send_text, websockets connections via send
+    async def _send(self, payload: str) -> None:
+        send_text = getattr(self.websocket, "send_text", None)
+        await (send_text(payload) if send_text is not None else self.websocket.send(payload))
+
+    def start(self) -> None:
+        self._task = asyncio.ensure_future(self._writer())
+
+    def stop(self) -> None:
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._queue.clear()
+        self._keyed.clear()
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def enqueue(self, payload: str, conflate_key: Optional[str] = None) -> None:
+        now = time.monotonic()
+        if conflate_key is not None:
+            pending = self._keyed.get(conflate_key)
+            if pending is not None:
+                pending[1] = payload
+                self.stats["conflated"] += 1
+                return
+        if len(self._queue) >= self.max_queue:
+            dropped = self._queue.popleft()
+            if dropped[0] is not None and self._keyed.get(dropped[0]) is dropped:
+                del self._keyed[dropped[0]]
+            self.stats["dropped"] += 1
+        entry = [conflate_key, payload, now]
+        self._queue.append(entry)
+        if conflate_key is not None:
+            self._keyed[conflate_key] = entry
+        self.stats["queued"] += 1
+        self._ready.set()
+
+    async def _writer(self) -> None:
+        try:
+            while True:
+                while not self._queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                entry = self._queue.popleft()
+                if entry[0] is not None and self._keyed.get(entry[0]) is entry:
+                    del self._keyed[entry[0]]
+                try:
+                    await asyncio.wait_for(self._send(entry[1]), self.send_timeout)
+                except asyncio.TimeoutError:
+                    self._on_failure(self, f"send stalled for over {self.send_timeout}s")
+                    return
+                except Exception as e:
+                    self._on_failure(self, f"send failed: {e}")
+                    return
+                self.latencies.append(time.monotonic() - entry[2])
+                self.stats["sent"] += 1
+                self.stats["bytes_sent"] += len(entry[1])
+        except asyncio.CancelledError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(
+            self.stats,
+            client_id=self.client_id,
+            queue_depth=len(self._queue),
+            connected_seconds=time.time() - self.connected_at,
+            latency_avg_seconds=sum(self.latencies) / len(self.latencies) if self.latencies else 0.0,
+            latency_p95_seconds=_percentile(self.latencies, 0.95),
+            latency_max_seconds=max(self.latencies) if self.latencies else 0.0,
+        )
+
+
+class WebSocketBroadcaster:
+    """
+    Per-client queued broadcast to a set of WebSocket connections.
+
+    ``broadcast`` serializes a message once and only appends it to each
+    client's queue, so it never waits on the network. A client is evicted
+    (closed and removed, then ``on_evict`` is called) when a send errors,
+    when one send takes longer than ``send_timeout``, or when its queue has
+    stayed at or above ``backlog_threshold`` for ``evict_after`` seconds.
+    """
+
+    def __init__(self, max_queue: int = DEFAULT_MAX_QUEUE, backlog_threshold: int = DEFAULT_BACKLOG_THRESHOLD,
+                 evict_after: float = DEFAULT_EVICT_AFTER, send_timeout: float = DEFAULT_SEND_TIMEOUT,
+                 on_evict: Optional[Callable[[Any, str], None]] = None):
+        """
+        Initialize the broadcaster.
+
+        Args:
+            max_queue: Frames queued per client; the oldest is dropped beyond it
+            backlog_threshold: Queue depth at which a client counts as behind
+            evict_after: Seconds a client may stay behind before eviction
+            send_timeout: Seconds a single send may take
+            on_evict: Called with (websocket, reason) after a client is evicted
+        """
+        self.max_queue = max_queue
+        self.backlog_threshold = backlog_threshold
+        self.evict_after = evict_after
+        self.send_timeout = send_timeout
+        self.on_evict = on_evict
+        self.channels: Dict[Any, ClientChannel] = {}
+        self.stats = {"broadcasts": 0, "evicted": 0, "evicted_backlog": 0, "evicted_errors": 0,
+                      "dropped_total": 0, "conflated_total": 0}
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    def __contains__(self, websocket: Any) -> bool:
+        return websocket in self.channels
+
+    def add(self, websocket: Any, client_id: Optional[str] = None) -> ClientChannel:
+        """Register a client and start its writer task."""
+        channel = self.channels.get(websocket)
+        if channel is None:
+            channel = ClientChannel(websocket, client_id or str(id(websocket)), self.max_queue,
+                                    self.send_timeout, self._writer_failed)
+            self.channels[websocket] = channel
+            channel.start()
+        return channel
+
+    def discard(self, websocket: Any) -> None:
+        """Stop a client's writer and forget it (the socket is left open)."""
+        channel = self.channels.pop(websocket, None)
+        if channel is not None:
+            self._retire(channel)
+
+    def send(self, websocket: Any, message: Union[str, Dict[str, Any]],
+             conflate_key: Optional[str] = None) -> bool:
+        """Queue a message for one client; False when it is not registered."""
+        channel = self.channels.get(websocket)
+        if channel is None:
+            return False
+        self._enqueue(channel, encode_message(message), conflate_key, time.monotonic())
+        return True
+
+    def broadcast(self, message: Union[str, Dict[str, Any]], conflate_key: Optional[str] = None) -> int:
+        """Queue a message for every client; returns how many clients it was queued for."""
+        if not self.channels:
+            return 0
+        payload = encode_message(message)
+        now = time.monotonic()
+        self.stats["broadcasts"] += 1
+        queued = 0
+        for channel in list(self.channels.values()):
+            if self._enqueue(channel, payload, conflate_key, now):
+                queued += 1
+        return queued
+
+    def _enqueue(self, channel: ClientChannel, payload: str, conflate_key: Optional[str], now: float) -> bool:
+        channel.enqueue(payload, conflate_key)
+        if channel.depth < self.backlog_threshold:
+            channel.backlogged_since = None
+            return True
+        if channel.backlogged_since is None:
+            channel.backlogged_since = now
+        elif now - channel.backlogged_since >= self.evict_after:
+            self._evict(channel, f"backlog of {channel.depth} frames for over {self.evict_after}s",
+                        SLOW_CONSUMER_CLOSE_CODE)
+            self.stats["evicted_backlog"] += 1
+            return False
+        return True
+
+    def _writer_failed(self, channel: ClientChannel, reason: str) -> None:
+        if self.channels.get(channel.websocket) is channel:
+            self._evict(channel, reason, ERROR_CLOSE_CODE)
+            self.stats["evicted_errors"] += 1
+
+    def _evict(self, channel: ClientChannel, reason: str, code: int) -> None:
+        self.channels.pop(channel.websocket, None)
+        self._retire(channel)
+        self.stats["evicted"] += 1
+        logger.warning(f"Evicting WebSocket client {channel.client_id}: {reason}")
+        asyncio.ensure_future(self._close(channel.websocket, code, reason))
+        if self.on_evict is not None:
+            try:
+                self.on_evict(channel.websocket, reason)
+            except Exception as e:
+                logger.error(f"WebSocket eviction callback failed: {e}")
+
+    def _retire(self, channel: ClientChannel) -> None:
+        self.stats["dropped_total"] += channel.stats["dropped"]
+        self.stats["conflated_total"] += channel.stats["conflated"]
+        channel.stop()
+
+    @staticmethod
+    async def _close(websocket: Any, code: int, reason: str) -> None:
+        try:
+            await asyncio.wait_for(websocket.close(code=code, reason=reason[:120]), DEFAULT_SEND_TIMEOUT)
+        except Exception:
+            pass
+
+    async def close(self) -> None:
+        """Stop every writer and close every client."""
+        channels = list(self.channels.values())
+        self.channels.clear()
+        for channel in channels:
+            self._retire(channel)
+        await asyncio.gather(*[self._close(c.websocket, 1001, "Server shutting down") for c in channels])
+
+    def get_stats(self, include_clients: bool = True) -> Dict[str, Any]:
+        clients = [channel.get_stats() for channel in self.channels.values()]
+        stats = dict(
+            self.stats,
+            clients=len(clients),
+            queued_frames=sum(c["queue_depth"] for c in clients),
+            backlogged_clients=sum(1 for c in clients if c["queue_depth"] >= self.backlog_threshold),
+            dropped_total=self.stats["dropped_total"] + sum(c["dropped"] for c in clients),
+            conflated_total=self.stats["conflated_total"] + sum(c["conflated"] for c in clients),
+            max_latency_p95_seconds=max((c["latency_p95_seconds"] for c in clients), default=0.0),
+        )
+        if include_clients:
+            stats["per_client"] = clients
+        return stats
@@ -0,0 +1,290 @@
+"""
+Request/response RPC over the agent WebSocket connections.
+Each side of a connection wraps it in an RPCEndpoint: calls carry a
+correlation ID, any number of them can be in flight on one socket, each
+has its own timeout (passed along as the callee's deadline), a caller
+that gives up sends a cancel that stops the work on the other side, and
+a handler can stream partial results before its final response.
+
+Messages use the usual ``{"type", "id", "data"}`` envelope with the
+correlation ID as ``id``. Requests address the callee's own HTTP API (method + path + JSON body),
+served in-process through ``asgi_dispatcher``, so every existing endpoint
+is reachable over the socket and callers can fall back to plain HTTP
+when no socket is up.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RPC_REQUEST = "rpc_request"
+RPC_RESPONSE = "rpc_response"
+RPC_STREAM = "rpc_stream"
+RPC_CANCEL = "rpc_cancel"
+RPC_TYPES = frozenset((RPC_REQUEST, RPC_RESPONSE, RPC_STREAM, RPC_CANCEL))
+
+NDJSON = b"application/x-ndjson"   # Streaming responses: one partial result per line
+DEFAULT_TIMEOUT = 30.0
+
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+Emit = Callable[[Any], Awaitable[None]]
+Dispatch = Callable[[str, str, Optional[Any], Emit], Awaitable[Tuple[int, Any]]]
+
+_ids = itertools.count(1)
+
+
+class RPCError(Exception):
+    """A call that could not complete."""
+
+
+class RPCUnavailable(RPCError):
+    """The connection is gone; the caller may retry over HTTP."""
+
+
+class _Call:
+    def __init__(self, on_partial: Optional[Callable[[Any], Any]]):
+        self.future = asyncio.get_running_loop().create_future()
+        self.on_partial = on_partial
+
+
+class RPCEndpoint:
+    """
+    One side of an RPC-capable connection.
+
+    ``send`` writes a message dict to the socket; the owner feeds every
+    received RPC message to ``handle`` and calls ``close`` when the socket
+    goes away. Requests are served by ``dispatch`` (see ``asgi_dispatcher``);
+    an endpoint without one only makes calls.
+    """
+
+    def __init__(self, send: Send, dispatch: Optional[Dispatch] = None, name: str = "peer"):
+        self._send = send
+        self.dispatch = dispatch
+        self.name = name
+        self.closed = False
+        self._prefix = f"{os.getpid():x}-{id(self):x}-"
+        self._pending: Dict[str, _Call] = {}
+        self._serving: Dict[str, asyncio.Task] = {}
+        self.stats = {"calls": 0, "completed": 0, "timeouts": 0, "cancelled": 0, "failed": 0,
+                      "served": 0, "serve_cancelled": 0, "partials_sent": 0}
+
+    async def call(self, method: str, path: str, body: Any = None, timeout: float = DEFAULT_TIMEOUT,
+                   on_partial: Optional[Callable[[Any], Any]] = None) -> Tuple[int, Any]:
+        """
+        Call ``method path`` on the peer and return ``(status, data)``.
+
+        ``on_partial`` receives streamed partial results as they arrive.
+        Raises asyncio.TimeoutError after ``timeout`` seconds and
+        RPCUnavailable if the connection closes first; in both cases and on
+        cancellation of the caller the peer is told to stop.
+        """
+        if self.closed:
+            raise RPCUnavailable(f"RPC connection to {self.name} is closed")
+        call_id = f"{self._prefix}{next(_ids)}"
+        call = _Call(on_partial)
+        self._pending[call_id] = call
+        self.stats["calls"] += 1
+        try:
+            await self._send({"type": RPC_REQUEST, "id": call_id,
+                              "data": {"method": method.upper(), "path": path, "body": body, "timeout": timeout}})
+            status, data = await asyncio.wait_for(call.future, timeout)
+            self.stats["completed"] += 1
+            return status, data
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            await self._cancel_remote(call_id)
+            raise
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            await self._cancel_remote(call_id)
+            raise
+        except RPCUnavailable:
+            self.stats["failed"] += 1
+            raise
+        except Exception as e:
+            self.stats["failed"] += 1
+            raise RPCUnavailable(f"RPC to {self.name} failed: {e}") from e
+        finally:
+            self._pending.pop(call_id, None)
+
+    async def stream(self, method: str, path: str, body: Any = None,
+                     timeout: float = DEFAULT_TIMEOUT) -> AsyncIterator[Any]:
+        """Yield the peer's partial results, then its final data if any (``timeout`` covers the whole call)."""
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        task = asyncio.ensure_future(self.call(method, path, body, timeout, on_partial=queue.put_nowait))
+        task.add_done_callback(lambda _: queue.put_nowait(done))
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                yield item
+            status, data = task.result()
+            if status >= 400:
+                raise RPCError(f"{self.name} returned {status}: {data}")
+            if data is not None:
+                yield data
+        finally:
+            if not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+
+    async def _cancel_remote(self, call_id: str) -> None:
+        if self.closed:
+            return
+        try:
+            await self._send({"type": RPC_CANCEL, "id": call_id, "data": {}})
+        except Exception as e:
+            logger.debug(f"Could not send RPC cancel to {self.name}: {e}")
+
+    async def handle(self, message: Dict[str, Any]) -> bool:
+        """Process a received message; returns False if it isn't an RPC message."""
+        message_type = message.get("type")
+        call_id = message.get("id")
+        data = message.get("data") or {}
+        if message_type == RPC_RESPONSE:
+            call = self._pending.get(call_id)
+            if call is not None and not call.future.done():
+                body = data.get("body")
+                if body is None and data.get("error") is not None:
+                    body = {"error": data["error"]}
+                call.future.set_result((data.get("status", 200), body))
+        elif message_type == RPC_STREAM:
+            call = self._pending.get(call_id)
+            if call is not None and call.on_partial is not None:
+                try:
+                    call.on_partial(data.get("body"))
+                except Exception as e:
+                    logger.warning(f"RPC partial handler error: {e}")
+        elif message_type == RPC_REQUEST:
+            if call_id not in self._serving:
+                self._serving[call_id] = asyncio.ensure_future(self._serve(message))
+        elif message_type == RPC_CANCEL:
+            task = self._serving.pop(call_id, None)
+            if task is not None:
+                self.stats["serve_cancelled"] += 1
+                task.cancel()
+        else:
+            return False
+        return True
+
+    async def _serve(self, message: Dict[str, Any]) -> None:
+        call_id = message["id"]
+        request = message.get("data") or {}
+
+        async def emit(chunk: Any) -> None:
+            self.stats["partials_sent"] += 1
+            await self._send({"type": RPC_STREAM, "id": call_id, "data": {"body": chunk}})
+
+        try:
+            if self.dispatch is None:
+                reply = {"status": 501, "error": "RPC not served here"}
+            else:
+                status, data = await asyncio.wait_for(
+                    self.dispatch(request.get("method", "GET"), request.get("path", "/"), request.get("body"), emit),
+                    request.get("timeout") or None)
+                reply = {"status": status, "body": data}
+        except asyncio.CancelledError:
+            return   # Cancelled by the caller (or the connection closed); nobody is waiting
+        except asyncio.TimeoutError:
+            reply = {"status": 504, "error": "Deadline exceeded"}
+        except Exception as e:
+            logger.error(f"RPC {request.get('method')} {request.get('path')} failed: {e}")
+            reply = {"status": 500, "error": str(e)}
+        finally:
+            self._serving.pop(call_id, None)
+        self.stats["served"] += 1
+        try:
+            await self._send({"type": RPC_RESPONSE, "id": call_id, "data": reply})
+        except Exception as e:
+            logger.debug(f"Could not send RPC response to {self.name}: {e}")
+
+    def close(self, reason: str = "connection closed") -> None:
+        """Fail calls in flight (RPCUnavailable) and stop serving requests."""
+        self.closed = True
+        for call in self._pending.values():
+            if not call.future.done():
+                call.future.set_exception(RPCUnavailable(f"RPC to {self.name}: {reason}"))
+        for task in self._serving.values():
+            task.cancel()
+        self._serving.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, in_flight=len(self._pending), serving=len(self._serving), closed=self.closed)
+
+
+def asgi_dispatcher(app: Callable) -> Dispatch:
+    """
+    Serve RPC requests by calling an ASGI app (the agent's FastAPI app)
+    in-process. ``application/x-ndjson`` responses are streamed back line
+    by line as partial results; anything else is returned as JSON (or text).
+    """
+    async def dispatch(method: str, path: str, body: Any, emit: Emit) -> Tuple[int, Any]:
+        route, _, query = path.partition("?")
+        payload = b"" if body is None else json.dumps(body, default=str).encode()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method.upper(),
+            "scheme": "http",
+            "path": route,
+            "raw_path": route.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"rpc"), (b"content-type", b"application/json"),
+                        (b"content-length", str(len(payload)).encode())],
+            "client": ("rpc", 0),
+            "server": ("rpc", 80),
+        }
+        state = {"status": 500, "streaming": False, "buffer": b"", "body": []}
+        request_sent = False
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": payload, "more_body": False}
+            await asyncio.get_running_loop().create_future()   # No disconnect until the response is done
+
+        async def send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                headers = dict(message.get("headers", []))
+                state["streaming"] = headers.get(b"content-type", b"").startswith(NDJSON)
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                if not state["streaming"]:
+                    state["body"].append(chunk)
+                    return
+                *lines, state["buffer"] = (state["buffer"] + chunk).split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        await emit(json.loads(line))
+
+        await app(scope, receive, send)
+        if state["streaming"]:
+            if state["buffer"].strip():
+                await emit(json.loads(state["buffer"]))
+            return state["status"], None
+        content = b"".join(state["body"])
+        try:
+            return state["status"], json.loads(content) if content else None
+        except ValueError:
+            return state["status"], content.decode(errors="replace")
+
+    return dispatch
+
+
+def agent_key(name: str) -> str:
+    """Agent name as the meta agent knows it ("agentic_signal" -> "signal")."""
+    return name[len("agentic_"):] if name.startswith("agentic_") else name
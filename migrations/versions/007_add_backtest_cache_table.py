@@ -0,0 +1,32 @@
+"""Add backtest_cache for the content-addressed backtest result cache
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create backtest_cache, keyed by the cache's content hash."""
+    op.create_table('backtest_cache',
+        sa.Column('cache_key', sa.String(64), primary_key=True),
+        sa.Column('strategy_type', sa.String(50), nullable=True),
+        sa.Column('symbol', sa.String(20), nullable=True),
+        sa.Column('compute_seconds', sa.Float, nullable=True),
+        sa.Column('data', sa.LargeBinary, nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=True)
+    )
+
+
+def downgrade():
+    """Drop backtest_cache (cached results are recomputed)."""
+    op.drop_table('backtest_cache')
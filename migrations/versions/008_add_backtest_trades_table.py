@@ -0,0 +1,96 @@
+"""Move backtest trades and equity curves out of the backtests JSONB row
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+TRADE_KEYS = "ARRAY['symbol', 'side', 'entry_time', 'exit_time', 'entry_price', 'exit_price', " \
+             "'units', 'quantity', 'pnl', 'return_pct', 'bars_held', 'exit_reason']"
+
+
+def upgrade():
+    """Create backtest_trades and backtest_artifacts and move existing trades over."""
+
+    # Append-only trade rows, one per round trip
+    op.create_table('backtest_trades',
+        sa.Column('id', sa.BigInteger, primary_key=True),
+        sa.Column('backtest_id', sa.Integer, sa.ForeignKey('backtests.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('seq', sa.Integer, nullable=False),  # Position of the trade within its backtest
+        sa.Column('symbol', sa.String(20)),
+        sa.Column('side', sa.String(10)),
+        sa.Column('entry_time', sa.DateTime),
+        sa.Column('exit_time', sa.DateTime),
+        sa.Column('entry_price', sa.Float),
+        sa.Column('exit_price', sa.Float),
+        sa.Column('quantity', sa.Float),
+        sa.Column('pnl', sa.Float),
+        sa.Column('return_pct', sa.Float),
+        sa.Column('bars_held', sa.Integer),
+        sa.Column('exit_reason', sa.String(20)),
+        sa.Column('extra', postgresql.JSONB)
+    )
+    op.create_unique_constraint('uq_backtest_trades_backtest_seq', 'backtest_trades', ['backtest_id', 'seq'])
+    op.create_index('idx_backtest_trades_backtest_exit', 'backtest_trades', ['backtest_id', 'exit_time'])
+
+    # Compressed columnar series (equity curves)
+    op.create_table('backtest_artifacts',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('backtest_id', sa.Integer, sa.ForeignKey('backtests.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('kind', sa.String(30), nullable=False),
+        sa.Column('encoding', sa.String(30), nullable=False),
+        sa.Column('rows', sa.Integer, default=0),
+        sa.Column('data', sa.LargeBinary, nullable=False),
+        sa.Column('created_at', sa.DateTime, default=sa.func.now())
+    )
+    op.create_unique_constraint('uq_backtest_artifacts_backtest_kind', 'backtest_artifacts', ['backtest_id', 'kind'])
+
+    # Move trades already stored in backtests.trades
+    op.execute(f"""
+        INSERT INTO backtest_trades (backtest_id, seq, symbol, side, entry_time, exit_time, entry_price,
+                                     exit_price, quantity, pnl, return_pct, bars_held, exit_reason, extra)
+        SELECT b.id, (t.ord - 1)::int,
+               t.trade->>'symbol', t.trade->>'side',
+               (t.trade->>'entry_time')::timestamp, (t.trade->>'exit_time')::timestamp,
+               (t.trade->>'entry_price')::float, (t.trade->>'exit_price')::float,
+               COALESCE((t.trade->>'units')::float, (t.trade->>'quantity')::float),
+               (t.trade->>'pnl')::float, (t.trade->>'return_pct')::float,
+               (t.trade->>'bars_held')::int, t.trade->>'exit_reason',
+               NULLIF(t.trade - {TRADE_KEYS}, '{{}}'::jsonb)
+        FROM backtests b, jsonb_array_elements(b.trades) WITH ORDINALITY AS t(trade, ord)
+        WHERE jsonb_typeof(b.trades) = 'array'
+    """)
+    op.execute("UPDATE backtests SET trades = NULL WHERE trades IS NOT NULL")
+
+
+def downgrade():
+    """Fold trades back into backtests.trades and drop the new tables."""
+
+    op.execute("""
+        UPDATE backtests b SET trades = t.trades
+        FROM (
+            SELECT backtest_id,
+                   jsonb_agg(jsonb_strip_nulls(jsonb_build_object(
+                       'symbol', symbol, 'side', side, 'entry_time', entry_time, 'exit_time', exit_time,
+                       'entry_price', entry_price, 'exit_price', exit_price, 'units', quantity, 'pnl', pnl,
+                       'return_pct', return_pct, 'bars_held', bars_held, 'exit_reason', exit_reason
+                   )) || COALESCE(extra, '{}'::jsonb) ORDER BY seq) AS trades
+            FROM backtest_trades
+            GROUP BY backtest_id
+        ) t
+        WHERE b.id = t.backtest_id
+    """)
+
+    op.drop_table('backtest_artifacts')
+    op.drop_index('idx_backtest_trades_backtest_exit', table_name='backtest_trades')
+    op.drop_table('backtest_trades')
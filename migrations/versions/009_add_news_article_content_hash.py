@@ -0,0 +1,27 @@
+"""Add content hash to news articles for deduplication
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add news_articles.content_hash with a unique index."""
+    op.add_column('news_articles', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('idx_news_articles_content_hash', 'news_articles', ['content_hash'], unique=True)
+
+
+def downgrade():
+    """Remove news_articles.content_hash."""
+    op.drop_index('idx_news_articles_content_hash', 'news_articles')
+    op.drop_column('news_articles', 'content_hash')
@@ -0,0 +1,52 @@
+"""Add agent_history_archive for records spilled from agent in-memory histories
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create agent_history_archive as a hypertable when TimescaleDB is available."""
+    op.create_table('agent_history_archive',
+        sa.Column('id', sa.BigInteger, autoincrement=True, nullable=False),
+        sa.Column('recorded_at', sa.DateTime, nullable=False),
+        sa.Column('collection', sa.String(200), nullable=False),
+        sa.Column('record_id', sa.String(64), nullable=False),
+        sa.Column('record_key', sa.String(128), nullable=True),
+        sa.Column('record', postgresql.JSONB, nullable=False),
+        # Hypertable unique keys must include the time column
+        sa.PrimaryKeyConstraint('id', 'recorded_at')
+    )
+    op.create_index('idx_agent_history_archive_collection_time', 'agent_history_archive',
+                    ['collection', 'recorded_at'])
+    op.create_index('idx_agent_history_archive_collection_key', 'agent_history_archive',
+                    ['collection', 'record_key'])
+
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb') THEN
+                PERFORM create_hypertable('agent_history_archive', 'recorded_at',
+                                          chunk_time_interval => INTERVAL '7 days', migrate_data => true);
+            END IF;
+        END
+        $$;
+    """)
+
+
+def downgrade():
+    """Drop agent_history_archive."""
+    op.drop_index('idx_agent_history_archive_collection_key', table_name='agent_history_archive')
+    op.drop_index('idx_agent_history_archive_collection_time', table_name='agent_history_archive')
+    op.drop_table('agent_history_archive')
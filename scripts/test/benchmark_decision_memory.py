@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Decision Memory Benchmark
+Fills the decision memory with 10k, 100k and 1M synthetic decisions whose
+success depends on their context, then compares similar-decision lookup
+against a linear scan of the history comparing contexts field by field
+(before) and exact numpy k-NN: query latency, rows scanned and recall of
+the IVF index. Also checks that outcome statistics over the neighbors
+predict success better than the per-type history rate and that a saved
+memory reloads with identical results.
+"""
+
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+import numpy as np
+
+from common.decision_memory import DecisionMemory, featurize
+
+SIZES = (10_000, 100_000, 1_000_000)
+K = 20
+QUERIES = 200
+LINEAR_QUERIES = {10_000: 50, 100_000: 10, 1_000_000: 3}
+
+TYPES = ("risk_management", "strategy_selection", "trade_execution")
+SYMBOLS = [f"{base}/USDT" for base in ("BTC", "ETH", "SOL", "ADA", "XRP", "DOT", "AVAX", "LINK", "MATIC", "ATOM",
+                                       "LTC", "BCH", "UNI", "AAVE", "ALGO", "XLM", "FIL", "NEAR", "APT", "ARB")]
+REGIMES = ("bull", "bear", "sideways", "volatile")
+TRENDS = ("up", "down", "flat")
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def make_decision(rng: random.Random, i: int) -> dict:
+    regime, trend = rng.choice(REGIMES), rng.choice(TRENDS)
+    volatility = rng.uniform(0.005, 0.08)
+    context = {
+        "symbol": rng.choice(SYMBOLS),
+        "market_conditions": regime,
+        "trend": trend,
+        "timeframe": rng.choice(("1h", "4h", "1d")),
+        "volatility": round(volatility, 4),
+        "position_size": round(rng.uniform(0.01, 0.2), 3),
+        "rsi": round(rng.uniform(10, 90), 1),
+    }
+    aligned = (regime, trend) in (("bull", "up"), ("bear", "down"), ("sideways", "flat"))
+    p = min(0.95, max(0.05, 0.25 + 0.5 * aligned - 0.2 * (volatility > 0.05) - 0.15 * (regime == "volatile")))
+    decision_type = TYPES[i % 3] if rng.random() < 0.9 else rng.choice(TYPES)
+    success = rng.random() < p
+    return {"id": f"d{i}", "type": decision_type, "context": context, "confidence": round(rng.uniform(0.5, 0.95), 2),
+            "p": p, "score": 0.9 if success else 0.3}
+
+
+def linear_similar(history: list, query: dict, k: int) -> list:
+    """Before: scan every decision of the same type and count matching context fields."""
+    scored = []
+    for past in history:
+        if past["type"] != query["type"]:
+            continue
+        matches = sum(1 for key, value in query["context"].items() if past["context"].get(key) == value)
+        scored.append((matches, past["id"]))
+    scored.sort(reverse=True)
+    return scored[:k]
+
+
+def benchmark_decision_memory():
+    logging.getLogger("common.decision_memory").setLevel(logging.WARNING)
+    print("🧠 Decision Memory Benchmark")
+    print("=" * 50)
+    success = True
+    rng = random.Random(5)
+    total = max(SIZES)
+    decisions = [make_decision(rng, i) for i in range(total + QUERIES)]
+    history, queries = decisions[:total], decisions[total:]
+
+    started = time.perf_counter()
+    vectors = np.stack([featurize(d["type"], d["context"], d["confidence"]) for d in decisions])
+    print(f"   Featurized {len(decisions)} decisions at "
+          f"{(time.perf_counter() - started) / len(decisions) * 1e6:.1f} µs each")
+    query_vectors = vectors[total:]
+
+    for size in SIZES:
+        memory = DecisionMemory()
+        started = time.perf_counter()
+        for start in range(0, size, 10_000):
+            chunk = history[start:min(start + 10_000, size)]
+            memory.add_vectors([d["id"] for d in chunk], [d["type"] for d in chunk],
+                               vectors[start:start + len(chunk)], [d["score"] for d in chunk])
+        build = time.perf_counter() - started
+
+        # Before: linear field-by-field scan
+        n_linear = LINEAR_QUERIES[size]
+        started = time.perf_counter()
+        for query in queries[:n_linear]:
+            linear_similar(history[:size], query, K)
+        linear_ms = (time.perf_counter() - started) / n_linear * 1e3
+
+        # Exact k-NN with numpy (recall reference)
+        labels = memory.index.labels[:size]
+        exact, exact_ms = [], 0.0
+        for query, qv in zip(queries, query_vectors):
+            started = time.perf_counter()
+            label = memory._type_codes[query["type"]]
+            rows = np.flatnonzero(labels == label)
+            sims = memory.index.vectors[rows] @ qv
+            top = rows[np.argpartition(-sims, K)[:K]]
+            exact_ms += time.perf_counter() - started
+            exact.append(set(top.tolist()))
+        exact_ms = exact_ms / QUERIES * 1e3
+
+        # After: IVF search
+        hits, predictions, baseline, truths = 0, [], [], []
+        type_rates = {t: float(np.mean([d["score"] > 0.7 for d in history[:size] if d["type"] == t][-100:]))
+                      for t in TYPES}
+        scanned_before = memory.stats["rows_scanned"]
+        started = time.perf_counter()
+        results = [memory.similar_outcomes(q["type"], q["context"], q["confidence"], k=K) for q in queries]
+        ivf_ms = (time.perf_counter() - started) / QUERIES * 1e3
+        scanned = (memory.stats["rows_scanned"] - scanned_before) / QUERIES
+        for query, result, reference in zip(queries, results, exact):
+            rows = {memory._rows[n.decision_id] for n in result["neighbors"]}
+            hits += len(rows & reference)
+            predictions.append(result["weighted_success_rate"])
+            baseline.append(type_rates[query["type"]])
+            truths.append(query["p"])
+        recall = hits / (QUERIES * K)
+        error = float(np.mean(np.abs(np.array(predictions) - truths)))
+        baseline_error = float(np.mean(np.abs(np.array(baseline) - truths)))
+
+        print(f"   {size:>9,} decisions: built in {build:.1f}s, {memory.get_stats()['lists']} lists")
+        print(f"      linear field scan (before) {linear_ms:9.2f} ms/query")
+        print(f"      exact numpy k-NN           {exact_ms:9.2f} ms/query")
+        print(f"      IVF k-NN (after)           {ivf_ms:9.2f} ms/query, {scanned:,.0f} rows scanned "
+              f"({scanned / size:.1%}), recall@{K} {recall:.2f}")
+        print(f"      success-rate error: neighbors {error:.3f} vs per-type history {baseline_error:.3f}")
+        success &= check(f"{size:,}: IVF faster than the linear scan ({linear_ms / ivf_ms:.0f}x) "
+                         f"with recall@{K} >= 0.8", ivf_ms < linear_ms and recall >= 0.8)
+        success &= check(f"{size:,}: neighbor outcomes predict success better than the per-type rate",
+                         error < baseline_error)
+        if size >= 100_000:
+            success &= check(f"{size:,}: lookup is sublinear (scans {scanned / size:.1%} of the decisions)",
+                             scanned < 0.05 * size)
+
+        if size == 100_000:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "memory.npz")
+                memory.path = path
+                started = time.perf_counter()
+                memory.save()
+                save_s = time.perf_counter() - started
+                started = time.perf_counter()
+                loaded = DecisionMemory.load(path)
+                load_s = time.perf_counter() - started
+                same = all(
+                    [n.decision_id for n in loaded.search(q["type"], q["context"], q["confidence"], K)]
+                    == [n.decision_id for n in memory.search(q["type"], q["context"], q["confidence"], K)]
+                    for q in queries[:50])
+                success &= check(f"Saved in {save_s:.2f}s, reloaded in {load_s:.2f}s with identical neighbors",
+                                 same and len(loaded) == size)
+                memory.add("new", "risk_management", queries[0]["context"], 0.8, 0.9)
+                memory.persist_interval = 0
+                success &= check("Periodic persistence saves only when there are unsaved changes",
+                                 memory.persist_if_due() and not memory.persist_if_due())
+
+    print("=" * 50)
+    print("✅ Decision memory benchmark passed" if success else "❌ Decision memory benchmark failed")
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if benchmark_decision_memory() else 1)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+ML Hyperparameter Search Benchmark
+Runs the same time-series cross-validated grid search with 1 worker and with
+every available core, checks both find the same best parameters and reports
+the parallel speed-up. Also runs successive halving and Hyperband once, and
+checks that a halving bracket whose partial rungs are pruned entirely still
+promotes a config to the full budget.
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from agents.optimize.ml_search import HyperparameterSearch, MLSearchConfig
+
+PARAM_GRID = {
+    "n_estimators": [10, 20, 40],
+    "max_depth": [2, 4, 8, None],
+    "min_samples_leaf": [1, 5, 20],
+}
+
+
+def make_dataset(rows: int = 2000, seed: int = 3):
+    """Lagged-return features with a weakly predictable next-bar direction."""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.01, rows)
+    returns[1:] += 0.15 * returns[:-1]
+    frame = pd.DataFrame({f"lag_{k}": np.roll(returns, k) for k in range(1, 11)})
+    frame["vol_10"] = pd.Series(returns).rolling(10).std().bfill()
+    target = pd.Series((np.roll(returns, -1) > 0).astype(int))
+    return frame.iloc[20:-1].reset_index(drop=True), target.iloc[20:-1].reset_index(drop=True)
+
+
+async def run_search(X, y, method: str, workers: int):
+    config = MLSearchConfig(method=method, cv_folds=5, gap=1, n_iter=36, max_workers=workers,
+                            preprocessor=StandardScaler(), prune=False, seed=11)
+    search = HyperparameterSearch(RandomForestClassifier(random_state=0, n_jobs=1), PARAM_GRID, X, y, config)
+    return await search.run()
+
+
+class PruneEveryPartialRung(HyperparameterSearch):
+    """Prunes every config below the full budget, as thresholds from a stronger earlier bracket can."""
+
+    def _prune_thresholds(self, budget: float):
+        return [float("inf")] * (len(self.folds) - 1) if budget < 1.0 else []
+
+
+async def benchmark_ml_search():
+    print("🤖 ML Hyperparameter Search Benchmark")
+    print("=" * 50)
+    X, y = make_dataset()
+    cores = os.cpu_count() or 1
+    print(f"   Rows: {len(X)}  Features: {X.shape[1]}  Grid: 36 configs x 5 folds  Cores: {cores}")
+
+    success = True
+    single = await run_search(X, y, "grid", 1)
+    print(f"✅ grid, 1 worker:        {single.duration:.2f}s  best={single.best_params} "
+          f"accuracy={single.best_score:.4f}")
+    if cores > 1:
+        parallel = await run_search(X, y, "grid", cores)
+        speedup = single.duration / parallel.duration
+        efficiency = speedup / cores
+        same = parallel.best_params == single.best_params
+        ok = same and efficiency > 0.6
+        success &= ok
+        print(f"{'✅' if ok else '❌'} grid, {cores} workers:       {parallel.duration:.2f}s  "
+              f"speed-up {speedup:.2f}x (efficiency {efficiency:.0%}), same best: {same}")
+    else:
+        print("   Only one core available, skipping the scaling check")
+
+    for method in ("halving", "hyperband"):
+        result = await run_search(X, y, method, cores)
+        ok = bool(result.best_params)
+        success &= ok
+        print(f"{'✅' if ok else '❌'} {method:10s} {cores} workers: {result.duration:.2f}s  "
+              f"{result.evaluated} evaluations, best={result.best_params} "
+              f"accuracy={result.best_score:.4f}")
+
+    config = MLSearchConfig(method="halving", cv_folds=3, n_iter=9, max_workers=cores, seed=11)
+    search = PruneEveryPartialRung(RandomForestClassifier(random_state=0, n_jobs=1), PARAM_GRID, X, y, config)
+    result = await search.run()
+    ok = bool(result.best_params) and search._rung_log[-1]["budget"] == 1.0
+    success &= ok
+    print(f"{'✅' if ok else '❌'} Fully pruned rungs still promote a config to the full budget "
+          f"({result.pruned} pruned, best={result.best_params})")
+
+    print("=" * 50)
+    print("✅ ML search benchmark passed" if success else "❌ ML search benchmark failed")
+    return success
+
+
+if __name__ == "__main__":
+    success = asyncio.run(benchmark_ml_search())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Sentiment Batch Scoring Benchmark
+Reports articles/sec for the original one-article-at-a-time TextBlob + VADER
+scoring and for the batch scorer at batch sizes 1, 64 and 1024, and checks
+both give the same scores.
+"""
+
+import asyncio
+import os
+import random
+import re
+import sys
+import time
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from textblob import TextBlob
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from agents.news_sentiment.scoring import SentimentScorer, BatchScorer
+
+BATCH_SIZES = (1, 64, 1024)
+ARTICLES = 2048
+
+_VOCABULARY = (
+    "Bitcoin ETF approval lifts crypto market as traders pile in . "
+    "Ethereum price slides after exchange hack , regulators warn of fraud risk . "
+    "Analysts say trading volume is steady while the network upgrade ships on schedule . "
+    "Solana rally stalls ; investors fear a sharp correction but remain optimistic ! "
+    "The report covers block times , fees , validators and custody arrangements ."
+).split()
+
+
+def make_articles(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    articles = []
+    for _ in range(n):
+        words = [rng.choice(_VOCABULARY) for _ in range(rng.randint(20, 120))]
+        articles.append(" ".join(words))
+    return articles
+
+
+def legacy_score(vader: SentimentIntensityAnalyzer, text: str) -> float:
+    """The per-article path the agent used before batching."""
+    textblob_sentiment = TextBlob(text).sentiment.polarity
+    vader_sentiment = vader.polarity_scores(text)['compound']
+    words = re.findall(r'\b\w+\b', text.lower())
+    word_counts = {}
+    for word in words:
+        if len(word) > 3:
+            word_counts[word] = word_counts.get(word, 0) + 1
+    sorted(word_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+    return (textblob_sentiment + vader_sentiment) / 2
+
+
+async def run_batches(batch_scorer: BatchScorer, articles: list, batch_size: int) -> list:
+    results = []
+    for i in range(0, len(articles), batch_size):
+        results.extend(await batch_scorer.score(articles[i:i + batch_size]))
+    return results
+
+
+def benchmark_sentiment_batch():
+    print("📰 Sentiment Batch Scoring Benchmark")
+    print("=" * 50)
+    articles = make_articles(ARTICLES)
+    success = True
+
+    vader = SentimentIntensityAnalyzer()
+    started = time.perf_counter()
+    reference = [legacy_score(vader, text) for text in articles]
+    legacy_rate = len(articles) / (time.perf_counter() - started)
+    print(f"   Per-article (before): {legacy_rate:8.0f} articles/sec")
+
+    batch_scorer = BatchScorer(SentimentScorer(), workers=max(1, min(4, os.cpu_count() or 1)))
+    batch_scorer.start()
+    try:
+        for batch_size in BATCH_SIZES:
+            started = time.perf_counter()
+            results = asyncio.run(run_batches(batch_scorer, articles, batch_size))
+            rate = len(articles) / (time.perf_counter() - started)
+            same = all(abs(result['sentiment_score'] - expected) < 1e-12
+                       for result, expected in zip(results, reference)) and len(results) == len(reference)
+            success &= same
+            print(f"{'✅' if same else '❌'} Batch size {batch_size:4d}: {rate:8.0f} articles/sec "
+                  f"({rate / legacy_rate:.1f}x)")
+    finally:
+        batch_scorer.close()
+
+    print("=" * 50)
+    print("✅ Sentiment batch benchmark passed" if success else "❌ Sentiment batch benchmark failed")
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if benchmark_sentiment_batch() else 1)
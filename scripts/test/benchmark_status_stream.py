@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Status Snapshot + Delta Benchmark
+Replays a simulated multi-agent status (a few heartbeats change per tick)
+to 30 clients and reports bytes/sec and serialization work for full-status
+broadcasts (before) against one snapshot per client plus per-tick deltas
+(after). Also checks that a client mirror applying the deltas always matches
+the server status, recovers from a dropped frame by resyncing, and that
+no snapshot is built before the first status is recorded.
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from common.status_stream import StatusStream, StatusMirror
+
+AGENTS = ("research", "signal", "execution", "strategy", "risk", "compliance", "backtest", "optimize",
+          "monitor", "news_sentiment", "strategy_discovery", "realtime_data")
+CLIENTS = 30
+TICKS = 600
+TICK_SECONDS = 1.0
+
+
+def make_status(rng: random.Random, start: datetime) -> dict:
+    return {
+        "agent_type": "agentic_meta",
+        "status": "healthy",
+        "timestamp": start.isoformat(),
+        "agents": {
+            name: {
+                "status": "healthy",
+                "endpoint": f"http://{name}:8000",
+                "last_heartbeat": start.isoformat(),
+                "response_time": round(rng.uniform(0.01, 0.2), 4),
+                "active_tasks": rng.randint(0, 3),
+                "capabilities": ["analysis", "reporting", "coordination"],
+                "metrics": {"success_rate": 0.98, "avg_latency_ms": 42.0, "errors_1h": 0},
+            }
+            for name in AGENTS
+        },
+        "autonomous_decisions_count": 0,
+        "validation_success_rate": 1.0,
+        "recent_decisions": [{"id": f"d{i}", "type": "rebalance", "confidence": 0.7} for i in range(5)],
+    }
+
+
+def advance(status: dict, rng: random.Random, now: datetime, tick: int) -> None:
+    """One tick: two heartbeats, the timestamp and now and then a new decision."""
+    status["timestamp"] = now.isoformat()
+    for name in rng.sample(AGENTS, 2):
+        agent = status["agents"][name]
+        agent["last_heartbeat"] = now.isoformat()
+        agent["response_time"] = round(rng.uniform(0.01, 0.2), 4)
+    if tick % 20 == 0:
+        status["autonomous_decisions_count"] += 1
+        status["recent_decisions"] = status["recent_decisions"][1:] + [
+            {"id": f"d{tick}", "type": "rebalance", "confidence": round(rng.random(), 3)}]
+    if tick % 97 == 0:
+        status["agents"][rng.choice(AGENTS)]["status"] = rng.choice(["healthy", "degraded"])
+
+
+def benchmark_status_stream():
+    print("📶 Status Snapshot + Delta Benchmark")
+    print("=" * 50)
+    success = True
+    rng = random.Random(11)
+    start = datetime(2025, 1, 1)
+    status = make_status(rng, start)
+    duration = TICKS * TICK_SECONDS
+
+    # Before: the full status serialized and sent to every client every tick
+    full_bytes, started = 0, time.perf_counter()
+    replay = json.loads(json.dumps(status))
+    replay_rng = random.Random(12)
+    for tick in range(1, TICKS + 1):
+        advance(replay, replay_rng, start + timedelta(seconds=tick), tick)
+        for _ in range(CLIENTS):
+            full_bytes += len(json.dumps({"type": "agent_status_update", "data": replay,
+                                          "timestamp": replay["timestamp"]}))
+    full_cpu = time.perf_counter() - started
+
+    # After: snapshot on connect, then one delta per tick serialized once for all clients
+    stream = StatusStream()
+    try:
+        stream.snapshot()
+        empty_refused = False
+    except RuntimeError:
+        empty_refused = True
+    stream.update(status)
+    snapshot = json.dumps(stream.snapshot())
+    delta_bytes, delta_cpu = CLIENTS * len(snapshot), 0.0
+    replay = json.loads(json.dumps(status))
+    replay_rng = random.Random(12)
+    mirror, lossy = StatusMirror(), StatusMirror()
+    mirror.apply(json.loads(snapshot))
+    lossy.apply(json.loads(snapshot))
+    matches, resyncs = True, 0
+    for tick in range(1, TICKS + 1):
+        advance(replay, replay_rng, start + timedelta(seconds=tick), tick)
+        started = time.perf_counter()
+        delta = stream.update(replay)
+        payload = json.dumps(delta) if delta is not None else None
+        delta_cpu += time.perf_counter() - started
+        if payload is None:
+            continue
+        delta_bytes += CLIENTS * len(payload)
+        frame = json.loads(payload)
+        mirror.apply(frame)
+        matches &= mirror.state == stream.state
+        if tick % 50 == 25:
+            continue  # The lossy client drops this frame
+        if not lossy.apply(frame):
+            resyncs += 1
+            lossy.apply(json.loads(json.dumps(stream.snapshot(resync=True))))
+
+    print(f"   {len(AGENTS)} agents, {CLIENTS} clients, {TICKS} ticks of {TICK_SECONDS:.0f}s")
+    print(f"   Full status (before): {full_bytes / duration:10.0f} bytes/sec, "
+          f"{TICKS * CLIENTS} serializations, {full_cpu * 1e3:.1f} ms server CPU")
+    print(f"   Snapshot + deltas (after): {delta_bytes / duration:6.0f} bytes/sec, "
+          f"{stream.stats['deltas']} serializations, {delta_cpu * 1e3:.1f} ms server CPU")
+    print(f"   Reduction: {full_bytes / delta_bytes:.1f}x fewer bytes")
+    success &= delta_bytes * 5 < full_bytes
+    success &= matches
+    print(f"{'✅' if matches else '❌'} Mirror applying deltas matches the server status every tick")
+    recovered = lossy.state == stream.state and resyncs == TICKS // 50
+    success &= recovered
+    print(f"{'✅' if recovered else '❌'} Client dropping one frame in 50 resynced {resyncs} times and converged")
+    success &= empty_refused
+    print(f"{'✅' if empty_refused else '❌'} No snapshot is sent before a status was recorded")
+    print("=" * 50)
+    print("✅ Status stream benchmark passed" if success else "❌ Status stream benchmark failed")
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if benchmark_status_stream() else 1)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Agent WebSocket Wire Format Benchmark
+Measures encode/decode cost and bytes on the wire for typical agent
+messages as JSON text (before) against msgpack, msgpack + deflate and
+micro-batched msgpack frames (after), then runs AgentWebSocketClient
+against local servers to check subprotocol negotiation, batching within
+the latency budget and the JSON fallback for peers that don't negotiate.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from websockets.asyncio.server import serve
+
+from common.websocket_client import AgentWebSocketClient, MessageType, WebSocketMessage
+from common.wire_format import WireCodec, MSGPACK_SUBPROTOCOL, decode_frame
+
+ITERATIONS = 2000
+BATCH = 32
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def wire_bytes(frame) -> int:
+    """Payload plus a masked client frame header (2-14 bytes)."""
+    size = len(frame.encode() if isinstance(frame, str) else frame)
+    return size + 4 + (2 if size < 126 else 4 if size < 65536 else 10)
+
+
+def sample_messages(rng: random.Random) -> dict:
+    tick = WebSocketMessage(MessageType.TRADE_UPDATE, {
+        "agent": "realtime_data", "symbol": "BTC/USDT", "price": 67321.45, "volume": 0.0132,
+        "bid": 67321.4, "ask": 67321.5, "exchange": "binanceus", "timestamp": "2025-01-01T00:00:00.123456"})
+    signal = WebSocketMessage(MessageType.SIGNAL_UPDATE, {
+        "agent": "signal", "symbol": "ETH/USDT", "signal": "buy", "confidence": 0.8123,
+        "indicators": {"rsi": 28.4, "macd": -1.21, "macd_signal": -1.9, "bb_position": 0.08, "volume_ratio": 1.7},
+        "reasoning": "RSI oversold with MACD crossing up and volume above average",
+        "timestamp": "2025-01-01T00:00:00"})
+    status = WebSocketMessage(MessageType.AGENT_STATUS, {
+        "agent": "execution", "status": "connected",
+        "capabilities": {"type": "execution", "version": "1.0",
+                         "features": ["websocket", "real_time_updates", "order_routing", "position_sync"]},
+        "open_orders": 3, "uptime_seconds": 86400})
+    candles = WebSocketMessage(MessageType.RESPONSE, {
+        "agent": "research", "symbol": "BTC/USDT", "timeframe": "1m",
+        "candles": [{"t": 1735689600000 + i * 60000, "o": round(67000 + rng.gauss(0, 50), 2),
+                     "h": round(67050 + rng.gauss(0, 50), 2), "l": round(66950 + rng.gauss(0, 50), 2),
+                     "c": round(67000 + rng.gauss(0, 50), 2), "v": round(rng.uniform(0, 5), 4)}
+                    for i in range(120)]})
+    return {"market tick": tick, "signal update": signal, "agent status": status, "candles (120)": candles}
+
+
+def timed(fn, iterations: int = ITERATIONS) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def run_microbenchmark() -> bool:
+    success = True
+    json_codec = WireCodec(None)
+    binary = WireCodec(MSGPACK_SUBPROTOCOL, compress_threshold=None)
+    deflate = WireCodec(MSGPACK_SUBPROTOCOL)
+    print(f"   {'message':<16}{'format':<18}{'bytes':>8}{'encode µs':>12}{'decode µs':>12}")
+    for name, message in sample_messages(random.Random(3)).items():
+        payload = [message.to_dict()]
+        for label, codec in (("json (before)", json_codec), ("msgpack", binary), ("msgpack+deflate", deflate)):
+            frame = codec.encode(payload)
+            encode_us = timed(lambda: codec.encode(payload))
+            decode_us = timed(lambda: decode_frame(frame))
+            print(f"   {name:<16}{label:<18}{wire_bytes(frame):>8}{encode_us:>12.1f}{decode_us:>12.1f}")
+            success &= decode_frame(frame) == payload
+        success &= wire_bytes(deflate.encode(payload)) <= wire_bytes(json_codec.encode(payload))
+
+    ticks = []
+    for i in range(BATCH):
+        tick = sample_messages(random.Random(i))["market tick"]
+        tick.data["price"] += i
+        ticks.append(tick.to_dict())
+    json_total = sum(wire_bytes(json_codec.encode([t])) for t in ticks)
+    json_us = timed(lambda: [json_codec.encode([t]) for t in ticks], 200)
+    batch_frame = deflate.encode(ticks)
+    batch_us = timed(lambda: deflate.encode(ticks), 200)
+    print(f"   {BATCH} ticks: {json_total} bytes in {BATCH} JSON frames ({json_us:.0f} µs) vs "
+          f"{wire_bytes(batch_frame)} bytes in one batched frame ({batch_us:.0f} µs), "
+          f"{json_total / wire_bytes(batch_frame):.1f}x fewer bytes")
+    success &= check("Every format round-trips and deflated msgpack is never larger than JSON", success)
+    success &= check("Batched frame decodes to the same messages in order", decode_frame(batch_frame) == ticks)
+    success &= check("Batching cuts bytes on the wire at least 3x", wire_bytes(batch_frame) * 3 < json_total)
+    levels = [{"type": "order_book", "data": {"levels": {1: 0.5, 2: 0.25}}}, ticks[0]]
+    success &= check("Non-string map keys don't drop the batch", decode_frame(deflate.encode(levels)) == levels)
+    return success
+
+
+async def run_loopback() -> bool:
+    success = True
+    received = {"frames": [], "messages": []}
+
+    async def handler(websocket):
+        async for frame in websocket:
+            received["frames"].append(frame)
+            received["messages"].extend(decode_frame(frame))
+
+    for label, subprotocols in (("msgpack peer", [MSGPACK_SUBPROTOCOL]), ("old JSON peer", None)):
+        received["frames"].clear()
+        received["messages"].clear()
+        async with serve(handler, "127.0.0.1", 0, subprotocols=subprotocols) as server:
+            port = server.sockets[0].getsockname()[1]
+            client = AgentWebSocketClient("benchmark", "127.0.0.1", port, batch_window_ms=5)
+            await client.connect()
+            await client.flush()  # Registration message out before timing
+            started = time.perf_counter()
+            for i in range(100):
+                await client.send_trade_update({"symbol": "BTC/USDT", "price": 67000 + i})
+            while len(received["messages"]) < 101 and time.perf_counter() - started < 2:
+                await asyncio.sleep(0.001)
+            delivered = time.perf_counter() - started
+            info = client.get_connection_info()
+            await client.disconnect()
+
+        prices = [m["data"]["price"] for m in received["messages"] if m["type"] == "trade_update"]
+        print(f"   {label}: negotiated {info['wire_format']}, 101 messages in {len(received['frames'])} frames, "
+              f"{info['wire_stats']['bytes']} bytes, delivered in {delivered * 1e3:.1f} ms")
+        success &= check(f"{label}: every message delivered in order", prices == [67000 + i for i in range(100)])
+        if subprotocols:
+            success &= check(f"{label}: binary frames, batched within the 5 ms window",
+                             all(isinstance(f, bytes) for f in received["frames"])
+                             and len(received["frames"]) <= 10 and delivered < 0.5)
+        else:
+            success &= check(f"{label}: falls back to one JSON text frame per message",
+                             info["wire_format"] == "volex.json.v1"
+                             and all(isinstance(f, str) for f in received["frames"])
+                             and len(received["frames"]) == 101)
+    return success
+
+
+def benchmark_wire_format():
+    logging.getLogger("common.websocket_client").setLevel(logging.ERROR)  # No communication logger DB here
+    print("📦 Agent WebSocket Wire Format Benchmark")
+    print("=" * 50)
+    success = run_microbenchmark()
+    success &= asyncio.run(run_loopback())
+    print("=" * 50)
+    print("✅ Wire format benchmark passed" if success else "❌ Wire format benchmark failed")
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if benchmark_wire_format() else 1)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Tool Workflow DAG Benchmark
+Runs a price-analysis workflow (a blocking price fetch and an async
+indicator per symbol, then one aggregate step) the way
+EnhancedAgentCoordinator.execute_tool_workflow ran steps before (in
+order, sync tools called on the event loop) and through the DAGExecutor
+(after): wall time and the longest event loop stall. Also checks that
+outputs reach dependent steps, the critical-path report, per-step
+timeouts and retries, skipping of steps whose dependency failed, the
+global concurrency cap across concurrent runs, the bounded tool thread
+pool, graph validation and in-order execution of workflows without
+dependencies, which keep going after a failed step.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from common.workflow_dag import DAGExecutor, StepError, WorkflowError, build_graph, resolve_input
+
+SYMBOLS = {"BTC/USDT": 0.10, "ETH/USDT": 0.10, "SOL/USDT": 0.15, "ADA/USDT": 0.10, "XRP/USDT": 0.10}
+PRICES = {"BTC/USDT": 65000.0, "ETH/USDT": 3400.0, "SOL/USDT": 150.0, "ADA/USDT": 0.45, "XRP/USDT": 0.55}
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def fetch_price(symbol: str) -> dict:
+    """Blocking exchange call, like the MCP tools."""
+    time.sleep(SYMBOLS[symbol])
+    return {"symbol": symbol, "price": PRICES[symbol], "closes": [PRICES[symbol] * (1 + i / 100) for i in range(5)]}
+
+
+async def indicator(closes: list) -> dict:
+    await asyncio.sleep(0.02)
+    return {"sma": sum(closes) / len(closes)}
+
+
+def aggregate(**indicators) -> dict:
+    return {"symbols": len(indicators), "indicators": indicators}
+
+
+def price_workflow() -> list:
+    steps = []
+    for n, symbol in enumerate(SYMBOLS):
+        key = symbol.split("/")[0].lower()
+        steps.append({"step": len(steps) + 1, "id": f"fetch_{key}", "fn": fetch_price,
+                      "parameters": {"symbol": symbol}, "depends_on": []})
+        steps.append({"step": len(steps) + 1, "id": f"sma_{key}", "fn": indicator,
+                      "inputs": {"closes": f"fetch_{key}.closes"}})
+    steps.append({"step": len(steps) + 1, "id": "aggregate", "fn": aggregate,
+                  "inputs": {step["id"]: step["id"] for step in steps if step["id"].startswith("sma_")}})
+    return steps
+
+
+def make_runner(executor: DAGExecutor):
+    """What the coordinator does per step: parameters plus inputs, sync functions offloaded."""
+    async def run_step(step: dict, upstream: dict):
+        kwargs = dict(step.get("parameters", {}))
+        for name, ref in step.get("inputs", {}).items():
+            kwargs[name] = resolve_input(ref, upstream)
+        return await executor.call(step["fn"], **kwargs)
+    return run_step
+
+
+async def run_sequential(steps: list) -> dict:
+    """Before: every step in order, sync functions called inline on the event loop."""
+    outputs = {}
+    for step in steps:
+        kwargs = dict(step.get("parameters", {}))
+        for name, ref in step.get("inputs", {}).items():
+            kwargs[name] = resolve_input(ref, outputs)
+        result = step["fn"](**kwargs)
+        outputs[step["id"]] = await result if asyncio.iscoroutine(result) else result
+    return outputs
+
+
+async def measure_stall(work) -> tuple:
+    """Run ``work`` while a 5 ms heartbeat measures the longest event loop stall."""
+    stall, stop = 0.0, False
+
+    async def heartbeat():
+        nonlocal stall
+        last = time.perf_counter()
+        while not stop:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            stall = max(stall, now - last - 0.005)
+            last = now
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    result = await work
+    elapsed = time.perf_counter() - started
+    stop = True
+    await beat
+    return result, elapsed, stall
+
+
+async def run_checks() -> bool:
+    success = True
+    executor = DAGExecutor(max_concurrency=8, max_workers=5)
+    steps = price_workflow()
+
+    before, before_s, before_stall = await measure_stall(run_sequential(steps))
+    run, after_s, after_stall = await measure_stall(executor.run(steps, make_runner(executor)))
+    print(f"   Sequential, inline (before): {before_s * 1e3:6.0f} ms, longest loop stall {before_stall * 1e3:5.1f} ms")
+    print(f"   DAG executor (after):        {after_s * 1e3:6.0f} ms, longest loop stall {after_stall * 1e3:5.1f} ms")
+    timing = run.timing
+    print(f"   Critical path {' -> '.join(timing['critical_path'])}: {timing['critical_path_ms']:.0f} ms "
+          f"of {timing['total_ms']:.0f} ms, parallelism {timing['parallelism']}")
+    success &= check(f"Independent steps run concurrently ({before_s / after_s:.1f}x faster)",
+                     run.succeeded and after_s < before_s / 3)
+    success &= check("Sync tools no longer block the event loop", before_stall > 0.09 and after_stall < 0.02)
+    success &= check("Outputs reach dependent steps (same aggregate as before)",
+                     run.steps["aggregate"].output == before["aggregate"]
+                     and run.steps["aggregate"].output["symbols"] == len(SYMBOLS))
+    success &= check("Critical path runs through the slowest fetch",
+                     timing["critical_path"] == ["fetch_sol", "sma_sol", "aggregate"]
+                     and timing["steps"]["fetch_sol"]["duration_ms"] >= 150)
+
+    # Timeouts, retries and skipping
+    calls = {"flaky": 0, "slow": 0, "missing": 0}
+
+    def flaky():
+        calls["flaky"] += 1
+        if calls["flaky"] < 3:
+            raise ConnectionError("exchange timeout")
+        return "ok"
+
+    async def slow():
+        calls["slow"] += 1
+        await asyncio.sleep(1)
+
+    async def missing():
+        calls["missing"] += 1
+        raise StepError("Tool not found")
+
+    async def after_slow(value):
+        return value
+
+    retry_executor = DAGExecutor(retry_backoff=0.01)
+    run = await retry_executor.run([
+        {"id": "flaky", "fn": flaky, "retries": 2, "depends_on": []},
+        {"id": "slow", "fn": slow, "timeout": 0.05, "retries": 1},
+        {"id": "after_slow", "fn": after_slow, "inputs": {"value": "slow"}},
+        {"id": "missing", "fn": missing, "retries": 3},
+        {"id": "independent", "fn": fetch_price, "parameters": {"symbol": "BTC/USDT"}},
+    ], make_runner(retry_executor))
+    states = {sid: (r.status, r.attempts) for sid, r in run.steps.items()}
+    success &= check(f"Failed step retried until it succeeds {states['flaky']}", states["flaky"] == ("success", 3))
+    success &= check(f"Per-step timeout enforced on every attempt {states['slow']}",
+                     states["slow"] == ("timeout", 2) and run.steps["slow"].duration < 0.3)
+    success &= check("Step whose dependency failed is skipped", states["after_slow"] == ("skipped", 0))
+    success &= check("StepError is not retried", states["missing"] == ("error", 1) and calls["missing"] == 1)
+    success &= check("Independent steps finish regardless", states["independent"] == ("success", 1))
+
+    # Global concurrency cap across concurrent runs
+    capped = DAGExecutor(max_concurrency=3)
+
+    async def unit(n):
+        await asyncio.sleep(0.02)
+        return n
+
+    fan_out = [{"id": f"s{i}", "fn": unit, "parameters": {"n": i}, "depends_on": []} for i in range(5)]
+    started = time.perf_counter()
+    runs = await asyncio.gather(*(capped.run(fan_out, make_runner(capped)) for _ in range(4)))
+    elapsed = time.perf_counter() - started
+    success &= check(f"4 concurrent runs of 5 steps never exceed 3 running steps "
+                     f"(peak {capped.stats['peak_concurrency']}, {elapsed * 1e3:.0f} ms)",
+                     all(r.succeeded for r in runs) and capped.stats["peak_concurrency"] == 3 and elapsed >= 0.12)
+    queued = max(s["queued_ms"] for r in runs for s in r.timing["steps"].values())
+    success &= check(f"Time spent waiting for a slot is reported ({queued:.0f} ms)", queued > 10)
+
+    # Bounded thread pool for sync tools
+    pooled = DAGExecutor(max_workers=2)
+    threads = set()
+
+    def blocking(n):
+        threads.add(threading.current_thread().name)
+        time.sleep(0.05)
+        return n
+
+    started = time.perf_counter()
+    await pooled.run([{"id": f"b{i}", "fn": blocking, "parameters": {"n": i}, "depends_on": []} for i in range(6)],
+                     make_runner(pooled))
+    elapsed = time.perf_counter() - started
+    success &= check(f"Sync tools share a pool of 2 threads ({len(threads)} used, {elapsed * 1e3:.0f} ms)",
+                     len(threads) == 2 and all(t.startswith("workflow-step") for t in threads) and elapsed >= 0.15)
+
+    # Graph validation and legacy workflows
+    def raises(steps):
+        try:
+            build_graph(steps)
+            return False
+        except WorkflowError:
+            return True
+
+    success &= check("Cycles, unknown dependencies and duplicate ids are rejected",
+                     raises([{"id": "a", "depends_on": ["b"]}, {"id": "b", "depends_on": ["a"]}])
+                     and raises([{"id": "a", "depends_on": ["nope"]}])
+                     and raises([{"id": "a"}, {"id": "a"}]))
+    order = []
+
+    async def record(n):
+        await asyncio.sleep(0.01 * (3 - n))
+        order.append(n)
+
+    legacy = [{"step": n, "fn": record, "parameters": {"n": n}} for n in (1, 2, 3)]
+    await executor.run(legacy, make_runner(executor))
+    success &= check("Workflows without dependencies still run step by step",
+                     order == [1, 2, 3] and build_graph(legacy) == {"1": [], "2": ["1"], "3": ["2"]})
+    order.clear()
+    legacy[0] = {"step": 1, "fn": missing}
+    run = await executor.run(legacy, make_runner(executor))
+    success &= check("Workflows without dependencies keep going after a failed step",
+                     order == [2, 3] and [r.status for r in run.steps.values()] == ["error", "success", "success"])
+    for pool in (executor, retry_executor, capped, pooled):
+        pool.close()
+    return success
+
+
+def benchmark_workflow_dag():
+    logging.getLogger("common.workflow_dag").setLevel(logging.ERROR)  # Expected step failures
+    print("🕸️  Tool Workflow DAG Benchmark")
+    print("=" * 50)
+    success = asyncio.run(run_checks())
+    print("=" * 50)
+    print("✅ Workflow DAG benchmark passed" if success else "❌ Workflow DAG benchmark failed")
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if benchmark_workflow_dag() else 1)
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Agent WebSocket RPC Benchmark
+Runs an agent (FastAPI app + AgentWebSocketClient serving RPC) against a
+meta-side /ws endpoint wired like the hybrid Meta Agent's, then compares
+round-trip latency of calls over the WebSocket with the per-call HTTP
+requests the Meta Agent made before (before/after). Also checks result
+correlation with many calls in flight on one socket, per-call timeouts and
+caller cancellation reaching the agent's handler, streamed partial
+results, and the HTTP fallback once the socket is gone.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+import requests
+import uvicorn
+from fastapi import FastAPI, WebSocket
+from fastapi.responses import StreamingResponse
+
+from common.websocket_client import AgentWebSocketClient
+from common.wire_format import WireCodec, decode_frame, negotiate_subprotocol
+from common.ws_rpc import RPCEndpoint, RPCUnavailable, RPC_TYPES, asgi_dispatcher, agent_key
+
+CALLS = 300
+CONCURRENT = 50
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def make_agent_app(events: dict) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy", "agent": "risk", "active_tasks": 2}
+
+    @app.post("/assess/strategy")
+    async def assess(body: dict):
+        await asyncio.sleep(body.get("delay", 0))
+        return {"request": body["n"], "risk_score": body["n"] * 0.01, "approved": True}
+
+    @app.get("/slow")
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+            return {"done": True}
+        except asyncio.CancelledError:
+            events["slow_cancelled"] += 1
+            raise
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(5):
+                yield json.dumps({"step": i, "sent_at": time.monotonic()}) + "\n"
+                await asyncio.sleep(0.05)
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    return app
+
+
+def make_meta_app(agent_rpc: dict) -> FastAPI:
+    """The hybrid Meta Agent's /ws handling, reduced to the parts RPC uses."""
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping():
+        return {"pong": True}
+
+    @app.websocket("/ws")
+    async def ws(websocket: WebSocket):
+        subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols", []))
+        await websocket.accept(subprotocol=subprotocol)
+        codec = WireCodec(subprotocol)
+
+        async def send(message):
+            frame = codec.encode([message])
+            await (websocket.send_bytes(frame) if isinstance(frame, bytes) else websocket.send_text(frame))
+
+        rpc = RPCEndpoint(send, asgi_dispatcher(app))
+        try:
+            while True:
+                frame = await websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    break
+                for data in decode_frame(frame["bytes"] if frame.get("bytes") is not None else frame.get("text", "")):
+                    if data.get("type") in RPC_TYPES:
+                        await rpc.handle(data)
+                    elif data.get("type") == "agent_status" and data["data"].get("rpc"):
+                        agent_rpc[agent_key(data["data"]["agent"])] = rpc
+        finally:
+            rpc.close()
+
+    return app
+
+
+def start_in_thread(app: FastAPI) -> tuple:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="error", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, server.servers[0].sockets[0].getsockname()[1]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    return (f"p50 {statistics.median(samples) * 1e3:.2f} ms, "
+            f"p95 {samples[int(len(samples) * 0.95)] * 1e3:.2f} ms")
+
+
+async def run_checks(agent_port: int, meta_port: int, events: dict, agent_app: FastAPI) -> bool:
+    success = True
+    agent_rpc = {}
+    meta = uvicorn.Server(uvicorn.Config(make_meta_app(agent_rpc), host="127.0.0.1", port=meta_port,
+                                         log_level="error", lifespan="off"))
+    meta_task = asyncio.create_task(meta.serve())
+    while not meta.started:
+        await asyncio.sleep(0.01)
+
+    client = AgentWebSocketClient("agentic_risk", "127.0.0.1", meta_port)
+    client.auto_reconnect = False
+    await client.connect()
+    await client.serve_rpc(agent_app)
+    while "risk" not in agent_rpc:
+        await asyncio.sleep(0.01)
+    rpc = agent_rpc["risk"]
+
+    # Round-trip latency: HTTP as _call_agent made it (blocking requests, new connection per call) vs RPC
+    url = f"http://127.0.0.1:{agent_port}/health"
+    http_samples, rpc_samples = [], []
+    for _ in range(CALLS):
+        started = time.perf_counter()
+        http_result = requests.get(url, timeout=30).json()
+        http_samples.append(time.perf_counter() - started)
+    for _ in range(CALLS):
+        started = time.perf_counter()
+        status, rpc_result = await rpc.call("GET", "/health")
+        rpc_samples.append(time.perf_counter() - started)
+    print(f"   HTTP per call (before): {percentiles(http_samples)}")
+    print(f"   WebSocket RPC (after):  {percentiles(rpc_samples)}")
+    print(f"   Speedup at p50: {statistics.median(http_samples) / statistics.median(rpc_samples):.1f}x")
+    success &= check("RPC returns the same result as the HTTP endpoint", status == 200 and rpc_result == http_result)
+    success &= check("RPC round trip faster than HTTP", statistics.median(rpc_samples) < statistics.median(http_samples))
+
+    # Many calls in flight on one socket, finishing out of order
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        rpc.call("POST", "/assess/strategy", {"n": n, "delay": (CONCURRENT - n) * 0.002}) for n in range(CONCURRENT)])
+    elapsed = time.perf_counter() - started
+    serial = sum((CONCURRENT - n) * 0.002 for n in range(CONCURRENT))
+    success &= check(f"{CONCURRENT} concurrent calls multiplexed and correlated "
+                     f"({elapsed * 1e3:.0f} ms, {serial * 1e3:.0f} ms of handler time)",
+                     all(status == 200 and body["request"] == n for n, (status, body) in enumerate(results))
+                     and elapsed < 2 * CONCURRENT * 0.002)
+
+    # Per-call timeout and caller cancellation both stop the handler on the agent
+    try:
+        await rpc.call("GET", "/slow", timeout=0.2)
+        timed_out = False
+    except asyncio.TimeoutError:
+        timed_out = True
+    task = asyncio.create_task(rpc.call("GET", "/slow"))
+    await asyncio.sleep(0.1)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await asyncio.sleep(0.1)
+    success &= check(f"Timeout raised and both abandoned calls cancelled on the agent ({events['slow_cancelled']})",
+                     timed_out and events["slow_cancelled"] == 2 and not client.rpc.get_stats()["serving"])
+
+    # Streamed partial results arrive as they are produced
+    arrivals = []
+    async for chunk in rpc.stream("GET", "/stream"):
+        arrivals.append((chunk["step"], time.monotonic() - chunk["sent_at"]))
+    success &= check(f"5 partial results streamed, each delivered within "
+                     f"{max(delay for _, delay in arrivals) * 1e3:.1f} ms of being produced",
+                     [step for step, _ in arrivals] == list(range(5)) and all(d < 0.04 for _, d in arrivals))
+
+    # Agent -> meta calls use the socket while it is up and HTTP once it is gone
+    over_socket = await client.call("GET", "/api/ping")
+    socket_calls = client.rpc.get_stats()["completed"]
+    in_flight = asyncio.create_task(rpc.call("GET", "/slow"))
+    await asyncio.sleep(0.05)
+    await client.disconnect()
+    try:
+        await in_flight
+        dropped = False
+    except RPCUnavailable:
+        dropped = True
+    over_http = await client.call("GET", "/api/ping")
+    success &= check("Agent call to the Meta Agent went over the socket", over_socket == {"pong": True} and socket_calls == 1)
+    success &= check("Call in flight when the socket closed failed fast with RPCUnavailable", dropped)
+    success &= check("Agent call falls back to HTTP without a socket", over_http == {"pong": True})
+
+    meta.should_exit = True
+    await meta_task
+    return success
+
+
+def benchmark_ws_rpc():
+    logging.getLogger("common.websocket_client").setLevel(logging.ERROR)  # No communication logger DB here
+    print("🔁 Agent WebSocket RPC Benchmark")
+    print("=" * 50)
+    events = {"slow_cancelled": 0}
+    agent_app = make_agent_app(events)
+    agent_server, agent_thread, agent_port = start_in_thread(agent_app)
+    meta_port = free_port()
+    try:
+        success = asyncio.run(run_checks(agent_port, meta_port, events, agent_app))
+    finally:
+        agent_server.should_exit = True
+        agent_thread.join(5)
+    print("=" * 50)
+    print("✅ WebSocket RPC benchmark passed" if success else "❌ WebSocket RPC benchmark failed")
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if benchmark_ws_rpc() else 1)
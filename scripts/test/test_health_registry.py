@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Health Registry Test Script
+Serves fake agent, Vault and database health checks locally and checks
+that HealthRegistry probes them concurrently with per-target timeouts,
+adapts its intervals, serves the cached view without probing and flags
+stale entries.
+"""
+
+import asyncio
+import logging
+import sys
+import os
+import time
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from aiohttp import web
+
+from common.health_registry import HealthRegistry, HealthTarget, http_probe, vault_probe, database_probe
+
+SLOW_SECONDS = 2.0
+
+
+class FakeDatabase:
+    def __init__(self, healthy: bool):
+        self.healthy = healthy
+
+    def health_check(self) -> bool:
+        return self.healthy
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+async def start_server():
+    async def healthy(request):
+        return web.json_response({"status": "healthy", "version": "2.1.0", "active_tasks": 3})
+
+    async def slow(request):
+        await asyncio.sleep(SLOW_SECONDS)
+        return web.json_response({"status": "healthy"})
+
+    async def failing(request):
+        return web.Response(status=500, text="boom")
+
+    async def sealed_vault(request):
+        return web.json_response({"initialized": True, "sealed": True, "version": "1.18.3"}, status=503)
+
+    app = web.Application()
+    app.router.add_get("/healthy/health", healthy)
+    app.router.add_get("/slow/health", slow)
+    app.router.add_get("/failing/health", failing)
+    app.router.add_get("/v1/sys/health", sealed_vault)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def run_checks() -> bool:
+    success = True
+    runner, base = await start_server()
+    registry = HealthRegistry([
+        HealthTarget("signal", "Signal Agent", http_probe(f"{base}/healthy/health"), timeout=0.5, info={"port": 8003}),
+        HealthTarget("risk", "Risk Agent", http_probe(f"{base}/slow/health"), timeout=0.3),
+        HealthTarget("monitor", "Monitor Agent", http_probe(f"{base}/failing/health"), timeout=0.5),
+        HealthTarget("down", "Down Agent", http_probe("http://127.0.0.1:9/health"), timeout=0.5),
+        HealthTarget("vault", "Vault", vault_probe(base), timeout=0.5),
+        HealthTarget("db", "TimescaleDB", database_probe(lambda: FakeDatabase(True)), timeout=0.5),
+    ], min_interval=0.2, base_interval=0.4, max_interval=1.0)
+    try:
+        view = registry.view()
+        success &= check("Before any probe every target is unknown and stale",
+                         all(e["status"] == "unknown" and e["stale"] for e in view["agents"].values()))
+
+        started = time.monotonic()
+        await registry.refresh()
+        elapsed = time.monotonic() - started
+        success &= check(f"All targets probed concurrently ({elapsed:.2f}s, slowest timeout 0.5s)", elapsed < 0.9)
+
+        agents = registry.view()["agents"]
+        success &= check("Healthy agent fields passed through",
+                         agents["signal"]["status"] == "healthy" and agents["signal"]["version"] == "2.1.0"
+                         and agents["signal"]["port"] == 8003 and agents["signal"]["checked_at"] is not None)
+        success &= check(f"Slow agent cut off by its own timeout ({agents['risk']['error']})",
+                         agents["risk"]["status"] == "unreachable" and agents["risk"]["response_time"] < 0.5)
+        success &= check("HTTP 500 reported as unhealthy",
+                         agents["monitor"]["status"] == "unhealthy" and agents["monitor"]["error"] == "HTTP 500")
+        success &= check("Refused connection reported as unreachable", agents["down"]["status"] == "unreachable")
+        success &= check("Sealed Vault detected from /v1/sys/health",
+                         agents["vault"]["status"] == "sealed" and agents["vault"]["version"] == "1.18.3")
+        success &= check("Database checked with SELECT 1 health check", agents["db"]["status"] == "healthy")
+
+        # Background refresh with adaptive intervals
+        registry.start()
+        await asyncio.sleep(2.5)
+        agents = registry.view()["agents"]
+        success &= check(f"Failing targets polled at the fast interval ({agents['monitor']['check_interval']}s)",
+                         agents["monitor"]["check_interval"] == 0.2 and agents["monitor"]["consecutive_failures"] >= 5)
+        success &= check(f"Healthy targets backed off to the ceiling ({agents['signal']['check_interval']}s)",
+                         agents["signal"]["check_interval"] == 1.0)
+
+        started = time.perf_counter()
+        for _ in range(1000):
+            registry.view()
+        per_view = (time.perf_counter() - started) / 1000
+        success &= check(f"Cached view served without probing ({per_view * 1e6:.0f} µs per call)", per_view < 0.005)
+
+        await registry.stop()
+        await asyncio.sleep(2.5)
+        view = registry.view()
+        success &= check(f"Entries flagged stale once the refresher stops ({view['stale_agents']} stale)",
+                         not view["refresher_running"] and view["stale_agents"] == view["total_agents"])
+    finally:
+        await registry.stop()
+        await runner.cleanup()
+    return success
+
+
+def test_health_registry():
+    logging.getLogger("common.health_registry").setLevel(logging.ERROR)  # Expected probe failures
+    print("🩺 Testing Health Registry")
+    print("=" * 50)
+    success = asyncio.run(run_checks())
+    print("=" * 50)
+    print("✅ Health registry tests passed" if success else "❌ Health registry tests failed")
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if test_health_registry() else 1)
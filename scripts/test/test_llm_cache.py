@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache Test Script
+Runs VolexSwarmOpenAIClient against a local fake completion backend and checks
+cache hits, TTL expiry, the disk tier and its cleanup, semantic bucket keys
+and the counters.
+"""
+
+import asyncio
+import sys
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from common.disk_cache import DiskCacheStore
+from common.llm_cache import LLMResponseCache
+from common.openai_client import VolexSwarmOpenAIClient
+
+
+class FakeCompletionBackend:
+    """Stands in for the OpenAI client: answers every request and counts them."""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, max_tokens, temperature):
+        self.calls += 1
+        content = f"**Market Commentary**\nAnswer {self.calls} to {len(messages)} messages\n**Sentiment**: bullish"
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=120, completion_tokens=40)
+        )
+
+
+def market_info(price: float) -> dict:
+    return {
+        "symbol": "BTCUSDT",
+        "current_price": price,
+        "price_change_24h": 2.345,
+        "volume_24h": 1234567.0,
+        "technical_indicators": {"rsi": 61.27, "macd": 12.5},
+        "timestamp": time.time()
+    }
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def test_llm_cache():
+    print("🗄️ Testing LLM Response Cache")
+    print("=" * 50)
+    success = True
+
+    with tempfile.TemporaryDirectory() as directory:
+        backend = FakeCompletionBackend()
+        cache = LLMResponseCache(max_entries=16, store=DiskCacheStore(directory))
+        client = VolexSwarmOpenAIClient(backend=backend, cache=cache)
+
+        # Exact-request caching through generate_completion
+        messages = [{"role": "user", "content": "Summarize   BTC  market"}]
+        first = asyncio.run(client.generate_completion(messages))
+        second = asyncio.run(client.generate_completion([{"role": "user", "content": "Summarize BTC market"}]))
+        success &= check("Repeated completion served from cache (whitespace normalized)",
+                         first == second and backend.calls == 1)
+        asyncio.run(client.generate_completion(messages, use_cache=False))
+        success &= check("use_cache=False bypasses the cache", backend.calls == 2)
+
+        # Structured calls: exact keys miss when the price moves, semantic keys don't
+        client.generate_market_commentary(market_info(43251.7))
+        client.generate_market_commentary(market_info(43251.7))
+        success &= check("Identical market commentary cached", backend.calls == 3)
+        client.generate_market_commentary(market_info(43262.1))
+        success &= check("Exact key misses on a small price move", backend.calls == 4)
+        client.generate_market_commentary(market_info(43251.7), semantic_cache=True)
+        client.generate_market_commentary(market_info(43262.1), semantic_cache=True)
+        success &= check("Semantic bucket reuses one answer for near-identical snapshots", backend.calls == 5)
+        client.generate_market_commentary(market_info(45100.0), semantic_cache=True)
+        success &= check("Semantic bucket misses on a material move", backend.calls == 6)
+
+        # Disk tier survives a cold memory tier
+        cache.clear_memory()
+        client.generate_market_commentary(market_info(43251.7))
+        success &= check("Disk tier answers after memory is cleared",
+                         backend.calls == 6 and cache.stats["persistent_hits"] == 1)
+
+        # TTL expiry
+        cache.ttls["market_commentary"] = 0.05
+        client.generate_market_commentary(market_info(40000.0))
+        time.sleep(0.1)
+        client.generate_market_commentary(market_info(40000.0))
+        success &= check("Expired entry is refetched", backend.calls == 8 and cache.stats["expired"] >= 1)
+        expired_key = next(iter(cache._memory))
+        cache.put(expired_key, {"content": "stale"}, ttl=-1)
+        cache.clear_memory()
+        success &= check("Expired disk entry is deleted when looked up",
+                         cache.get(expired_key) is None
+                         and not os.path.exists(cache.store._path(expired_key)))
+
+        # Periodic sweep keeps the directory bounded
+        swept = LLMResponseCache(store=DiskCacheStore(os.path.join(directory, "swept")),
+                                 max_disk_entries=5, sweep_interval=0)
+        for i in range(12):
+            swept.put(f"{i:064x}", {"content": str(i)})
+        files = sum(len(names) for _, _, names in os.walk(swept.store.directory))
+        success &= check(f"Sweep caps the disk tier ({files} files kept)", files == 5 and swept.stats["sweeps"] == 12)
+
+        stats = client.get_cache_stats()
+        success &= check(f"Counters: {stats['memory_hits']} memory hits, {stats['persistent_hits']} disk hits, "
+                         f"{stats['misses']} misses, {stats['prompt_tokens_saved']} prompt tokens saved",
+                         stats["prompt_tokens_saved"] == 120 * (stats["memory_hits"] + stats["persistent_hits"]))
+
+    print("=" * 50)
+    print("✅ LLM cache tests passed" if success else "❌ LLM cache tests failed")
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if test_llm_cache() else 1)
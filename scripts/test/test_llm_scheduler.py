@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+LLM Scheduler Test Script
+Drives LLMScheduler with a slow fake completion call and checks the
+concurrency bound, priority ordering, request/token budgets, cancellation
+and the wait metrics, then runs VolexSwarmOpenAIClient's async and
+structured (synchronous) calls through it.
+"""
+
+import asyncio
+import sys
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from common import llm_scheduler
+from common.llm_cache import LLMResponseCache
+from common.llm_scheduler import LLMScheduler, Priority
+from common.openai_client import VolexSwarmOpenAIClient
+
+
+class SlowBackend:
+    """Blocking fake LLM call that records start order and peak concurrency."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.started = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def call(self, label: str):
+        with self.lock:
+            self.started.append(label)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return label
+
+    def create(self, model, messages, max_tokens, temperature):
+        self.call(messages[-1]["content"])
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))],
+            usage=SimpleNamespace(prompt_tokens=30, completion_tokens=10, total_tokens=40)
+        )
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+async def concurrency_and_priority() -> bool:
+    success = True
+    backend = SlowBackend()
+    scheduler = LLMScheduler(max_concurrency=2)
+    low = [scheduler.run(lambda i=i: backend.call(f"low{i}"), priority=Priority.LOW) for i in range(4)]
+    tasks = [asyncio.ensure_future(c) for c in low]
+    await asyncio.sleep(0)  # The first two start, the rest queue
+    tasks.append(asyncio.ensure_future(scheduler.run(lambda: backend.call("trade"), priority=Priority.TRADE)))
+    await asyncio.sleep(0)
+    success &= check(f"Queue depth reported ({scheduler.get_stats()['queue_depth_by_priority']})",
+                     scheduler.get_stats()["queue_depth_by_priority"] == {"trade": 1, "low": 2})
+    await asyncio.gather(*tasks)
+    success &= check(f"At most 2 calls in flight (peak {backend.peak})", backend.peak == 2)
+    success &= check(f"Trade request jumps the queued low-priority ones ({backend.started})",
+                     backend.started.index("trade") < backend.started.index("low3"))
+    stats = scheduler.get_stats()
+    success &= check(f"Wait metrics: avg {stats['wait_avg_seconds']:.3f}s, p95 {stats['wait_p95_seconds']:.3f}s",
+                     stats["completed"] == 5 and stats["wait_max_seconds"] > 0)
+    scheduler.shutdown()
+    return success
+
+
+async def budgets() -> bool:
+    success = True
+    original = llm_scheduler.WINDOW_SECONDS
+    llm_scheduler.WINDOW_SECONDS = 0.3   # Shrink the rolling minute so the test is quick
+    try:
+        backend = SlowBackend(delay=0.0)
+        scheduler = LLMScheduler(max_concurrency=8, requests_per_minute=2)
+        start = time.monotonic()
+        await asyncio.gather(*[scheduler.run(lambda i=i: backend.call(i)) for i in range(4)])
+        elapsed = time.monotonic() - start
+        success &= check(f"Request budget spreads 4 calls over two windows ({elapsed:.2f}s)",
+                         0.25 <= elapsed < 1.0 and scheduler.stats["throttled"] >= 1)
+        scheduler.shutdown()
+
+        scheduler = LLMScheduler(max_concurrency=8, tokens_per_minute=1000)
+        start = time.monotonic()
+        await asyncio.gather(*[scheduler.run(lambda i=i: backend.call(i), tokens=600,
+                                             actual_tokens=lambda _: 500) for i in range(2)])
+        elapsed = time.monotonic() - start
+        success &= check(f"Token budget holds the second 600-token call ({elapsed:.2f}s)", elapsed >= 0.25)
+        success &= check("Reservations reconciled to reported usage",
+                         scheduler.stats["tokens_used"] == 1000 and scheduler.stats["tokens_reserved"] == 1200)
+        scheduler.shutdown()
+    finally:
+        llm_scheduler.WINDOW_SECONDS = original
+    return success
+
+
+async def cancellation() -> bool:
+    success = True
+    backend = SlowBackend(delay=0.1)
+    scheduler = LLMScheduler(max_concurrency=1)
+    running = asyncio.ensure_future(scheduler.run(lambda: backend.call("running")))
+    queued = asyncio.ensure_future(scheduler.run(lambda: backend.call("queued")))
+    await asyncio.sleep(0.01)
+    queued.cancel()
+    try:
+        await scheduler.run(lambda: backend.call("timed out"), timeout=0.02)
+        timed_out = False
+    except asyncio.TimeoutError:
+        timed_out = True
+    await running
+    await asyncio.sleep(0.15)
+    success &= check("Timeout raised to the caller", timed_out)
+    success &= check(f"Cancelled and timed-out requests never reach the API ({backend.started})",
+                     backend.started == ["running"] and scheduler.stats["cancelled"] == 2)
+    success &= check("Queue drained", scheduler.get_stats()["queue_depth"] == 0 and scheduler.get_stats()["running"] == 0)
+    scheduler.shutdown()
+    return success
+
+
+async def client_integration() -> bool:
+    backend = SlowBackend(delay=0.02)
+    scheduler = LLMScheduler(max_concurrency=2)
+    client = VolexSwarmOpenAIClient(backend=backend, cache=LLMResponseCache(store=None), scheduler=scheduler)
+    prompts = [[{"role": "user", "content": f"prompt {i}"}] for i in range(6)]
+    results = await asyncio.gather(*[client.generate_completion(m, call_type="agent_vote") for m in prompts])
+    stats = client.get_scheduler_stats()
+    success = check(f"Client completions go through the scheduler ({stats['completed']} completed, "
+                    f"{stats['tokens_used']} tokens used)",
+                    results == ["ok"] * 6 and backend.peak == 2 and stats["tokens_used"] == 240)
+    scheduler.shutdown()
+    return success
+
+
+async def structured_calls() -> bool:
+    backend = SlowBackend(delay=0.05)
+    scheduler = LLMScheduler(max_concurrency=1)
+    client = VolexSwarmOpenAIClient(backend=backend, cache=LLMResponseCache(store=None), scheduler=scheduler)
+    info = {"symbol": "BTCUSDT", "current_price": 43250.0, "price_change_24h": 2.3, "volume_24h": 1.2e6,
+            "technical_indicators": {"rsi": 61.0}}
+    loop = asyncio.get_running_loop()
+    busy = asyncio.ensure_future(client.generate_completion([{"role": "user", "content": "busy"}]))
+    await asyncio.sleep(0.01)
+    commentary = loop.run_in_executor(None, client.generate_market_commentary, info)
+    await asyncio.sleep(0.01)
+    trade = asyncio.ensure_future(client.generate_completion([{"role": "user", "content": "trade"}],
+                                                             call_type="trading_decision"))
+    await asyncio.gather(busy, commentary, trade)
+    stats = scheduler.get_stats()
+    success = check(f"Structured calls from other threads queue at their priority ({backend.started[:2]})",
+                    len(backend.started) == 3 and backend.started[1] == "trade" and backend.peak == 1
+                    and stats["completed"] == 3 and stats["tokens_used"] == 120)
+    scheduler.shutdown()
+    standalone = LLMScheduler(max_concurrency=1)
+    client = VolexSwarmOpenAIClient(backend=backend, cache=LLMResponseCache(store=None), scheduler=standalone)
+    result = await loop.run_in_executor(None, client.generate_strategy_insights,
+                                        {"strategy_name": "momentum", "performance_data": {"total_return": 0.1},
+                                         "market_conditions": {"trend": "up"}})
+    success &= check("Without async callers they use the scheduler's own loop thread",
+                     standalone.get_stats()["completed"] == 1 and "insights" in result)
+    standalone.shutdown()
+    return success
+
+
+def test_llm_scheduler():
+    print("🚦 Testing LLM Scheduler")
+    print("=" * 50)
+    success = True
+    for case in (concurrency_and_priority, budgets, cancellation, client_integration, structured_calls):
+        success &= asyncio.run(case())
+    print("=" * 50)
+    print("✅ LLM scheduler tests passed" if success else "❌ LLM scheduler tests failed")
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if test_llm_scheduler() else 1)
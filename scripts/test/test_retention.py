@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+History Retention Test
+Runs retained histories against a FileColdStore in a temp directory and
+checks that they behave like the lists they replace, stay within their
+size caps and time windows, spill evicted records in the background,
+read hot and spilled records back through one query API (dataclasses and
+datetimes intact), find records by key, drop idle per-entity collections,
+report memory gauges, and keep a bounded backlog while the store is
+failing. Also compares memory held after 200k appends with
+an uncapped list (before/after).
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from common.retention import FileColdStore, RetentionManager
+
+APPENDS = 200_000
+
+
+@dataclass
+class Decision:
+    id: str
+    confidence: float
+    timestamp: datetime = field(default_factory=datetime.now)
+
+
+class FailingStore(FileColdStore):
+    """A file store that can be switched into failing writes."""
+
+    failing = False
+
+    def write_many(self, collection, rows):
+        if self.failing:
+            raise ConnectionError("archive unavailable")
+        super().write_many(collection, rows)
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+def record(i: int) -> dict:
+    return {"action": "created", "workflow_id": f"wf-{i}", "n": i, "timestamp": datetime.now(),
+            "result": {"success": i % 3 != 0, "duration": i * 0.001}}
+
+
+async def run_checks(directory: str) -> bool:
+    success = True
+    manager = RetentionManager(FileColdStore(os.path.join(directory, "archive")), flush_interval=0.05)
+
+    # List behaviour and the size cap
+    history = manager.collection("workflow_history", max_items=100)
+    for i in range(250):
+        history.append(record(i))
+    success &= check("Capped at 100 records in memory, 250 counted in total",
+                     len(history) == 100 and history.total == 250)
+    success &= check("Indexing, slices and iteration see the newest records",
+                     history[0]["n"] == 150 and history[-1]["n"] == 249
+                     and [r["n"] for r in history[-3:]] == [247, 248, 249]
+                     and sum(1 for _ in history) == 100 and bool(history))
+
+    # Spill and read back through the same query API
+    manager.start()
+    await asyncio.sleep(0.2)
+    stats = history.get_stats()
+    success &= check(f"150 evicted records spilled in the background ({stats['spilled']})",
+                     stats["spilled"] == 150 and stats["pending"] == 0)
+    everything = history.query()
+    success &= check("query returns spilled and in-memory records as one ordered history",
+                     [r["n"] for r in everything] == list(range(250)))
+    success &= check("Spilled records come back with their datetimes",
+                     isinstance(everything[0]["timestamp"], datetime))
+    failed = history.query(where=lambda r: not r["result"]["success"])
+    success &= check("where filters across both tiers", [r["n"] for r in failed] == list(range(0, 250, 3)))
+    reads = history.stats["cold_reads"]
+    recent = history.query(limit=20)
+    success &= check("A limit memory can satisfy doesn't touch the cold store",
+                     [r["n"] for r in recent] == list(range(230, 250)) and history.stats["cold_reads"] == reads)
+    success &= check("A limit reaching past memory reads only what's missing",
+                     [r["n"] for r in history.query(limit=120)] == list(range(130, 250)))
+    async_read = await history.aquery(where=lambda r: r["n"] < 5)
+    success &= check("aquery reads the cold store off the event loop", [r["n"] for r in async_read] == list(range(5)))
+    later = manager.collection("workflow_history")
+    success &= check("collection() returns the existing history by name", later is history)
+
+    # Time windows and dataclass round trips
+    evicted = []
+    decisions = manager.collection("decision_history", max_items=1000, max_age=0.3,
+                                   decode=lambda r: Decision(**r), on_evict=lambda d: evicted.append(d.id),
+                                   key=lambda d: d.id)
+    for i in range(5):
+        decisions.append(Decision(f"old-{i}", 0.5 + i / 10))
+    await asyncio.sleep(0.35)
+    for i in range(3):
+        decisions.append(Decision(f"new-{i}", 0.9))
+    success &= check("Records older than the window leave memory on append",
+                     [d.id for d in decisions] == ["new-0", "new-1", "new-2"] and len(evicted) == 5)
+    await asyncio.sleep(0.4)
+    success &= check("The background sweep expires idle collections", len(decisions) == 0 and len(evicted) == 8)
+    await manager.flush()
+    found = decisions.query(where=lambda d: d.id == "old-3")
+    success &= check("Spilled dataclasses are rebuilt by decode",
+                     len(found) == 1 and isinstance(found[0], Decision) and found[0].confidence == 0.8
+                     and isinstance(found[0].timestamp, datetime))
+    reads = decisions.stats["cold_reads"]
+    by_id = await decisions.aget("old-3")
+    success &= check("aget finds a spilled record by its key with one lookup",
+                     isinstance(by_id, Decision) and by_id.confidence == 0.8
+                     and decisions.stats["cold_reads"] == reads + 1 and decisions.get("nope") is None)
+    cutoff = datetime.now() - timedelta(seconds=0.5)
+    success &= check("since/until select by append time", [d.id for d in decisions.query(since=cutoff)]
+                     == ["new-0", "new-1", "new-2"] and len(decisions.query(until=cutoff)) == 5)
+
+    # Gauges
+    stats = manager.get_stats()
+    gauges = stats["collections"]["workflow_history"]
+    success &= check(f"Per-collection gauges ({gauges['in_memory']} records, ~{gauges['approx_bytes']:,} bytes)",
+                     gauges["in_memory"] == 100 and gauges["max_items"] == 100 and gauges["approx_bytes"] > 0
+                     and stats["records_written"] == 158 and stats["approx_bytes"] >= gauges["approx_bytes"])
+
+    # Per-entity collections leave the manager once idle
+    entity = manager.collection("fault_detection/h1", max_items=10, max_age=0.1, transient=True)
+    for i in range(3):
+        entity.append({"n": i})
+    await asyncio.sleep(0.3)
+    success &= check("Idle transient collection is dropped after its records spilled",
+                     "fault_detection/h1" not in manager.collections and manager.stats["dropped_collections"] == 1
+                     and [r["n"] for r in entity.query()] == [0, 1, 2])
+    entity.append({"n": 3})
+    success &= check("Appending registers it again", manager.collections.get("fault_detection/h1") is entity)
+    await manager.stop()
+
+    # Failing store: backlog stays bounded, nothing is lost once the store recovers
+    store = FailingStore(os.path.join(directory, "flaky"))
+    flaky = RetentionManager(store, max_pending=50)
+    audit = flaky.collection("security_history", max_items=10)
+    store.failing = True
+    for i in range(40):
+        audit.append({"n": i})
+    await flaky.flush()
+    success &= check("Failed write keeps the batch queued and still readable",
+                     audit.get_stats()["pending"] == 30 and flaky.stats["write_failures"] == 1
+                     and [r["n"] for r in audit.query()] == list(range(40)))
+    for i in range(40, 100):
+        audit.append({"n": i})
+    success &= check(f"Backlog capped at max_pending, oldest dropped ({audit.stats['dropped']})",
+                     audit.get_stats()["pending"] == 50 and audit.stats["dropped"] == 40)
+    store.failing = False
+    await flaky.flush()
+    success &= check("Backlog written once the store is back",
+                     audit.get_stats()["pending"] == 0 and [r["n"] for r in audit.query()] == list(range(40, 100)))
+
+    # Without a store evicted records are simply discarded
+    capped = RetentionManager().collection("optimization_history", max_items=5)
+    for i in range(8):
+        capped.append({"n": i})
+    success &= check("Without a cold store the cap just discards",
+                     len(capped) == 5 and capped.stats["dropped"] == 3 and len(capped.query()) == 5)
+    return success
+
+
+def measure_memory(directory: str) -> bool:
+    """Memory held after APPENDS records: uncapped list (before) vs retained history (after)."""
+    tracemalloc.start()
+    uncapped = []
+    for i in range(APPENDS):
+        uncapped.append(record(i))
+    before, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    sum(1 for r in uncapped if r["result"]["success"])
+    scan_before = time.perf_counter() - started
+    del uncapped
+    tracemalloc.stop()
+
+    async def fill() -> tuple:
+        manager = RetentionManager(FileColdStore(os.path.join(directory, "memory")), flush_interval=0.05)
+        history = manager.collection("workflow_history", max_items=2000)
+        manager.start()
+        tracemalloc.start()
+        for i in range(APPENDS):
+            history.append(record(i))
+            if i % 200 == 0:
+                await asyncio.sleep(0.001)   # Let the spiller run, as it would between requests
+        await manager.flush()
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        started = time.perf_counter()
+        sum(1 for r in history if r["result"]["success"])
+        scan_after = time.perf_counter() - started
+        await manager.stop()
+        return after, scan_after, history
+
+    after, scan_after, history = asyncio.run(fill())
+    print(f"   {APPENDS:,} appends: uncapped list holds {before / 1e6:.1f} MB (before), "
+          f"retained history {after / 1e6:.1f} MB (after)")
+    print(f"   Scan over the history: {scan_before * 1e3:.1f} ms before, {scan_after * 1e3:.2f} ms after")
+    success = check(f"Memory bounded by the cap ({before / after:.0f}x less)", after < before / 20)
+    success &= check(f"All records still readable from the archive ({history.stats['dropped']} dropped)",
+                     len(history.query()) == APPENDS)
+    return success
+
+
+def test_retention():
+    logging.getLogger("common.retention").setLevel(logging.ERROR)  # Expected write failures
+    print("🗄️  History Retention Test")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as directory:
+        success = asyncio.run(run_checks(directory))
+        success &= measure_memory(directory)
+    print("=" * 50)
+    print("✅ Retention test passed" if success else "❌ Retention test failed")
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if test_retention() else 1)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+WebSocket Broadcast Load Test
+Runs WebSocketBroadcaster against hundreds of simulated clients (fast,
+slow, very slow, stalled and broken) while status and notification
+frames are published, and checks that fast clients are unaffected, slow
+ones get conflated status, and stalled/broken/backlogged ones are evicted.
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import os
+import time
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from common.ws_broadcast import WebSocketBroadcaster
+
+CLIENT_MIX = {          # kind -> (count, seconds per send; None stalls forever)
+    "fast": (300, 0.001),
+    "slow": (60, 0.02),
+    "very_slow": (20, 0.3),
+    "stalled": (20, None),
+    "broken": (20, 0.0),
+}
+DURATION = 2.0
+STATUS_INTERVAL = 0.01      # 100 status frames/s, conflated
+NOTIFY_EVERY = 5            # Every 5th tick also sends a notification (20/s, not conflated)
+
+
+class SimulatedClient:
+    """Starlette-style socket whose send_text takes a fixed time, hangs or fails."""
+
+    def __init__(self, kind: str, delay):
+        self.kind = kind
+        self.delay = delay
+        self.received = []
+        self.closed_with = None
+
+    async def send_text(self, payload: str):
+        if self.kind == "broken":
+            raise ConnectionResetError("peer reset")
+        if self.delay is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.delay)
+        self.received.append(json.loads(payload))
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.closed_with = code
+
+
+def last_status(client: SimulatedClient) -> int:
+    return max((m["seq"] for m in client.received if m["type"] == "agent_status_update"), default=0)
+
+
+def notifications_received(client: SimulatedClient) -> int:
+    return sum(1 for m in client.received if m["type"] == "notification")
+
+
+def check(label: str, condition: bool) -> bool:
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+
+async def run_load() -> bool:
+    success = True
+    evicted = {}
+    broadcaster = WebSocketBroadcaster(max_queue=50, backlog_threshold=20, evict_after=0.5, send_timeout=0.5,
+                                       on_evict=lambda ws, reason: evicted.setdefault(ws.kind, []).append(reason))
+    clients = [SimulatedClient(kind, delay) for kind, (count, delay) in CLIENT_MIX.items() for _ in range(count)]
+    for i, client in enumerate(clients):
+        broadcaster.add(client, f"{client.kind}-{i}")
+
+    broadcast_time, ticks, notifications = 0.0, 0, 0
+    start = time.monotonic()
+    while time.monotonic() - start < DURATION:
+        ticks += 1
+        began = time.perf_counter()
+        broadcaster.broadcast({"type": "agent_status_update", "seq": ticks}, conflate_key="agent_status")
+        if ticks % NOTIFY_EVERY == 0:
+            notifications += 1
+            broadcaster.broadcast({"type": "notification", "n": notifications})
+        broadcast_time += time.perf_counter() - began
+        await asyncio.sleep(STATUS_INTERVAL)
+    await asyncio.sleep(0.5)  # Let the queues drain
+
+    stats = broadcaster.get_stats()
+    by_kind = {kind: [c for c in clients if c.kind == kind] for kind in CLIENT_MIX}
+    per_client = {c["client_id"]: c for c in stats["per_client"]}
+
+    print(f"   {len(clients)} clients, {ticks} status frames, {notifications} notifications in {DURATION}s")
+    print(f"   broadcast() cost {broadcast_time / ticks * 1e3:.3f} ms per tick for all clients")
+
+    fast = by_kind["fast"]
+    fast_p95 = max(per_client[f"fast-{i}"]["latency_p95_seconds"] for i in range(len(fast)))
+    success &= check(f"Fast clients got every notification and the final status (worst p95 {fast_p95 * 1e3:.1f} ms)",
+                     all(notifications_received(c) == notifications and last_status(c) == ticks for c in fast)
+                     and fast_p95 < 0.1)
+    success &= check("Broadcast never waits on the network (< 5 ms per tick)", broadcast_time / ticks < 0.005)
+
+    slow = by_kind["slow"]
+    success &= check(f"Slow clients stay connected with status conflated "
+                     f"({stats['conflated_total']} frames conflated)",
+                     "slow" not in evicted and all(last_status(c) == ticks for c in slow)
+                     and all(per_client[f"slow-{300 + i}"]["conflated"] > 0 for i in range(len(slow))))
+    success &= check("Slow clients still got every notification",
+                     all(notifications_received(c) == notifications for c in slow))
+    success &= check(f"Stalled clients evicted on send timeout ({len(evicted.get('stalled', []))})",
+                     len(evicted.get("stalled", [])) == CLIENT_MIX["stalled"][0])
+    success &= check(f"Broken clients evicted on first error ({len(evicted.get('broken', []))})",
+                     len(evicted.get("broken", [])) == CLIENT_MIX["broken"][0])
+    success &= check(f"Backlogged very slow clients evicted ({len(evicted.get('very_slow', []))})",
+                     len(evicted.get("very_slow", [])) == CLIENT_MIX["very_slow"][0]
+                     and all(c.closed_with == 1013 for c in by_kind["very_slow"]))
+    success &= check(f"Stats: {stats['clients']} clients left, {stats['evicted']} evicted, "
+                     f"{stats['dropped_total']} frames dropped",
+                     stats["clients"] == CLIENT_MIX["fast"][0] + CLIENT_MIX["slow"][0])
+    await broadcaster.close()
+    return success
+
+
+def test_ws_broadcast():
+    logging.getLogger("common.ws_broadcast").setLevel(logging.ERROR)  # One eviction warning per client
+    print("📡 Testing WebSocket Broadcast Under Load")
+    print("=" * 50)
+    success = asyncio.run(run_load())
+    print("=" * 50)
+    print("✅ WebSocket broadcast tests passed" if success else "❌ WebSocket broadcast tests failed")
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if test_ws_broadcast() else 1)